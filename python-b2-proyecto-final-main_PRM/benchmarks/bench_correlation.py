@@ -0,0 +1,98 @@
+"""
+Benchmark: DataFrame.corr() computed twice vs CorrelationService.
+
+Encodes the merged financing dataset (see bench_label_encoder.py) to numeric
+columns like the prepared data, repeats it up to 1M to 10M rows and times:
+
+- pandas: df.corr() twice (plot_correlations and get_most_important_features)
+- service: the first correlation_matrix (float32 centered Gram matrix) and the
+  second one (a cache hit: only the fingerprint is computed)
+- target only: the correlations with tipo_financiamiento without the matrix
+- append: 1% new rows added with append() vs df.corr() of the combined frame
+
+The largest difference with pandas and the top 6 features are checked.
+
+Usage (from the project folder):
+    python benchmarks/bench_correlation.py
+    python benchmarks/bench_correlation.py --sizes 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_label_encoder import merged_dataset, scaled  # noqa: E402
+from financing.correlation import CorrelationService, top_correlated  # noqa: E402
+from financing.labels import one_hot_to_labels  # noqa: E402
+
+TARGET = "tipo_financiamiento"
+
+
+def numeric_dataset():
+    # Like data_frame_tipo_financiamiento: label codes and 0/1 flags
+    data = merged_dataset()
+    one_hot = ["FinanciamentoCasa", "FinanciamentoCarro"]
+    data[TARGET] = one_hot_to_labels(data[one_hot].to_numpy().astype(int), one_hot)
+    data = data.drop(columns=one_hot)
+    for column in data.columns:
+        if data[column].dtype == bool:
+            data[column] = data[column].astype(np.int8)
+        elif not pd.api.types.is_numeric_dtype(data[column]):
+            data[column] = data[column].astype("category").cat.codes.astype(np.int8)
+    return data
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="correlation benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    data = numeric_dataset()
+    print(f"{'rows':>10} {'step':<26} {'time (s)':>9}  check")
+    for n_rows in args.sizes:
+        df = scaled(data, n_rows)
+        new_rows = scaled(data, n_rows // 100)
+
+        def row(step, seconds, check=""):
+            print(f"{n_rows:>10} {step:<26} {seconds:>9.2f}  {check}")
+
+        first_time, expected = timed(df.corr)
+        second_time, _ = timed(df.corr)
+        row("pandas corr() x2", first_time + second_time)
+        expected_top = expected[TARGET].abs().sort_values(ascending=False).drop(TARGET).head(6).index.tolist()
+
+        service = CorrelationService()
+        miss_time, matrix = timed(lambda: service.correlation_matrix(df))
+        hit_time, _ = timed(lambda: service.correlation_matrix(df))
+        error = np.abs(matrix - expected).max().max()
+        same_top = top_correlated(matrix[TARGET], 6, exclude=TARGET) == expected_top
+        row("service (miss + hit)", miss_time + hit_time,
+            f"miss {miss_time:.2f} s, hit {hit_time:.2f} s, max diff {error:.1e}, top 6 {'OK' if same_top else 'MISMATCH'}")
+
+        target_time, correlations = timed(lambda: CorrelationService().target_correlation(df, TARGET))
+        error = np.abs(correlations - expected[TARGET]).max()
+        row("target only", target_time, f"max diff {error:.1e}")
+
+        combined = pd.concat([df, new_rows], ignore_index=True)
+        recompute_time, expected = timed(combined.corr)
+        row("append: pandas corr()", recompute_time)
+        append_time, _ = timed(lambda: service.append(df, new_rows))
+        hit_time, matrix = timed(lambda: service.correlation_matrix(combined))
+        error = np.abs(matrix - expected).max().max()
+        row("append: service", append_time + hit_time,
+            f"append {append_time:.2f} s, hit {hit_time:.2f} s, max diff {error:.1e}")
+        del df, combined
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: one LabelEncoder per column vs CategoryEncoder on the merged dataset.
+
+Builds the merged financing dataset from the CSV files in data/ (typed read,
+duplicated IDs dropped, age and income ranges, inner join, cleaned column
+names), repeats its rows up to 1M to 10M rows and times, with the peak memory
+growth of each step:
+
+- one-hot decoding (OneHotDecoderImputer fit + transform of FinanciamentoCasa
+  and FinanciamentoCarro into tipo_financiamiento)
+- MultiColumnLabelEncoder fit, transform and inverse_transform of AGE_RANGE,
+  INCOME_RANGE, tipo_financiamiento and Regiao
+
+each one with the original LabelEncoder code (a copy of the frame, then one
+sorted lookup per column) and with CategoryEncoder (hash or category-code
+lookup, all columns assigned at once without copying the others). The codes,
+the classes and the decoded values are checked to be the same.
+
+Usage (from the project folder):
+    python benchmarks/bench_label_encoder.py
+    python benchmarks/bench_label_encoder.py --sizes 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+from financing import age_range_binner, income_range_binner, one_hot_to_labels, read_typed_csv  # noqa: E402
+from financing.encoding import CategoryEncoder, decode_columns, encode_columns  # noqa: E402
+from financing.model_zoo import PeakMemory  # noqa: E402
+
+ONE_HOT_COLUMNS = ["FinanciamentoCasa", "FinanciamentoCarro"]
+LABEL_COLUMNS = ["AGE_RANGE", "INCOME_RANGE", "tipo_financiamiento", "Regiao"]
+
+
+def merged_dataset():
+    # Same steps as the notebook up to data_frame_merged
+    def read(name):
+        return read_typed_csv(os.path.join(PROJECT, "data", f"{name}.csv")).drop_duplicates(subset=["ID"])
+
+    insurance = read("InsuranceCompanyABC")
+    for binner in (age_range_binner(), income_range_binner()):
+        insurance = binner.fit(insurance).add_range_column(insurance)
+    merged = insurance.merge(read("RetailBankEFG"), on="ID").merge(read("InvestmentBankCDE"), on="ID")
+    return merged.rename(columns=lambda x: re.sub("[^A-Za-z0-9_]+", "", x))
+
+
+def scaled(data, n_rows):
+    return data.iloc[np.resize(np.arange(len(data)), n_rows)].reset_index(drop=True)
+
+
+# Original code of OneHotDecoderImputer and MultiColumnLabelEncoder
+
+def old_one_hot(X):
+    encoders = {col: LabelEncoder().fit(X[col]) for col in ONE_HOT_COLUMNS}
+    X_transformed = X.copy()
+    for col in ONE_HOT_COLUMNS:
+        X_transformed[col] = encoders[col].transform(X[col])
+    X_transformed["tipo_financiamiento"] = one_hot_to_labels(X_transformed[ONE_HOT_COLUMNS].to_numpy(), ONE_HOT_COLUMNS)
+    return X_transformed.drop(columns=ONE_HOT_COLUMNS)
+
+
+def old_fit(X):
+    return {col: LabelEncoder().fit(X[col]) for col in LABEL_COLUMNS}
+
+
+def old_transform(X, encoders):
+    X_transformed = X.copy()
+    for col in LABEL_COLUMNS:
+        X_transformed[col] = encoders[col].transform(X[col])
+    return X_transformed
+
+
+def old_inverse(X, encoders):
+    X_inverse = X.copy()
+    for col in LABEL_COLUMNS:
+        X_inverse[col] = encoders[col].inverse_transform(X[col])
+    return X_inverse
+
+
+def new_one_hot(X):
+    encoders = {col: CategoryEncoder().fit(X[col]) for col in ONE_HOT_COLUMNS}
+    encoded = np.column_stack([encoders[col].transform(X[col]) for col in ONE_HOT_COLUMNS])
+    return X.drop(columns=ONE_HOT_COLUMNS).assign(tipo_financiamiento=one_hot_to_labels(encoded, ONE_HOT_COLUMNS))
+
+
+def new_fit(X):
+    return {col: CategoryEncoder().fit(X[col]) for col in LABEL_COLUMNS}
+
+
+def _run(function):
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+    return seconds, memory.peak_mb, result
+
+
+def measured(function):
+    # Each step runs in a forked child (sharing the data), so memory freed by one
+    # step cannot be reused by the next one and hide its peak
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    child = multiprocessing.get_context("fork").Process(target=lambda: sender.send(_run(function)))
+    child.start()
+    result = receiver.recv()
+    child.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="label encoder benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    merged = merged_dataset()
+    print(f"merged dataset: {merged.shape[0]} rows x {merged.shape[1]} columns")
+    print(f"{'rows':>10} {'step':<18} {'old (s)':>8} {'new (s)':>8} {'speedup':>8} "
+          f"{'old peak (MB)':>14} {'new peak (MB)':>14}  check")
+
+    for n_rows in args.sizes:
+        X = scaled(merged, n_rows)
+
+        def row(step, old, new, check):
+            print(f"{n_rows:>10} {step:<18} {old[0]:>8.2f} {new[0]:>8.2f} {old[0] / new[0]:>7.1f}x "
+                  f"{old[1]:>14.0f} {new[1]:>14.0f}  {'OK' if check else 'MISMATCH'}")
+
+        old = measured(lambda: old_one_hot(X)["tipo_financiamiento"].to_numpy())
+        new = measured(lambda: new_one_hot(X)["tipo_financiamiento"].to_numpy())
+        row("one-hot decode", old, new, np.array_equal(old[2], new[2]))
+
+        X = new_one_hot(X)
+        old_encoders, new_encoders = old_fit(X), new_fit(X)
+        old = measured(lambda: [encoder.classes_ for encoder in old_fit(X).values()])
+        new = measured(lambda: [encoder.classes_ for encoder in new_fit(X).values()])
+        row("fit", old, new, all(np.array_equal(a, b) for a, b in zip(old[2], new[2])))
+
+        old = measured(lambda: old_transform(X, old_encoders)[LABEL_COLUMNS].to_numpy())
+        new = measured(lambda: encode_columns(X, new_encoders)[LABEL_COLUMNS].to_numpy())
+        row("transform", old, new, np.array_equal(old[2], new[2]))
+
+        encoded = encode_columns(X, new_encoders)
+        old = measured(lambda: old_inverse(encoded, old_encoders)[LABEL_COLUMNS].to_numpy())
+        new = measured(lambda: decode_columns(encoded, new_encoders)[LABEL_COLUMNS].to_numpy())
+        row("inverse_transform", old, new, np.array_equal(old[2], new[2]))
+        del X, encoded
+
+
+if __name__ == "__main__":
+    main()
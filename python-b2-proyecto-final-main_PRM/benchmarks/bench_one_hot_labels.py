@@ -0,0 +1,61 @@
+"""
+Benchmark: row-wise DataFrame.apply vs vectorized one_hot_to_labels.
+
+Builds a random encoded FinanciamentoCasa/FinanciamentoCarro matrix with 10k to
+10M rows and times both ways of deriving tipo_financiamiento, checking that
+they produce the same labels. The row-wise version is only run up to
+--max-apply-rows because it takes minutes beyond that.
+
+Usage (from the project folder):
+    python benchmarks/bench_one_hot_labels.py
+    python benchmarks/bench_one_hot_labels.py --sizes 10000 1000000 --max-apply-rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from financing.labels import one_hot_to_labels  # noqa: E402
+from financing.preparation import OneHotDecoderImputer  # noqa: E402
+
+COLUMNS = ["FinanciamentoCasa", "FinanciamentoCarro"]
+
+
+# Per-row logic of OneHotDecoderImputer
+get_financing_type_name_from_row = OneHotDecoderImputer(
+    columns=COLUMNS, label_column_name="tipo_financiamiento").get_financing_type_name_from_row
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="one-hot label derivation benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--max-apply-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>9}  check")
+    for n_rows in args.sizes:
+        rng = np.random.default_rng(42)
+        encoded = pd.DataFrame(rng.integers(0, 2, size=(n_rows, len(COLUMNS))), columns=COLUMNS)
+
+        vector_time, labels = timed(lambda: one_hot_to_labels(encoded.to_numpy(), COLUMNS))
+
+        if n_rows <= args.max_apply_rows:
+            apply_time, expected = timed(lambda: encoded.apply(get_financing_type_name_from_row, axis=1))
+            check = "OK" if list(labels) == list(expected) else "MISMATCH"
+            print(f"{n_rows:>12} {apply_time:>12.3f} {vector_time:>15.4f} {apply_time / vector_time:>8.0f}x  {check}")
+        else:
+            print(f"{n_rows:>12} {'-':>12} {vector_time:>15.4f} {'-':>9}  skipped")
+
+
+if __name__ == "__main__":
+    main()
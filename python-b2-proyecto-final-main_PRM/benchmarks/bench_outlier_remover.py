@@ -0,0 +1,119 @@
+"""
+Benchmark: OutlierRemover recomputing the quartiles in every transform vs bounds learned once.
+
+Builds a random insurance-like table (Idade, Renda, Regiao, Genero and four
+flags) with 1M to 10M rows and times, with the peak memory growth of each step:
+
+- old: the original transform (quartiles of the call's data, copy, filtered
+  copy reassigned onto the columns, dropna)
+- fit: exact quartiles column by column, or a streaming quantile sketch
+- transform: one boolean mask built column by column and a single row selection
+
+The new transform keeps the same number of rows as the old one; the sketch
+bounds are checked to be within 0.5% (in rank) of the exact ones.
+
+Usage (from the project folder):
+    python benchmarks/bench_outlier_remover.py
+    python benchmarks/bench_outlier_remover.py --sizes 1000000 --sketch-size 4096
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from financing.model_zoo import PeakMemory  # noqa: E402
+from financing.outliers import (  # noqa: E402
+    filter_rows, iqr_bounds, quantiles_by_column, quartile_sketches, within_bounds_mask,
+)
+
+COLUMNS = ["Idade", "Renda"]
+
+
+def old_transform(X, columns, threshold=1.5):
+    # Original OutlierRemover.transform
+    X = X.copy()
+    Q1 = X[columns].quantile(0.25)
+    Q3 = X[columns].quantile(0.75)
+    IQR = Q3 - Q1
+    lower_bound = Q1 - threshold * IQR
+    upper_bound = Q3 + threshold * IQR
+    mask = ((X[columns] >= lower_bound) & (X[columns] <= upper_bound)).all(axis=1)
+    X_filtered = X[mask].reset_index(drop=True)
+    X[columns] = X_filtered[columns]
+    return X.dropna()
+
+
+def insurance_like(n_rows, rng):
+    return pd.DataFrame({
+        "ID": np.arange(n_rows, dtype=np.int64),
+        "Idade": rng.normal(45, 15, n_rows).astype(np.float32),
+        "Renda": rng.lognormal(8.8, 0.4, n_rows).astype(np.float32),
+        "Regiao": pd.Categorical(rng.choice(["N", "NE", "CO", "SE", "S"], n_rows)),
+        "Genero": rng.integers(0, 2, n_rows).astype(np.int8),
+        **{f"seguro {i}": rng.integers(0, 2, n_rows).astype(bool) for i in range(4)},
+    })
+
+
+def _run(function):
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+    return seconds, memory.peak_mb, result
+
+
+def measured(function):
+    # Each step runs in a forked child (sharing the data), so memory freed by one
+    # step cannot be reused by the next one and hide its peak
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    child = multiprocessing.get_context("fork").Process(target=lambda: sender.send(_run(function)))
+    child.start()
+    result = receiver.recv()
+    child.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OutlierRemover benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--sketch-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'step':<22} {'time (s)':>9} {'peak (MB)':>10}  check")
+    for n_rows in args.sizes:
+        X = insurance_like(n_rows, np.random.default_rng(42))
+        print(f"{n_rows:>10} {'(data)':<22} {'':>9} {X.memory_usage(deep=True).sum() / 1e6:>10.0f}")
+
+        old_time, old_peak, old_rows = measured(lambda: len(old_transform(X, COLUMNS)))
+        print(f"{'':>10} {'old transform':<22} {old_time:>9.2f} {old_peak:>10.0f}")
+
+        fit_time, fit_peak, quartiles = measured(lambda: quantiles_by_column(X, COLUMNS, [0.25, 0.75]))
+        lower, upper = iqr_bounds(quartiles.loc[0.25], quartiles.loc[0.75])
+        print(f"{'':>10} {'fit (exact)':<22} {fit_time:>9.2f} {fit_peak:>10.0f}")
+
+        sketch_time, sketch_peak, sketch_quartiles = measured(lambda: {
+            column: sketch.quantile([0.25, 0.75])
+            for column, sketch in quartile_sketches(X, COLUMNS, k=args.sketch_size).items()
+        })
+        rank_error = max(
+            abs((X[column] < estimate).mean() - q)
+            for column, estimates in sketch_quartiles.items() for q, estimate in zip((0.25, 0.75), estimates)
+        )
+        check = "OK" if rank_error < 0.005 else "MISMATCH"
+        print(f"{'':>10} {'fit (sketch)':<22} {sketch_time:>9.2f} {sketch_peak:>10.0f}  "
+              f"rank error {rank_error:.5f} {check}")
+
+        new_time, new_peak, new_rows = measured(lambda: len(filter_rows(X, within_bounds_mask(X, lower, upper))))
+        check = "OK" if new_rows == old_rows else "MISMATCH"
+        print(f"{'':>10} {'transform (one mask)':<22} {new_time:>9.2f} {new_peak:>10.0f}  "
+              f"{new_rows} rows kept {check}")
+        del X
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: the data-quality functions of the notebook vs profile_frame.
+
+Repeats the merged financing dataset (see bench_label_encoder.py) up to 1M to
+10M rows, with 1% of missing ages and incomes, and times the quality section
+of the notebook for one frame (get_nan_values twice, check_duplicates,
+describe and get_value_counts_non_numeric_columns, each scanning the frame)
+against a single profile_frame. The null counts, duplicated IDs, numeric
+summary and value counts are checked to be the same.
+
+Usage (from the project folder):
+    python benchmarks/bench_profiler.py
+    python benchmarks/bench_profiler.py --sizes 1000000 --n-jobs 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_label_encoder import merged_dataset, scaled  # noqa: E402
+from financing.profiling import profile_frame  # noqa: E402
+
+
+def old_quality_section(df, key="ID"):
+    # get_nan_values (printed once and once more for the answer), check_duplicates,
+    # describe() and get_value_counts_non_numeric_columns as in the notebook
+    nan_values = [{"Count NaN values in each column": df.isna().sum(),
+                   "Total number of records with NaN values": df.isna().any(axis=1).sum()} for _ in range(2)][-1]
+    duplicates = df.duplicated(subset=key).sum()
+    summary = df.describe()
+    non_numeric_cols = df.select_dtypes(exclude=["number"]).columns.tolist()
+    value_counts = {col: df[col].value_counts() for col in non_numeric_cols}
+    return nan_values, duplicates, summary, value_counts
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def same_results(old, profile):
+    nan_values, duplicates, summary, value_counts = old
+    return (
+        profile.null_counts.equals(nan_values["Count NaN values in each column"])
+        and profile.rows_with_nulls == nan_values["Total number of records with NaN values"]
+        and profile.duplicate_keys == duplicates
+        and list(profile.numeric_summary.columns) == list(summary.columns)
+        and np.allclose(profile.numeric_summary.to_numpy(), summary.to_numpy(), rtol=1e-5, equal_nan=True)
+        and profile.value_counts.keys() == value_counts.keys()
+        and all(profile.value_counts[col].equals(counts) for col, counts in value_counts.items())
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data-quality profiler benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    merged = merged_dataset()
+    print(f"{'rows':>10} {'columns':>8} {'functions (s)':>14} {'profile (s)':>12} {'speedup':>8}  check")
+    for n_rows in args.sizes:
+        df = scaled(merged, n_rows)
+        rng = np.random.default_rng(0)
+        for column in ("Idade", "Renda"):
+            df.loc[rng.random(n_rows) < 0.01, column] = np.nan
+
+        old_time, old = timed(lambda: old_quality_section(df))
+        new_time, profile = timed(lambda: profile_frame(df, key="ID", n_jobs=args.n_jobs))
+        check = "OK" if same_results(old, profile) else "MISMATCH"
+        print(f"{n_rows:>10} {df.shape[1]:>8} {old_time:>14.2f} {new_time:>12.2f} {old_time / new_time:>7.1f}x  {check}")
+        del df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: exhaustive GridSearchCV vs successive halving (SuccessiveHalvingSearch).
+
+Searches the hyperparameters of the notebook's Gradient Boosting, Random
+Forest and AdaBoost, each inside the imblearn pipeline with undersampling and
+SMOTE, on the encoded merged dataset (see bench_correlation.py). The grid is
+the same for both searches: GridSearchCV cross-validates every setting with
+the full n_estimators (resampling the folds in every fit), successive halving
+starts all of them with a fraction of the estimators (at least
+--min-resources) and promotes the best third each iteration, resampling
+each fold once. Both use all the cores.
+For each model it reports the time, the chosen setting and its score in the
+exhaustive search (the gap to the best one).
+
+Usage (from the project folder):
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --models "Gradient Boosting" --folds 5 --factor 2 --min-resources 5
+"""
+import argparse
+import os
+import sys
+import time
+
+from sklearn.model_selection import GridSearchCV, ParameterGrid, StratifiedKFold
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_correlation import TARGET, numeric_dataset  # noqa: E402
+from financing.model_zoo import available_cores  # noqa: E402
+from financing.search import SuccessiveHalvingSearch  # noqa: E402
+from financing.stages import SEARCH_SPACES, adaboost, balanced, gradient_boosting, random_forest  # noqa: E402
+
+
+def search_spaces():
+    # name -> (pipeline, grid): the notebook's pipelines and search spaces (financing.stages);
+    # n_estimators is the budget of successive halving
+    models = {"Gradient Boosting": gradient_boosting, "Random Forest": random_forest, "AdaBoost": adaboost}
+    return {name: (balanced(model()), SEARCH_SPACES[name]) for name, model in models.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hyperparameter search benchmark")
+    parser.add_argument("--models", nargs="+", default=list(search_spaces()))
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--factor", type=int, default=3)
+    parser.add_argument("--min-resources", type=int, default=10, help="fewest estimators of an iteration")
+    args = parser.parse_args()
+
+    data = numeric_dataset()
+    X, y = data.drop(columns=["ID", TARGET]), data[TARGET]
+    cv = StratifiedKFold(args.folds, shuffle=True, random_state=0)
+    cores = available_cores()
+    print(f"{len(X)} rows, {args.folds} folds, {cores} cores")
+
+    print(f"{'model':<18} {'settings':>8} {'search':>10} {'time (s)':>9} {'score':>7}  setting")
+    for name in args.models:
+        pipeline, grid = search_spaces()[name]
+        settings = len(ParameterGrid(grid))
+
+        start = time.perf_counter()
+        exhaustive = GridSearchCV(pipeline, grid, cv=cv, n_jobs=cores, refit=False).fit(X, y)
+        exhaustive_time = time.perf_counter() - start
+        scores = {str(sorted(params.items())): score for params, score
+                  in zip(exhaustive.cv_results_["params"], exhaustive.cv_results_["mean_test_score"])}
+
+        start = time.perf_counter()
+        halving = SuccessiveHalvingSearch(pipeline, grid, n_candidates=settings, resource="clf__n_estimators",
+                                          min_resources=args.min_resources, factor=args.factor, cv=cv,
+                                          core_budget=cores, refit=False, verbose=False).fit(X, y)
+        halving_time = time.perf_counter() - start
+        chosen = {key: value for key, value in halving.best_params_.items() if key != "clf__n_estimators"}
+
+        print(f"{name:<18} {settings:>8} {'grid':>10} {exhaustive_time:>9.1f} {exhaustive.best_score_:>7.4f}  "
+              f"{exhaustive.best_params_}")
+        print(f"{'':<18} {'':>8} {'halving':>10} {halving_time:>9.1f} "
+              f"{scores[str(sorted(chosen.items()))]:>7.4f}  {chosen}  "
+              f"({exhaustive_time / halving_time:.1f}x faster, {len(halving.schedule_)} iterations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: the scoring service with and without micro-batching.
+
+Starts `python -m financing.serving` on the model written by the notebook
+(output/model/financing_model.joblib) and sends single-customer requests
+from concurrent clients, each one waiting for its answer before sending the
+next. For each setting it reports the request throughput, the client
+latency percentiles and the mean batch size seen by the service. With
+--max-wait-ms 0 and --max-batch-rows 1 every request is its own predict call.
+
+Usage (from the project folder, after a batch run of the notebook):
+    python benchmarks/bench_serving.py
+    python benchmarks/bench_serving.py --model output/model/financing_model.joblib --clients 32 --requests 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT)
+from financing import read_typed_csv  # noqa: E402
+
+# (label, max batch rows, max wait in ms)
+SETTINGS = [("no batching", 1, 0.0), ("micro-batch 2 ms", 1024, 2.0), ("micro-batch 5 ms", 1024, 5.0)]
+
+
+def raw_records(n):
+    # Customers as they come from the sources: merged columns without the financing type
+    def read(name):
+        return read_typed_csv(os.path.join(PROJECT, "data", f"{name}.csv")).drop_duplicates(subset=["ID"])
+
+    retail = read("RetailBankEFG").drop(columns=["Financiamento Casa", "Financiamento Carro"])
+    merged = read("InsuranceCompanyABC").merge(retail, on="ID").merge(read("InvestmentBankCDE"), on="ID")
+    return json.loads(merged.sample(n, replace=True, random_state=0).to_json(orient="records"))
+
+
+def request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    with urllib.request.urlopen(urllib.request.Request(url, data), timeout=60) as response:
+        return json.loads(response.read())
+
+
+def start_service(model, port, max_batch_rows, max_wait_ms):
+    service = subprocess.Popen(
+        [sys.executable, "-m", "financing.serving", model, "--port", str(port),
+         "--max-batch-rows", str(max_batch_rows), "--max-wait-ms", str(max_wait_ms)],
+        cwd=PROJECT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(600):
+        try:
+            request(f"http://127.0.0.1:{port}/health")
+            return service
+        except OSError:
+            time.sleep(0.05)
+    service.kill()
+    raise RuntimeError("the service did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="scoring service benchmark")
+    parser.add_argument("--model", default=os.path.join(PROJECT, "output", "model", "financing_model.joblib"))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    records = raw_records(args.requests)
+    print(f"{'setting':<18} {'requests/s':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'rows/batch':>11}")
+    for label, max_batch_rows, max_wait_ms in SETTINGS:
+        service = start_service(args.model, args.port, max_batch_rows, max_wait_ms)
+        url = f"http://127.0.0.1:{args.port}"
+        try:
+            def timed_request(record):
+                start = time.perf_counter()
+                request(f"{url}/predict", [record])
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.clients) as clients:
+                latencies = np.array(list(clients.map(timed_request, records))) * 1000
+            elapsed = time.perf_counter() - start
+            stats = request(f"{url}/stats")
+        finally:
+            service.terminate()
+            service.wait()
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{label:<18} {len(records) / elapsed:>11.0f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} "
+              f"{stats['rows'] / stats['batches']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: sklearn's predict_proba vs the array-compiled ensembles (compile_ensemble).
+
+Trains the notebook's models on the encoded merged dataset (see
+bench_correlation.py): Gradient Boosting inside the imblearn pipeline with
+undersampling and SMOTE, Random Forest, AdaBoost and the soft Voting
+Classifier of the three. For each model it reports the median latency of
+scoring one row and a small batch (repeated calls, as the micro-batches of
+the scoring service) and the time to score a large batch, with predict_proba
+of the fitted model and of its CompiledEnsemble. The largest
+probability difference and the share of identical predictions are checked.
+
+Usage (from the project folder):
+    python benchmarks/bench_tree_predictor.py
+    python benchmarks/bench_tree_predictor.py --calls 200 --small-rows 16 --batch-rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_correlation import TARGET, numeric_dataset  # noqa: E402
+from bench_label_encoder import scaled  # noqa: E402
+from financing.stages import adaboost, balanced, gradient_boosting, random_forest, voting_classifier  # noqa: E402
+from financing.trees import compile_ensemble  # noqa: E402
+
+
+def notebook_models():
+    # Same models and hyperparameters as the notebook (financing.stages)
+    return {
+        "Gradient Boosting (pipeline)": balanced(gradient_boosting()),
+        "Random Forest": random_forest(),
+        "AdaBoost": adaboost(),
+        "Voting Classifier": voting_classifier(gradient_boosting(), random_forest(), adaboost()),
+    }
+
+
+def median_ms(function, calls):
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+
+def seconds(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compiled tree ensemble benchmark")
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--small-rows", type=int, default=64)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = numeric_dataset()
+    X, y = data.drop(columns=["ID", TARGET]), data[TARGET]
+    batch = scaled(X, args.batch_rows)
+    row = X.iloc[[0]]
+    small = X.iloc[:args.small_rows]
+
+    print(f"{'model':<30} {'':>9} {'1 row (ms)':>10} {f'{args.small_rows} rows (ms)':>14} "
+          f"{f'{args.batch_rows} rows (s)':>16}  check")
+    for name, model in notebook_models().items():
+        model.fit(X, y)
+        compiled = compile_ensemble(model)
+        times = {
+            scorer: (median_ms(lambda: predictor.predict_proba(row), args.calls),
+                     median_ms(lambda: predictor.predict_proba(small), args.calls),
+                     seconds(lambda: predictor.predict_proba(batch)))
+            for scorer, predictor in (("sklearn", model), ("compiled", compiled))
+        }
+
+        difference = np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max()
+        same = (compiled.predict(X) == model.predict(X)).mean()
+        check = "OK" if difference < 1e-9 and same == 1 else "MISMATCH"
+        for scorer, (single, small_time, batch_time) in times.items():
+            print(f"{name if scorer == 'sklearn' else '':<30} {scorer:>9} {single:>10.3f} {small_time:>14.3f} "
+                  f"{batch_time:>16.2f}" + (f"  max diff {difference:.1e}, {same:.2%} same {check}"
+                                             if scorer == "compiled" else ""))
+        print(f"{'':<30} {compiled}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Building blocks of the financing notebook.
+
+The names below are imported from their modules on first use (PEP 562), so
+`import financing` (and `python -m financing --help`) does not load pandas,
+sklearn or imblearn until something needs them.
+"""
+import importlib
+
+_EXPORTS = {
+    "one_hot_to_labels": "labels",
+    "RangeBinner": "binning",
+    "age_range_binner": "binning",
+    "income_range_binner": "binning",
+    "SCHEMAS": "loading",
+    "read_typed_csv": "loading",
+    "memory_usage_mb": "loading",
+    "StageCache": "cache",
+    "FigureOutput": "figures",
+    "RunReport": "report",
+    "ModelZoo": "model_zoo",
+    "comparison_table": "model_zoo",
+    "InstrumentedPipeline": "pipeline_tools",
+    "step_timings_table": "pipeline_tools",
+    "cross_validate_folds": "cross_validation",
+    "fold_iterations": "cross_validation",
+    "fit_pca": "decomposition",
+    "elbow_inertias": "decomposition",
+    "QuantileSketch": "quantiles",
+    "StreamingPreparation": "streaming",
+    "fit_streaming": "streaming",
+    "read_partitions": "streaming",
+    "iqr_bounds": "outliers",
+    "quartile_sketches": "outliers",
+    "quantiles_by_column": "outliers",
+    "within_bounds_mask": "outliers",
+    "filter_rows": "outliers",
+    "CategoryEncoder": "encoding",
+    "encode_columns": "encoding",
+    "decode_columns": "encoding",
+    "DataProfile": "profiling",
+    "profile_frame": "profiling",
+    "CorrelationService": "correlation",
+    "frame_fingerprint": "correlation",
+    "top_correlated": "correlation",
+    "CompiledEnsemble": "trees",
+    "compile_ensemble": "trees",
+    "SuccessiveHalvingSearch": "search",
+    "halving_schedule": "search",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
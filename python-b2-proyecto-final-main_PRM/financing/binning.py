@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# Age ranges used by CreateNewRangesColumns: [0, 25), [25, 30), ..., [60, inf).
+# Ages below 0 have no range (None label -> unknown_label)
+AGE_RANGE_EDGES = [0, 25, 30, 35, 40, 45, 50, 55, 60]
+AGE_RANGE_LABELS = [
+    None, 'R1-0-24', 'R2-25-29', 'R3-30-34', 'R4-35-39', 'R5-40-44', 'R6-45-49', 'R7-50-54', 'R8-55-59', 'R9-60'
+]
+
+# Income ranges: (-inf, 6000], (6000, 6500), [6500, 7000), ..., [9000, inf).
+# 6000 itself belongs to the first range, every other edge opens the range above
+INCOME_RANGE_EDGES = [6000, 6500, 7000, 7500, 8000, 8500, 9000]
+INCOME_RANGE_LABELS = [
+    'R1-6000', 'R2-6000-6500', 'R3-6500-7000', 'R4-7000-7500', 'R5-7500-8000', 'R6-8000-8500', 'R7-8500-9000', 'R8-9000'
+]
+INCOME_RANGE_RIGHT_CLOSED_EDGES = [6000]
+
+
+class RangeBinner(BaseEstimator, TransformerMixin):
+    def __init__(self, column, output_column, edges, labels, right_closed_edges=(),
+                 unknown_label="UNKNOWN", coerce_numeric=False):
+        """
+        Initialize the RangeBinner.
+
+        Assigns each value of `column` to a range by binary search over the sorted
+        edges and stores the result in `output_column` as a pandas Categorical.
+        A value equal to an edge falls in the range above it, unless the edge is
+        listed in `right_closed_edges`. NaN values and ranges labelled None get
+        `unknown_label`.
+
+        Parameters:
+        - column: str, name of the numeric column to bin
+        - output_column: str, name of the new categorical column
+        - edges: list of float, sorted range boundaries
+        - labels: list of str or None, len(edges) + 1 labels, from below the first edge to above the last
+        - right_closed_edges: list of float, edges whose equal values belong to the range below
+        - unknown_label: str, label for NaN values and for ranges labelled None
+        - coerce_numeric: bool, convert the column with pd.to_numeric(errors='coerce') first
+        """
+        self.column = column
+        self.output_column = output_column
+        self.edges = edges
+        self.labels = labels
+        self.right_closed_edges = right_closed_edges
+        self.unknown_label = unknown_label
+        self.coerce_numeric = coerce_numeric
+
+    def categories(self):
+        """
+        Every label the range column can take: the range labels and unknown_label.
+
+        Returns:
+        - list of str
+        """
+        return [label for label in self.labels if label is not None] + [self.unknown_label]
+
+    def fit(self, X, y=None):
+        """
+        Validate the range definition. Nothing is learned from the data.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - self: RangeBinner, the transformer instance
+        """
+        edges = np.asarray(self.edges, dtype=float)
+        if len(edges) == 0:
+            raise ValueError("at least one edge is required")
+        if np.any(np.diff(edges) <= 0):
+            raise ValueError("edges must be strictly increasing")
+        if len(self.labels) != len(edges) + 1:
+            raise ValueError("labels must have len(edges) + 1 elements")
+        return self
+
+    def bin_codes(self, values):
+        """
+        Compute the range index of every value.
+
+        Parameters:
+        - values: array-like of float
+
+        Returns:
+        - codes: np.ndarray of int, index into `labels` (len(labels) for NaN)
+        """
+        values = np.asarray(values, dtype=float)
+        edges = np.asarray(self.edges, dtype=float)
+
+        # Number of edges strictly below each value (equal values stay below)...
+        codes = np.searchsorted(edges, values, side='left')
+        # ...plus one when the value sits exactly on an edge that opens the range above
+        on_edge = np.minimum(codes, len(edges) - 1)
+        opens_above = ~np.isin(edges, np.asarray(self.right_closed_edges, dtype=float))
+        codes += (edges[on_edge] == values) & opens_above[on_edge]
+
+        codes[np.isnan(values)] = len(self.labels)
+        return codes
+
+    def add_range_column(self, data):
+        """
+        Add the categorical range column to `data` in place.
+
+        Parameters:
+        - data: pd.DataFrame, the DataFrame to modify
+
+        Returns:
+        - data: pd.DataFrame, the same DataFrame with the new range column
+        """
+        values = data[self.column]
+        if self.coerce_numeric:
+            values = pd.to_numeric(values, errors='coerce')
+
+        # Map range index -> category code; ranges labelled None and NaN go to unknown_label
+        known = [label for label in self.labels if label is not None]
+        unknown_code = len(known)
+        lookup = np.full(len(self.labels) + 1, unknown_code, dtype=np.int8)
+        lookup[[i for i, label in enumerate(self.labels) if label is not None]] = np.arange(unknown_code)
+        codes = lookup[self.bin_codes(values)]
+
+        # unknown_label is only a category when some value actually needs it
+        categories = known + [self.unknown_label] if (codes == unknown_code).any() else known
+        data[self.output_column] = pd.Categorical.from_codes(codes, categories=categories)
+        return data
+
+    def transform(self, X):
+        """
+        Add the categorical range column.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the DataFrame with the new range column
+        """
+        return self.add_range_column(X.copy())
+
+
+def age_range_binner():
+    """RangeBinner for Idade -> AGE_RANGE with the project's age ranges."""
+    return RangeBinner('Idade', 'AGE_RANGE', AGE_RANGE_EDGES, AGE_RANGE_LABELS)
+
+
+def income_range_binner():
+    """RangeBinner for Renda -> INCOME_RANGE with the project's income ranges."""
+    return RangeBinner('Renda', 'INCOME_RANGE', INCOME_RANGE_EDGES, INCOME_RANGE_LABELS,
+                       right_closed_edges=INCOME_RANGE_RIGHT_CLOSED_EDGES, coerce_numeric=True)
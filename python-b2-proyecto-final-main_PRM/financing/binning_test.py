@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.binning import RangeBinner, age_range_binner, income_range_binner
+
+
+def select_age_range(age):
+    """Reference: the original np.select age ranges of CreateNewRangesColumns."""
+    conditions = [
+        (age >= 0) & (age < 25), (age >= 25) & (age < 30), (age >= 30) & (age < 35),
+        (age >= 35) & (age < 40), (age >= 40) & (age < 45), (age >= 45) & (age < 50),
+        (age >= 50) & (age < 55), (age >= 55) & (age < 60), (age >= 60)
+    ]
+    choices = ['R1-0-24', 'R2-25-29', 'R3-30-34', 'R4-35-39', 'R5-40-44', 'R6-45-49', 'R7-50-54', 'R8-55-59', 'R9-60']
+    return np.select(conditions, choices, default="UNKNOWN")
+
+
+def select_income_range(income):
+    """Reference: the original np.select income ranges of CreateNewRangesColumns."""
+    income = pd.to_numeric(income, errors='coerce')
+    conditions = [
+        (income <= 6000), (income >= 6000) & (income < 6500), (income >= 6500) & (income < 7000),
+        (income >= 7000) & (income < 7500), (income >= 7500) & (income < 8000),
+        (income >= 8000) & (income < 8500), (income >= 8500) & (income < 9000), (income >= 9000)
+    ]
+    choices = ['R1-6000', 'R2-6000-6500', 'R3-6500-7000', 'R4-7000-7500', 'R5-7500-8000', 'R6-8000-8500', 'R7-8500-9000', 'R8-9000']
+    return np.select(conditions, choices, default="UNKNOWN")
+
+
+def test_age_ranges_match_select_including_edges_and_missing():
+    ages = np.concatenate([
+        np.arange(-5, 80, 0.5),
+        [0, 24.999, 25, 59.999, 60, np.nan, -0.001],
+        np.random.default_rng(0).uniform(-10, 100, 10_000),
+    ])
+    df = pd.DataFrame({'Idade': ages})
+    result = age_range_binner().fit(df).transform(df)['AGE_RANGE']
+    assert list(result.astype(str)) == list(select_age_range(df['Idade']))
+
+
+def test_income_ranges_match_select_including_edges_and_non_numeric():
+    incomes = [5999.99, 6000, 6000.01, 6499.99, 6500, 7000, 8999.99, 9000, 12000, -1, None, 'abc', '7250']
+    incomes += list(np.random.default_rng(1).uniform(4000, 11000, 10_000))
+    df = pd.DataFrame({'Renda': pd.Series(incomes, dtype=object)})
+    result = income_range_binner().fit(df).transform(df)['INCOME_RANGE']
+    assert list(result.astype(str)) == list(select_income_range(df['Renda']))
+
+
+def test_output_is_categorical_without_unused_unknown():
+    df = pd.DataFrame({'Idade': [20, 30, 70]})
+    result = age_range_binner().fit(df).transform(df)['AGE_RANGE']
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert "UNKNOWN" not in result.cat.categories
+    assert list(result) == ['R1-0-24', 'R3-30-34', 'R9-60']
+
+
+def test_transform_does_not_modify_input():
+    df = pd.DataFrame({'Idade': [20, 30]})
+    age_range_binner().fit(df).transform(df)
+    assert list(df.columns) == ['Idade']
+
+
+def test_invalid_definitions_are_rejected():
+    df = pd.DataFrame({'x': [1]})
+    with pytest.raises(ValueError):
+        RangeBinner('x', 'y', [1, 1], ['a', 'b', 'c']).fit(df)
+    with pytest.raises(ValueError):
+        RangeBinner('x', 'y', [1, 2], ['a', 'b']).fit(df)
@@ -0,0 +1,212 @@
+import hashlib
+import inspect
+import os
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+# Bump to invalidate every cached stage when the storage layout changes
+CACHE_FORMAT_VERSION = 1
+
+# Sources of this package: the transformers of the stages call its helpers (binning edges,
+# CSV parsing, encoders...), so every key includes them
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+# fastparquet names an unnamed index "index" on read; it is stored under this name and restored to None
+_UNNAMED_INDEX = "__stage_cache_index__"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's contents.
+
+    Parameters:
+    - path: str or Path, file to hash
+    - chunk_size: int, bytes read at a time
+
+    Returns:
+    - str, hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_files(paths):
+    """
+    Python source files of a list of files and directories, without the tests.
+
+    Parameters:
+    - paths: list of str or Path, .py files or directories searched recursively
+
+    Returns:
+    - list of Path, sorted
+    """
+    files = set()
+    for path in map(Path, paths):
+        files.update(path.rglob("*.py") if path.is_dir() else [path])
+    return sorted(file for file in files if not file.name.endswith("_test.py") and file.name != "conftest.py")
+
+
+def describe_params(value):
+    """
+    Stable text description of a stage parameter, used to build cache keys.
+
+    Estimators are described by their class, the source code of the class when
+    available (so editing a transformer invalidates its stages) and their
+    get_params(), recursively; containers are described element by element.
+
+    Parameters:
+    - value: any, a transformer, pipeline, container or plain value
+
+    Returns:
+    - str, the description
+    """
+    if hasattr(value, "get_params"):
+        cls = type(value)
+        try:
+            source = inspect.getsource(cls)
+        except (OSError, TypeError):
+            source = ""
+        params = value.get_params(deep=False)
+        described = ", ".join(f"{name}={describe_params(params[name])}" for name in sorted(params))
+        return f"{cls.__module__}.{cls.__qualname__}[{hashlib.sha256(source.encode()).hexdigest()}]({described})"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key!r}: {describe_params(value[key])}" for key in sorted(value, key=repr)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(describe_params(item) for item in value) + "]"
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    return repr(value)
+
+
+class StageCache:
+    def __init__(self, directory=".cache/financing", enabled=True, verbose=True, code=(PACKAGE_DIR,)):
+        """
+        Initialize the StageCache.
+
+        Persists the DataFrame produced by each preparation stage as a Parquet
+        file. A stage's key hashes its name, the contents of its source files,
+        its parameters, the keys of the stages it depends on and the source
+        code in `code`, so changing any input file, transformer parameter,
+        upstream stage or helper module (e.g. the range edges of
+        financing.binning) recomputes it and everything after it. Older files
+        of the same stage are removed.
+
+        Parameters:
+        - directory: str or Path, where the cached stages are stored
+        - enabled: bool, when False every stage is computed and nothing is stored
+        - verbose: bool, print whether each stage was computed or loaded
+        - code: list of str or Path, source files or directories every stage depends on
+          (default: the financing package)
+        """
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.verbose = verbose
+        self.code = code
+        self.keys = {}
+        self._file_digests = {}
+        self._code_digest = None
+
+    def _source_digest(self, path):
+        # Files are hashed once per (path, size, mtime)
+        stat = os.stat(path)
+        signature = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        if signature not in self._file_digests:
+            self._file_digests[signature] = file_digest(path)
+        return self._file_digests[signature]
+
+    def code_digest(self):
+        """
+        SHA-256 of the source files in `code`, computed once per StageCache.
+
+        Returns:
+        - str, hexadecimal digest
+        """
+        if self._code_digest is None:
+            digest = hashlib.sha256()
+            for path in source_files(self.code):
+                digest.update(path.name.encode())
+                digest.update(self._source_digest(path).encode())
+            self._code_digest = digest.hexdigest()
+        return self._code_digest
+
+    def key(self, name, sources=(), params=None, depends_on=()):
+        """
+        Compute the cache key of a stage.
+
+        Parameters:
+        - name: str, stage name
+        - sources: list of str or Path, input files of the stage
+        - params: any, transformer(s) or values the stage output depends on
+        - depends_on: list of str, names of stages already run through this cache
+
+        Returns:
+        - str, hexadecimal key
+        """
+        missing = [stage for stage in depends_on if stage not in self.keys]
+        if missing:
+            raise KeyError(f"stage {name!r} depends on stages that have not run: {missing}")
+
+        digest = hashlib.sha256()
+        parts = [f"v{CACHE_FORMAT_VERSION}", name, self.code_digest()]
+        parts += [self._source_digest(path) for path in sources]
+        parts.append(describe_params(params))
+        parts += [self.keys[stage] for stage in depends_on]
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()[:20]
+
+    def stage(self, name, compute, sources=(), params=None, depends_on=()):
+        """
+        Return the output of a stage, from the cache when its key is unchanged.
+
+        `compute` returns either a DataFrame or a tuple whose first element is
+        the DataFrame and whose remaining elements (e.g. a fitted pipeline) are
+        stored with joblib next to it.
+
+        Parameters:
+        - name: str, stage name, also used as the file name prefix
+        - compute: callable without arguments producing the stage output
+        - sources: list of str or Path, input files of the stage
+        - params: any, transformer(s) or values the stage output depends on
+        - depends_on: list of str, names of earlier stages this one consumes
+
+        Returns:
+        - pd.DataFrame, or the tuple returned by `compute`
+        """
+        key = self.key(name, sources, params, depends_on)
+        self.keys[name] = key
+        if not self.enabled:
+            return compute()
+
+        frame_path = self.directory / f"{name}-{key}.parquet"
+        objects_path = self.directory / f"{name}-{key}.joblib"
+        if frame_path.exists():
+            frame = pd.read_parquet(frame_path, engine="fastparquet")
+            if frame.index.name == _UNNAMED_INDEX:
+                frame.index.name = None
+            if self.verbose:
+                print(f"[cache] {name}: loaded {frame_path}")
+            if objects_path.exists():
+                return (frame, *joblib.load(objects_path))
+            return frame
+
+        result = compute()
+        frame, objects = (result[0], result[1:]) if isinstance(result, tuple) else (result, None)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for old_file in self.directory.glob(f"{name}-*"):
+            old_file.unlink()
+        if objects is not None:
+            joblib.dump(objects, objects_path)
+        # Written last: the Parquet file marks the stage as complete
+        stored = frame.rename_axis(_UNNAMED_INDEX) if frame.index.name is None else frame
+        stored.to_parquet(frame_path, engine="fastparquet")
+        if self.verbose:
+            print(f"[cache] {name}: computed and stored {frame_path}")
+        return result
@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from financing.cache import PACKAGE_DIR, StageCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.csv"
+    path.write_text("ID,x\n1,a\n2,b\n")
+    return path
+
+
+class Counter:
+    """Stage function that counts how many times it is computed."""
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.frame
+
+
+def sample_frame():
+    return pd.DataFrame({
+        "flag": [True, False, True],
+        "small": pd.Series([1, 0, 1], dtype="int8"),
+        "age": pd.Series([20.5, 31.0, 44.25], dtype="float32"),
+        "region": pd.Categorical(["NE", "S", "NE"]),
+    }, index=[3, 7, 9])
+
+
+def test_second_run_loads_the_same_frame_without_computing(tmp_path, source):
+    compute = Counter(sample_frame())
+    first = StageCache(tmp_path / "cache", verbose=False).stage("frame", compute, sources=[source])
+    second = StageCache(tmp_path / "cache", verbose=False).stage("frame", compute, sources=[source])
+    assert compute.calls == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_changing_a_source_file_invalidates_the_stage(tmp_path, source):
+    compute = Counter(sample_frame())
+    StageCache(tmp_path / "cache", verbose=False).stage("frame", compute, sources=[source])
+    source.write_text("ID,x\n1,a\n2,c\n")
+    StageCache(tmp_path / "cache", verbose=False).stage("frame", compute, sources=[source])
+    assert compute.calls == 2
+    # The outdated file of the stage is removed
+    assert len(list((tmp_path / "cache").glob("frame-*"))) == 1
+
+
+def test_changing_params_invalidates_the_stage(tmp_path):
+    compute = Counter(sample_frame())
+    StageCache(tmp_path, verbose=False).stage("frame", compute, params=StandardScaler())
+    StageCache(tmp_path, verbose=False).stage("frame", compute, params=StandardScaler())
+    StageCache(tmp_path, verbose=False).stage("frame", compute, params=StandardScaler(with_mean=False))
+    assert compute.calls == 2
+
+
+def test_upstream_change_invalidates_downstream_stages(tmp_path, source):
+    upstream, downstream = Counter(sample_frame()), Counter(sample_frame())
+
+    def run():
+        cache = StageCache(tmp_path / "cache", verbose=False)
+        cache.stage("upstream", upstream, sources=[source])
+        cache.stage("downstream", downstream, depends_on=["upstream"])
+
+    run()
+    run()
+    source.write_text("ID,x\n3,a\n")
+    run()
+    assert (upstream.calls, downstream.calls) == (2, 2)
+
+
+def test_extra_objects_are_stored_with_the_frame(tmp_path):
+    compute = lambda: (sample_frame(), {"mapping": {0: "Ambos"}})
+    StageCache(tmp_path, verbose=False).stage("frame", compute)
+    frame, extra = StageCache(tmp_path, verbose=False).stage("frame", compute)
+    pd.testing.assert_frame_equal(frame, sample_frame())
+    assert extra == {"mapping": {0: "Ambos"}}
+
+
+def test_disabled_cache_always_computes_and_stores_nothing(tmp_path):
+    compute = Counter(sample_frame())
+    for _ in range(2):
+        StageCache(tmp_path / "cache", enabled=False).stage("frame", compute)
+    assert compute.calls == 2
+    assert not (tmp_path / "cache").exists()
+
+
+def test_unknown_dependency_is_an_error(tmp_path):
+    with pytest.raises(KeyError):
+        StageCache(tmp_path).stage("frame", sample_frame, depends_on=["missing"])
+
+
+def test_editing_the_package_code_invalidates_every_stage(tmp_path, source):
+    # A copy of financing/binning.py stands for the package: the ranges stage only passes
+    # CreateNewRangesColumns() as params, the edges live in the helper module
+    package = tmp_path / "package"
+    package.mkdir()
+    binning = package / "binning.py"
+    binning.write_text((PACKAGE_DIR / "binning.py").read_text())
+    (package / "binning_test.py").write_text("# tests are not part of the key\n")
+    compute = Counter(sample_frame())
+
+    def run():
+        StageCache(tmp_path / "cache", verbose=False, code=[package]).stage("ranges", compute, sources=[source])
+
+    run()
+    (package / "binning_test.py").write_text("# edited test\n")
+    run()
+    assert compute.calls == 1
+    binning.write_text(binning.read_text().replace("AGE_RANGE_EDGES = [0, 25,", "AGE_RANGE_EDGES = [0, 21,"))
+    run()
+    assert compute.calls == 2
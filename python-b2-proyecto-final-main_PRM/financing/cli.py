@@ -0,0 +1,84 @@
+"""
+Command line of the project: the notebook's pipeline by stages (see financing.stages) and the package's tools.
+
+Usage (from the project folder):
+    python -m financing prepare --data data
+    python -m financing train --models "Gradient Boosting" AdaBoost
+    python -m financing train --search --search-candidates 9
+    python -m financing evaluate
+    python -m financing run
+    python -m financing serve output/model/financing_model.joblib --port 8000
+    python -m financing synthetic --rows 1000000 --output data/synthetic
+    python -m financing timings compare before/timings.json output/timings.json
+
+Only argparse is loaded to parse the command line; each stage imports the
+libraries it needs, so --help answers at once. The stages take their defaults
+from the notebook's variables: FINANCING_DATA_DIR, FINANCING_OUTPUT_DIR,
+FINANCING_CORE_BUDGET, FINANCING_SEARCH and FINANCING_SEARCH_CANDIDATES.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+# Commands that forward their arguments to the main() of a module
+TOOLS = {
+    "serve": ("serving", "serve a saved model over HTTP (financing.serving)"),
+    "synthetic": ("synthetic", "generate synthetic bank datasets (financing.synthetic)"),
+    "timings": ("timing", "show or compare section timing reports (financing.timing)"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m financing",
+                                     description="financing type classification, by stages")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", default=os.environ.get("FINANCING_OUTPUT_DIR", "output"),
+                        help="output directory; the stages keep their artifacts in OUTPUT/stages (default: %(default)s)")
+    common.add_argument("--quiet", action="store_true", help="print nothing but errors")
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument("--data", default=os.environ.get("FINANCING_DATA_DIR", "data"),
+                      help="folder with the three CSV files (default: %(default)s)")
+    models = argparse.ArgumentParser(add_help=False)
+    models.add_argument("--models", nargs="+", metavar="NAME",
+                        help="models to train (default: Gradient Boosting, Random Forest, AdaBoost and the "
+                             "Voting Classifier)")
+    models.add_argument("--core-budget", type=int, default=int(os.environ.get("FINANCING_CORE_BUDGET", "0")) or None,
+                        help="cores for training (default: all)")
+    models.add_argument("--search", action="store_true", default=os.environ.get("FINANCING_SEARCH", "0") == "1",
+                        help="search the hyperparameters by successive halving before training")
+    models.add_argument("--search-candidates", type=int,
+                        default=int(os.environ.get("FINANCING_SEARCH_CANDIDATES", "27")),
+                        help="settings of the first iteration of each search (default: %(default)s)")
+
+    commands.add_parser("prepare", parents=[common, data], help="read, merge and prepare the three sources")
+    commands.add_parser("train", parents=[common, models], help="balance, split and train the models")
+    commands.add_parser("evaluate", parents=[common], help="compare the models and save the best one for serving")
+    commands.add_parser("run", parents=[common, data, models], help="prepare, train and evaluate")
+    for name, (_, description) in TOOLS.items():
+        commands.add_parser(name, help=description, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in TOOLS:
+        return importlib.import_module(f".{TOOLS[argv[0]][0]}", __package__).main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    from . import stages
+
+    verbose = not args.quiet
+    try:
+        if args.command in ("prepare", "run"):
+            stages.prepare(args.data, args.output, verbose=verbose)
+        if args.command in ("train", "run"):
+            stages.train(args.output, args.models, args.core_budget, args.search, args.search_candidates,
+                         verbose=verbose)
+        if args.command in ("evaluate", "run"):
+            stages.evaluate(args.output, verbose=verbose)
+    except (FileNotFoundError, ValueError) as exception:
+        parser.exit(2, f"{parser.prog} {args.command}: error: {exception}\n")
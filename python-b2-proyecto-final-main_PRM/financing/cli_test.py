@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import joblib
+import pytest
+
+from financing import cli, serving
+from financing.stages import SEARCH_SPACES, stage_paths
+
+
+def test_help_does_not_import_the_heavy_libraries():
+    code = ("import sys\nfrom financing import cli\ntry:\n    cli.main(['--help'])\nexcept SystemExit:\n    pass\n"
+            "print([name for name in ('numpy', 'pandas', 'sklearn', 'imblearn') if name in sys.modules])")
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1],
+                            capture_output=True, text=True, check=True).stdout
+    assert "prepare" in output and output.strip().endswith("[]")
+
+
+def test_run_and_missing_artifacts(data_dir, tmp_path, capsys):
+    output = tmp_path / "output"
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["evaluate", "--output", str(output)])
+    assert exit_info.value.code == 2
+    assert "run the 'prepare' stage first" in capsys.readouterr().err
+
+    cli.main(["run", "--data", str(data_dir), "--output", str(output), "--models", "AdaBoost", "--core-budget", "1",
+              "--search", "--search-candidates", "2", "--quiet"])
+    assert capsys.readouterr().out == ""
+    assert all(path.exists() for path in stage_paths(output).values())
+    assert set(joblib.load(stage_paths(output)["models"])["AdaBoost"]["best_params"]) == {
+        "clf__n_estimators", *SEARCH_SPACES["AdaBoost"]}
+
+
+def test_tools_receive_their_arguments(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serving, "main", calls.append)
+    cli.main(["serve", "model.joblib", "--port", "9000"])
+    assert calls == [["model.joblib", "--port", "9000"]]
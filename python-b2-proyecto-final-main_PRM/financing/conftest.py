@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.loading import FLAG, SCHEMAS
+from financing.synthetic import SOURCES, BankDataGenerator
+
+
+@pytest.fixture
+def sources():
+    # Three row-aligned sources like the originals, with repeated IDs and products that go together
+    rng = np.random.default_rng(0)
+    n = 3000
+    ids = rng.permutation(np.arange(1000, 1000 + 10 * n, 10))[:n]
+    ids[rng.choice(n, 150, replace=False)] = ids[:150]
+    region = rng.choice(["N", "NE", "SE"], n, p=[0.2, 0.3, 0.5])
+    wealthy = rng.random(n) < np.where(region == "SE", 0.6, 0.2)
+    frames = {}
+    for source in SOURCES:
+        columns = {"ID": ids}
+        for column, dtype in list(SCHEMAS[source].items())[1:]:
+            if dtype == FLAG:
+                columns[column] = np.where(wealthy, rng.random(n) < 0.8, rng.random(n) < 0.1)
+            elif column == "Idade":
+                columns[column] = rng.normal(40, 12, n).clip(18, 85).round(3).astype(np.float32)
+            elif column == "Renda":
+                columns[column] = (rng.lognormal(8.9, 0.1, n) * np.where(region == "SE", 1.2, 1.0)).round(3)
+            elif column == "Regiao":
+                columns[column] = pd.Categorical(region)
+            else:
+                columns[column] = rng.integers(0, 2, n)
+        frames[source] = pd.DataFrame(columns).astype({c: d for c, d in SCHEMAS[source].items() if d != FLAG})
+    return frames
+
+
+@pytest.fixture
+def data_dir(sources, tmp_path):
+    # The three CSVs generated from `sources`, as the data folder of the stages
+    BankDataGenerator(seed=1, chunk_rows=1000).fit(sources).write(2000, tmp_path / "data")
+    return tmp_path / "data"
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.correlation import CorrelationService, frame_fingerprint, top_correlated
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 5000
+    target = rng.integers(0, 4, n).astype(np.int8)
+    return pd.DataFrame({
+        "ID": np.arange(n) + 1000,
+        "Idade": rng.normal(45, 15, n).astype(np.float32),
+        "Renda": (rng.lognormal(8.8, 0.4, n) + 300.0 * target).astype(np.float32),
+        "Emprestimo_pessoal": (rng.random(n) < 0.2 + 0.15 * target).astype(np.int8),
+        "seguroauto": rng.random(n) < 0.5,
+        "tipo_financiamiento": target,
+    })
+
+
+def test_matrix_matches_pandas(data):
+    service = CorrelationService(block_rows=1000)
+    np.testing.assert_allclose(service.correlation_matrix(data), data.corr(), atol=1e-5)
+    np.testing.assert_allclose(CorrelationService(dtype=np.float64).correlation_matrix(data), data.corr(), atol=1e-12)
+
+
+def test_target_correlation_matches_pandas(data):
+    expected = data.corr()["tipo_financiamiento"]
+    # Alone (cross products only) and from an already computed matrix
+    alone = CorrelationService().target_correlation(data, "tipo_financiamiento")
+    service = CorrelationService()
+    service.correlation_matrix(data)
+    from_matrix = service.target_correlation(data, "tipo_financiamiento")
+    for correlations in (alone, from_matrix):
+        np.testing.assert_allclose(correlations, expected, atol=1e-5)
+        assert correlations["tipo_financiamiento"] == 1.0
+
+
+def test_memoized_on_content(data, monkeypatch):
+    service = CorrelationService()
+    first = service.correlation_matrix(data)
+    # Same content in a new frame with another index: no new pass over the rows
+    monkeypatch.setattr(service, "_accumulate", lambda *args: pytest.fail("recomputed"))
+    pd.testing.assert_frame_equal(service.correlation_matrix(data.set_index(data.index + 7).copy()), first)
+
+    changed = data.copy()
+    changed.loc[0, "Idade"] += 1
+    assert frame_fingerprint(changed) != frame_fingerprint(data)
+
+
+def test_append_updates_incrementally(data):
+    service = CorrelationService(block_rows=700)
+    head, tail = data.iloc[:3000], data.iloc[3000:]
+    service.correlation_matrix(head)
+    key = service.append(head, tail)
+    assert key == frame_fingerprint(data)
+
+    combined = pd.concat([head, tail])
+    service._accumulate = lambda *args: pytest.fail("recomputed")
+    np.testing.assert_allclose(service.correlation_matrix(combined), data.corr(), atol=1e-5)
+
+
+def test_constant_column_and_missing_values(data):
+    data = data.assign(constant=1.0)
+    correlations = CorrelationService().correlation_matrix(data)
+    assert correlations["constant"].isna().all()
+    with pytest.raises(ValueError, match="missing"):
+        CorrelationService().correlation_matrix(data.assign(Idade=np.nan))
+
+
+def test_top_correlated_partial_sort():
+    correlations = pd.Series({"a": 0.1, "b": -0.9, "target": 1.0, "c": 0.5, "d": np.nan, "e": -0.3})
+    assert top_correlated(correlations, 3, exclude="target") == ["b", "c", "e"]
+    assert top_correlated(correlations, 10, exclude="target") == ["b", "c", "e", "a", "d"]
+    expected = correlations.abs().sort_values(ascending=False).drop("target").head(4).index.tolist()
+    assert top_correlated(correlations, 4, exclude="target") == expected
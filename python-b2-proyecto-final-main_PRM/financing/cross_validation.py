@@ -0,0 +1,129 @@
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv, cross_validate
+from sklearn.utils import _safe_indexing
+
+
+def fold_iterations(estimator):
+    """
+    Iterations (or ensemble members) a fitted estimator actually used.
+
+    For early-stopping estimators (e.g. GradientBoostingClassifier with
+    n_iter_no_change, HistGradientBoostingClassifier, SGDClassifier) this is
+    where training stopped; for pipelines the final step is inspected.
+
+    Parameters:
+    - estimator: fitted estimator or pipeline
+
+    Returns:
+    - int or None, None when the estimator does not report it
+    """
+    if hasattr(estimator, "steps"):
+        estimator = estimator.steps[-1][1]
+    for attribute in ("n_iter_", "n_estimators_"):
+        value = getattr(estimator, attribute, None)
+        if value is not None:
+            # LogisticRegression reports one count per class (or one for all classes)
+            return int(np.max(value))
+    return None
+
+
+def _warm_start_param(estimator):
+    # Name of the warm_start parameter of the estimator or of the final step of a pipeline
+    names = [name for name in estimator.get_params(deep=True) if name.split("__")[-1] == "warm_start"]
+    if not names:
+        raise ValueError(f"{type(estimator).__name__} has no warm_start parameter")
+    name = max(names, key=lambda name: name.count("__"))
+    prefix = name[:-len("warm_start")]
+    if prefix + "n_estimators" in estimator.get_params(deep=True):
+        # Ensembles would keep the members trained on the previous folds
+        raise ValueError("warm_start across folds is only supported for estimators that reuse their "
+                         "solution as initialization (e.g. LogisticRegression), not for ensembles")
+    return name
+
+
+def _warm_start_folds(estimator, X, y, cv, scoring, return_train_score):
+    # Folds fitted one after another, each one starting from the solution of the previous fold
+    model = clone(estimator).set_params(**{_warm_start_param(estimator): True})
+    scorer = check_scoring(model, scoring)
+    results = {"fit_time": [], "score_time": [], "test_score": [], "estimator": []}
+    if return_train_score:
+        results["train_score"] = []
+    for train_index, test_index in cv.split(X, y):
+        X_fit, y_fit = _safe_indexing(X, train_index), _safe_indexing(y, train_index)
+        start = time.perf_counter()
+        model.fit(X_fit, y_fit)
+        results["fit_time"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results["test_score"].append(scorer(model, _safe_indexing(X, test_index), _safe_indexing(y, test_index)))
+        results["score_time"].append(time.perf_counter() - start)
+        if return_train_score:
+            results["train_score"].append(scorer(model, X_fit, y_fit))
+        results["estimator"].append(copy.deepcopy(model))
+    return {name: values if name == "estimator" else np.asarray(values) for name, values in results.items()}
+
+
+def cross_validate_folds(estimator, X, y, cv=5, n_jobs=None, scoring="accuracy", X_holdout=None,
+                         y_holdout=None, return_train_score=False, warm_start=False, memory=None):
+    """
+    Cross-validate an estimator in a single pass and return one row per fold.
+
+    The folds are fitted by one call to sklearn's cross_validate, in parallel
+    with n_jobs. Each row holds the validation score, the fit and score times
+    and the iterations the fold's model used (see fold_iterations). When a
+    holdout set is given, each fold's model is also scored on it, so no
+    estimator has to be refitted to evaluate it.
+
+    With warm_start=True the folds are fitted one after another in this
+    process, each one initialized with the solution of the previous fold;
+    consecutive folds share most of their data, so iterative solvers converge
+    in fewer iterations.
+
+    With a memory (e.g. the joblib.Memory of the pipeline step cache), the
+    steps of an imblearn/sklearn Pipeline are cached, so the resampled folds
+    (RandomUnderSampler, SMOTE, ...) are reused by later runs on the same folds.
+
+    Parameters:
+    - estimator: unfitted estimator or pipeline; it is cloned, not modified
+    - X, y: data to cross-validate on
+    - cv: int or cross-validation splitter (int: stratified K-fold for classifiers)
+    - n_jobs: int or None, folds fitted in parallel (ignored with warm_start)
+    - scoring: str or callable, the scorer
+    - X_holdout, y_holdout: optional data the fold models are also scored on
+    - return_train_score: bool, also score each fold's model on its training part
+    - warm_start: bool, fit the folds sequentially reusing the previous solution
+    - memory: None, str or joblib.Memory, step cache for pipelines
+
+    Returns:
+    - pd.DataFrame with columns fold, test_score, [train_score], [holdout_score],
+      fit_time, score_time and n_iter
+    """
+    if memory is not None:
+        if not hasattr(estimator, "steps"):
+            raise ValueError("memory is only supported for Pipeline estimators")
+        estimator = clone(estimator).set_params(memory=memory)
+    cv = check_cv(cv, y, classifier=is_classifier(estimator))
+
+    if warm_start:
+        results = _warm_start_folds(estimator, X, y, cv, scoring, return_train_score)
+    else:
+        results = cross_validate(estimator, X, y, cv=cv, n_jobs=n_jobs, scoring=scoring,
+                                 return_train_score=return_train_score, return_estimator=True)
+
+    folds = pd.DataFrame({"fold": np.arange(1, len(results["test_score"]) + 1),
+                          "test_score": results["test_score"]})
+    if return_train_score:
+        folds["train_score"] = results["train_score"]
+    if X_holdout is not None:
+        scorer = check_scoring(estimator, scoring)
+        folds["holdout_score"] = [scorer(model, X_holdout, y_holdout) for model in results["estimator"]]
+    folds["fit_time"] = results["fit_time"]
+    folds["score_time"] = results["score_time"]
+    folds["n_iter"] = pd.array([fold_iterations(model) for model in results["estimator"]], dtype="Int64")
+    return folds
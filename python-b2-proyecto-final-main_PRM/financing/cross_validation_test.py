@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from joblib import Memory
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import KFold, cross_val_score
+from sklearn.tree import DecisionTreeClassifier
+
+from financing.cross_validation import cross_validate_folds
+from financing.pipeline_tools import InstrumentedPipeline
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=500, n_features=8, n_informative=4, n_classes=3, random_state=0)
+    X, y = pd.DataFrame(X), pd.Series(y)
+    return X[:400], y[:400], X[400:], y[400:]
+
+
+KFOLD = KFold(n_splits=5, shuffle=True, random_state=123)
+
+
+def test_matches_cross_val_score_and_scores_holdout(data):
+    X_train, y_train, X_test, y_test = data
+    model = LogisticRegression(max_iter=1000)
+    folds = cross_validate_folds(model, X_train, y_train, cv=KFOLD, n_jobs=2,
+                                 X_holdout=X_test, y_holdout=y_test, return_train_score=True)
+
+    expected = cross_val_score(model, X_train, y_train, cv=KFOLD, scoring="accuracy")
+    np.testing.assert_array_equal(folds["test_score"], expected)
+    assert list(folds.columns) == ["fold", "test_score", "train_score", "holdout_score",
+                                   "fit_time", "score_time", "n_iter"]
+    assert folds["holdout_score"].between(0, 1).all()
+    assert (folds["fit_time"] > 0).all() and folds["n_iter"].notna().all()
+
+
+def test_early_stopping_iterations_are_reported(data):
+    X_train, y_train, _, _ = data
+    model = GradientBoostingClassifier(n_estimators=200, n_iter_no_change=3, random_state=0)
+    folds = cross_validate_folds(model, X_train, y_train, cv=KFOLD)
+    assert (folds["n_iter"] < 200).all()
+
+
+def test_warm_start_reuses_previous_fold(data):
+    X_train, y_train, _, _ = data
+    model = LogisticRegression(max_iter=1000, tol=1e-8)
+    cold = cross_validate_folds(model, X_train, y_train, cv=KFOLD)
+    warm = cross_validate_folds(model, X_train, y_train, cv=KFOLD, warm_start=True)
+    np.testing.assert_allclose(warm["test_score"], cold["test_score"], atol=0.02)
+    assert warm["n_iter"].iloc[1:].sum() < cold["n_iter"].iloc[1:].sum()
+    assert not model.warm_start
+
+
+def test_warm_start_rejects_ensembles(data):
+    X_train, y_train, _, _ = data
+    with pytest.raises(ValueError, match="ensembles"):
+        cross_validate_folds(GradientBoostingClassifier(), X_train, y_train, warm_start=True)
+
+
+def test_memory_reuses_resampled_folds(data, tmp_path):
+    X_train, y_train, _, _ = data
+    pipeline = InstrumentedPipeline([("over", SMOTE(random_state=0)),
+                                     ("clf", DecisionTreeClassifier(random_state=0))])
+    memory = Memory(tmp_path, verbose=0)
+    first = cross_validate_folds(pipeline, X_train, y_train, cv=KFOLD, memory=memory)
+    second = cross_validate_folds(pipeline, X_train, y_train, cv=KFOLD, memory=memory)
+    pd.testing.assert_series_equal(first["test_score"], second["test_score"])
+    assert pipeline.memory is None
+    assert len(list(tmp_path.rglob("output.pkl"))) == 5
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.utils import check_random_state
+
+PCA_MODES = ("exact", "randomized", "incremental", "auto")
+ELBOW_MODES = ("exact", "minibatch")
+
+
+def _chunks(X, batch_size):
+    for start in range(0, X.shape[0], batch_size):
+        yield X[start:start + batch_size]
+
+
+def fit_pca(X, n_components, mode="exact", batch_size=10_000, random_state=0):
+    """
+    Fit a PCA model and project X onto its principal components.
+
+    Modes:
+    - "exact": PCA with a full SVD (the reference results)
+    - "randomized": PCA with the randomized SVD solver, which only computes
+      the n_components leading components
+    - "incremental": IncrementalPCA fitted with partial_fit on chunks of
+      batch_size rows, so the SVD never sees the whole matrix; X is also
+      projected chunk by chunk
+    - "auto": scikit-learn picks the solver from the shape of X: the
+      eigendecomposition of the covariance matrix for tall matrices (many
+      more rows than columns, like the customer table), which needs a single
+      pass over X, and the randomized SVD for large wide ones
+
+    All modes return the same components up to the sign, within the tolerance
+    of the approximate solvers.
+
+    Parameters:
+    - X: pd.DataFrame or np.ndarray, the features
+    - n_components: int, number of principal components
+    - mode: str, one of PCA_MODES
+    - batch_size: int, rows per chunk in "incremental" mode
+    - random_state: int, seed of the randomized solver
+
+    Returns:
+    - (pca_model, X_principal): the fitted model and a pd.DataFrame with columns PC1..PCn
+    """
+    if mode not in PCA_MODES:
+        raise ValueError(f"mode must be one of {PCA_MODES}, got {mode!r}")
+    values = X.to_numpy() if isinstance(X, pd.DataFrame) else np.asarray(X)
+    if mode == "incremental":
+        # Every chunk passed to partial_fit needs at least n_components rows
+        batch_size = max(batch_size, n_components)
+        pca_model = IncrementalPCA(n_components=n_components, batch_size=batch_size)
+        for chunk in _chunks(values, batch_size):
+            if chunk.shape[0] >= n_components:
+                pca_model.partial_fit(chunk)
+        components = np.vstack([pca_model.transform(chunk) for chunk in _chunks(values, batch_size)])
+    else:
+        solver = {"exact": "full", "randomized": "randomized", "auto": "auto"}[mode]
+        pca_model = PCA(n_components=n_components, svd_solver=solver, random_state=random_state)
+        components = pca_model.fit_transform(values)
+
+    index = X.index if isinstance(X, pd.DataFrame) else None
+    X_principal = pd.DataFrame(components, columns=[f"PC{i+1}" for i in range(n_components)], index=index)
+    return pca_model, X_principal
+
+
+def _nested_seeds(X, max_k, random_state):
+    # k-means++ seeding run once up to max_k: the seeds for k are the seeds for k-1 plus one
+    # new center, so every k starts from the centers chosen for the smaller ones
+    rng = check_random_state(random_state)
+    centers = [X[rng.randint(X.shape[0])]]
+    closest = ((X - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, max_k):
+        total = closest.sum()
+        index = rng.randint(X.shape[0]) if total == 0 else rng.choice(X.shape[0], p=closest / total)
+        centers.append(X[index])
+        closest = np.minimum(closest, ((X - X[index]) ** 2).sum(axis=1))
+    return np.array(centers)
+
+
+def _inertia(X, k, mode, seeds, batch_size, random_state):
+    if mode == "exact":
+        model = KMeans(n_clusters=k, n_init="auto", random_state=random_state)
+    else:
+        # No reassignment of small clusters: with heavy-tailed features (e.g. income) it moves
+        # centers onto single outliers and the inertia ends far above the exact one
+        model = MiniBatchKMeans(n_clusters=k, init=seeds[:k], n_init=1, batch_size=batch_size,
+                                reassignment_ratio=0, random_state=random_state)
+    # inertia_ is computed on the whole X in both modes
+    return model.fit(X).inertia_
+
+
+def elbow_inertias(X, ks=range(1, 10), mode="exact", n_jobs=None, batch_size=4096, sample_size=100_000,
+                   random_state=0):
+    """
+    K-means inertia for each number of clusters, for an elbow curve.
+
+    Modes:
+    - "exact": a KMeans per k, fitted one after another (the reference results)
+    - "minibatch": a MiniBatchKMeans per k, evaluated in parallel with n_jobs.
+      They are warm-started from smaller k: the initial centers are nested
+      k-means++ seeds (those for k are the ones for k-1 plus one more),
+      drawn once from at most sample_size rows
+
+    The minibatch inertias stay within the spread of exact KMeans across
+    random seeds (a few percent for most k).
+
+    Parameters:
+    - X: pd.DataFrame or np.ndarray, the data (e.g. X_principal)
+    - ks: iterable of int, numbers of clusters
+    - mode: str, one of ELBOW_MODES
+    - n_jobs: int or None, k values evaluated in parallel ("minibatch" mode)
+    - batch_size: int, MiniBatchKMeans batch size
+    - sample_size: int, maximum rows used to draw the seeds
+    - random_state: int, seed
+
+    Returns:
+    - pd.Series of inertia indexed by k
+    """
+    if mode not in ELBOW_MODES:
+        raise ValueError(f"mode must be one of {ELBOW_MODES}, got {mode!r}")
+    values = np.ascontiguousarray(X.to_numpy() if isinstance(X, pd.DataFrame) else X, dtype=np.float64)
+    ks = list(ks)
+
+    if mode == "exact":
+        inertias = [_inertia(values, k, mode, None, batch_size, random_state) for k in ks]
+    else:
+        rng = check_random_state(random_state)
+        sample = values
+        if values.shape[0] > sample_size:
+            sample = values[rng.choice(values.shape[0], sample_size, replace=False)]
+        seeds = _nested_seeds(sample, max(ks), rng)
+        inertias = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_inertia)(values, k, mode, seeds, batch_size, random_state) for k in ks
+        )
+    return pd.Series(inertias, index=pd.Index(ks, name="k"), name="inertia")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_blobs
+
+from financing.decomposition import elbow_inertias, fit_pca
+
+
+@pytest.fixture(scope="module")
+def features():
+    rng = np.random.default_rng(0)
+    # Correlated features with clearly separated variances
+    X = rng.normal(size=(3000, 6)) @ rng.normal(size=(6, 6)) * np.array([10, 5, 3, 2, 1, 0.5])
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(6)], index=np.arange(3000) + 100)
+
+
+@pytest.mark.parametrize("mode", ["randomized", "incremental", "auto"])
+def test_pca_modes_match_exact(features, mode):
+    exact, X_exact = fit_pca(features, 3)
+    model, X_principal = fit_pca(features, 3, mode=mode, batch_size=500)
+
+    np.testing.assert_allclose(model.explained_variance_ratio_, exact.explained_variance_ratio_, rtol=1e-3)
+    # Components are defined up to the sign
+    np.testing.assert_allclose(np.abs(X_principal.to_numpy()), np.abs(X_exact.to_numpy()), atol=1e-3 * X_exact.abs().max().max())
+    assert list(X_principal.columns) == ["PC1", "PC2", "PC3"]
+    pd.testing.assert_index_equal(X_principal.index, features.index)
+
+
+def test_incremental_pca_with_small_last_chunk(features):
+    model, X_principal = fit_pca(features.iloc[:1003], 5, mode="incremental", batch_size=500)
+    assert X_principal.shape == (1003, 5)
+
+
+def test_minibatch_elbow_within_tolerance_of_exact():
+    X, _ = make_blobs(n_samples=5000, centers=4, cluster_std=1.0, random_state=0)
+    exact = elbow_inertias(X, range(1, 7))
+    minibatch = elbow_inertias(X, range(1, 7), mode="minibatch", n_jobs=2)
+
+    assert list(minibatch.index) == list(range(1, 7))
+    np.testing.assert_allclose(minibatch, exact, rtol=0.1)
+    np.testing.assert_allclose(minibatch[4], exact[4], rtol=0.01)
+    # The elbow is still at the true number of clusters
+    drop = minibatch.diff(-1) / minibatch
+    assert drop[3] > 0.25 > drop[4]
+
+
+def test_invalid_modes():
+    with pytest.raises(ValueError):
+        fit_pca(np.zeros((10, 3)), 2, mode="sparse")
+    with pytest.raises(ValueError):
+        elbow_inertias(np.zeros((10, 3)), mode="online")
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+HANDLE_UNKNOWN = ("error", "use_encoded_value")
+
+
+def _observed(values):
+    # Distinct non-missing values; for a Categorical only the categories that appear
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        present = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories)) > 0
+        return np.asarray(values.cat.categories[present])
+    uniques = pd.unique(values)
+    return np.asarray(uniques[~pd.isna(uniques)])
+
+
+class CategoryEncoder(BaseEstimator, TransformerMixin):
+    def __init__(self, handle_unknown="error", unknown_value=-1):
+        """
+        Initialize the CategoryEncoder.
+
+        Drop-in replacement for sklearn's LabelEncoder on one column: classes_
+        are the sorted distinct values, so the codes are the same, but a value
+        is looked up in a hash table of the classes (pd.Index.get_indexer)
+        instead of a binary search over the sorted object array. A Categorical
+        column is not looked up value by value: its categories are mapped to
+        codes once and the mapping is applied to its integer codes.
+        inverse_transform is an array lookup, classes_[codes].
+
+        Missing values are never a class; in transform they are unknown values.
+
+        Parameters:
+        - handle_unknown: str, "error" raises a ValueError on values not seen in fit,
+          "use_encoded_value" encodes them as unknown_value
+        - unknown_value: int, code of the unknown values (negative, so it is no class)
+        """
+        self.handle_unknown = handle_unknown
+        self.unknown_value = unknown_value
+
+    def _set_classes(self, classes):
+        if self.handle_unknown not in HANDLE_UNKNOWN:
+            raise ValueError(f"handle_unknown must be one of {HANDLE_UNKNOWN}, got {self.handle_unknown!r}")
+        self.classes_ = np.sort(classes)
+        # Hash table of the classes, built once
+        self._index = pd.Index(self.classes_)
+        return self
+
+    def fit(self, values, y=None):
+        """
+        Learn the classes of a column.
+
+        Parameters:
+        - values: pd.Series or array-like
+
+        Returns:
+        - self: CategoryEncoder
+        """
+        return self._set_classes(_observed(pd.Series(values, copy=False)))
+
+    def partial_fit(self, values, y=None):
+        """
+        Add the classes of one chunk of a column; the result is the same as fitting on all the chunks.
+
+        Parameters:
+        - values: pd.Series or array-like
+
+        Returns:
+        - self: CategoryEncoder
+        """
+        observed = _observed(pd.Series(values, copy=False))
+        if hasattr(self, "classes_"):
+            observed = np.union1d(self.classes_, observed)
+        return self._set_classes(observed)
+
+    def transform(self, values):
+        """
+        Encode a column.
+
+        Parameters:
+        - values: pd.Series or array-like
+
+        Returns:
+        - codes: np.ndarray of int64, position of each value in classes_
+        """
+        check_is_fitted(self, "classes_")
+        values = pd.Series(values, copy=False)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # The extra last entry maps the code -1 (missing value) to unknown
+            lookup = np.append(self._index.get_indexer(values.cat.categories), -1)
+            codes = lookup[values.cat.codes.to_numpy()]
+        else:
+            codes = self._index.get_indexer(values.to_numpy()).astype(np.int64, copy=False)
+        unknown = codes < 0
+        if unknown.any():
+            if self.handle_unknown == "error":
+                raise ValueError(f"y contains previously unseen labels: {pd.unique(values.to_numpy()[unknown])[:10]}")
+            codes[unknown] = self.unknown_value
+        return codes
+
+    def inverse_transform(self, codes):
+        """
+        Decode a column.
+
+        Parameters:
+        - codes: array-like of int
+
+        Returns:
+        - values: np.ndarray, classes_[codes]; None for unknown codes when handle_unknown="use_encoded_value"
+        """
+        check_is_fitted(self, "classes_")
+        codes = np.asarray(codes)
+        valid = (codes >= 0) & (codes < len(self.classes_))
+        if valid.all():
+            return self.classes_[codes]
+        if self.handle_unknown == "error":
+            raise ValueError(f"y contains previously unseen labels: {np.unique(codes[~valid])[:10]}")
+        values = self.classes_.astype(object)[np.where(valid, codes, 0)]
+        values[~valid] = None
+        return values
+
+
+def encode_columns(X, encoders):
+    """
+    Encode several columns of a DataFrame in one pass.
+
+    The result shares the untouched columns with X (DataFrame.assign makes a
+    shallow, copy-on-write copy): only the encoded columns are new arrays.
+
+    Parameters:
+    - X: pd.DataFrame
+    - encoders: dict of column -> fitted CategoryEncoder
+
+    Returns:
+    - pd.DataFrame, X with the columns replaced by their codes
+    """
+    return X.assign(**{column: encoder.transform(X[column]) for column, encoder in encoders.items()})
+
+
+def decode_columns(X, encoders):
+    """
+    Decode several columns of a DataFrame encoded with encode_columns.
+
+    Parameters:
+    - X: pd.DataFrame
+    - encoders: dict of column -> fitted CategoryEncoder
+
+    Returns:
+    - pd.DataFrame, X with the columns replaced by their original values
+    """
+    return X.assign(**{column: encoder.inverse_transform(X[column]) for column, encoder in encoders.items()})
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from financing.encoding import CategoryEncoder, decode_columns, encode_columns
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    regions = rng.choice(["SE", "N", "CO", "S", "NE"], 500)
+    return pd.DataFrame({
+        "Regiao": pd.Categorical(regions, categories=["CO", "N", "NE", "S", "SE", "XX"]),
+        "tipo_financiamiento": rng.choice(["Ambos", "Ninguno", "FinanciamentoCasa"], 500),
+        "FinanciamentoCasa": rng.integers(0, 2, 500).astype(bool),
+        "Renda": rng.normal(7000, 500, 500),
+    })
+
+
+@pytest.mark.parametrize("column", ["Regiao", "tipo_financiamiento", "FinanciamentoCasa"])
+def test_same_classes_and_codes_as_label_encoder(data, column):
+    expected = LabelEncoder().fit(data[column])
+    encoder = CategoryEncoder().fit(data[column])
+
+    np.testing.assert_array_equal(encoder.classes_, expected.classes_)
+    codes = encoder.transform(data[column])
+    np.testing.assert_array_equal(codes, expected.transform(data[column]))
+    np.testing.assert_array_equal(encoder.inverse_transform(codes), data[column].to_numpy())
+
+
+def test_unused_categories_are_not_classes(data):
+    assert "XX" not in CategoryEncoder().fit(data["Regiao"]).classes_
+
+
+def test_partial_fit_matches_fit(data):
+    encoder = CategoryEncoder()
+    for start in range(0, len(data), 7):
+        encoder.partial_fit(data["tipo_financiamiento"].iloc[start:start + 7])
+    np.testing.assert_array_equal(encoder.classes_, CategoryEncoder().fit(data["tipo_financiamiento"]).classes_)
+
+
+def test_unknown_value_policies():
+    train = pd.Series(["N", "S", "N"])
+    test = pd.Series(["S", "SE", None, "N"])
+    with pytest.raises(ValueError, match="unseen"):
+        CategoryEncoder().fit(train).transform(test)
+
+    encoder = CategoryEncoder(handle_unknown="use_encoded_value", unknown_value=-1).fit(train)
+    codes = encoder.transform(test)
+    np.testing.assert_array_equal(codes, [1, -1, -1, 0])
+    assert list(encoder.inverse_transform(codes)) == ["S", None, None, "N"]
+    # Unknown and missing categories of a Categorical column too
+    np.testing.assert_array_equal(encoder.transform(test.astype("category")), [1, -1, -1, 0])
+
+    with pytest.raises(ValueError):
+        CategoryEncoder(handle_unknown="ignore").fit(train)
+
+
+def test_encode_columns_shares_untouched_columns(data):
+    encoders = {column: CategoryEncoder().fit(data[column]) for column in ["Regiao", "tipo_financiamiento"]}
+    encoded = encode_columns(data, encoders)
+
+    assert list(encoded.columns) == list(data.columns)
+    assert encoded["Regiao"].dtype == np.int64
+    assert np.shares_memory(encoded["Renda"].to_numpy(), data["Renda"].to_numpy())
+    # The input is left untouched
+    assert isinstance(data["Regiao"].dtype, pd.CategoricalDtype)
+
+    decoded = decode_columns(encoded, encoders)
+    np.testing.assert_array_equal(decoded["Regiao"].to_numpy(), data["Regiao"].to_numpy())
+    np.testing.assert_array_equal(decoded["tipo_financiamiento"].to_numpy(), data["tipo_financiamiento"].to_numpy())
@@ -0,0 +1,154 @@
+import multiprocessing
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+DEFAULT_PROMPT = "\n>>> Presiona Enter para continuar..."
+
+
+def figure_file_name(index, name):
+    """
+    File name of the index-th figure: "03_confusion_matrix.png".
+
+    Parameters:
+    - index: int, position of the figure in the run
+    - name: str, figure name (accents and symbols are dropped)
+
+    Returns:
+    - str, the file name
+    """
+    slug = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", slug).strip("_").lower() or "figure"
+    return f"{index:02d}_{slug}.png"
+
+
+def _init_worker():
+    matplotlib.use("Agg")
+
+
+def render_figure(fig, path, dpi):
+    """
+    Save a figure to a file. Runs in the worker processes of FigureOutput.
+
+    Parameters:
+    - fig: matplotlib.figure.Figure, the figure to render
+    - path: Path, destination file
+    - dpi: int, resolution
+
+    Returns:
+    - float, seconds spent rendering
+    """
+    start = time.perf_counter()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+class FigureOutput:
+    def __init__(self, batch=False, output_dir="output", max_workers=None, dpi=100, report=None):
+        """
+        Initialize the FigureOutput.
+
+        In interactive mode `show` displays the figure and waits for Enter, as
+        the plotting functions of the project always did. In batch mode the
+        backend is switched to Agg and every figure is closed in this process
+        and saved to `output_dir/figures` by a process pool, so rendering
+        overlaps with whatever the script does next (e.g. model training).
+
+        The pool uses the "fork" start method: "spawn" would re-run the whole
+        script in each worker. Where fork is not available (or with
+        max_workers=0) figures are rendered in this process.
+
+        Parameters:
+        - batch: bool, save figures to files instead of showing them
+        - output_dir: str or Path, directory of the run output
+        - max_workers: int or None, size of the process pool (None: number of CPUs)
+        - dpi: int, resolution of the saved figures
+        - report: RunReport or None, report that receives one entry per saved figure
+        """
+        self.batch = batch
+        self.output_dir = Path(output_dir)
+        self.max_workers = max_workers
+        self.dpi = dpi
+        self.report = report
+        self.figures = []
+        self._pending = []
+        self._pool = None
+        if batch:
+            plt.switch_backend("Agg")
+
+    @property
+    def figures_dir(self):
+        return self.output_dir / "figures"
+
+    def _executor(self):
+        if self._pool is None and self.max_workers != 0 and "fork" in multiprocessing.get_all_start_methods():
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    def show(self, fig=None, name="figure", prompt=DEFAULT_PROMPT, pause=None, wait=True):
+        """
+        Show a figure (interactive mode) or save it in the background (batch mode).
+
+        Parameters:
+        - fig: matplotlib.figure.Figure or None, the figure (None: the current figure)
+        - name: str, figure name, used for the file name and the report
+        - prompt: str, message shown while waiting for Enter
+        - pause: float or None, seconds to let the GUI draw before waiting
+        - wait: bool, wait for Enter and close the figure (interactive mode only)
+        """
+        if fig is None:
+            fig = plt.gcf()
+
+        if not self.batch:
+            plt.show(block=False)
+            if pause:
+                plt.pause(pause)
+            if wait:
+                input(prompt)
+                plt.close(fig)
+            return
+
+        self.figures_dir.mkdir(parents=True, exist_ok=True)
+        path = self.figures_dir / figure_file_name(len(self.figures) + 1, name)
+        record = {"name": name, "file": str(path.relative_to(self.output_dir))}
+        self.figures.append(record)
+        if self.report is not None:
+            self.report.add_figure(record)
+
+        # The figure is pickled to the worker; this process no longer needs it
+        plt.close(fig)
+        executor = self._executor()
+        if executor is None:
+            record["render_seconds"] = render_figure(fig, path, self.dpi)
+        else:
+            self._pending.append((record, executor.submit(render_figure, fig, path, self.dpi)))
+
+    def close(self):
+        """
+        Wait for the figures still being rendered and stop the process pool.
+
+        A figure that fails to render gets an "error" entry instead of stopping the run.
+
+        Returns:
+        - figures: list of dict, one record per saved figure
+        """
+        for record, future in self._pending:
+            try:
+                record["render_seconds"] = future.result()
+            except Exception as exc:
+                record["error"] = f"{type(exc).__name__}: {exc}"
+        self._pending = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        return self.figures
@@ -0,0 +1,40 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import pytest
+
+from financing.figures import FigureOutput, figure_file_name
+from financing.report import RunReport
+
+
+def test_figure_file_name_is_numbered_ascii():
+    assert figure_file_name(3, "FIGURA 5: Matriz de Correlación") == "03_figura_5_matriz_de_correlacion.png"
+    assert figure_file_name(1, "***") == "01_figure.png"
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_batch_mode_saves_every_figure_and_reports_it(tmp_path, max_workers):
+    report = RunReport()
+    output = FigureOutput(batch=True, output_dir=tmp_path, max_workers=max_workers, report=report)
+    for name in ["Confusion matrix", "Confusion matrix"]:
+        fig, ax = plt.subplots()
+        ax.plot([1, 2, 3])
+        output.show(fig, name)
+    figures = output.close()
+
+    assert [f["file"] for f in figures] == ["figures/01_confusion_matrix.png", "figures/02_confusion_matrix.png"]
+    assert all((tmp_path / f["file"]).stat().st_size > 0 for f in figures)
+    assert all("render_seconds" in f for f in figures)
+    assert report.figures == figures
+    # Figures are closed in this process once handed over
+    assert plt.get_fignums() == []
+
+
+def test_batch_mode_never_waits_for_input(tmp_path, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: pytest.fail("input() called in batch mode"))
+    output = FigureOutput(batch=True, output_dir=tmp_path, max_workers=0)
+    plt.figure()
+    output.show(name="current figure")
+    assert len(output.close()) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def one_hot_to_labels(encoded, columns, all_label="Ambos", none_label="Ninguno"):
+    """
+    Derive one label per row from a one-hot encoded matrix, without a Python call per row.
+
+    Same rules as OneHotDecoderImputer.get_financing_type_name_from_row:
+    every column set -> all_label, no column set -> none_label, otherwise the
+    name of the first column equal to 1, or NaN if no column equals 1
+    (DataFrame.apply turned the None returned per row into NaN).
+
+    Parameters:
+    - encoded: 2D array-like (rows x columns) of label-encoded values
+    - columns: list of str, column names in the same order as the matrix columns
+    - all_label: str, label for rows where every column is set
+    - none_label: str, label for rows where no column is set
+
+    Returns:
+    - labels: np.ndarray of dtype object, one label per row
+    """
+    encoded = np.asarray(encoded)
+    names = np.asarray(columns, dtype=object)
+
+    totals = encoded.sum(axis=1)
+    is_one = encoded == 1
+    # argmax over a boolean matrix gives the first True per row (0 if there is none)
+    first_one = is_one.argmax(axis=1)
+
+    labels = np.where(is_one.any(axis=1), names[first_one], np.nan).astype(object)
+    # Assigned in reverse order of precedence so that all_label wins
+    labels[totals == 0] = none_label
+    labels[totals == len(columns)] = all_label
+    return labels
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.labels import one_hot_to_labels
+from financing.preparation import OneHotDecoderImputer
+
+COLUMNS = ["FinanciamentoCasa", "FinanciamentoCarro"]
+
+
+def row_wise_labels(encoded_df):
+    """Reference: OneHotDecoderImputer.get_financing_type_name_from_row applied per row."""
+    imputer = OneHotDecoderImputer(columns=list(encoded_df.columns), label_column_name="tipo_financiamiento")
+    return encoded_df.apply(imputer.get_financing_type_name_from_row, axis=1).to_numpy(dtype=object)
+
+
+def assert_same_labels(result, expected):
+    # NaN-aware comparison (rows with no column equal to 1 get NaN)
+    pd.testing.assert_series_equal(pd.Series(result, dtype=object), pd.Series(expected, dtype=object))
+
+
+@pytest.mark.parametrize("n_rows", [1, 10, 10_000])
+def test_matches_row_wise_on_binary_columns(n_rows):
+    rng = np.random.default_rng(n_rows)
+    encoded = pd.DataFrame(rng.integers(0, 2, size=(n_rows, len(COLUMNS))), columns=COLUMNS)
+    expected = row_wise_labels(encoded)
+    result = one_hot_to_labels(encoded.to_numpy(), COLUMNS)
+    assert_same_labels(result, expected)
+
+
+def test_matches_row_wise_with_three_columns_and_non_binary_codes():
+    columns = ["a", "b", "c"]
+    rng = np.random.default_rng(0)
+    encoded = pd.DataFrame(rng.integers(0, 3, size=(5_000, 3)), columns=columns)
+    assert_same_labels(one_hot_to_labels(encoded.to_numpy(), columns), row_wise_labels(encoded))
+
+
+def test_labels():
+    encoded = np.array([[1, 1], [0, 0], [1, 0], [0, 1]])
+    assert list(one_hot_to_labels(encoded, COLUMNS)) == ["Ambos", "Ninguno", "FinanciamentoCasa", "FinanciamentoCarro"]
+
+
+def test_empty_input():
+    assert len(one_hot_to_labels(np.empty((0, 2), dtype=int), COLUMNS)) == 0
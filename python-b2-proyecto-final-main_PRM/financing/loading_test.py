@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.loading import FLAG, read_typed_csv, read_typed_csv_chunks
+
+SCHEMA = {"ID": "int64", "Idade": "float32", "Regiao": "category", "Genero": "int8", "seguro auto": FLAG}
+
+CSV = """ID,Idade,Regiao,Genero,seguro auto
+71504.000,31.5,NE,1.000,T
+12.000,40.25,S,0.000,F
+"""
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "sample.csv"
+    path.write_text(CSV)
+    return path
+
+
+def test_columns_get_the_schema_types(csv_path):
+    df = read_typed_csv(csv_path, SCHEMA)
+    assert df["ID"].dtype == np.int64
+    assert df["Idade"].dtype == np.float32
+    assert isinstance(df["Regiao"].dtype, pd.CategoricalDtype)
+    assert df["Genero"].dtype == np.int8
+    assert df["seguro auto"].dtype == bool
+    assert list(df["ID"]) == [71504, 12]
+    assert list(df["seguro auto"]) == [True, False]
+
+
+def test_same_values_as_default_read_csv(csv_path):
+    typed = read_typed_csv(csv_path, SCHEMA)
+    default = pd.read_csv(csv_path)
+    assert (typed["ID"] == default["ID"]).all()
+    assert (typed["Genero"] == default["Genero"]).all()
+    assert list(typed["Regiao"].astype(str)) == list(default["Regiao"])
+    assert list(typed["seguro auto"]) == list(default["seguro auto"] == "T")
+
+
+def test_missing_integer_values_use_nullable_type(tmp_path):
+    path = tmp_path / "missing.csv"
+    path.write_text("ID,Regiao\n1.000,N\n,S\n3.000,N\n")
+    df = read_typed_csv(path, {"ID": "int64"})
+    assert df["ID"].dtype == pd.Int64Dtype()
+    assert df["ID"].isna().sum() == 1
+
+
+def test_non_integer_ids_are_rejected(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("ID\n1.5\n")
+    with pytest.raises(ValueError):
+        read_typed_csv(path, {"ID": "int64"})
+
+
+def test_report_prints_memory(csv_path, capsys):
+    read_typed_csv(csv_path, SCHEMA, report=True)
+    assert "sample.csv" in capsys.readouterr().out
+
+
+def test_chunks_have_the_types_of_the_whole_file(csv_path):
+    chunks = list(read_typed_csv_chunks(csv_path, SCHEMA, chunksize=1))
+    assert len(chunks) == 2
+    pd.testing.assert_frame_equal(pd.concat(chunks).reset_index(drop=True)[["ID", "Idade", "Genero", "seguro auto"]],
+                                  read_typed_csv(csv_path, SCHEMA)[["ID", "Idade", "Genero", "seguro auto"]])
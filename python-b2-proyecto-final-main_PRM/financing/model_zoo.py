@@ -0,0 +1,276 @@
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from joblib import parallel_config
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, classification_report
+from threadpoolctl import threadpool_limits
+
+
+def available_cores():
+    """
+    Number of CPU cores this process may run on.
+
+    Returns:
+    - int, the cores in the CPU affinity mask (os.cpu_count() where that is not available)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def cap_n_jobs(estimator, n_jobs):
+    """
+    Limit every n_jobs parameter of an estimator (and of its nested estimators) to n_jobs.
+
+    Only parameters asking for parallelism (-1 or more than n_jobs) are changed;
+    None keeps its meaning of a single job.
+
+    Parameters:
+    - estimator: sklearn/imblearn estimator or pipeline, modified in place
+    - n_jobs: int, maximum number of jobs
+
+    Returns:
+    - estimator: the same estimator
+    """
+    capped = {
+        name: n_jobs for name, value in estimator.get_params(deep=True).items()
+        if name.endswith("n_jobs") and isinstance(value, int) and (value < 0 or value > n_jobs)
+    }
+    # Outer parameters first: setting a nested estimator replaces its own parameters
+    for name in sorted(capped, key=lambda name: name.count("__")):
+        estimator.set_params(**{name: n_jobs})
+    return estimator
+
+
+class PeakMemory:
+    def __init__(self, interval=0.005):
+        """
+        Context manager measuring the peak memory growth of this process.
+
+        On Linux the resident set size is sampled from /proc/self/statm by a
+        background thread, so native allocations (e.g. the tree builders of
+        scikit-learn) are included. Elsewhere the peak of tracemalloc is used,
+        which only sees Python and NumPy allocations.
+
+        Parameters:
+        - interval: float, seconds between samples
+        """
+        self.interval = interval
+        self.peak_mb = 0.0
+
+    @staticmethod
+    def _rss():
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, self._rss())
+
+    def __enter__(self):
+        self._use_rss = os.path.exists("/proc/self/statm")
+        if self._use_rss:
+            self._baseline = self._peak = self._rss()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._use_rss:
+            self._stop.set()
+            self._thread.join()
+            self.peak_mb = (max(self._peak, self._rss()) - self._baseline) / 1e6
+        else:
+            self.peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+        return False
+
+
+class ModelResult:
+    def __init__(self, name, model, y_pred, report, report_text, fit_seconds, predict_seconds,
+                 peak_memory_mb, n_jobs):
+        """
+        Outcome of training and evaluating one candidate of a ModelZoo.
+
+        Parameters:
+        - name: str, candidate name
+        - model: the fitted estimator
+        - y_pred: np.ndarray, predictions on the test set
+        - report: dict, classification_report(..., output_dict=True) on the test set
+        - report_text: str, the same report as text (6 digits)
+        - fit_seconds: float, wall time of fit
+        - predict_seconds: float, wall time of predict
+        - peak_memory_mb: float, peak memory growth during fit and predict (see PeakMemory)
+        - n_jobs: int, jobs the candidate was allowed to use
+        """
+        self.name = name
+        self.model = model
+        self.y_pred = y_pred
+        self.report = report
+        self.report_text = report_text
+        self.fit_seconds = fit_seconds
+        self.predict_seconds = predict_seconds
+        self.peak_memory_mb = peak_memory_mb
+        self.n_jobs = n_jobs
+
+    @property
+    def accuracy(self):
+        return self.report["accuracy"]
+
+
+def fit_and_evaluate(name, estimator, X_fit, y_fit, X_test, y_test, n_jobs):
+    """
+    Train one candidate and evaluate it on the test set. Runs in the ModelZoo workers.
+
+    Parameters:
+    - name: str, candidate name
+    - estimator: unfitted estimator or pipeline
+    - X_fit, y_fit: training data of the candidate
+    - X_test, y_test: test data
+    - n_jobs: int, jobs (and BLAS/OpenMP threads) the candidate may use
+
+    Returns:
+    - ModelResult
+    """
+    cap_n_jobs(estimator, n_jobs)
+    # Nested joblib parallelism (e.g. VotingClassifier) uses threads: idle loky worker
+    # processes started inside a pool worker would keep it from exiting for minutes
+    with PeakMemory() as memory, threadpool_limits(limits=n_jobs), parallel_config(backend="threading"):
+        start = time.perf_counter()
+        estimator.fit(X_fit, y_fit)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = estimator.predict(X_test)
+        predict_seconds = time.perf_counter() - start
+
+    report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+    # accuracy is missing from the dict when y_pred has labels absent from y_test
+    report.setdefault("accuracy", accuracy_score(y_test, y_pred))
+    report_text = classification_report(y_test, y_pred, digits=6, zero_division=0)
+    return ModelResult(name, estimator, y_pred, report, report_text, fit_seconds, predict_seconds,
+                       memory.peak_mb, n_jobs)
+
+
+class ModelZoo:
+    def __init__(self, core_budget=None, max_workers=None, verbose=True):
+        """
+        Initialize the ModelZoo.
+
+        Trains several candidate models concurrently in a process pool without
+        exceeding a global core budget: the candidates share the budget, and the
+        n_jobs parameters, joblib threads and BLAS/OpenMP threads of each one are
+        limited to its share. Each candidate is evaluated once on the test set.
+
+        The pool uses the "fork" start method ("spawn" would re-run the whole
+        script in each worker); where fork is not available, or the budget or
+        max_workers is 1, candidates are trained one after another in this
+        process with the whole budget.
+
+        Parameters:
+        - core_budget: int or None, total cores for all candidates (None: available_cores())
+        - max_workers: int or None, maximum number of candidates trained at the same time
+        - verbose: bool, print each candidate when it finishes
+        """
+        self.core_budget = core_budget
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.candidates = []
+
+    def add(self, name, estimator, X_train=None, y_train=None):
+        """
+        Add a candidate.
+
+        Parameters:
+        - name: str, candidate name (unique)
+        - estimator: unfitted estimator or imblearn Pipeline; it is cloned, not modified
+        - X_train, y_train: training data of this candidate (None: the data passed to run)
+
+        Returns:
+        - self: ModelZoo, to chain calls
+        """
+        if any(name == candidate[0] for candidate in self.candidates):
+            raise ValueError(f"duplicate candidate name {name!r}")
+        self.candidates.append((name, estimator, X_train, y_train))
+        return self
+
+    def _plan(self):
+        # (parallel candidates, jobs per candidate) within the core budget
+        budget = max(1, self.core_budget or available_cores())
+        workers = min(len(self.candidates), budget, self.max_workers or budget)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            workers = 1
+        return workers, max(1, budget // workers)
+
+    def run(self, X_train, y_train, X_test, y_test):
+        """
+        Train and evaluate every candidate.
+
+        Parameters:
+        - X_train, y_train: default training data
+        - X_test, y_test: test data
+
+        Returns:
+        - results: dict of name -> ModelResult, in the order the candidates were added
+        """
+        workers, n_jobs = self._plan()
+        jobs = [
+            (name, clone(estimator),
+             X_train if X_fit is None else X_fit, y_train if y_fit is None else y_fit,
+             X_test, y_test, n_jobs)
+            for name, estimator, X_fit, y_fit in self.candidates
+        ]
+        if self.verbose:
+            print(f"[model zoo] {len(jobs)} models, {workers} in parallel, n_jobs={n_jobs} each")
+
+        results = {}
+        if workers == 1:
+            for job in jobs:
+                results[job[0]] = self._finished(fit_and_evaluate(*job))
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = {job[0]: pool.submit(fit_and_evaluate, *job) for job in jobs}
+            for name, future in futures.items():
+                results[name] = self._finished(future.result())
+        return results
+
+    def _finished(self, result):
+        if self.verbose:
+            print(f"[model zoo] {result.name}: accuracy={result.accuracy:.4f} "
+                  f"fit={result.fit_seconds:.2f}s predict={result.predict_seconds:.2f}s")
+        return result
+
+
+def comparison_table(results):
+    """
+    One comparison table for the results of ModelZoo.run.
+
+    Parameters:
+    - results: dict of name -> ModelResult, or a list of ModelResult
+
+    Returns:
+    - pd.DataFrame, one row per model with its metrics, times, peak memory and n_jobs
+    """
+    if isinstance(results, dict):
+        results = list(results.values())
+    return pd.DataFrame({
+        "Modelo": [result.name for result in results],
+        "Accuracy": [result.accuracy for result in results],
+        "Precision (macro avg)": [result.report["macro avg"]["precision"] for result in results],
+        "Recall (macro avg)": [result.report["macro avg"]["recall"] for result in results],
+        "F1-Score (macro avg)": [result.report["macro avg"]["f1-score"] for result in results],
+        "Fit (s)": [result.fit_seconds for result in results],
+        "Predict (s)": [result.predict_seconds for result in results],
+        "Peak memory (MB)": [result.peak_memory_mb for result in results],
+        "n_jobs": [result.n_jobs for result in results],
+    })
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from financing.model_zoo import ModelZoo, PeakMemory, cap_n_jobs, comparison_table
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=4, n_classes=3,
+                               weights=[0.6, 0.3, 0.1], random_state=0)
+    X, y = pd.DataFrame(X), pd.Series(y)
+    return X[:450], y[:450], X[450:], y[450:]
+
+
+def candidates():
+    return {
+        "forest": Pipeline([("smote", SMOTE(random_state=0)),
+                            ("clf", RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=-1))]),
+        "voting": VotingClassifier([("lr", LogisticRegression(max_iter=500)),
+                                    ("rf", RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=-1))],
+                                   voting="soft", n_jobs=-1),
+    }
+
+
+def test_cap_n_jobs_limits_nested_parallelism_only():
+    voting = candidates()["voting"]
+    cap_n_jobs(voting, 2)
+    params = voting.get_params(deep=True)
+    assert params["n_jobs"] == 2 and params["rf__n_jobs"] == 2
+    assert params["lr__n_jobs"] is None
+
+
+@pytest.mark.parametrize("core_budget", [1, 4])
+def test_results_match_direct_training(data, core_budget):
+    X_train, y_train, X_test, y_test = data
+    zoo = ModelZoo(core_budget=core_budget, max_workers=2, verbose=False)
+    for name, estimator in candidates().items():
+        zoo.add(name, estimator)
+    results = zoo.run(X_train, y_train, X_test, y_test)
+
+    assert list(results) == ["forest", "voting"]
+    for name, estimator in candidates().items():
+        expected = estimator.fit(X_train, y_train).predict(X_test)
+        np.testing.assert_array_equal(results[name].y_pred, expected)
+        assert results[name].accuracy == pytest.approx(np.mean(expected == y_test))
+        assert results[name].n_jobs == (1 if core_budget == 1 else 2)
+
+
+def test_candidate_specific_training_data_and_table(data):
+    X_train, y_train, X_test, y_test = data
+    zoo = ModelZoo(core_budget=1, verbose=False)
+    zoo.add("all", LogisticRegression(max_iter=500))
+    zoo.add("half", LogisticRegression(max_iter=500), X_train[:200], y_train[:200])
+    results = zoo.run(X_train, y_train, X_test, y_test)
+
+    expected = LogisticRegression(max_iter=500).fit(X_train[:200], y_train[:200]).predict(X_test)
+    np.testing.assert_array_equal(results["half"].y_pred, expected)
+
+    table = comparison_table(results)
+    assert list(table["Modelo"]) == ["all", "half"]
+    assert {"Accuracy", "F1-Score (macro avg)", "Fit (s)", "Predict (s)", "Peak memory (MB)", "n_jobs"} <= set(table)
+
+
+def test_duplicate_names_are_rejected():
+    zoo = ModelZoo().add("a", LogisticRegression())
+    with pytest.raises(ValueError):
+        zoo.add("a", LogisticRegression())
+
+
+def test_peak_memory_sees_large_allocations():
+    with PeakMemory() as memory:
+        block = np.ones(20_000_000)
+        # keep it alive for a few sampling intervals
+        time.sleep(0.05)
+        del block
+    assert memory.peak_mb > 100
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from .quantiles import QuantileSketch
+
+
+def quartile_sketches(X, columns, sketches=None, k=2048, chunksize=1_000_000):
+    """
+    Add the values of some columns to one QuantileSketch per column.
+
+    Parameters:
+    - X: pd.DataFrame, the data (or one chunk of it)
+    - columns: list of column names
+    - sketches: dict of column -> QuantileSketch to update, or None to start new ones
+    - k: int, size of new sketches
+    - chunksize: int, rows added at a time, bounding the temporary float64 copy
+
+    Returns:
+    - sketches: dict of column -> QuantileSketch
+    """
+    sketches = {} if sketches is None else sketches
+    for column in columns:
+        sketch = sketches.setdefault(column, QuantileSketch(k=k))
+        values = X[column].to_numpy()
+        for start in range(0, len(values), chunksize):
+            sketch.update(values[start:start + chunksize])
+    return sketches
+
+
+def iqr_bounds(q1, q3, threshold=1.5):
+    """
+    Outlier bounds from the quartiles: [Q1 - threshold * IQR, Q3 + threshold * IQR].
+
+    Parameters:
+    - q1, q3: pd.Series, first and third quartile of each column
+    - threshold: float, multiple of the interquartile range
+
+    Returns:
+    - (lower_bound, upper_bound): tuple of pd.Series indexed by column
+    """
+    iqr = q3 - q1
+    return q1 - threshold * iqr, q3 + threshold * iqr
+
+
+def within_bounds_mask(X, lower_bound, upper_bound, drop_missing=True):
+    """
+    Boolean mask of the rows whose values are within the bounds in every bounded column.
+
+    Built column by column on the underlying arrays, so the only allocations
+    are boolean arrays of one value per row (no copy of the bounded columns).
+
+    Parameters:
+    - X: pd.DataFrame
+    - lower_bound, upper_bound: pd.Series indexed by column
+    - drop_missing: bool, also reject rows with a missing value in any column
+
+    Returns:
+    - mask: np.ndarray of bool, one value per row
+    """
+    mask = np.ones(len(X), dtype=bool)
+    for column, lower in lower_bound.items():
+        values = X[column].to_numpy()
+        # NaN fails both comparisons, so missing values in bounded columns are always rejected
+        mask &= values >= lower
+        mask &= values <= upper_bound[column]
+    if drop_missing:
+        for column in X.columns.difference(lower_bound.index, sort=False):
+            if X[column].hasnans:
+                mask &= X[column].notna().to_numpy()
+    return mask
+
+
+def filter_rows(X, mask):
+    """
+    Keep the rows of a mask with a single row selection.
+
+    Parameters:
+    - X: pd.DataFrame
+    - mask: np.ndarray of bool
+
+    Returns:
+    - pd.DataFrame, the selected rows with their original index; X itself when every row is kept
+    """
+    if mask.all():
+        return X
+    return X.iloc[np.flatnonzero(mask)]
+
+
+def quantiles_by_column(X, columns, quantiles):
+    """
+    Exact quantiles of some columns, one column at a time.
+
+    pandas' DataFrame.quantile copies every column into one float64 block
+    first; sorting one column at a time keeps the temporary memory to a
+    single column.
+
+    Parameters:
+    - X: pd.DataFrame
+    - columns: list of column names
+    - quantiles: list of float
+
+    Returns:
+    - pd.DataFrame indexed by quantile, one column per column of X
+    """
+    return pd.DataFrame({column: X[column].quantile(quantiles) for column in columns})
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.outliers import (
+    filter_rows, iqr_bounds, quantiles_by_column, quartile_sketches, within_bounds_mask,
+)
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        "Idade": [20.0, 30.0, 35.0, 40.0, 200.0, np.nan, 33.0],
+        "Renda": [5000.0, 6000.0, 6500.0, 7000.0, 6800.0, 6000.0, 90000.0],
+        "Regiao": ["N", "S", None, "S", "N", "N", "S"],
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+
+
+def test_bounds_from_exact_quartiles(data):
+    quartiles = quantiles_by_column(data, ["Idade", "Renda"], [0.25, 0.75])
+    pd.testing.assert_frame_equal(quartiles, data[["Idade", "Renda"]].quantile([0.25, 0.75]))
+    lower, upper = iqr_bounds(quartiles.loc[0.25], quartiles.loc[0.75], threshold=1.5)
+    iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+    pd.testing.assert_series_equal(lower, quartiles.loc[0.25] - 1.5 * iqr)
+    pd.testing.assert_series_equal(upper, quartiles.loc[0.75] + 1.5 * iqr)
+
+
+def test_mask_rejects_outliers_and_missing_values(data):
+    lower = pd.Series({"Idade": 0.0, "Renda": 0.0})
+    upper = pd.Series({"Idade": 100.0, "Renda": 10000.0})
+    mask = within_bounds_mask(data, lower, upper)
+    # 200 years, missing age, income 90000 and the missing region are rejected
+    assert list(mask) == [True, True, False, True, False, False, False]
+    assert list(within_bounds_mask(data, lower, upper, drop_missing=False)) == [True, True, True, True, False, False, False]
+
+
+def test_filter_keeps_original_index_and_skips_copy_when_nothing_removed(data):
+    mask = np.array([True, False, True, True, False, False, True])
+    filtered = filter_rows(data, mask)
+    assert list(filtered.index) == [10, 12, 13, 16]
+    assert filter_rows(data, np.ones(len(data), dtype=bool)) is data
+
+
+def test_sketches_over_chunks_match_exact_quartiles():
+    values = pd.DataFrame({"Renda": np.random.default_rng(0).lognormal(8.8, 0.4, 200_000)})
+    sketches = quartile_sketches(values[:50_000], ["Renda"], k=1024, chunksize=10_000)
+    quartile_sketches(values[50_000:], ["Renda"], sketches, chunksize=10_000)
+    assert sketches["Renda"].count == len(values)
+    for q in (0.25, 0.75):
+        assert abs((values["Renda"] < sketches["Renda"].quantile(q)).mean() - q) < 0.005
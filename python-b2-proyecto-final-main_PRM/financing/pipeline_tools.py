@@ -0,0 +1,147 @@
+import time
+
+import pandas as pd
+from imblearn.pipeline import Pipeline
+from sklearn.utils.validation import check_memory
+
+from .model_zoo import PeakMemory
+
+
+class _TimedMemory:
+    def __init__(self, memory, step_names, records, X, y):
+        """
+        joblib.Memory-compatible wrapper installed by InstrumentedPipeline while fitting.
+
+        Delegates caching to the pipeline's own memory and records the wall time,
+        peak memory and cache hit of every intermediate step. It also keeps the
+        output (X, y) of the last intermediate step.
+
+        Parameters:
+        - memory: None, str or joblib.Memory, the memory of the pipeline
+        - step_names: list of str, names of the intermediate steps, in fitting order
+        - records: list, receives one dict per fitted step
+        - X, y: the data the pipeline is fitted on
+        """
+        self.memory = check_memory(memory)
+        # Pipeline only clones the steps when the memory has a location, keep its behaviour
+        self.location = getattr(self.memory, "location", None)
+        self.step_names = iter(step_names)
+        self.records = records
+        self.output = (X, y)
+
+    def cache(self, func):
+        cached = self.memory.cache(func)
+
+        def timed(transformer, *args, **kwargs):
+            hit = hasattr(cached, "check_call_in_cache") and cached.check_call_in_cache(transformer, *args, **kwargs)
+            with PeakMemory() as memory:
+                start = time.perf_counter()
+                result = cached(transformer, *args, **kwargs)
+                seconds = time.perf_counter() - start
+            resampled = func.__name__.endswith("resample_one")
+            self.records.append({
+                "step": next(self.step_names),
+                "estimator": type(transformer).__name__,
+                "method": "fit_resample" if resampled else "fit_transform",
+                "seconds": seconds,
+                "peak_memory_mb": memory.peak_mb,
+                "cached": hit,
+            })
+            # (X, y, fitted) for samplers, (X, fitted) for transformers
+            self.output = (result[0], result[1] if resampled else self.output[1])
+            return result
+        return timed
+
+
+class InstrumentedPipeline(Pipeline):
+    """
+    imblearn Pipeline that records the wall time and memory of each step when fitted.
+
+    After fit or fit_resample, `step_timings_` holds one dict per step with
+    step, estimator, method, seconds, peak_memory_mb and cached (the step was
+    loaded from the pipeline's memory). The final estimator is timed as the
+    remainder of the call and its peak memory is the peak of the whole call.
+
+    With 'passthrough' as final step, fit_resample returns the resampled
+    (X, y) of the intermediate steps (imblearn's Pipeline returns only X).
+
+    Pipelines that share a `memory` (e.g. a joblib.Memory) reuse the output of
+    identical leading steps on identical data, such as the same
+    RandomUnderSampler + SMOTE resampling of X_train.
+    """
+
+    def _intermediate_step_names(self):
+        return [name for name, step in self.steps[:-1] if step is not None and step != "passthrough"]
+
+    def _instrumented(self, method, X, y, **params):
+        records = []
+        memory = self.memory
+        self.memory = timed_memory = _TimedMemory(memory, self._intermediate_step_names(), records, X, y)
+        try:
+            with PeakMemory() as peak:
+                start = time.perf_counter()
+                result = getattr(super(), method)(X, y, **params)
+                seconds = time.perf_counter() - start
+        finally:
+            self.memory = memory
+
+        name, final = self.steps[-1]
+        if final is None or final == "passthrough":
+            if method == "fit_resample":
+                result = timed_memory.output
+        else:
+            records.append({
+                "step": name,
+                "estimator": type(final).__name__,
+                "method": method,
+                "seconds": seconds - sum(record["seconds"] for record in records),
+                "peak_memory_mb": peak.peak_mb,
+                "cached": False,
+            })
+        self.step_timings_ = records
+        return result
+
+    def fit(self, X, y=None, **params):
+        """
+        Fit the pipeline, recording the timings of each step in `step_timings_`.
+
+        Parameters:
+        - X: array-like, the training data
+        - y: array-like, the target
+
+        Returns:
+        - self: InstrumentedPipeline, the fitted pipeline
+        """
+        self._instrumented("fit", X, y, **params)
+        return self
+
+    def fit_resample(self, X, y=None, **params):
+        """
+        Fit the pipeline and resample the data, recording the timings of each step.
+
+        Parameters:
+        - X: array-like, the data to resample
+        - y: array-like, the target
+
+        Returns:
+        - (X_resampled, y_resampled): the resampled data
+        """
+        return self._instrumented("fit_resample", X, y, **params)
+
+
+def step_timings_table(pipelines):
+    """
+    One table with the step timings of several fitted InstrumentedPipelines.
+
+    Parameters:
+    - pipelines: dict of name -> fitted InstrumentedPipeline
+
+    Returns:
+    - pd.DataFrame, one row per pipeline step
+    """
+    rows = [
+        {"pipeline": name, **record}
+        for name, pipeline in pipelines.items()
+        for record in getattr(pipeline, "step_timings_", [])
+    ]
+    return pd.DataFrame(rows, columns=["pipeline", "step", "estimator", "method", "seconds", "peak_memory_mb", "cached"])
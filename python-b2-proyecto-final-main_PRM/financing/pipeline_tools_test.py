@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from imblearn.under_sampling import RandomUnderSampler
+from joblib import Memory
+from sklearn.datasets import make_classification
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from financing.pipeline_tools import InstrumentedPipeline, step_timings_table
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=4, n_classes=3,
+                               weights=[0.6, 0.3, 0.1], random_state=0)
+    return pd.DataFrame(X), pd.Series(y)
+
+
+def sampling_steps():
+    return [("under", RandomUnderSampler(sampling_strategy="not minority", random_state=42)),
+            ("over", SMOTE(sampling_strategy="not majority", random_state=42))]
+
+
+def test_matches_plain_pipeline_and_records_each_step(data):
+    X, y = data
+    steps = sampling_steps() + [("scale", StandardScaler()), ("clf", DecisionTreeClassifier(random_state=0))]
+    instrumented = InstrumentedPipeline(steps).fit(X, y)
+    plain = Pipeline(sampling_steps() + [("scale", StandardScaler()),
+                                         ("clf", DecisionTreeClassifier(random_state=0))]).fit(X, y)
+
+    np.testing.assert_array_equal(instrumented.predict(X), plain.predict(X))
+    timings = instrumented.step_timings_
+    assert [record["step"] for record in timings] == ["under", "over", "scale", "clf"]
+    assert [record["method"] for record in timings] == ["fit_resample", "fit_resample", "fit_transform", "fit"]
+    assert all(record["seconds"] >= 0 and not record["cached"] for record in timings)
+
+
+def test_passthrough_fit_resample_returns_x_and_y(data):
+    X, y = data
+    X_res, y_res = InstrumentedPipeline(sampling_steps() + [("passthrough", "passthrough")]).fit_resample(X, y)
+    X_plain, y_plain = Pipeline(sampling_steps()).fit_resample(X, y)
+    pd.testing.assert_frame_equal(X_res, X_plain)
+    pd.testing.assert_series_equal(y_res, y_plain)
+
+
+def test_shared_memory_reuses_identical_leading_steps(data, tmp_path):
+    X, y = data
+    memory = Memory(tmp_path, verbose=0)
+    balance = InstrumentedPipeline(sampling_steps() + [("passthrough", "passthrough")], memory=memory)
+    balance.fit_resample(X, y)
+    model = InstrumentedPipeline(sampling_steps() + [("clf", DecisionTreeClassifier(random_state=0))],
+                                 memory=memory).fit(X, y)
+
+    table = step_timings_table({"balance": balance, "model": model})
+    assert list(table["cached"]) == [False, False, True, True, False]
+    assert list(table["pipeline"]) == ["balance"] * 2 + ["model"] * 3
+    # the pipeline keeps its own memory after fitting
+    assert model.memory is memory
@@ -0,0 +1,323 @@
+"""
+Transformers of the notebook's data preparation (Pregunta 2).
+
+CreateNewRangesColumns adds AGE_RANGE and INCOME_RANGE to the insurance data;
+OneHotDecoderImputer, MultiColumnLabelEncoder, DropColumns and
+BooleanToNumeric make the steps of the pipeline that turns the merged sources
+into data_frame_tipo_financiamiento (see financing.stages.preparation_pipeline).
+They live in the package, not in the notebook, so that the notebook, the
+stages of `python -m financing` and StreamingPreparation share one definition.
+"""
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from .binning import age_range_binner, income_range_binner
+from .encoding import CategoryEncoder, decode_columns, encode_columns
+from .labels import one_hot_to_labels
+
+
+class CreateNewRangesColumns(BaseEstimator, TransformerMixin):
+
+    def __init__(self, age_binner=None, income_binner=None):
+        # Range definitions (RangeBinner); None uses the project's default age and income ranges
+        self.age_binner = age_binner
+        self.income_binner = income_binner
+
+    def fit(self, X, y=None):
+        # No adjustments needed in fit, simply return the object unchanged
+        return self
+
+    def createAgeRange(self, base_df):
+        # Binary search of each age over the sorted range edges:
+        # [0, 25) -> R1-0-24, ..., [60, inf) -> R9-60, negative or missing -> UNKNOWN
+        binner = self.age_binner or age_range_binner()
+
+        # Create 'AGE_RANGE' column as a categorical with the range labels
+        return binner.fit(base_df).add_range_column(base_df)
+
+    def createIncomeRange(self, base_df):
+        # Binary search of each income (converted to numeric) over the sorted range edges:
+        # (-inf, 6000] -> R1-6000, (6000, 6500) -> R2-6000-6500, ..., [9000, inf) -> R8-9000
+        binner = self.income_binner or income_range_binner()
+
+        # Create 'INCOME_RANGE' column as a categorical with the range labels
+        return binner.fit(base_df).add_range_column(base_df)
+
+    def transform(self, X):
+        # First, make a copy of the input DataFrame 'X'
+        data = X.copy()
+
+        # Create the age range column
+        df_with_age_range = self.createAgeRange(data)
+
+        # Create the income range column
+        df_with_income_range = self.createIncomeRange(df_with_age_range)
+
+        return df_with_income_range
+
+
+def update_label_encoders(label_encoders, X, columns, handle_unknown="error", unknown_value=-1):
+    """
+    Add the values of a new chunk to the classes of the label encoders.
+
+    CategoryEncoder sorts its classes, so after every chunk the encoders are the
+    same as if they had been fitted on all the chunks at once.
+
+    Parameters:
+    - label_encoders: dict of column -> CategoryEncoder, updated in place
+    - X: pd.DataFrame, the new chunk
+    - columns: list of str, columns to encode
+    - handle_unknown, unknown_value: unknown-value policy of new encoders (see CategoryEncoder)
+    """
+    for col in columns:
+        label_encoders.setdefault(col, CategoryEncoder(handle_unknown, unknown_value)).partial_fit(X[col])
+
+
+class OneHotDecoderImputer(BaseEstimator, TransformerMixin):
+    def __init__(self, columns, label_column_name):
+        """
+        Initialize the OneHotDecoderImputer.
+
+        Parameters:
+        - columns: list of str, names of columns to be converted from one-hot encoding
+        - label_column_name: str, name of the new label column
+        """
+        self.columns = columns  # List of column names to be converted from one-hot encoding
+        self.label_column_name = label_column_name
+        self.label_encoders = {}  # Dictionary to store label encoders for each column
+
+    def fit(self, X, y=None):
+        """
+        Fit the label encoders on the specified columns.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - self: OneHotDecoderImputer, the transformer instance
+        """
+        for col in self.columns:
+            self.label_encoders[col] = CategoryEncoder().fit(X[col])
+        return self  # Return the transformer instance
+
+    def partial_fit(self, X, y=None):
+        """
+        Update the label encoders with the values of one chunk of the data (streaming preparation).
+
+        Parameters:
+        - X: pd.DataFrame, a chunk of the input DataFrame
+
+        Returns:
+        - self: OneHotDecoderImputer, the transformer instance
+        """
+        update_label_encoders(self.label_encoders, X, self.columns)
+        return self
+
+    def get_financing_type_name_from_row(self, row):
+        """
+        Get the financing type name from a one-hot encoded row.
+
+        Parameters:
+        - row: pd.Series, a row of one-hot encoded data
+
+        Returns:
+        - str or None, the name of the financing type or None if not found
+        """
+        total_financing_types = row.sum()
+        if total_financing_types == len(row):
+            return "Ambos"
+        if total_financing_types == 0:
+            return "Ninguno"
+        for col_name, value in row.items():
+            if value == 1:
+                return col_name
+        return None
+
+    def transform(self, X):
+        """
+        Convert one-hot encoded columns to a single label column.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the DataFrame with the new label column
+        """
+        # Encode the specified columns using the fitted label encoders
+        encoded = np.column_stack([self.label_encoders[col].transform(X[col]) for col in self.columns])
+
+        # Create the label column from the whole encoded matrix at once
+        # (same rules as get_financing_type_name_from_row, without a call per row).
+        # The other columns are not copied: drop and assign share them with X
+        labels = one_hot_to_labels(encoded, self.columns)
+        return X.drop(columns=self.columns).assign(**{self.label_column_name: labels})
+
+
+class BooleanToNumeric(BaseEstimator, TransformerMixin):
+    def __init__(self):
+        """
+        Initialize the BooleanToNumeric transformer.
+        """
+        pass
+
+    def fit(self, X, y=None):
+        """
+        Fit the BooleanToNumeric transformer.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - self: BooleanToNumeric, the transformer instance
+        """
+        return self
+
+    def transform(self, X):
+        """
+        Transform boolean values (bool columns, or "T"/"F" text) to numerical values (1 or 0).
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the transformed DataFrame
+        """
+        X_transformed = X.copy()
+        # Columns parsed to bool by read_typed_csv only need a cast
+        bool_columns = X_transformed.select_dtypes(include='bool').columns
+        X_transformed[bool_columns] = X_transformed[bool_columns].astype(np.int8)
+        # Text columns still holding "T"/"F" (data not read with read_typed_csv)
+        text_columns = X_transformed.select_dtypes(include=['object', 'string']).columns
+        if len(text_columns):
+            X_transformed[text_columns] = X_transformed[text_columns].replace({"T": 1, "F": 0})
+        return X_transformed
+
+
+class MultiColumnLabelEncoder(BaseEstimator, TransformerMixin):
+    def __init__(self, columns=None, handle_unknown="error", unknown_value=-1, categories=None):
+        """
+        Initialize the MultiColumnLabelEncoder.
+
+        Parameters:
+        - columns: array of str, names of columns to encode. If None, encode all columns.
+        - handle_unknown: str, "error" or "use_encoded_value" for values not seen in fit
+        - unknown_value: int, code of the unknown values with handle_unknown="use_encoded_value"
+        - categories: dict of column -> list of values that are classes even if the data lacks them
+          (e.g. RangeBinner.categories(), so that new records with a missing age can be encoded)
+        """
+        self.columns = columns
+        self.handle_unknown = handle_unknown
+        self.unknown_value = unknown_value
+        self.categories = categories
+        self.label_encoders = {}
+
+    def _add_categories(self):
+        for col, values in (self.categories or {}).items():
+            if col in self.label_encoders:
+                self.label_encoders[col].partial_fit(values)
+
+    def fit(self, X, y=None):
+        """
+        Fit the label encoders on the specified columns.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - self: MultiColumnLabelEncoder, the transformer instance
+        """
+        if self.columns is None:
+            self.columns = X.columns
+        for col in self.columns:
+            self.label_encoders[col] = CategoryEncoder(self.handle_unknown, self.unknown_value).fit(X[col])
+        self._add_categories()
+        return self
+
+    def partial_fit(self, X, y=None):
+        """
+        Update the label encoders with the values of one chunk of the data (streaming preparation).
+
+        Parameters:
+        - X: pd.DataFrame, a chunk of the input DataFrame
+
+        Returns:
+        - self: MultiColumnLabelEncoder, the transformer instance
+        """
+        if self.columns is None:
+            self.columns = X.columns
+        update_label_encoders(self.label_encoders, X, self.columns, self.handle_unknown, self.unknown_value)
+        self._add_categories()
+        return self
+
+    def transform(self, X):
+        """
+        Transform the specified columns using the fitted label encoders.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the DataFrame with transformed columns
+        """
+        # All the columns in one pass; the other columns are shared with X, not copied
+        return encode_columns(X, {col: self.label_encoders[col] for col in self.columns})
+
+    def fit_transform(self, X, y=None):
+        """
+        Fit label encoders on the specified columns and transform the DataFrame.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the DataFrame with transformed columns
+        """
+        return self.fit(X, y).transform(X)
+
+    def inverse_transform(self, X):
+        """
+        Reverse the encoding back to the original values.
+
+        Parameters:
+        - X: pd.DataFrame, the DataFrame with encoded columns
+
+        Returns:
+        - X_inverse: pd.DataFrame, the DataFrame with original values
+        """
+        return decode_columns(X, {col: self.label_encoders[col] for col in self.columns})
+
+
+class DropColumns(BaseEstimator, TransformerMixin):
+    def __init__(self, columns=None):
+        """
+        Initialize the DropColumns transformer.
+
+        Parameters:
+        - columns: list of str, names of columns to drop from the DataFrame
+        """
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        """
+        Fit the DropColumns transformer.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - self: DropColumns, the transformer instance
+        """
+        return self
+
+    def transform(self, X):
+        """
+        Transform the input DataFrame by dropping specified columns.
+
+        Parameters:
+        - X: pd.DataFrame, the input DataFrame
+
+        Returns:
+        - X_transformed: pd.DataFrame, the transformed DataFrame
+        """
+        X_transformed = X.drop(columns=self.columns, errors='ignore')
+        return X_transformed
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Rows of the numeric summary, as in DataFrame.describe()
+SUMMARY_STATISTICS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+SUMMARY_QUANTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def _bool_value_counts(column):
+    # Same result as value_counts() for a numpy bool column, from one count_nonzero
+    values = column.to_numpy()
+    n_true = int(np.count_nonzero(values))
+    counts = {True: n_true, False: len(values) - n_true}
+    # Most frequent first; a tie keeps the order of appearance, as value_counts
+    first = bool(values[0]) if len(values) else True
+    order = sorted((value for value in (first, not first) if counts[value]), key=lambda value: -counts[value])
+    return pd.Series([counts[value] for value in order], index=pd.Index(order, dtype=bool, name=column.name),
+                     name="count", dtype=np.int64)
+
+
+def _profile_column(column, is_key):
+    # Everything about one column from one read of its values
+    profile = {"dtype": column.dtype}
+    missing = column.isna().to_numpy()
+    profile["nulls"] = int(missing.sum())
+    profile["missing"] = missing if profile["nulls"] else None
+
+    if is_key:
+        profile["duplicates"] = int(column.duplicated().sum())
+
+    if pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype):
+        # Nullable integer and float columns (pd.NA) are read as float64 with NaN
+        if isinstance(column.dtype, pd.api.extensions.ExtensionDtype):
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = column.to_numpy()
+        if profile["nulls"]:
+            values = values[~missing]
+        count = len(values)
+        if count:
+            # float64 accumulation; one partition of the values gives min, quartiles and max
+            mean = values.mean(dtype=np.float64)
+            deviations = values - mean
+            std = np.sqrt(deviations @ deviations / (count - 1)) if count > 1 else np.nan
+            quantiles = np.quantile(values, SUMMARY_QUANTILES)
+        else:
+            mean = std = np.nan
+            quantiles = np.full(len(SUMMARY_QUANTILES), np.nan)
+        profile["summary"] = [count, mean, std, quantiles[0], *quantiles[1:4], quantiles[4]]
+    elif column.dtype == np.bool_:
+        profile["value_counts"] = _bool_value_counts(column)
+    else:
+        profile["value_counts"] = column.value_counts()
+    return profile
+
+
+class DataProfile:
+    def __init__(self, rows, columns, key=None):
+        """
+        Initialize the DataProfile.
+
+        Data-quality report of a DataFrame built by profile_frame: the null
+        counts, duplicated keys, numeric summary and categorical frequencies
+        that get_nan_values, check_duplicates, describe() and
+        get_value_counts_non_numeric_columns compute, each with its own scan.
+
+        Parameters:
+        - rows: int, number of rows
+        - columns: list of str, column names
+        - key: str or None, identifier column whose duplicates are counted
+        """
+        self.rows = rows
+        self.columns = columns
+        self.key = key
+        self.dtypes = pd.Series(dtype=object)
+        self.null_counts = pd.Series(dtype=np.int64)
+        self.rows_with_nulls = 0
+        self.duplicate_keys = None
+        self.numeric_summary = pd.DataFrame(index=SUMMARY_STATISTICS)
+        self.value_counts = {}
+
+    def nan_values(self):
+        """
+        Null values per column and rows with any null value, in the format of get_nan_values.
+
+        Returns:
+        - dict
+        """
+        return {"Count NaN values in each column": self.null_counts,
+                "Total number of records with NaN values": self.rows_with_nulls}
+
+    def non_numeric_columns(self):
+        """
+        Columns without numeric summary (text, categorical and boolean), as find_non_numeric_columns.
+
+        Returns:
+        - list of str
+        """
+        return list(self.value_counts)
+
+    def summary(self):
+        """
+        One row per column: type, null values and distinct values (non-numeric columns).
+
+        Returns:
+        - pd.DataFrame indexed by column
+        """
+        distinct = pd.Series({column: int((counts > 0).sum()) for column, counts in self.value_counts.items()},
+                             dtype="Int64")
+        return pd.DataFrame({
+            "dtype": self.dtypes.astype(str),
+            "nulls": self.null_counts,
+            "null %": (100 * self.null_counts / self.rows).round(2) if self.rows else self.null_counts * 0.0,
+            "distinct": distinct.reindex(self.columns),
+        })
+
+    def __repr__(self):
+        duplicates = "" if self.key is None else f", {self.duplicate_keys} duplicated {self.key}"
+        return (f"DataProfile({self.rows} rows x {len(self.columns)} columns, "
+                f"{self.rows_with_nulls} rows with nulls{duplicates})")
+
+
+def profile_frame(data_frame, key=None, n_jobs=None):
+    """
+    Profile a DataFrame in a single pass over its columns.
+
+    Each column is read once, in parallel threads (numpy and the pandas hash
+    tables release the GIL), and yields its null count, its duplicated values
+    if it is the key, and either the describe() statistics (numeric columns)
+    or its value counts (text, categorical and boolean columns). The rows with
+    any null value are the union of the null masks of the columns.
+
+    The statistics are those of describe() computed with float64 sums, so
+    means and standard deviations of float32 columns can differ from pandas
+    in the last digits.
+
+    Parameters:
+    - data_frame: pd.DataFrame
+    - key: str or None, identifier column whose duplicated values are counted (as check_duplicates)
+    - n_jobs: int or None, columns profiled in parallel (-1: all cores)
+
+    Returns:
+    - DataProfile
+    """
+    columns = list(data_frame.columns)
+    profiles = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_profile_column)(data_frame[column], column == key) for column in columns
+    )
+
+    profile = DataProfile(len(data_frame), columns, key)
+    profile.dtypes = pd.Series({column: p["dtype"] for column, p in zip(columns, profiles)}, dtype=object)
+    profile.null_counts = pd.Series({column: p["nulls"] for column, p in zip(columns, profiles)}, dtype=np.int64)
+
+    rows_with_nulls = np.zeros(len(data_frame), dtype=bool)
+    for p in profiles:
+        if p["missing"] is not None:
+            rows_with_nulls |= p["missing"]
+    profile.rows_with_nulls = int(rows_with_nulls.sum())
+
+    if key is not None:
+        profile.duplicate_keys = profiles[columns.index(key)]["duplicates"]
+
+    profile.numeric_summary = pd.DataFrame(
+        {column: p["summary"] for column, p in zip(columns, profiles) if "summary" in p},
+        index=SUMMARY_STATISTICS,
+    )
+    profile.value_counts = {column: p["value_counts"] for column, p in zip(columns, profiles) if "value_counts" in p}
+    return profile
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.profiling import profile_frame
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 1000
+    data = pd.DataFrame({
+        "ID": np.concatenate([np.arange(n - 30), np.arange(30)]),
+        "Idade": rng.normal(45, 15, n).astype(np.float32),
+        "Renda": rng.lognormal(8.8, 0.4, n),
+        "Genero": pd.array(rng.integers(0, 2, n), dtype="Int8"),
+        "Regiao": pd.Categorical(rng.choice(["N", "S", "SE"], n), categories=["CO", "N", "S", "SE"]),
+        "tipo": rng.choice(["Ambos", "Ninguno", "FinanciamentoCasa"], n),
+        "seguro auto": rng.random(n) < 0.3,
+    })
+    data.loc[rng.random(n) < 0.05, "Idade"] = np.nan
+    data.loc[rng.random(n) < 0.05, "Genero"] = pd.NA
+    data.loc[rng.random(n) < 0.05, "tipo"] = None
+    return data
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_profile_matches_the_separate_scans(data, n_jobs):
+    profile = profile_frame(data, key="ID", n_jobs=n_jobs)
+
+    pd.testing.assert_series_equal(profile.null_counts, data.isna().sum())
+    assert profile.rows_with_nulls == data.isna().any(axis=1).sum()
+    assert profile.duplicate_keys == data.duplicated(subset="ID").sum() == 30
+
+    expected = data.describe()
+    assert list(profile.numeric_summary.columns) == list(expected.columns)
+    np.testing.assert_allclose(profile.numeric_summary.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-6)
+
+    non_numeric = data.select_dtypes(exclude=["number"]).columns.tolist()
+    assert profile.non_numeric_columns() == non_numeric
+    for column in non_numeric:
+        pd.testing.assert_series_equal(profile.value_counts[column], data[column].value_counts())
+
+
+def test_report_helpers(data):
+    profile = profile_frame(data, key="ID")
+    nan_values = profile.nan_values()
+    assert nan_values["Total number of records with NaN values"] == profile.rows_with_nulls
+
+    summary = profile.summary()
+    assert list(summary.index) == list(data.columns)
+    assert summary.loc["Regiao", "distinct"] == 3
+    assert pd.isna(summary.loc["Renda", "distinct"])
+    assert "30 duplicated ID" in repr(profile)
+
+
+def test_empty_and_all_missing_columns():
+    data = pd.DataFrame({"x": [np.nan, np.nan], "flag": [True, True]})
+    profile = profile_frame(data)
+    assert profile.numeric_summary.loc["count", "x"] == 0
+    assert profile.duplicate_keys is None
+    pd.testing.assert_series_equal(profile.value_counts["flag"], data["flag"].value_counts())
+    assert profile_frame(data.iloc[:0]).rows_with_nulls == 0
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class QuantileSketch:
+    def __init__(self, k=2048, random_state=0):
+        """
+        Initialize the QuantileSketch.
+
+        Streaming quantile estimator with bounded memory (a KLL sketch): values
+        are added chunk by chunk with update and sketches of different chunks
+        or partitions can be combined with merge. It keeps about 3 * k values
+        whatever the number of values added, and the rank error of a quantile
+        is around 1 / k (0.05% for the default k).
+
+        While fewer than k values have been added nothing is discarded and
+        quantile returns the exact result, with the same linear interpolation
+        as pandas and numpy.
+
+        Parameters:
+        - k: int, size of the largest compactor; larger is more accurate
+        - random_state: int, seed of the compaction offsets
+        """
+        self.k = k
+        self.random_state = random_state
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(random_state)
+
+    def _capacity(self, level):
+        # Capacities shrink geometrically (2/3 per level) from the top level down
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # With an odd number of items the largest one stays at this level
+                kept = items[len(items) - len(items) % 2:]
+                promoted = items[:len(items) - len(items) % 2][self._rng.integers(2)::2]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                self._levels[level] = kept
+            level += 1
+
+    def update(self, values):
+        """
+        Add values to the sketch; NaN values are ignored.
+
+        Parameters:
+        - values: array-like of numbers
+
+        Returns:
+        - self: QuantileSketch
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Add the values summarized by another sketch.
+
+        Parameters:
+        - other: QuantileSketch
+
+        Returns:
+        - self: QuantileSketch
+        """
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    @property
+    def exact(self):
+        # True while no value has been discarded
+        return len(self._levels) == 1
+
+    def quantile(self, q):
+        """
+        Estimate quantiles of the values added so far.
+
+        Parameters:
+        - q: float or array-like of float in [0, 1]
+
+        Returns:
+        - float or np.ndarray, like numpy.quantile (NaN when the sketch is empty)
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.exact:
+            return np.quantile(self._levels[0], q)
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # Each item stands for `weight` values: place it at the middle of their ranks
+        ranks = np.cumsum(weights) - (weights + 1) / 2
+        return np.interp(np.asarray(q) * (weights.sum() - 1), ranks, values)
+
+    @property
+    def size(self):
+        """Number of values kept in memory."""
+        return sum(len(items) for items in self._levels)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from financing.quantiles import QuantileSketch
+
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+
+def rank_errors(values, estimates):
+    return [abs((values < estimate).mean() - q) for estimate, q in zip(estimates, QUANTILES)]
+
+
+def test_exact_while_small():
+    values = np.random.default_rng(0).normal(size=1000)
+    sketch = QuantileSketch().update(values[:600]).update(values[600:])
+    assert sketch.exact
+    np.testing.assert_allclose(sketch.quantile(QUANTILES), pd.Series(values).quantile(QUANTILES))
+
+
+def test_bounded_memory_and_small_rank_error():
+    values = np.random.default_rng(1).lognormal(8, 1, 500_000)
+    sketch = QuantileSketch(k=1024)
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+    assert sketch.count == len(values)
+    assert sketch.size < 4 * 1024
+    assert max(rank_errors(values, sketch.quantile(QUANTILES))) < 0.005
+
+
+def test_merge_of_partitions():
+    values = np.random.default_rng(2).normal(size=200_000)
+    left = QuantileSketch().update(values[:120_000])
+    right = QuantileSketch(random_state=1).update(values[120_000:])
+    merged = left.merge(right)
+    assert merged.count == len(values)
+    assert max(rank_errors(values, merged.quantile(QUANTILES))) < 0.005
+
+
+def test_nan_ignored_and_empty():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    assert QuantileSketch().update([1.0, np.nan, 3.0]).quantile(0.5) == 2.0
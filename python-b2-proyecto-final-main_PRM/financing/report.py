@@ -0,0 +1,144 @@
+import html
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _json_default(value):
+    # numpy scalars and arrays, timestamps and paths are not JSON serializable as they are
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+class RunReport:
+    def __init__(self, title="Run report"):
+        """
+        Initialize the RunReport.
+
+        Collects what a batch run produced (figures, result tables and single
+        values) and writes it as run_report.json and run_report.html.
+
+        Parameters:
+        - title: str, title of the report
+        """
+        self.title = title
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.figures = []
+        self.tables = {}
+        self.values = {}
+
+    def add_figure(self, record):
+        """
+        Add a figure record (name, file and, once rendered, render_seconds or error).
+
+        Parameters:
+        - record: dict, the figure record; it may still be updated after being added
+        """
+        self.figures.append(record)
+
+    def add_table(self, name, data_frame):
+        """
+        Add a result table.
+
+        Parameters:
+        - name: str, table name
+        - data_frame: pd.DataFrame, the table
+        """
+        self.tables[name] = data_frame.copy()
+
+    def add_value(self, name, value):
+        """
+        Add a single result value.
+
+        Parameters:
+        - name: str, value name
+        - value: any JSON-compatible value (numpy scalars are converted)
+        """
+        self.values[name] = value
+
+    def to_dict(self):
+        """
+        The report as a JSON-compatible dict.
+
+        Returns:
+        - dict, with title, start/end time, duration, figures, tables and values
+        """
+        return {
+            "title": self.title,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_seconds": round(time.perf_counter() - self._start, 3),
+            "figures": self.figures,
+            "tables": {name: json.loads(table.to_json(orient="records")) for name, table in self.tables.items()},
+            "values": self.values,
+        }
+
+    def to_html(self, data=None):
+        """
+        The report as a standalone HTML page; figures are linked by relative path.
+
+        Parameters:
+        - data: dict or None, output of to_dict (computed if None)
+
+        Returns:
+        - str, the HTML document
+        """
+        data = data or self.to_dict()
+        esc = html.escape
+        parts = [
+            "<!DOCTYPE html>",
+            "<html><head><meta charset=\"utf-8\">",
+            f"<title>{esc(data['title'])}</title>",
+            "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:4px 8px}img{max-width:100%;border:1px solid #eee}</style>",
+            "</head><body>",
+            f"<h1>{esc(data['title'])}</h1>",
+            f"<p>{esc(data['started_at'])} &rarr; {esc(data['finished_at'])} ({data['duration_seconds']:.1f} s)</p>",
+        ]
+        if data["values"]:
+            parts.append("<h2>Results</h2><table>")
+            parts += [f"<tr><th>{esc(str(name))}</th><td>{esc(str(value))}</td></tr>"
+                      for name, value in data["values"].items()]
+            parts.append("</table>")
+        for name, table in self.tables.items():
+            parts.append(f"<h2>{esc(name)}</h2>")
+            parts.append(table.to_html(index=False, float_format=lambda x: f"{x:.4f}"))
+        if data["figures"]:
+            parts.append("<h2>Figures</h2>")
+        for figure in data["figures"]:
+            parts.append(f"<h3>{esc(figure['name'])}</h3>")
+            if "error" in figure:
+                parts.append(f"<p>Render failed: {esc(figure['error'])}</p>")
+            else:
+                parts.append(f"<img src=\"{esc(figure['file'])}\" alt=\"{esc(figure['name'])}\">")
+        parts.append("</body></html>")
+        return "\n".join(parts)
+
+    def write(self, output_dir):
+        """
+        Write run_report.json and run_report.html to output_dir.
+
+        Parameters:
+        - output_dir: str or Path, destination directory
+
+        Returns:
+        - (json_path, html_path): tuple of Path
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        data = self.to_dict()
+        json_path = output_dir / "run_report.json"
+        html_path = output_dir / "run_report.html"
+        json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False, default=_json_default), encoding="utf-8")
+        html_path.write_text(self.to_html(data), encoding="utf-8")
+        return json_path, html_path
@@ -0,0 +1,27 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from financing.report import RunReport
+
+
+def test_write_produces_json_and_html(tmp_path):
+    report = RunReport("Prueba")
+    report.add_table("Modelos", pd.DataFrame({"Modelo": ["GB", "RF"], "Accuracy": [0.5, np.float64(0.25)]}))
+    report.add_value("Mejor modelo", "GB")
+    report.add_value("Accuracy", np.float64(0.5))
+    report.add_figure({"name": "Matriz <1>", "file": "figures/01_matriz_1.png", "render_seconds": 0.1})
+    report.add_figure({"name": "Rota", "file": "figures/02_rota.png", "error": "ValueError: x"})
+
+    json_path, html_path = report.write(tmp_path / "out")
+
+    data = json.loads(json_path.read_text(encoding="utf-8"))
+    assert data["values"] == {"Mejor modelo": "GB", "Accuracy": 0.5}
+    assert data["tables"]["Modelos"] == [{"Modelo": "GB", "Accuracy": 0.5}, {"Modelo": "RF", "Accuracy": 0.25}]
+    assert data["duration_seconds"] >= 0
+
+    page = html_path.read_text(encoding="utf-8")
+    assert '<img src="figures/01_matriz_1.png" alt="Matriz &lt;1&gt;">' in page
+    assert "Render failed: ValueError: x" in page
+    assert "<table" in page
@@ -0,0 +1,307 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, parallel_config
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+from sklearn.utils import _safe_indexing
+from threadpoolctl import threadpool_limits
+
+from .model_zoo import available_cores, cap_n_jobs
+
+# Resampled folds of the running search, set before the worker processes are forked so they inherit them
+_FOLDS = {}
+
+
+def halving_schedule(n_candidates, max_resources, factor=3, min_resources=None):
+    """
+    Candidates and resources of each iteration of successive halving.
+
+    Each iteration keeps the best 1/factor of the candidates and gives them
+    factor times the resources, so that the last iteration evaluates the
+    finalists with max_resources.
+
+    Parameters:
+    - n_candidates: int, candidates of the first iteration
+    - max_resources: int, resources of the last iteration
+    - factor: int, ratio of candidates (and of resources) between iterations
+    - min_resources: int or None, smallest resources of an iteration (limits the number of iterations)
+
+    Returns:
+    - list of (candidates, resources), one per iteration
+    """
+    n_iterations, remaining = 1, n_candidates
+    while remaining > 1:
+        remaining = math.ceil(remaining / factor)
+        n_iterations += 1
+    if min_resources is not None:
+        n_iterations = min(n_iterations, 1 + int(math.floor(math.log(max_resources / min_resources, factor) + 1e-9)))
+    n_iterations = max(n_iterations, 1)
+    schedule = []
+    for iteration in range(n_iterations):
+        resources = max(1, int(round(max_resources / factor ** (n_iterations - 1 - iteration))))
+        schedule.append((n_candidates, resources))
+        n_candidates = max(1, math.ceil(n_candidates / factor))
+    return schedule
+
+
+def _stratified_order(y, rng):
+    # Order of the rows in which every prefix has (almost) the class proportions of y
+    y = np.asarray(y)
+    keys = np.empty(len(y))
+    for label in np.unique(y):
+        rows = np.flatnonzero(y == label)
+        keys[rng.permutation(rows)] = (np.arange(len(rows)) + rng.random()) / len(rows)
+    return np.argsort(keys, kind="stable")
+
+
+def _resample(steps, X, y, X_validation):
+    # Samplers (and transformers) of the pipeline fitted on one training fold. As in the pipeline,
+    # samplers only change the training data
+    for step in steps:
+        if hasattr(step, "fit_resample"):
+            X, y = step.fit_resample(X, y)
+        else:
+            X = step.fit_transform(X, y)
+            X_validation = step.transform(X_validation)
+    return X, y, X_validation
+
+
+def _evaluate(task):
+    # One candidate on one fold. Runs in the worker processes (or in the search's process)
+    candidate, fold, data_key, final, scorer, model, n_jobs = task
+    cap_n_jobs(final, n_jobs)
+    start = time.perf_counter()
+    try:
+        if isinstance(_FOLDS[data_key], Exception):
+            raise _FOLDS[data_key]
+        X_fit, y_fit, X_validation, y_validation = _FOLDS[data_key]
+        with threadpool_limits(limits=n_jobs), parallel_config(backend="threading"):
+            if model is not None:
+                # Same data with more estimators: continue the model of the previous iteration
+                final = model.set_params(**{**final.get_params(deep=False), "warm_start": True})
+            final.fit(X_fit, y_fit)
+            score = scorer(final, X_validation, y_validation)
+        error = None
+    except Exception as exception:  # noqa: BLE001 - a failing candidate is ranked last, as error_score=nan
+        score, error, final = np.nan, f"{type(exception).__name__}: {exception}", None
+    return candidate, fold, score, time.perf_counter() - start, error, final
+
+
+class SuccessiveHalvingSearch:
+    def __init__(self, estimator, param_distributions, n_candidates=27, resource="n_samples", max_resources=None,
+                 min_resources=None, factor=3, cv=3, scoring="accuracy", random_state=0, core_budget=None,
+                 memory=None, refit=True, verbose=True):
+        """
+        Initialize the SuccessiveHalvingSearch.
+
+        Hyperparameter search by successive halving: n_candidates parameter
+        settings drawn from param_distributions are cross-validated with a
+        small budget, the best 1/factor are promoted to the next iteration with
+        factor times the budget, and so on until the finalists are evaluated
+        with max_resources (see halving_schedule). The budget is either
+        - "n_samples": rows of each training fold (a stratified prefix of the fold)
+        - a parameter of the estimator, e.g. "clf__n_estimators"; estimators
+          with warm_start (GradientBoosting, RandomForest) continue the fold
+          models of the previous iteration instead of training them again
+
+        For an imblearn Pipeline, the steps before the classifier (samplers
+        such as RandomUnderSampler and SMOTE) are fitted once per fold, budget
+        and setting of their own parameters, in this process, and shared by
+        every candidate; with `memory` they are also kept on disk for later
+        searches. Only the classifier is trained per candidate.
+
+        The candidates of an iteration are trained concurrently in a process
+        pool ("fork", as ModelZoo) within core_budget cores, the workers
+        inheriting the resampled folds instead of receiving copies. A
+        candidate whose fit fails gets a NaN score and is not promoted.
+
+        Parameters:
+        - estimator: unfitted estimator or Pipeline; it is cloned, not modified
+        - param_distributions: dict of parameter -> list of values or scipy.stats distribution
+          (or a list of such dicts), as RandomizedSearchCV
+        - n_candidates: int, settings of the first iteration
+        - resource: str, "n_samples" or the name of an integer parameter of the estimator
+        - max_resources: int or None, budget of the last iteration (None: the whole training fold,
+          or the value of the parameter in estimator)
+        - min_resources: int or None, smallest budget of an iteration
+        - factor: int, ratio of candidates and of budget between iterations
+        - cv: int or cross-validation splitter
+        - scoring: str or callable, the scorer
+        - random_state: int, seed of the settings and of the n_samples prefixes
+        - core_budget: int or None, total cores for the candidates (None: available_cores())
+        - memory: None, str or joblib.Memory, disk cache of the resampled folds
+        - refit: bool, fit the best setting on all the data (best_estimator_)
+        - verbose: bool, print a line per iteration
+        """
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_candidates = n_candidates
+        self.resource = resource
+        self.max_resources = max_resources
+        self.min_resources = min_resources
+        self.factor = factor
+        self.cv = cv
+        self.scoring = scoring
+        self.random_state = random_state
+        self.core_budget = core_budget
+        self.memory = memory
+        self.refit = refit
+        self.verbose = verbose
+
+    def _split_pipeline(self):
+        # (steps before the classifier, classifier, name of the classifier step)
+        if not hasattr(self.estimator, "steps"):
+            return [], self.estimator, None
+        name, final = self.estimator.steps[-1]
+        prefix = [(step_name, step) for step_name, step in self.estimator.steps[:-1]
+                  if step not in (None, "passthrough")]
+        return prefix, final, name
+
+    def _final_params(self, params, final_name):
+        # Parameters of the classifier step, without its prefix
+        if final_name is None:
+            return params
+        prefix = final_name + "__"
+        return {name[len(prefix):]: value for name, value in params.items() if name.startswith(prefix)}
+
+    def _fold_data(self, X, y, fold, train, validation, n_rows, prefix_params):
+        key = (fold, n_rows, tuple(sorted(prefix_params.items(), key=lambda item: item[0])))
+        if key not in _FOLDS:
+            rows = train[self._orders[fold][:n_rows]] if n_rows < len(train) else train
+            steps = []
+            for step_name, step in self._prefix:
+                own = {name[len(step_name) + 2:]: value for name, value in prefix_params.items()
+                       if name.startswith(step_name + "__")}
+                steps.append(clone(step).set_params(**own))
+            resample = self._memory.cache(_resample) if self._memory is not None else _resample
+            try:
+                X_fit, y_fit, X_validation = resample(steps, _safe_indexing(X, rows), _safe_indexing(y, rows),
+                                                      _safe_indexing(X, validation))
+                _FOLDS[key] = (X_fit, y_fit, X_validation, _safe_indexing(y, validation))
+            except Exception as exception:  # noqa: BLE001 - e.g. SMOTE with too few rows: the candidates fail
+                _FOLDS[key] = exception
+        return key
+
+    def _run(self, tasks):
+        budget = max(1, self.core_budget or available_cores())
+        workers = min(len(tasks), budget)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            workers = 1
+        n_jobs = max(1, budget // workers)
+        tasks = [task + (n_jobs,) for task in tasks]
+        if workers == 1:
+            return [_evaluate(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            return list(pool.map(_evaluate, tasks))
+
+    def fit(self, X, y):
+        """
+        Run the search.
+
+        Parameters:
+        - X, y: training data
+
+        Returns:
+        - self: SuccessiveHalvingSearch, with results_, best_params_, best_score_ and best_estimator_
+        """
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y))
+        self._prefix, final, final_name = self._split_pipeline()
+        self._memory = Memory(self.memory, verbose=0) if isinstance(self.memory, str) else self.memory
+        scorer = check_scoring(final, self.scoring)
+        rng = np.random.default_rng(self.random_state)
+        self._orders = [_stratified_order(_safe_indexing(y, train), rng) for train, _ in splits]
+
+        n_candidates = self.n_candidates
+        spaces = self.param_distributions if isinstance(self.param_distributions, list) else [self.param_distributions]
+        if all(not hasattr(values, "rvs") for space in spaces for values in space.values()):
+            # Only lists: no more candidates than settings in the grid
+            n_candidates = min(n_candidates, len(ParameterGrid(self.param_distributions)))
+        candidates = list(ParameterSampler(self.param_distributions, n_candidates, random_state=self.random_state))
+        by_samples = self.resource == "n_samples"
+        max_resources = self.max_resources
+        if max_resources is None:
+            max_resources = (min(len(train) for train, _ in splits) if by_samples
+                             else self.estimator.get_params()[self.resource])
+        warm_start = (not by_samples and "warm_start" in final.get_params(deep=False)
+                      and self.resource.startswith(f"{final_name}__" if final_name else ""))
+        self.schedule_ = halving_schedule(len(candidates), max_resources, self.factor, self.min_resources)
+
+        rows, alive, models = [], list(range(len(candidates))), {}
+        try:
+            for iteration, (_, resources) in enumerate(self.schedule_):
+                start = time.perf_counter()
+                tasks = []
+                for candidate in alive:
+                    params = dict(candidates[candidate])
+                    if not by_samples:
+                        params[self.resource] = resources
+                    prefix_params = {name: value for name, value in params.items()
+                                     if final_name is not None and not name.startswith(final_name + "__")}
+                    final_params = self._final_params(params, final_name)
+                    for fold, (train, validation) in enumerate(splits):
+                        n_rows = resources if by_samples else len(train)
+                        key = self._fold_data(X, y, fold, train, validation, n_rows, prefix_params)
+                        tasks.append((candidate, fold, key, clone(final).set_params(**final_params), scorer,
+                                      models.get((candidate, fold)) if warm_start else None))
+                results = pd.DataFrame(self._run(tasks),
+                                       columns=["candidate", "fold", "score", "fit_time", "error", "model"])
+                if warm_start:
+                    models = {(candidate, fold): model for candidate, fold, model
+                              in results[["candidate", "fold", "model"]].itertuples(index=False)}
+
+                scores = results.groupby("candidate", sort=False).agg(
+                    mean_test_score=("score", "mean"), std_test_score=("score", "std"),
+                    fit_time=("fit_time", "sum"), error=("error", "first"))
+                # A failed fold makes the candidate's score NaN
+                scores.loc[results.groupby("candidate")["score"].apply(lambda s: s.isna().any()), "mean_test_score"] \
+                    = np.nan
+                ranked = scores.sort_values("mean_test_score", ascending=False, na_position="last", kind="stable")
+                n_promoted = math.ceil(len(alive) / self.factor)
+                promoted = [candidate for candidate in ranked.index[:n_promoted]
+                            if not np.isnan(ranked.loc[candidate, "mean_test_score"])]
+                for candidate, row in scores.iterrows():
+                    rows.append({"iteration": iteration, "n_resources": resources, "candidate": candidate,
+                                 "params": candidates[candidate], **row.to_dict(),
+                                 "promoted": candidate in promoted})
+                if self.verbose:
+                    best = ranked.iloc[0]
+                    print(f"[halving] iteration {iteration}: {len(alive)} candidates x {len(splits)} folds, "
+                          f"{self.resource}={resources}, best {best['mean_test_score']:.4f} "
+                          f"({time.perf_counter() - start:.1f} s)")
+                if iteration < len(self.schedule_) - 1:
+                    alive = promoted or alive[:1]
+                    models = {key: model for key, model in models.items() if key[0] in alive}
+        finally:
+            _FOLDS.clear()
+
+        self.results_ = pd.DataFrame(rows)
+        last = self.results_[self.results_["iteration"] == self.results_["iteration"].max()]
+        best = last.sort_values("mean_test_score", ascending=False, na_position="last", kind="stable").iloc[0]
+        self.best_index_ = int(best["candidate"])
+        self.best_score_ = float(best["mean_test_score"])
+        self.best_params_ = dict(candidates[self.best_index_])
+        if not by_samples:
+            self.best_params_[self.resource] = int(best["n_resources"])
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+
+    def summary(self):
+        """
+        One row per iteration: budget, candidates, best and median scores and fit time.
+
+        Returns:
+        - pd.DataFrame indexed by iteration
+        """
+        return self.results_.groupby("iteration").agg(
+            n_resources=("n_resources", "first"), candidates=("candidate", "size"),
+            best_score=("mean_test_score", "max"), median_score=("mean_test_score", "median"),
+            fit_time=("fit_time", "sum"),
+        )
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from imblearn.under_sampling import RandomUnderSampler
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier
+from sklearn.model_selection import StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+from financing import search
+from financing.search import SuccessiveHalvingSearch, halving_schedule
+
+
+@pytest.fixture(scope="module")
+def data():
+    X, y = make_classification(n_samples=900, n_features=8, n_informative=4, n_classes=3,
+                               weights=[0.6, 0.3, 0.1], random_state=0)
+    return pd.DataFrame(X), pd.Series(y)
+
+
+def balanced(classifier):
+    return Pipeline([("sampling_under", RandomUnderSampler(sampling_strategy="not minority", random_state=0)),
+                     ("sampling_over", SMOTE(sampling_strategy="not majority", random_state=0)),
+                     ("clf", classifier)])
+
+
+def test_halving_schedule():
+    assert halving_schedule(27, 100) == [(27, 4), (9, 11), (3, 33), (1, 100)]
+    assert halving_schedule(27, 100, min_resources=10) == [(27, 11), (9, 33), (3, 100)]
+    assert halving_schedule(1, 50) == [(1, 50)]
+
+
+def test_warm_started_estimators_match_training_from_scratch(data):
+    X, y = data
+    cv = StratifiedKFold(3, shuffle=True, random_state=0)
+    pipeline = balanced(GradientBoostingClassifier(n_estimators=27, random_state=0))
+    found = SuccessiveHalvingSearch(pipeline, {"clf__max_depth": [1, 2, 3], "clf__learning_rate": [0.05, 0.2]},
+                                    n_candidates=6, resource="clf__n_estimators", cv=cv, core_budget=1,
+                                    verbose=False).fit(X, y)
+
+    assert found.best_params_["clf__n_estimators"] == 27
+    # Every evaluation of the last iteration equals cross-validating the setting from scratch
+    last = found.results_[found.results_["iteration"] == found.results_["iteration"].max()]
+    for _, row in last.iterrows():
+        params = {**row["params"], "clf__n_estimators": row["n_resources"]}
+        scores = [clone(pipeline).set_params(**params).fit(X.iloc[train], y.iloc[train])
+                  .score(X.iloc[validation], y.iloc[validation]) for train, validation in cv.split(X, y)]
+        assert row["mean_test_score"] == pytest.approx(np.mean(scores))
+    assert found.best_estimator_.get_params()["clf__max_depth"] == found.best_params_["clf__max_depth"]
+
+
+def test_folds_are_resampled_once_per_budget(data, monkeypatch):
+    X, y = data
+    calls = []
+    resample = search._resample
+    monkeypatch.setattr(search, "_resample", lambda *args: calls.append(len(args[1])) or resample(*args))
+    found = SuccessiveHalvingSearch(balanced(DecisionTreeClassifier(random_state=0)),
+                                    {"clf__max_depth": [2, 3, 4, 5, 6, None], "clf__min_samples_leaf": [1, 5, 20]},
+                                    n_candidates=9, cv=3, core_budget=1, refit=False, verbose=False).fit(X, y)
+
+    assert [candidates for candidates, _ in found.schedule_] == [9, 3, 1]
+    assert len(calls) == 3 * len(found.schedule_)
+    assert sorted(set(calls)) == [resources for _, resources in found.schedule_]
+    assert found.summary()["candidates"].tolist() == [9, 3, 1]
+    assert not hasattr(found, "best_estimator_")
+
+
+def test_process_pool_matches_sequential_search(data):
+    X, y = data
+    space = {"clf__learning_rate": [0.1, 0.5, 1.0], "clf__estimator__max_depth": [1, 2, 3]}
+    results = [
+        SuccessiveHalvingSearch(balanced(AdaBoostClassifier(DecisionTreeClassifier(), n_estimators=20,
+                                                            random_state=0)),
+                                space, n_candidates=6, resource="clf__n_estimators", core_budget=core_budget,
+                                refit=False, verbose=False).fit(X, y)
+        for core_budget in (1, 2)
+    ]
+    pd.testing.assert_frame_equal(results[0].results_.drop(columns="fit_time"),
+                                  results[1].results_.drop(columns="fit_time"))
+    assert results[0].best_params_ == results[1].best_params_
+
+
+def test_failing_candidates_are_not_promoted(data):
+    X, y = data
+    found = SuccessiveHalvingSearch(balanced(DecisionTreeClassifier(random_state=0)),
+                                    {"clf__max_depth": [-1, 3], "sampling_over__k_neighbors": [5, 0]},
+                                    n_candidates=4, factor=2, cv=3, core_budget=1, verbose=False).fit(X, y)
+
+    first = found.results_[found.results_["iteration"] == 0]
+    failed = first[first["mean_test_score"].isna()]
+    assert len(failed) == 3 and not failed["promoted"].any()
+    assert failed["error"].notna().all()
+    assert found.best_params_ == {"clf__max_depth": 3, "sampling_over__k_neighbors": 5}
@@ -0,0 +1,417 @@
+"""
+Batch prediction service for a trained financing classifier.
+
+Usage (from the project folder, with the artifact written by the notebook):
+    python -m financing.serving output/model/financing_model.joblib --port 8000
+
+    curl -s localhost:8000/predict -d '[{"Idade": 34, "Renda": 7200, "Regiao": "SE", ...}]'
+    curl -s localhost:8000/stats
+"""
+import argparse
+import json
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .encoding import encode_columns
+
+TEXT_FLAGS = {"T": 1, "F": 0, True: 1, False: 0}
+
+
+def clean_column_name(name):
+    """Column name without the characters the notebook removes from the merged data (spaces, accents...)."""
+    return re.sub("[^A-Za-z0-9_]+", "", name)
+
+
+class ScoringModel:
+    def __init__(self, estimator, feature_names, label_encoders, target_encoder, range_binners=(), example=None):
+        """
+        Initialize the ScoringModel.
+
+        Self-contained version of the notebook's preparation plus a trained
+        classifier, built only from package classes so that it can be loaded
+        outside the notebook: raw customer records (the merged source columns,
+        with or without the notebook's column name cleaning) go through
+        - the range binners (AGE_RANGE, INCOME_RANGE)
+        - the fitted label encoders of the categorical columns
+        - T/F and boolean flags to 0/1
+        - the feature columns of the training data, in their order
+        and the predicted codes are decoded with the target encoder.
+
+        Parameters:
+        - estimator: fitted classifier or CompiledEnsemble (predict, predict_proba) trained on the prepared features
+        - feature_names: list of str, columns of the training data, in order
+        - label_encoders: dict of column -> fitted CategoryEncoder of the categorical features
+        - target_encoder: fitted CategoryEncoder of the target (codes -> labels)
+        - range_binners: list of RangeBinner, range columns computed from the records
+        - example: pd.DataFrame or None, a few raw records used by warm_up
+        """
+        self.estimator = estimator
+        self.feature_names = list(feature_names)
+        self.label_encoders = label_encoders
+        self.target_encoder = target_encoder
+        self.range_binners = list(range_binners)
+        self.example = example
+
+    @property
+    def classes(self):
+        """Labels of the target, in the order of predict_proba."""
+        return self.target_encoder.inverse_transform(self.estimator.classes_)
+
+    def prepare(self, data):
+        """
+        Prepared feature matrix of raw records.
+
+        Parameters:
+        - data: pd.DataFrame or list of dict, raw records
+
+        Returns:
+        - X: pd.DataFrame with the feature columns
+        """
+        data = pd.DataFrame(data) if not isinstance(data, pd.DataFrame) else data.copy(deep=False)
+        data = data.rename(columns=clean_column_name)
+        for binner in self.range_binners:
+            binner.add_range_column(data)
+        missing = [column for column in self.feature_names if column not in data.columns]
+        if missing:
+            raise ValueError(f"records are missing the columns {missing}")
+        X = encode_columns(data[self.feature_names], self.label_encoders)
+        flags = {}
+        for column in X.columns:
+            if X[column].dtype == bool:
+                flags[column] = X[column].astype(np.int8)
+            elif not pd.api.types.is_numeric_dtype(X[column].dtype):
+                flags[column] = X[column].map(TEXT_FLAGS)
+        return X.assign(**flags)
+
+    def predict(self, data):
+        """
+        Predicted financing type of each record.
+
+        Parameters:
+        - data: pd.DataFrame or list of dict, raw records
+
+        Returns:
+        - np.ndarray of labels (e.g. "Ambos", "FinanciamentoCasa")
+        """
+        return self.target_encoder.inverse_transform(self.estimator.predict(self.prepare(data)))
+
+    def predict_proba(self, data):
+        """
+        Probability of each financing type.
+
+        Parameters:
+        - data: pd.DataFrame or list of dict, raw records
+
+        Returns:
+        - pd.DataFrame, one column per label
+        """
+        return pd.DataFrame(self.estimator.predict_proba(self.prepare(data)), columns=self.classes)
+
+    def warm_up(self):
+        """
+        Score the example records once, so the first request does not pay for lazy loading.
+
+        Returns:
+        - float, seconds taken
+        """
+        start = time.perf_counter()
+        if self.example is not None and len(self.example):
+            self.predict(self.example)
+        return time.perf_counter() - start
+
+    def save(self, path):
+        """
+        Write the model as an uncompressed joblib file, whose numpy arrays can be memory-mapped on load.
+
+        Parameters:
+        - path: str or Path
+
+        Returns:
+        - Path, the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path, mmap_mode="r", warm_up=True):
+        """
+        Load a model written by save.
+
+        Parameters:
+        - path: str or Path
+        - mmap_mode: str or None, joblib memory mapping of the arrays ("r": shared, read-only pages)
+        - warm_up: bool, score the example records before returning
+
+        Returns:
+        - ScoringModel
+        """
+        model = joblib.load(path, mmap_mode=mmap_mode)
+        if warm_up:
+            model.warm_up()
+        return model
+
+
+class _Request:
+    __slots__ = ("frame", "future", "enqueued")
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch_rows=1024, max_wait_ms=5.0, history=1000, verbose=False):
+        """
+        Initialize the MicroBatcher.
+
+        Coalesces concurrent prediction requests: a scoring thread takes the
+        first waiting request, collects the requests that arrive within
+        max_wait_ms of it (up to max_batch_rows rows) and scores them with a
+        single predict call. Each batch is recorded with its size, the time its
+        oldest request waited, the predict time and the throughput.
+
+        When a batch fails (e.g. one request with an unknown category), its
+        requests are scored one by one so that only the invalid ones fail.
+
+        Parameters:
+        - model: ScoringModel (or any object with predict(pd.DataFrame))
+        - max_batch_rows: int, rows scored together at most
+        - max_wait_ms: float, time a request waits for others to join its batch
+        - history: int, batches kept for stats()
+        - verbose: bool, print one line per batch
+        """
+        self.model = model
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.verbose = verbose
+        self.batches = deque(maxlen=history)
+        self.totals = {"batches": 0, "requests": 0, "rows": 0, "predict_seconds": 0.0}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the scoring thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the scoring thread once the waiting requests are scored."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, frame):
+        """
+        Queue records for scoring.
+
+        Parameters:
+        - frame: pd.DataFrame, raw records
+
+        Returns:
+        - concurrent.futures.Future with the predictions (np.ndarray)
+        """
+        request = _Request(frame)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self, first):
+        batch, rows = [first], len(first.frame)
+        deadline = first.enqueued + self.max_wait_ms / 1000
+        while rows < self.max_batch_rows:
+            # Requests already waiting (e.g. during the previous predict) join without waiting longer
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            rows += len(request.frame)
+        return batch, rows
+
+    def _loop(self):
+        while self._running or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._score(*self._collect(first))
+
+    def _score(self, batch, rows):
+        start = time.perf_counter()
+        try:
+            frames = [request.frame for request in batch]
+            predictions = self.model.predict(frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True))
+            ends = np.cumsum([len(frame) for frame in frames])[:-1]
+            for request, result in zip(batch, np.split(predictions, ends)):
+                request.future.set_result(result)
+        except Exception:
+            for request in batch:
+                try:
+                    request.future.set_result(self.model.predict(request.frame))
+                except Exception as error:
+                    request.future.set_exception(error)
+        end = time.perf_counter()
+
+        record = {
+            "requests": len(batch),
+            "rows": rows,
+            "wait_ms": (start - batch[0].enqueued) * 1000,
+            "predict_ms": (end - start) * 1000,
+            "latency_ms": (end - batch[0].enqueued) * 1000,
+            "rows_per_second": rows / (end - start) if end > start else float("inf"),
+        }
+        with self._lock:
+            self.batches.append(record)
+            self.totals["batches"] += 1
+            self.totals["requests"] += len(batch)
+            self.totals["rows"] += rows
+            self.totals["predict_seconds"] += end - start
+        if self.verbose:
+            print(f"[serving] batch: {record['requests']} requests, {rows} rows, wait {record['wait_ms']:.1f} ms, "
+                  f"predict {record['predict_ms']:.1f} ms, {record['rows_per_second']:.0f} rows/s")
+
+    def stats(self):
+        """
+        Totals and latency percentiles of the recent batches.
+
+        Returns:
+        - dict
+        """
+        with self._lock:
+            batches = pd.DataFrame(list(self.batches))
+            totals = dict(self.totals)
+        stats = {**totals, "max_batch_rows": self.max_batch_rows, "max_wait_ms": self.max_wait_ms}
+        if totals["predict_seconds"]:
+            stats["rows_per_predict_second"] = totals["rows"] / totals["predict_seconds"]
+        if len(batches):
+            stats["recent"] = {
+                "batches": len(batches),
+                "mean_rows": float(batches["rows"].mean()),
+                "mean_requests": float(batches["requests"].mean()),
+                **{f"latency_ms_p{int(q * 100)}": float(batches["latency_ms"].quantile(q)) for q in (0.5, 0.95, 0.99)},
+                "mean_predict_ms": float(batches["predict_ms"].mean()),
+            }
+        return stats
+
+
+class _ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog: the default (5) resets connections under a burst of concurrent clients
+    request_queue_size = 1024
+
+
+def _handler(model, batcher, timeout):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "classes": list(model.classes), "features": model.feature_names})
+            elif self.path == "/stats":
+                self._send(200, batcher.stats())
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                records = payload["records"] if isinstance(payload, dict) else payload
+                if not len(records):
+                    # Nothing to score: no columns to prepare, and no need to wait for a batch
+                    self._send(200, {"predictions": []})
+                    return
+                predictions = batcher.submit(pd.DataFrame.from_records(records)).result(timeout)
+            except (ValueError, KeyError, TypeError) as error:
+                self._send(400, {"error": str(error)})
+                return
+            except TimeoutError:
+                self._send(503, {"error": "timed out waiting for the prediction"})
+                return
+            except Exception as error:
+                # Any other failure of the model is an answer too, not a dropped connection
+                self._send(500, {"error": f"{type(error).__name__}: {error}"})
+                return
+            self._send(200, {"predictions": predictions.tolist()})
+
+        def log_message(self, format, *args):
+            # One line per batch (MicroBatcher verbose) instead of one per request
+            pass
+
+    return ScoringHandler
+
+
+def make_server(model, host="127.0.0.1", port=8000, max_batch_rows=1024, max_wait_ms=5.0, timeout=30.0,
+                verbose=False):
+    """
+    HTTP scoring server: POST /predict (a list of records, or {"records": [...]}), GET /stats, GET /health.
+
+    Each request is handled in its own thread and waits for its micro-batch.
+
+    Parameters:
+    - model: ScoringModel
+    - host, port: address to listen on (port 0: any free port, see server.server_address)
+    - max_batch_rows, max_wait_ms: micro-batching (see MicroBatcher)
+    - timeout: float, seconds a request waits for its predictions
+    - verbose: bool, print one line per batch
+
+    Returns:
+    - (server, batcher): ThreadingHTTPServer (not yet serving) and the started MicroBatcher
+    """
+    batcher = MicroBatcher(model, max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms, verbose=verbose).start()
+    return _ScoringServer((host, port), _handler(model, batcher, timeout)), batcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="financing batch prediction service")
+    parser.add_argument("model", help="ScoringModel file written by the notebook (output/model/financing_model.joblib)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-rows", type=int, default=1024)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--verbose", action="store_true", help="print one line per batch")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = ScoringModel.load(args.model)
+    print(f"[serving] model loaded and warmed up in {time.perf_counter() - start:.2f} s "
+          f"({type(model.estimator).__name__}, {len(model.feature_names)} features)")
+    server, batcher = make_server(model, args.host, args.port, args.max_batch_rows, args.max_wait_ms,
+                                  verbose=args.verbose)
+    print(f"[serving] listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
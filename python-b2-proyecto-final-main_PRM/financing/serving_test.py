@@ -0,0 +1,132 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from financing.binning import age_range_binner
+from financing.encoding import CategoryEncoder
+from financing.serving import MicroBatcher, ScoringModel, clean_column_name, make_server
+
+
+@pytest.fixture
+def records():
+    rng = np.random.default_rng(0)
+    n = 400
+    return pd.DataFrame({
+        "Idade": rng.normal(45, 15, n).round(),
+        "Regiao": rng.choice(["N", "SE", "S"], n),
+        "Seguro Auto": rng.choice(["T", "F"], n),
+        "Emprestimo pessoal": rng.random(n) < 0.3,
+    })
+
+
+@pytest.fixture
+def model(records):
+    binner = age_range_binner()
+    data = binner.add_range_column(records.rename(columns=clean_column_name))
+    encoders = {column: CategoryEncoder().fit(data[column]) for column in ("Regiao", "AGE_RANGE")}
+    features = ["Idade", "Regiao", "AGE_RANGE", "SeguroAuto", "Emprestimopessoal"]
+    labels = np.where(data["Regiao"] == "SE", "Ambos", np.where(data["Idade"] > 45, "Casa", "Carro"))
+    target_encoder = CategoryEncoder().fit(labels)
+    model = ScoringModel(None, features, encoders, target_encoder, [binner], example=records.head(3))
+    model.estimator = DecisionTreeClassifier(random_state=0).fit(model.prepare(records),
+                                                                 target_encoder.transform(labels))
+    return model
+
+
+def test_prepare_and_predict(model, records):
+    X = model.prepare(records)
+    assert list(X.columns) == model.feature_names
+    assert set(X["SeguroAuto"]) <= {0, 1} and X["Emprestimopessoal"].dtype == np.int8
+    predictions = model.predict(records)
+    assert set(predictions) <= {"Ambos", "Casa", "Carro"}
+    assert (predictions[records["Regiao"].to_numpy() == "SE"] == "Ambos").all()
+    assert list(model.predict_proba(records).columns) == list(model.classes)
+    with pytest.raises(ValueError, match="missing the columns"):
+        model.predict(records.drop(columns="Regiao"))
+
+
+def test_save_and_load(model, records, tmp_path):
+    path = model.save(tmp_path / "model" / "financing_model.joblib")
+    loaded = ScoringModel.load(path)
+    np.testing.assert_array_equal(loaded.predict(records), model.predict(records))
+    # Records as JSON (list of dict) give the same result as the DataFrame
+    from_json = loaded.predict(json.loads(records.to_json(orient="records")))
+    np.testing.assert_array_equal(from_json, model.predict(records))
+
+
+def test_batcher_coalesces_and_isolates_errors(model, records):
+    calls = []
+    predict = model.predict
+    model.predict = lambda frame: calls.append(len(frame)) or predict(frame)
+    batcher = MicroBatcher(model, max_wait_ms=200).start()
+    try:
+        frames = [records.iloc[i:i + 10] for i in range(0, 100, 10)]
+        bad = records.iloc[:2].assign(Regiao="XX")
+        futures = [batcher.submit(frame) for frame in frames[:5]] + [batcher.submit(bad)]
+        futures += [batcher.submit(frame) for frame in frames[5:]]
+        for frame, future in zip(frames, futures[:5] + futures[6:]):
+            np.testing.assert_array_equal(future.result(5), predict(frame))
+        with pytest.raises(ValueError, match="unseen"):
+            futures[5].result(5)
+    finally:
+        batcher.stop()
+    # One batch of everything, then one call per request after the failure
+    assert calls[0] == 102 and len(calls) == 1 + len(futures)
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["requests"] == 11 and stats["recent"]["mean_rows"] == 102
+
+
+def test_http_server(model, records):
+    server, batcher = make_server(model, port=0, max_wait_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = "http://{}:{}".format(*server.server_address)
+
+    def post(payload):
+        request = urllib.request.Request(f"{url}/predict", json.dumps(payload).encode())
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+
+    try:
+        payloads = json.loads(records.head(8).to_json(orient="records"))
+        results = [None] * len(payloads)
+
+        def client(i):
+            results[i] = post([payloads[i]])["predictions"]
+
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(len(payloads))]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        assert sum(results, []) == model.predict(records.head(8)).tolist()
+        assert post({"records": payloads[:2]})["predictions"] == results[0] + results[1]
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post([{**payloads[0], "Regiao": "XX"}])
+        assert error.value.code == 400
+        assert post([]) == {"predictions": []}
+
+        with urllib.request.urlopen(f"{url}/stats", timeout=10) as response:
+            stats = json.loads(response.read())
+        assert stats["requests"] == 10 and stats["batches"] < stats["requests"]
+
+        # Failures other than bad records answer 500 with the error instead of dropping the connection
+        def broken(frame):
+            raise RuntimeError("model unavailable")
+
+        model.predict = broken
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post([payloads[0]])
+        assert error.value.code == 500
+        assert json.loads(error.value.read()) == {"error": "RuntimeError: model unavailable"}
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.stop()
@@ -0,0 +1,414 @@
+"""
+Stages of the notebook's pipeline that can run on their own (see financing.cli).
+
+Each stage reads the artifacts of the previous one from output_dir/stages and
+writes its own, so "train" does not repeat the preparation and "evaluate" does
+not train again:
+- prepare: the three CSVs -> stages/prepared.parquet, stages/preparation.joblib (encoders)
+- train: balanced train/test split, optionally the hyperparameter search, and the four models
+  -> stages/models.joblib, stages/test.parquet
+- evaluate: metrics of the models -> stages/metrics.json, model/financing_model.joblib (ScoringModel)
+
+The notebook builds its preparation and its models with the functions of this
+module (preparation_pipeline, balanced, gradient_boosting, ..., SEARCH_SPACES),
+so the script and the stages cannot drift apart.
+
+The heavy libraries (pandas, sklearn, imblearn) are imported inside the
+functions, so importing this module, or running another stage, does not pay
+for them.
+"""
+import json
+import time
+from pathlib import Path
+
+SOURCES = ("InsuranceCompanyABC", "RetailBankEFG", "InvestmentBankCDE")
+TARGET = "tipo_financiamiento"
+ONE_HOT_COLUMNS = ["FinanciamentoCasa", "FinanciamentoCarro"]
+LABEL_COLUMNS = ["AGE_RANGE", "INCOME_RANGE", TARGET, "Regiao"]
+# Arguments of drop_duplicates and of the merges of the three sources
+DEDUP_PARAMS = {"subset": ["ID"]}
+MERGE_PARAMS = {"on": "ID", "how": "inner"}
+VOTING = "Voting Classifier (Ensamble)"
+# Name of each tuned model inside the Voting Classifier
+VOTING_NAMES = {"Gradient Boosting": "gb", "Random Forest": "rf", "AdaBoost": "ada"}
+# Successive-halving search space of each model (FINANCING_SEARCH, train(search=True))
+SEARCH_SPACES = {
+    "Gradient Boosting": {"clf__learning_rate": [0.05, 0.1, 0.2], "clf__max_depth": [2, 3, 4],
+                          "clf__subsample": [0.8, 1.0], "clf__min_samples_leaf": [1, 10]},
+    "Random Forest": {"clf__max_depth": [6, 10, None], "clf__min_samples_leaf": [1, 2, 5],
+                      "clf__max_features": ["sqrt", 0.5], "clf__min_samples_split": [2, 5]},
+    "AdaBoost": {"clf__learning_rate": [0.05, 0.1, 0.3, 1.0], "clf__estimator__max_depth": [1, 2, 3],
+                 "clf__estimator__min_samples_leaf": [1, 10]},
+}
+
+
+def stage_paths(output_dir="output"):
+    """
+    Files written by the stages.
+
+    Parameters:
+    - output_dir: str or Path, output directory of the run
+
+    Returns:
+    - dict of artifact name -> Path
+    """
+    stages = Path(output_dir) / "stages"
+    return {
+        "prepared": stages / "prepared.parquet",
+        "preparation": stages / "preparation.joblib",
+        "models": stages / "models.joblib",
+        "test": stages / "test.parquet",
+        "metrics": stages / "metrics.json",
+        "scoring_model": Path(output_dir) / "model" / "financing_model.joblib",
+    }
+
+
+def _require(path, stage):
+    if not Path(path).exists():
+        raise FileNotFoundError(f"{path} not found: run the '{stage}' stage first")
+
+
+def _log(stage, message, start, verbose):
+    if verbose:
+        print(f"[{stage}] {message} ({time.perf_counter() - start:.1f} s)")
+
+
+def preparation_pipeline():
+    """
+    The notebook's pipeline_data_preparation (unfitted).
+
+    Financing flags to the tipo_financiamiento label, label encoding of the
+    categorical columns (the range columns with every label of their binner),
+    without ID and with the T/F flags as 0/1.
+
+    Returns:
+    - imblearn Pipeline
+    """
+    from imblearn.pipeline import Pipeline
+
+    from .binning import age_range_binner, income_range_binner
+    from .preparation import BooleanToNumeric, DropColumns, MultiColumnLabelEncoder, OneHotDecoderImputer
+
+    # The range encoders know every range and UNKNOWN, which the served records can have
+    # (e.g. a missing Idade); UNKNOWN sorts last, so the codes of the ranges do not change
+    categories = {binner.output_column: binner.categories() for binner in (age_range_binner(), income_range_binner())}
+    return Pipeline([
+        ("one_hote_to_label", OneHotDecoderImputer(columns=ONE_HOT_COLUMNS, label_column_name=TARGET)),
+        ("label_encode", MultiColumnLabelEncoder(columns=LABEL_COLUMNS, categories=categories)),
+        ("drop_columns", DropColumns(columns=["ID"])),
+        ("boolean_numeric", BooleanToNumeric()),
+    ])
+
+
+def prepare_frame(merged):
+    """
+    Fit preparation_pipeline on the merged sources.
+
+    Parameters:
+    - merged: pd.DataFrame, merged sources with AGE_RANGE and INCOME_RANGE and clean column names
+
+    Returns:
+    - (prepared, pipeline): pd.DataFrame, the fitted pipeline (its "label_encode" step holds the
+      CategoryEncoder of each of LABEL_COLUMNS)
+    """
+    pipeline = preparation_pipeline()
+    return pipeline.fit_transform(merged), pipeline
+
+
+def prepare(data_dir="data", output_dir="output", verbose=True):
+    """
+    Stage "prepare": read, deduplicate, add the ranges, merge and prepare the three sources.
+
+    Parameters:
+    - data_dir: str or Path, folder with the three CSVs
+    - output_dir: str or Path, output directory of the run
+    - verbose: bool, print the progress
+
+    Returns:
+    - pd.DataFrame, the prepared data (as data_frame_tipo_financiamiento)
+    """
+    import joblib
+
+    from .loading import read_typed_csv
+    from .preparation import CreateNewRangesColumns
+    from .serving import clean_column_name
+
+    start = time.perf_counter()
+    frames = {source: read_typed_csv(Path(data_dir) / f"{source}.csv").drop_duplicates(**DEDUP_PARAMS)
+              for source in SOURCES}
+    merged = CreateNewRangesColumns().fit_transform(frames["InsuranceCompanyABC"])
+    for source in SOURCES[1:]:
+        merged = merged.merge(frames[source], **MERGE_PARAMS)
+    merged = merged.rename(columns=clean_column_name)
+
+    prepared, pipeline = prepare_frame(merged)
+    encoders = pipeline.named_steps["label_encode"].label_encoders
+    paths = stage_paths(output_dir)
+    paths["prepared"].parent.mkdir(parents=True, exist_ok=True)
+    prepared.to_parquet(paths["prepared"], engine="fastparquet", index=False)
+    raw_columns = [col for col in merged.columns if col not in ONE_HOT_COLUMNS + ["AGE_RANGE", "INCOME_RANGE"]]
+    joblib.dump({"label_encoders": {col: encoder for col, encoder in encoders.items() if col != TARGET},
+                 "target_encoder": encoders[TARGET],
+                 "example": merged[raw_columns].head(5)}, paths["preparation"])
+    _log("prepare", f"{len(prepared)} rows x {prepared.shape[1]} columns -> {paths['prepared']}", start, verbose)
+    return prepared
+
+
+def balancing_steps():
+    """
+    The notebook's steps_imbalance: RandomUnderSampler of all but the minority class, then SMOTE.
+
+    Returns:
+    - list of (name, sampler)
+    """
+    from imblearn.over_sampling import SMOTE
+    from imblearn.under_sampling import RandomUnderSampler
+
+    return [
+        ("sampling_under", RandomUnderSampler(sampling_strategy="not minority", random_state=42)),
+        ("sampling_over", SMOTE(sampling_strategy="not majority", k_neighbors=5, random_state=42)),
+    ]
+
+
+def _balance(X, y):
+    from imblearn.pipeline import Pipeline
+
+    return Pipeline(balancing_steps()).fit_resample(X, y)
+
+
+def balanced(classifier, memory=None):
+    """
+    A classifier behind the balancing steps, as the notebook's model pipelines.
+
+    Parameters:
+    - classifier: unfitted estimator, the "clf" step
+    - memory: joblib.Memory or None, cache of the balancing steps
+
+    Returns:
+    - InstrumentedPipeline
+    """
+    from .pipeline_tools import InstrumentedPipeline
+
+    return InstrumentedPipeline(balancing_steps() + [("clf", classifier)], memory=memory)
+
+
+def gradient_boosting():
+    """The notebook's GradientBoostingClassifier (unfitted)."""
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    return GradientBoostingClassifier(learning_rate=0.1, max_depth=3, n_estimators=100, random_state=8860)
+
+
+def random_forest():
+    """The notebook's RandomForestClassifier (unfitted)."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(n_estimators=100, max_depth=10, min_samples_split=5, min_samples_leaf=2,
+                                  random_state=42, n_jobs=-1)
+
+
+def adaboost():
+    """The notebook's AdaBoostClassifier (unfitted)."""
+    from sklearn.ensemble import AdaBoostClassifier
+    from sklearn.tree import DecisionTreeClassifier
+
+    return AdaBoostClassifier(estimator=DecisionTreeClassifier(max_depth=3), n_estimators=50, learning_rate=0.1,
+                              random_state=42)
+
+
+def voting_classifier(gb, rf, ada):
+    """
+    The notebook's soft Voting Classifier of the three models, trained on balanced data.
+
+    Parameters:
+    - gb, rf, ada: unfitted estimators (gradient_boosting(), random_forest(), adaboost())
+
+    Returns:
+    - VotingClassifier
+    """
+    from sklearn.ensemble import VotingClassifier
+
+    return VotingClassifier([("gb", gb), ("rf", rf), ("ada", ada)], voting="soft", n_jobs=-1)
+
+
+def notebook_models(memory=None):
+    """
+    The notebook's models with their hyperparameters.
+
+    Parameters:
+    - memory: joblib.Memory or None, cache of the balancing steps of the pipelines
+
+    Returns:
+    - dict of name -> unfitted estimator; VOTING is trained on balanced data, the others balance
+      inside their pipeline
+    """
+    return {
+        "Gradient Boosting": balanced(gradient_boosting(), memory),
+        "Random Forest": balanced(random_forest(), memory),
+        "AdaBoost": balanced(adaboost(), memory),
+        VOTING: voting_classifier(gradient_boosting(), random_forest(), adaboost()),
+    }
+
+
+def search_hyperparameters(models, X, y, n_candidates=27, core_budget=None, memory=None, verbose=True):
+    """
+    Successive-halving search of the hyperparameters of the models of SEARCH_SPACES.
+
+    The best parameters are set on each pipeline and on the same model inside
+    the Voting Classifier, if `models` has it (with only the Voting
+    Classifier, its models are searched behind the balancing steps).
+
+    Parameters:
+    - models: dict of name -> unfitted estimator (notebook_models()), modified in place
+    - X, y: training data (not balanced: the pipelines balance each fold)
+    - n_candidates: int, settings of the first iteration of each search
+    - core_budget: int or None, cores of the searches (None: all)
+    - memory: joblib.Memory or None, cache of the balancing steps
+    - verbose: bool, print the progress
+
+    Returns:
+    - dict of name -> fitted SuccessiveHalvingSearch
+    """
+    from sklearn.base import clone
+
+    from .search import SuccessiveHalvingSearch
+
+    searches = {}
+    for name, space in SEARCH_SPACES.items():
+        if name in models:
+            estimator = models[name]
+        elif VOTING in models:
+            estimator = balanced(clone(models[VOTING].named_estimators[VOTING_NAMES[name]]), memory)
+        else:
+            continue
+        search = SuccessiveHalvingSearch(estimator, space, n_candidates=n_candidates,
+                                         resource="clf__n_estimators", min_resources=10, cv=3, random_state=42,
+                                         core_budget=core_budget, memory=memory, refit=False,
+                                         verbose=verbose).fit(X, y)
+        estimator.set_params(**search.best_params_)
+        if VOTING in models:
+            models[VOTING].set_params(**{f"{VOTING_NAMES[name]}__{param[len('clf__'):]}": value
+                                         for param, value in search.best_params_.items()})
+        searches[name] = search
+    return searches
+
+
+def train(output_dir="output", models=None, core_budget=None, search=False, n_candidates=27, verbose=True):
+    """
+    Stage "train": balance the prepared data, split it and train the models in a ModelZoo.
+
+    Parameters:
+    - output_dir: str or Path, output directory of the run (with the "prepare" artifacts)
+    - models: list of str or None, names of notebook_models() to train (None: all)
+    - core_budget: int or None, cores of the ModelZoo and of the searches (None: all)
+    - search: bool, search the hyperparameters first (search_hyperparameters), as FINANCING_SEARCH
+    - n_candidates: int, settings of the first iteration of each search
+    - verbose: bool, print the progress
+
+    Returns:
+    - dict of name -> ModelResult
+    """
+    import joblib
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    from .model_zoo import ModelZoo
+
+    paths = stage_paths(output_dir)
+    _require(paths["prepared"], "prepare")
+    candidates = notebook_models()
+    unknown = sorted(set(models or ()) - set(candidates))
+    if unknown:
+        raise ValueError(f"unknown models {unknown}, choose from {list(candidates)}")
+
+    start = time.perf_counter()
+    data = pd.read_parquet(paths["prepared"], engine="fastparquet")
+    X_reshaped, y_reshaped = _balance(data.drop(columns=[TARGET]), data[TARGET])
+    X_train, X_test, y_train, y_test = train_test_split(X_reshaped, y_reshaped, test_size=0.2, stratify=y_reshaped,
+                                                        random_state=42)
+    X_train_balanced, y_train_balanced = _balance(X_train, y_train)
+
+    candidates = {name: estimator for name, estimator in candidates.items() if models is None or name in models}
+    # Best parameters of each searched model; the Voting Classifier keeps those of all its models
+    best_params = {}
+    if search:
+        searches = search_hyperparameters(candidates, X_train, y_train, n_candidates, core_budget, verbose=verbose)
+        best_params = {name: found.best_params_ for name, found in searches.items()}
+
+    zoo = ModelZoo(core_budget=core_budget, verbose=verbose)
+    for name, estimator in candidates.items():
+        zoo.add(name, estimator, *((X_train_balanced, y_train_balanced) if name == VOTING else ()))
+    results = zoo.run(X_train, y_train, X_test, y_test)
+
+    joblib.dump({name: {"model": result.model, "fit_seconds": result.fit_seconds,
+                        "peak_memory_mb": result.peak_memory_mb, "n_jobs": result.n_jobs,
+                        "best_params": best_params if name == VOTING else best_params.get(name)}
+                 for name, result in results.items()}, paths["models"])
+    X_test.assign(**{TARGET: y_test}).to_parquet(paths["test"], engine="fastparquet", index=False)
+    _log("train", f"{len(results)} models on {len(X_train)} rows -> {paths['models']}", start, verbose)
+    return results
+
+
+def evaluate(output_dir="output", verbose=True):
+    """
+    Stage "evaluate": compare the trained models on the test set and save the best one for serving.
+
+    The best model by accuracy is compiled (compile_ensemble) and saved as a
+    ScoringModel with the encoders of the "prepare" stage, as the notebook does.
+
+    Parameters:
+    - output_dir: str or Path, output directory of the run (with the "prepare" and "train" artifacts)
+    - verbose: bool, print the comparison table
+
+    Returns:
+    - pd.DataFrame, comparison_table of the models
+    """
+    import joblib
+    import pandas as pd
+    from sklearn.metrics import accuracy_score, classification_report
+
+    from .model_zoo import ModelResult, comparison_table
+    from .serving import ScoringModel
+    from .binning import age_range_binner, income_range_binner
+    from .trees import compile_ensemble
+
+    paths = stage_paths(output_dir)
+    _require(paths["preparation"], "prepare")
+    _require(paths["models"], "train")
+    start = time.perf_counter()
+    trained = joblib.load(paths["models"])
+    test = pd.read_parquet(paths["test"], engine="fastparquet")
+    X_test, y_test = test.drop(columns=[TARGET]), test[TARGET]
+
+    results = []
+    for name, record in trained.items():
+        predict_start = time.perf_counter()
+        y_pred = record["model"].predict(X_test)
+        predict_seconds = time.perf_counter() - predict_start
+        report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+        report.setdefault("accuracy", accuracy_score(y_test, y_pred))
+        results.append(ModelResult(name, record["model"], y_pred, report,
+                                   classification_report(y_test, y_pred, digits=6, zero_division=0),
+                                   record["fit_seconds"], predict_seconds, record["peak_memory_mb"],
+                                   record["n_jobs"]))
+    comparison = comparison_table(results)
+    best = max(results, key=lambda result: result.accuracy)
+
+    # The balancing pipelines do not resample when predicting: their final classifier is enough
+    estimator = best.model[-1] if hasattr(best.model, "steps") else best.model
+    preparation = joblib.load(paths["preparation"])
+    scoring_model = ScoringModel(compile_ensemble(estimator), feature_names=X_test.columns,
+                                 label_encoders=preparation["label_encoders"],
+                                 target_encoder=preparation["target_encoder"],
+                                 range_binners=[age_range_binner(), income_range_binner()],
+                                 example=preparation["example"])
+    scoring_model.save(paths["scoring_model"])
+
+    with open(paths["metrics"], "w") as file:
+        json.dump({"best_model": best.name, "best_accuracy": best.accuracy,
+                   "models": comparison.to_dict(orient="records")}, file, indent=2)
+    if verbose:
+        print(comparison.to_string(index=False))
+    _log("evaluate", f"best model {best.name} (accuracy {best.accuracy:.4f}) -> {paths['scoring_model']}",
+         start, verbose)
+    return comparison
@@ -0,0 +1,68 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing import stages
+from financing.binning import age_range_binner, income_range_binner
+from financing.serving import ScoringModel
+
+
+def test_prepare_matches_the_scoring_model_preparation(data_dir, tmp_path):
+    prepared = stages.prepare(data_dir, tmp_path / "output", verbose=False)
+    paths = stages.stage_paths(tmp_path / "output")
+
+    assert "ID" not in prepared and not set(stages.ONE_HOT_COLUMNS) & set(prepared.columns)
+    assert all(pd.api.types.is_numeric_dtype(dtype) for dtype in prepared.dtypes)
+    pd.testing.assert_frame_equal(pd.read_parquet(paths["prepared"], engine="fastparquet"), prepared,
+                                  check_dtype=False)
+
+    # The raw records saved with the encoders are prepared by ScoringModel as the first rows
+    preparation = joblib.load(paths["preparation"])
+    assert set(preparation["target_encoder"].classes_) <= {"Ambos", "FinanciamentoCarro", "FinanciamentoCasa",
+                                                           "Ninguno"}
+    features = prepared.drop(columns=[stages.TARGET])
+    scoring = ScoringModel(None, features.columns, preparation["label_encoders"], preparation["target_encoder"],
+                           [age_range_binner(), income_range_binner()])
+    np.testing.assert_array_equal(scoring.prepare(preparation["example"]).to_numpy(dtype=float),
+                                  features.head(5).to_numpy(dtype=float))
+    # A record without age falls in the UNKNOWN range, which the range encoder knows
+    unknown_age = scoring.prepare(preparation["example"].head(1).assign(Idade=None))
+    assert unknown_age["AGE_RANGE"].item() == len(age_range_binner().categories()) - 1
+
+
+def test_stages_persist_their_artifacts(data_dir, tmp_path):
+    output = tmp_path / "output"
+    with pytest.raises(FileNotFoundError, match="'prepare' stage"):
+        stages.train(output, verbose=False)
+    stages.prepare(data_dir, output, verbose=False)
+    with pytest.raises(ValueError, match="unknown models"):
+        stages.train(output, models=["Logistic Regression"], verbose=False)
+
+    results = stages.train(output, models=["AdaBoost", "Random Forest"], core_budget=1, verbose=False)
+    comparison = stages.evaluate(output, verbose=False)
+    paths = stages.stage_paths(output)
+
+    assert list(joblib.load(paths["models"])) == ["Random Forest", "AdaBoost"]
+    assert comparison["Accuracy"].tolist() == pytest.approx([results[name].accuracy
+                                                             for name in comparison["Modelo"]])
+    with open(paths["metrics"]) as file:
+        metrics = json.load(file)
+    assert metrics["best_model"] == comparison.loc[comparison["Accuracy"].idxmax(), "Modelo"]
+    model = ScoringModel.load(paths["scoring_model"])
+    assert len(model.predict(model.example)) == 5
+
+
+def test_search_tunes_the_models_inside_the_voting_classifier(data_dir, tmp_path):
+    output = tmp_path / "output"
+    stages.prepare(data_dir, output, verbose=False)
+    stages.train(output, models=[stages.VOTING], core_budget=1, search=True, n_candidates=2, verbose=False)
+
+    record = joblib.load(stages.stage_paths(output)["models"])[stages.VOTING]
+    assert set(record["best_params"]) == set(stages.SEARCH_SPACES)
+    voting_params = record["model"].get_params()
+    for name, best_params in record["best_params"].items():
+        for param, value in best_params.items():
+            assert voting_params[f"{stages.VOTING_NAMES[name]}__{param[len('clf__'):]}"] == value
@@ -0,0 +1,265 @@
+import math
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from .loading import read_typed_csv_chunks
+
+# Default partition size, in bytes of CSV: each partition of every source must fit in memory at once
+PARTITION_BYTES = 32 * 2 ** 20
+
+
+def partition_of(keys, n_partitions):
+    """
+    Partition number of each key, by hash, so equal keys always land in the same partition.
+
+    Parameters:
+    - keys: pd.Series, the join keys
+    - n_partitions: int, number of partitions
+
+    Returns:
+    - np.ndarray of int, partition of each key
+    """
+    return (pd.util.hash_pandas_object(keys, index=False).to_numpy() % n_partitions).astype(int)
+
+
+def partition_csv(path, directory, key="ID", n_partitions=16, chunksize=100_000, schema=None):
+    """
+    Stream a source CSV into Parquet partitions by the hash of its key.
+
+    Each chunk of the file is split by partition and written as one file per
+    partition (directory/part-PPPP/CCCCCC.parquet), so memory is bounded by the
+    chunk size and the files of a partition keep the order of the source file.
+
+    Parameters:
+    - path: str or Path, the CSV file (read with read_typed_csv_chunks)
+    - directory: str or Path, destination directory; it is emptied first
+    - key: str, join key column
+    - n_partitions: int, number of partitions
+    - chunksize: int, rows read at a time
+    - schema: dict or None, column types (None: SCHEMAS by file name)
+
+    Returns:
+    - rows: int, rows read
+    """
+    directory = Path(directory)
+    shutil.rmtree(directory, ignore_errors=True)
+    rows = 0
+    for number, chunk in enumerate(read_typed_csv_chunks(path, schema=schema, chunksize=chunksize)):
+        rows += len(chunk)
+        for partition, part in chunk.groupby(partition_of(chunk[key], n_partitions), sort=False):
+            part_directory = directory / f"part-{partition:04d}"
+            part_directory.mkdir(parents=True, exist_ok=True)
+            part.to_parquet(part_directory / f"{number:06d}.parquet", engine="fastparquet", index=False)
+    return rows
+
+
+def read_partition(directory, partition):
+    """
+    Read one partition written by partition_csv, in source order.
+
+    Parameters:
+    - directory: str or Path, the partitioned source
+    - partition: int, partition number
+
+    Returns:
+    - pd.DataFrame or None if the partition is empty
+    """
+    files = sorted((Path(directory) / f"part-{partition:04d}").glob("*.parquet"))
+    if not files:
+        return None
+    return pd.concat([pd.read_parquet(file, engine="fastparquet") for file in files], ignore_index=True)
+
+
+def read_partitions(directory):
+    """
+    Concatenate the Parquet partitions of a directory (e.g. the output of StreamingPreparation).
+
+    Only for outputs that fit in memory; otherwise iterate over the files.
+
+    Parameters:
+    - directory: str or Path
+
+    Returns:
+    - pd.DataFrame
+    """
+    files = sorted(Path(directory).glob("part-*.parquet"))
+    return pd.concat([pd.read_parquet(file, engine="fastparquet") for file in files], ignore_index=True)
+
+
+def _transform(steps, chunk):
+    for _, step in steps:
+        chunk = step.transform(chunk)
+    return chunk
+
+
+def fit_streaming(steps, chunks):
+    """
+    Fit transformers on data that is only available chunk by chunk.
+
+    Steps with partial_fit (e.g. StandardScaler, or the quantile sketches of
+    an outlier filter) are stateful: each one is fitted in its own pass over
+    every chunk, transformed by the steps before it. The other steps must be
+    stateless (fit learns nothing from the data) and are fitted on the first
+    non-empty chunk.
+
+    Parameters:
+    - steps: list of (name, transformer), fitted in place
+    - chunks: callable returning a new iterator over the chunks (pd.DataFrame)
+
+    Returns:
+    - passes: int, full passes made over the chunks
+    """
+    passes = 0
+    for position, (name, step) in enumerate(steps):
+        previous = steps[:position]
+        if hasattr(step, "partial_fit"):
+            passes += 1
+            for chunk in chunks():
+                chunk = _transform(previous, chunk)
+                if len(chunk):
+                    step.partial_fit(chunk)
+        else:
+            for chunk in chunks():
+                chunk = _transform(previous, chunk)
+                if len(chunk):
+                    step.fit(chunk)
+                    break
+    return passes
+
+
+class StreamingPreparation:
+    def __init__(self, sources, key="ID", source_steps=None, pipeline=None, n_partitions=None,
+                 partition_bytes=PARTITION_BYTES, chunksize=100_000, work_dir=".cache/financing/streaming",
+                 schemas=None, verbose=True):
+        """
+        Initialize the StreamingPreparation.
+
+        Out-of-core version of the preparation: load, drop duplicated keys,
+        source transformers, inner join of the sources and preparation pipeline,
+        with memory bounded by the partition size instead of the input size.
+
+        1. Each source CSV is streamed in chunks and split by the hash of the key
+           into n_partitions Parquet partitions (partition_csv).
+        2. The source_steps of each source are fitted with fit_streaming over its
+           deduplicated partitions.
+        3. Partition by partition, the sources are deduplicated (keeping the first
+           row of each key, as drop_duplicates), transformed and joined in the
+           order of `sources` (equal keys share a partition, so the partition-wise
+           join is the full join).
+        4. The pipeline steps are fitted with fit_streaming over the joined
+           partitions and each one is transformed and written to
+           output_dir/part-PPPP.parquet.
+
+        The output holds the same rows as the in-memory preparation, grouped by
+        partition instead of in the order of the first source.
+
+        Parameters:
+        - sources: dict of name -> CSV path, joined in this order
+        - key: str, join key column
+        - source_steps: dict of name -> list of (name, transformer) applied to that source before the join
+        - pipeline: sklearn/imblearn Pipeline (or list of steps) applied after the join; None keeps the join
+        - n_partitions: int or None, None: one partition per partition_bytes of the largest source
+        - partition_bytes: int, target CSV bytes per partition when n_partitions is None
+        - chunksize: int, rows read from the CSV files at a time
+        - work_dir: str or Path, where the partitioned sources and joined partitions are kept
+        - schemas: dict of name -> schema for read_typed_csv_chunks (None: SCHEMAS by file name)
+        - verbose: bool, print the progress of each phase
+        """
+        self.sources = sources
+        self.key = key
+        self.source_steps = source_steps
+        self.pipeline = pipeline
+        self.n_partitions = n_partitions
+        self.partition_bytes = partition_bytes
+        self.chunksize = chunksize
+        self.work_dir = work_dir
+        self.schemas = schemas
+        self.verbose = verbose
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"[streaming] {message}")
+
+    def _steps(self):
+        if self.pipeline is None:
+            return []
+        return list(getattr(self.pipeline, "steps", self.pipeline))
+
+    def _source_partition(self, name, partition):
+        data = read_partition(Path(self.work_dir) / "sources" / name, partition)
+        if data is None:
+            return None
+        return data.drop_duplicates(subset=[self.key], ignore_index=True)
+
+    def run(self, output_dir):
+        """
+        Run the preparation and write the partitioned output.
+
+        Parameters:
+        - output_dir: str or Path, destination of the part-PPPP.parquet files; it is emptied first
+
+        Returns:
+        - files: list of Path, the output partitions (empty partitions are not written)
+        """
+        work_dir = Path(self.work_dir)
+        n_partitions = self.n_partitions or max(1, max(
+            math.ceil(Path(path).stat().st_size / self.partition_bytes) for path in self.sources.values()
+        ))
+        partitions = range(n_partitions)
+        source_steps = self.source_steps or {}
+        self.rows_ = {}
+
+        for name, path in self.sources.items():
+            schema = (self.schemas or {}).get(name)
+            self.rows_[name] = partition_csv(path, work_dir / "sources" / name, key=self.key,
+                                             n_partitions=n_partitions, chunksize=self.chunksize, schema=schema)
+            self._log(f"{name}: {self.rows_[name]} rows in {n_partitions} partitions")
+
+        self.passes_ = {}
+        for name, steps in source_steps.items():
+            self.passes_[name] = fit_streaming(
+                steps, lambda name=name: filter(lambda data: data is not None,
+                                                (self._source_partition(name, p) for p in partitions)))
+
+        joined_dir = work_dir / "joined"
+        shutil.rmtree(joined_dir, ignore_errors=True)
+        joined_dir.mkdir(parents=True)
+        joined_rows = 0
+        for partition in partitions:
+            joined = None
+            for name in self.sources:
+                data = self._source_partition(name, partition)
+                if data is None:
+                    joined = None
+                    break
+                data = _transform(source_steps.get(name, []), data)
+                joined = data if joined is None else joined.merge(data, on=self.key, how="inner")
+            if joined is not None and len(joined):
+                joined_rows += len(joined)
+                joined.to_parquet(joined_dir / f"part-{partition:04d}.parquet", engine="fastparquet", index=False)
+        self.rows_["joined"] = joined_rows
+        self._log(f"joined: {joined_rows} rows")
+
+        joined_files = sorted(joined_dir.glob("part-*.parquet"))
+
+        def joined_chunks():
+            return (pd.read_parquet(file, engine="fastparquet") for file in joined_files)
+
+        steps = self._steps()
+        self.passes_["pipeline"] = fit_streaming(steps, joined_chunks)
+
+        output_dir = Path(output_dir)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        output_dir.mkdir(parents=True)
+        files = []
+        output_rows = 0
+        for file, chunk in zip(joined_files, joined_chunks()):
+            chunk = _transform(steps, chunk)
+            output_rows += len(chunk)
+            files.append(output_dir / file.name)
+            chunk.to_parquet(files[-1], engine="fastparquet", index=False)
+        self.rows_["output"] = output_rows
+        self._log(f"output: {output_rows} rows in {len(files)} files in {output_dir}")
+        return files
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.preprocessing import StandardScaler
+
+from financing.loading import FLAG
+from financing.streaming import StreamingPreparation, fit_streaming, partition_csv, read_partition, read_partitions
+
+SCHEMAS = {
+    "people": {"ID": "int64", "Idade": "float32", "Regiao": "category"},
+    "loans": {"ID": "int64", "Casa": FLAG},
+}
+
+
+class Scale(BaseEstimator, TransformerMixin):
+    def __init__(self, columns):
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        self.scaler_ = StandardScaler().fit(X[self.columns])
+        return self
+
+    def partial_fit(self, X, y=None):
+        self.scaler_ = getattr(self, "scaler_", StandardScaler()).partial_fit(X[self.columns])
+        return self
+
+    def transform(self, X):
+        X = X.copy()
+        X[self.columns] = self.scaler_.transform(X[self.columns])
+        return X
+
+
+class AddOne(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X.assign(Idade=X["Idade"] + 1)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 500
+    people = pd.DataFrame({"ID": rng.integers(0, 400, n), "Idade": rng.integers(18, 80, n),
+                           "Regiao": rng.choice(["N", "S", "NE"], n)})
+    loans = pd.DataFrame({"ID": rng.integers(0, 400, n), "Casa": rng.choice(["T", "F"], n)})
+    paths = {"people": tmp_path / "people.csv", "loans": tmp_path / "loans.csv"}
+    people.to_csv(paths["people"], index=False)
+    loans.to_csv(paths["loans"], index=False)
+    return paths
+
+
+def in_memory(paths):
+    people = pd.read_csv(paths["people"]).drop_duplicates(subset=["ID"])
+    loans = pd.read_csv(paths["loans"]).drop_duplicates(subset=["ID"])
+    merged = AddOne().transform(people).merge(loans, on="ID", how="inner")
+    return Scale(["Idade"]).fit(merged).transform(merged)
+
+
+def test_partitions_keep_source_order(sources, tmp_path):
+    rows = partition_csv(sources["people"], tmp_path / "parts", n_partitions=4, chunksize=64, schema=SCHEMAS["people"])
+    assert rows == 500
+    source = pd.read_csv(sources["people"])
+    for partition in range(4):
+        data = read_partition(tmp_path / "parts", partition)
+        expected = source[source["ID"].isin(data["ID"])]
+        assert list(data["ID"]) == list(expected["ID"])
+
+
+@pytest.mark.parametrize("n_partitions", [1, 5])
+def test_same_rows_as_in_memory(sources, tmp_path, n_partitions):
+    preparation = StreamingPreparation(sources, source_steps={"people": [("add_one", AddOne())]},
+                                       pipeline=[("scale", Scale(["Idade"]))], n_partitions=n_partitions,
+                                       chunksize=64, work_dir=tmp_path / "work", schemas=SCHEMAS, verbose=False)
+    files = preparation.run(tmp_path / "out")
+    assert len(files) == n_partitions
+
+    result = read_partitions(tmp_path / "out").sort_values("ID").reset_index(drop=True)
+    expected = in_memory(sources).sort_values("ID").reset_index(drop=True)
+    np.testing.assert_array_equal(result["ID"], expected["ID"])
+    np.testing.assert_allclose(result["Idade"], expected["Idade"], atol=1e-5)
+    np.testing.assert_array_equal(result["Casa"], expected["Casa"] == "T")
+    assert preparation.rows_["output"] == len(expected)
+    assert preparation.passes_["pipeline"] == 1
+
+
+def test_fit_streaming_fits_stateful_steps_in_order():
+    data = pd.DataFrame({"Idade": np.arange(100.0)})
+    chunks = [data[:30], data[30:70], data[70:]]
+    steps = [("add_one", AddOne()), ("scale", Scale(["Idade"]))]
+    assert fit_streaming(steps, lambda: iter(chunks)) == 1
+
+    scaler = steps[1][1].scaler_
+    assert scaler.mean_[0] == pytest.approx(50.5)
+    assert scaler.var_[0] == pytest.approx(data["Idade"].var(ddof=0))
@@ -0,0 +1,313 @@
+"""
+Synthetic, larger versions of the three bank datasets.
+
+Usage (from the project folder):
+    python -m financing.synthetic --rows 10000000 --output data/synthetic
+    python -m financing.synthetic --rows 1000000 --output data/synthetic --formats parquet --seed 7
+
+The CSV files have the names and format of the originals, so the notebook can
+read them with FINANCING_DATA_DIR=data/synthetic. The Parquet output is one
+directory per source with part-CCCC.parquet files (see read_partitions).
+"""
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .loading import SCHEMAS, FLAG, read_typed_csv
+
+SOURCES = list(SCHEMAS)
+NUMERIC_COLUMNS = ["Idade", "Renda"]
+FORMATS = ("csv", "parquet")
+
+
+def _flag_columns(source):
+    return [column for column, dtype in SCHEMAS[source].items() if dtype == FLAG]
+
+
+def _pack(flags):
+    # One integer per row with a bit per flag column
+    return (flags.astype(np.uint32) << np.arange(flags.shape[1], dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
+
+
+def _unpack(codes, n_flags):
+    return ((codes[:, np.newaxis] >> np.arange(n_flags, dtype=np.uint32)) & 1).astype(bool)
+
+
+def distribution_summary(sources):
+    """
+    Statistics the generator reproduces, to compare original and synthetic data.
+
+    Parameters:
+    - sources: dict of source name -> typed pd.DataFrame (read_typed_csv), rows aligned by ID
+
+    Returns:
+    - dict with the share of each Regiao, Idade/Renda quartiles by Regiao, the share of
+      each flag, the share of pairs of flags set together and the duplicated-ID rate
+    """
+    insurance = sources["InsuranceCompanyABC"]
+    flags = pd.concat([sources[source][_flag_columns(source)] for source in SOURCES], axis=1).to_numpy(np.float64)
+    numeric = insurance.groupby("Regiao", observed=True)[NUMERIC_COLUMNS].quantile([0.25, 0.5, 0.75])
+    return {
+        "regions": insurance["Regiao"].value_counts(normalize=True).sort_index(),
+        "numeric_by_region": numeric,
+        "flag_rates": flags.mean(axis=0),
+        "flag_pairs": flags.T @ flags / len(flags),
+        "duplicated_ids": float(insurance["ID"].duplicated().mean()),
+    }
+
+
+class BankDataGenerator:
+    def __init__(self, seed=0, chunk_rows=1_000_000, bandwidth=0.5):
+        """
+        Initialize the BankDataGenerator.
+
+        Learns from the three source files (whose rows list the same IDs in
+        the same order) a model of one customer across the three banks:
+        - Regiao: the share of each region
+        - Idade and Renda given Regiao: a smoothed bootstrap of the pairs of
+          the region (a random customer of the region plus Gaussian noise of
+          `bandwidth` times the Silverman bandwidth of its robust scale),
+          clipped to the observed range, so the skew and the income outliers
+          are kept
+        - Genero given Regiao: the share of each value
+        - the 20 T/F product columns of the three sources given Regiao: the
+          observed combinations and their frequencies, so every co-occurrence
+          between products is kept
+        - duplicated IDs: how many times an ID appears and, for each repeated
+          row, which sources repeat the first row exactly and which have other
+          values (as in the originals)
+        Idade/Renda, Genero and the products are independent given Regiao.
+
+        Rows are generated in chunks, each from its own random generator
+        seeded with (seed, chunk number): the output depends only on the seed
+        and chunk_rows, and memory on chunk_rows. IDs are unique across chunks
+        and shared by the three sources, row by row.
+
+        Parameters:
+        - seed: int, seed of the random generators
+        - chunk_rows: int, rows generated and written at a time
+        - bandwidth: float, noise of Idade and Renda relative to the Silverman bandwidth
+        """
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+        self.bandwidth = bandwidth
+
+    def fit(self, sources):
+        """
+        Learn the distributions of the source files.
+
+        Parameters:
+        - sources: dict of source name -> typed pd.DataFrame (read_typed_csv)
+
+        Returns:
+        - self: BankDataGenerator
+        """
+        ids = sources[SOURCES[0]]["ID"].to_numpy()
+        for source in SOURCES[1:]:
+            if not np.array_equal(sources[source]["ID"].to_numpy(), ids):
+                raise ValueError(f"{source} does not list the same IDs in the same order as {SOURCES[0]}")
+
+        first = ~pd.Series(ids).duplicated().to_numpy()
+        insurance = sources["InsuranceCompanyABC"][first]
+        flags = np.column_stack([sources[source][_flag_columns(source)].to_numpy()[first] for source in SOURCES])
+        codes = _pack(flags)
+
+        regions = insurance["Regiao"].astype(str).to_numpy()
+        self.regions_, counts = np.unique(regions, return_counts=True)
+        self.region_probabilities_ = counts / counts.sum()
+        self.numeric_, self.numeric_bandwidth_, self.numeric_range_ = [], [], []
+        self.male_share_, self.flag_codes_, self.flag_probabilities_ = [], [], []
+        for region in self.regions_:
+            in_region = regions == region
+            values = insurance.loc[in_region, NUMERIC_COLUMNS].to_numpy(np.float64)
+            q25, q75 = np.percentile(values, [25, 75], axis=0)
+            scale = np.minimum(values.std(axis=0), (q75 - q25) / 1.349)
+            self.numeric_.append(values)
+            self.numeric_bandwidth_.append(self.bandwidth * 1.06 * scale * len(values) ** -0.2)
+            self.numeric_range_.append((values.min(axis=0), values.max(axis=0)))
+            self.male_share_.append(float(insurance.loc[in_region, "Genero"].mean()))
+            region_codes, code_counts = np.unique(codes[in_region], return_counts=True)
+            self.flag_codes_.append(region_codes)
+            self.flag_probabilities_.append(code_counts / code_counts.sum())
+
+        # How many times each ID appears, and which sources repeat the first row exactly in the repeated rows
+        self.multiplicities_, multiplicity_counts = np.unique(pd.Series(ids).value_counts().to_numpy(),
+                                                              return_counts=True)
+        self.multiplicity_probabilities_ = multiplicity_counts / multiplicity_counts.sum()
+        copies = np.column_stack([sources[source].duplicated().to_numpy()[~first] for source in SOURCES])
+        self.copy_patterns_, pattern_counts = np.unique(copies, axis=0, return_counts=True)
+        self.copy_probabilities_ = pattern_counts / pattern_counts.sum()
+
+        unique_ids = np.sort(ids[first])
+        self.first_id_ = int(unique_ids[0])
+        self.mean_id_gap_ = max(1, int(round(np.diff(unique_ids).mean()))) if len(unique_ids) > 1 else 1
+        return self
+
+    def _customers(self, rng, n):
+        # n new customers, as one table with the columns of the three sources (without ID)
+        region = rng.choice(len(self.regions_), size=n, p=self.region_probabilities_)
+        numeric = np.empty((n, len(NUMERIC_COLUMNS)))
+        genero = np.empty(n, dtype=np.int8)
+        codes = np.empty(n, dtype=np.uint32)
+        for r in range(len(self.regions_)):
+            rows = np.flatnonzero(region == r)
+            picked = self.numeric_[r][rng.integers(0, len(self.numeric_[r]), len(rows))]
+            lower, upper = self.numeric_range_[r]
+            noisy = picked + rng.standard_normal(picked.shape) * self.numeric_bandwidth_[r]
+            numeric[rows] = np.clip(noisy, lower, upper).round(3)
+            genero[rows] = rng.random(len(rows)) < self.male_share_[r]
+            codes[rows] = self.flag_codes_[r][rng.choice(len(self.flag_codes_[r]), len(rows),
+                                                         p=self.flag_probabilities_[r])]
+        flag_columns = [column for source in SOURCES for column in _flag_columns(source)]
+        table = pd.DataFrame(_unpack(codes, len(flag_columns)), columns=flag_columns)
+        table.insert(0, "Regiao", pd.Categorical.from_codes(region, categories=self.regions_))
+        table.insert(0, "Renda", numeric[:, 1].astype(np.float32))
+        table.insert(0, "Idade", numeric[:, 0].astype(np.float32))
+        table.insert(3, "Genero", genero)
+        return table
+
+    def chunk(self, number, n_rows):
+        """
+        Generate one chunk of rows.
+
+        Parameters:
+        - number: int, chunk number (seeds its random generator and places its IDs)
+        - n_rows: int, rows of the chunk (at most chunk_rows)
+
+        Returns:
+        - dict of source name -> pd.DataFrame with the columns and types of read_typed_csv
+        """
+        rng = np.random.default_rng([self.seed, number])
+        # Customers and their number of rows, until the chunk is full
+        multiplicity = rng.choice(self.multiplicities_, size=n_rows, p=self.multiplicity_probabilities_)
+        n_customers = int(np.searchsorted(np.cumsum(multiplicity), n_rows)) + 1
+        multiplicity = multiplicity[:n_customers]
+        multiplicity[-1] -= multiplicity.sum() - n_rows
+
+        # Increasing IDs with gaps of mean mean_id_gap_ (1 to 2 x mean - 1), in a range of their own per chunk
+        gaps = rng.integers(1, 2 * self.mean_id_gap_, n_customers)
+        ids = self.first_id_ + number * self.chunk_rows * 2 * self.mean_id_gap_ + np.cumsum(gaps) - gaps[0]
+
+        rows = self._customers(rng, n_rows)
+        owner = np.repeat(np.arange(n_customers), multiplicity)
+        repeated = np.flatnonzero(np.r_[False, owner[1:] == owner[:-1]])
+        first_row = np.searchsorted(owner, owner[repeated])
+        copies = self.copy_patterns_[rng.choice(len(self.copy_patterns_), len(repeated), p=self.copy_probabilities_)]
+
+        # Rows in random order, the same for the three sources
+        order = rng.permutation(n_rows)
+        frames = {}
+        for s, source in enumerate(SOURCES):
+            copied, copied_from = repeated[copies[:, s]], first_row[copies[:, s]]
+            columns = {"ID": ids[owner][order]}
+            for column in list(SCHEMAS[source])[1:]:
+                values = rows[column]
+                categorical = isinstance(values.dtype, pd.CategoricalDtype)
+                array = (values.cat.codes if categorical else values).to_numpy().copy()
+                array[copied] = array[copied_from]
+                columns[column] = (pd.Categorical.from_codes(array[order], dtype=values.dtype) if categorical
+                                   else array[order])
+            frames[source] = pd.DataFrame(columns)
+        return frames
+
+    def chunks(self, n_rows):
+        """
+        Generate n_rows rows in chunks of chunk_rows.
+
+        Parameters:
+        - n_rows: int, total rows of each source
+
+        Returns:
+        - iterator of dict of source name -> pd.DataFrame
+        """
+        for number, start in enumerate(range(0, n_rows, self.chunk_rows)):
+            yield self.chunk(number, min(self.chunk_rows, n_rows - start))
+
+    def write(self, n_rows, output_dir, formats=("csv",), verbose=False):
+        """
+        Write n_rows rows of each source.
+
+        CSV files are written as the originals (IDs and numbers with three
+        decimals, quoted text and T/F flags), one file per source named after
+        it; Parquet keeps the types of read_typed_csv, in output_dir/<source>/part-CCCC.parquet.
+
+        Parameters:
+        - n_rows: int, rows of each source
+        - output_dir: str or Path
+        - formats: list of str, "csv" and/or "parquet"
+        - verbose: bool, print the progress of each chunk
+
+        Returns:
+        - list of Path, the written files
+        """
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"unknown formats {sorted(unknown)}; expected some of {FORMATS}")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if "csv" in formats:
+            for source in SOURCES:
+                path = output_dir / f"{source}.csv"
+                path.write_text(",".join(SCHEMAS[source]) + "\n")
+                written.append(path)
+        if "parquet" in formats:
+            for source in SOURCES:
+                directory = output_dir / source
+                directory.mkdir(exist_ok=True)
+                for old in directory.glob("part-*.parquet"):
+                    old.unlink()
+
+        start = time.perf_counter()
+        for number, frames in enumerate(self.chunks(n_rows)):
+            for source, frame in frames.items():
+                if "csv" in formats:
+                    _append_csv(frame, output_dir / f"{source}.csv")
+                if "parquet" in formats:
+                    path = output_dir / source / f"part-{number:04d}.parquet"
+                    frame.to_parquet(path, engine="fastparquet", index=False)
+                    written.append(path)
+            if verbose:
+                done = min(n_rows, (number + 1) * self.chunk_rows)
+                print(f"[synthetic] {done} of {n_rows} rows ({time.perf_counter() - start:.1f} s)")
+        return written
+
+
+def _append_csv(frame, path):
+    # Format of the original files: 71504.000,42.993,4428.512,"NE",1.000,"T",... The text values are
+    # written already quoted and the numbers with three decimals, so the csv module quotes nothing
+    formatted = {}
+    for column in frame.columns:
+        dtype = frame[column].dtype
+        if dtype == bool:
+            formatted[column] = np.where(frame[column].to_numpy(), '"T"', '"F"')
+        elif pd.api.types.is_integer_dtype(dtype):
+            formatted[column] = frame[column].astype(np.float64)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            formatted[column] = '"' + frame[column].astype(str) + '"'
+    frame.assign(**formatted).to_csv(path, mode="a", header=False, index=False, float_format="%.3f",
+                                     quoting=csv.QUOTE_NONE, quotechar="'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="synthetic versions of the three bank datasets")
+    parser.add_argument("--rows", type=int, required=True, help="rows of each source")
+    parser.add_argument("--output", default="data/synthetic")
+    parser.add_argument("--data", default="data", help="folder of the original CSV files")
+    parser.add_argument("--formats", nargs="+", default=["csv"], choices=FORMATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    originals = {source: read_typed_csv(Path(args.data) / f"{source}.csv") for source in SOURCES}
+    generator = BankDataGenerator(seed=args.seed, chunk_rows=args.chunk_rows).fit(originals)
+    written = generator.write(args.rows, args.output, args.formats, verbose=True)
+    print(f"[synthetic] {len(written)} files in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
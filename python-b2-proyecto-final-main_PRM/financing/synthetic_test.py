@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financing.loading import SCHEMAS, read_typed_csv
+from financing.streaming import read_partitions
+from financing.synthetic import SOURCES, BankDataGenerator, distribution_summary
+
+
+def test_chunks_have_the_source_types_and_shared_ids(sources):
+    generator = BankDataGenerator(seed=3, chunk_rows=1000).fit(sources)
+    chunks = list(generator.chunks(2500))
+    assert [len(chunk["RetailBankEFG"]) for chunk in chunks] == [1000, 1000, 500]
+    for chunk in chunks:
+        for source in SOURCES:
+            pd.testing.assert_series_equal(chunk[source].dtypes, sources[source].dtypes)
+            np.testing.assert_array_equal(chunk[source]["ID"], chunk[SOURCES[0]]["ID"])
+    # IDs repeat within a chunk (as in the sources) but never across chunks
+    ids = [set(chunk[SOURCES[0]]["ID"]) for chunk in chunks]
+    assert len(set.union(*ids)) == sum(len(chunk_ids) for chunk_ids in ids)
+
+    # Deterministic: the same seed gives the same rows, and a chunk does not depend on the others
+    again = BankDataGenerator(seed=3, chunk_rows=1000).fit(sources)
+    pd.testing.assert_frame_equal(again.chunk(1, 1000)["InsuranceCompanyABC"], chunks[1]["InsuranceCompanyABC"])
+    other = BankDataGenerator(seed=4, chunk_rows=1000).fit(sources).chunk(1, 1000)["InsuranceCompanyABC"]
+    assert not other.equals(chunks[1]["InsuranceCompanyABC"])
+
+
+def test_distributions_are_kept(sources):
+    synthetic = next(BankDataGenerator(seed=0, chunk_rows=60_000).fit(sources).chunks(60_000))
+    original, generated = distribution_summary(sources), distribution_summary(synthetic)
+    np.testing.assert_allclose(generated["regions"], original["regions"], atol=0.01)
+    np.testing.assert_allclose(generated["flag_pairs"], original["flag_pairs"], atol=0.02)
+    np.testing.assert_allclose(generated["numeric_by_region"], original["numeric_by_region"], rtol=0.02)
+    assert generated["duplicated_ids"] == pytest.approx(original["duplicated_ids"], abs=0.01)
+    insurance = synthetic["InsuranceCompanyABC"]
+    assert insurance["Idade"].between(18, 85).all()
+    # Repeated IDs that copy the first row exactly, as often as in the source
+    assert insurance.duplicated().mean() == pytest.approx(sources["InsuranceCompanyABC"].duplicated().mean(),
+                                                          abs=0.01)
+
+
+def test_write_csv_and_parquet(sources, tmp_path):
+    generator = BankDataGenerator(seed=1, chunk_rows=400).fit(sources)
+    generator.write(1000, tmp_path, formats=["csv", "parquet"])
+    expected = {source: pd.concat([chunk[source] for chunk in generator.chunks(1000)], ignore_index=True)
+                for source in SOURCES}
+    for source in SOURCES:
+        pd.testing.assert_frame_equal(read_typed_csv(tmp_path / f"{source}.csv"), expected[source],
+                                      check_exact=False)
+        pd.testing.assert_frame_equal(read_partitions(tmp_path / source), expected[source])
+    lines = (tmp_path / "InsuranceCompanyABC.csv").read_text().splitlines()
+    assert lines[0] == ",".join(SCHEMAS["InsuranceCompanyABC"]) and len(lines) == 1001
+    # Same layout as the original files: 71504.000,42.993,4428.512,"NE",1.000,"T",...
+    fields = lines[1].split(",")
+    assert fields[0].endswith(".000") and fields[3].startswith('"') and fields[5] in ('"T"', '"F"')
+
+    with pytest.raises(ValueError, match="formats"):
+        generator.write(10, tmp_path, formats=["json"])
+
+
+def test_sources_must_be_aligned(sources):
+    sources["RetailBankEFG"] = sources["RetailBankEFG"].iloc[::-1].reset_index(drop=True)
+    with pytest.raises(ValueError, match="same IDs"):
+        BankDataGenerator().fit(sources)
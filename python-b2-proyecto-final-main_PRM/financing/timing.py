@@ -0,0 +1,362 @@
+"""
+Wall time, CPU time and peak memory of the sections of a run, and comparison of two runs.
+
+Usage (from the project folder, with the reports written by the notebook):
+    python -m financing.timing show output/timings.json
+    python -m financing.timing compare before/timings.json output/timings.json --top 15
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import platform
+import resource
+import threading
+import time
+import tracemalloc
+import types
+from datetime import datetime, timezone
+
+from .model_zoo import PeakMemory
+
+# Methods timed by SectionTimer.instrument when none are given
+ESTIMATOR_METHODS = ("fit", "partial_fit", "transform", "fit_transform", "fit_resample", "predict",
+                     "predict_proba", "inverse_transform")
+
+
+class SectionTimer:
+    def __init__(self, enabled=True, trace_python=False, interval=0.01):
+        """
+        Initialize the SectionTimer.
+
+        Records, for every named section of a run, its wall time, CPU time of
+        this process (all its threads), peak RSS growth over the RSS at its
+        start (sampled from /proc/self/statm by one background thread, as
+        PeakMemory) and, with trace_python, the peak of Python/NumPy
+        allocations (tracemalloc) over the traced memory at its start.
+
+        Sections nest: a section opened inside another is recorded under the
+        path "outer / inner", and repeated sections are aggregated (calls,
+        total times, largest peaks). They are opened with
+        - `with timer.section(name):`
+        - `timer.start(name)`: sequential top-level sections without indenting
+          a script; each call closes the previous one (finish closes the last)
+        - `@timer.timed()`: every call of a function
+        - `timer.instrument(cls)` (or `@timer.instrument` on a class): every call of the
+          fit/transform/predict... methods of a class, e.g. the transformers of a pipeline,
+          as "ClassName.method"
+
+        Only the thread and process that created the timer are recorded: calls
+        made in other threads (joblib's threading backend) or in forked
+        processes (ModelZoo and search workers, the figure pool) run untimed.
+
+        Parameters:
+        - enabled: bool, record the sections (False: every section is a no-op)
+        - trace_python: bool, also measure tracemalloc peaks (slows down allocation-heavy code)
+        - interval: float, seconds between RSS samples
+        """
+        self.enabled = enabled
+        self.trace_python = trace_python
+        self.interval = interval
+        self.sections = {}
+        self._stack = []
+        self._top = None
+        self._sampler = None
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._use_rss = os.path.exists("/proc/self/statm")
+        self._thread = threading.current_thread()
+        self._pid = os.getpid()
+
+    def _recording(self):
+        return self.enabled and threading.current_thread() is self._thread and os.getpid() == self._pid
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = PeakMemory._rss()
+            for frame in list(self._stack):
+                frame["rss_peak"] = max(frame["rss_peak"], rss)
+
+    def _enter(self, name):
+        if self._use_rss and self._sampler is None:
+            self._stop = threading.Event()
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+        if self.trace_python:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # The parent keeps the peak reached so far, the child starts from the current memory
+                self._stack[-1]["python_peak"] = max(self._stack[-1]["python_peak"], peak)
+            tracemalloc.reset_peak()
+        rss = PeakMemory._rss() if self._use_rss else 0
+        path = " / ".join([frame["path"] for frame in self._stack[-1:]] + [name])
+        frame = {"path": path, "depth": len(self._stack), "rss_start": rss, "rss_peak": rss,
+                 "python_start": tracemalloc.get_traced_memory()[0] if self.trace_python else 0,
+                 "start": time.perf_counter(), "cpu_start": time.process_time()}
+        frame["python_peak"] = frame["python_start"]
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame):
+        wall = time.perf_counter() - frame["start"]
+        cpu = time.process_time() - frame["cpu_start"]
+        self._stack.remove(frame)
+        rss_peak = max(frame["rss_peak"], PeakMemory._rss()) if self._use_rss else 0
+        if self._stack:
+            self._stack[-1]["rss_peak"] = max(self._stack[-1]["rss_peak"], rss_peak)
+        python_peak = None
+        if self.trace_python:
+            peak = max(frame["python_peak"], tracemalloc.get_traced_memory()[1])
+            python_peak = (peak - frame["python_start"]) / 1e6
+            if self._stack:
+                self._stack[-1]["python_peak"] = max(self._stack[-1]["python_peak"], peak)
+        if not self._stack and self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+        record = self.sections.setdefault(frame["path"], {
+            "section": frame["path"], "depth": frame["depth"], "calls": 0, "wall_seconds": 0.0,
+            "cpu_seconds": 0.0, "rss_peak_mb": None, "python_peak_mb": None,
+        })
+        record["calls"] += 1
+        record["wall_seconds"] += wall
+        record["cpu_seconds"] += cpu
+        if self._use_rss:
+            record["rss_peak_mb"] = max(record["rss_peak_mb"] or 0.0, (rss_peak - frame["rss_start"]) / 1e6)
+        if python_peak is not None:
+            record["python_peak_mb"] = max(record["python_peak_mb"] or 0.0, python_peak)
+
+    def section(self, name):
+        """
+        Context manager timing a section.
+
+        Parameters:
+        - name: str, section name
+
+        Returns:
+        - context manager
+        """
+        return _Section(self, name)
+
+    def start(self, name):
+        """
+        Close the current top-level section started with start (if any) and open a new one.
+
+        Parameters:
+        - name: str, section name
+        """
+        self.finish()
+        if self._recording():
+            self._top = self._enter(name)
+
+    def finish(self):
+        """Close the top-level section opened with start, and any section left open inside it."""
+        if self._top is not None:
+            while self._stack and self._stack[-1] is not self._top:
+                self._exit(self._stack[-1])
+            self._exit(self._top)
+            self._top = None
+
+    def timed(self, name=None):
+        """
+        Decorator timing every call of a function as a section.
+
+        Parameters:
+        - name: str or None, section name (None: the function name). `@timer.timed` without
+          parentheses also works
+
+        Returns:
+        - decorator
+        """
+        if callable(name):
+            return self.timed()(name)
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.section(name or function.__name__):
+                    return function(*args, **kwargs)
+            wrapper.__timed__ = True
+            return wrapper
+        return decorator
+
+    def instrument(self, cls=None, methods=ESTIMATOR_METHODS):
+        """
+        Time every call of some methods of a class (and of its clones), as "ClassName.method".
+
+        Parameters:
+        - cls: class, modified in place; without it, returns a class decorator
+        - methods: list of str, methods to time. Those the class does not have, and those that are
+          not plain functions (e.g. sklearn's available_if methods, which would always look available
+          once replaced), are skipped
+
+        Returns:
+        - cls, or a class decorator
+        """
+        if cls is None:
+            return lambda cls: self.instrument(cls, methods)
+        for method in methods:
+            function = inspect.getattr_static(cls, method, None)
+            if isinstance(function, types.FunctionType) and not getattr(function, "__timed__", False):
+                setattr(cls, method, self.timed(f"{cls.__name__}.{method}")(function))
+        return cls
+
+    def table(self):
+        """
+        The sections recorded so far, each one after its parent.
+
+        Returns:
+        - pd.DataFrame, one row per section
+        """
+        import pandas as pd
+
+        return pd.DataFrame(_ordered(list(self.sections.values())))
+
+    def report(self, label=None):
+        """
+        Machine-readable report of the run.
+
+        Parameters:
+        - label: str or None, name of the run
+
+        Returns:
+        - dict with the totals of the run and one dict per section
+        """
+        return {
+            "label": label,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "wall_seconds": time.perf_counter() - self._start,
+            "cpu_seconds": time.process_time() - self._start_cpu,
+            # ru_maxrss is in KB on Linux
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 / 1e6,
+            "trace_python": self.trace_python,
+            "sections": _ordered(list(self.sections.values())),
+        }
+
+    def write(self, path, label=None):
+        """
+        Write the report as JSON.
+
+        Parameters:
+        - path: str or Path
+        - label: str or None, name of the run
+
+        Returns:
+        - str, the written file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.report(label), file, indent=2)
+        return str(path)
+
+
+class _Section:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.frame = self.timer._enter(self.name) if self.timer._recording() else None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.frame is not None:
+            self.timer._exit(self.frame)
+        return False
+
+
+def _ordered(records):
+    # Parents before their children: sections are closed children first
+    order = {}
+    for record in records:
+        parts = record["section"].split(" / ")
+        for depth in range(1, len(parts) + 1):
+            order.setdefault(" / ".join(parts[:depth]), len(order))
+    return sorted(records, key=lambda record: _tree_key(record["section"], order))
+
+
+def _tree_key(path, order):
+    parts = path.split(" / ")
+    return [order[" / ".join(parts[:depth])] for depth in range(1, len(parts) + 1)]
+
+
+def load_report(path):
+    """
+    Read a report written by SectionTimer.write.
+
+    Parameters:
+    - path: str or Path
+
+    Returns:
+    - dict
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_reports(before, after):
+    """
+    Differences between the sections of two runs.
+
+    Parameters:
+    - before, after: dict (SectionTimer.report, load_report) or path of a report
+
+    Returns:
+    - pd.DataFrame, one row per section of either run (in the order of after, then the removed
+      ones), with the wall time, CPU time and peak RSS of each run, the wall time difference and ratio
+    """
+    import pandas as pd
+
+    before, after = (load_report(report) if not isinstance(report, dict) else report for report in (before, after))
+    columns = {"calls": "calls", "wall_seconds": "wall", "cpu_seconds": "cpu", "rss_peak_mb": "rss_peak_mb"}
+    frames = []
+    for suffix, report in (("before", before), ("after", after)):
+        sections = pd.DataFrame(report["sections"], columns=["section", *columns]).set_index("section")
+        frames.append(sections.rename(columns={column: f"{name}_{suffix}" for column, name in columns.items()}))
+    index = list(frames[1].index) + [section for section in frames[0].index if section not in frames[1].index]
+    comparison = frames[0].reindex(index).join(frames[1].reindex(index))
+    # Sections missing in one of the runs have no calls there
+    comparison[["calls_before", "calls_after"]] = comparison[["calls_before", "calls_after"]].astype("Int64")
+    comparison["wall_delta"] = comparison["wall_after"] - comparison["wall_before"]
+    comparison["wall_ratio"] = comparison["wall_after"] / comparison["wall_before"]
+    order = [f"{name}_{suffix}" for name in ("calls", "wall", "cpu", "rss_peak_mb") for suffix in ("before", "after")]
+    return comparison[order + ["wall_delta", "wall_ratio"]].reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="section timing reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print the sections of a report")
+    show.add_argument("report")
+    compare = commands.add_parser("compare", help="compare two reports, largest wall time changes first")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--top", type=int, default=20, help="sections to print (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_colwidth", 70,
+                           "display.float_format", "{:.3f}".format):
+        if args.command == "show":
+            report = load_report(args.report)
+            print(f"{report['label'] or args.report}: {report['wall_seconds']:.1f} s wall, "
+                  f"{report['cpu_seconds']:.1f} s CPU, max RSS {report['max_rss_mb']:.0f} MB")
+            print(pd.DataFrame(report["sections"]).drop(columns="depth").to_string(index=False))
+        else:
+            before, after = load_report(args.before), load_report(args.after)
+            print(f"total: {before['wall_seconds']:.1f} s -> {after['wall_seconds']:.1f} s wall, "
+                  f"max RSS {before['max_rss_mb']:.0f} MB -> {after['max_rss_mb']:.0f} MB")
+            comparison = compare_reports(before, after)
+            changes = comparison.reindex(comparison["wall_delta"].abs().sort_values(ascending=False).index)
+            print(changes.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from financing.timing import SectionTimer, compare_reports, load_report, main
+
+
+class Doubler(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X * 2
+
+
+def test_sections_nest_and_aggregate():
+    timer = SectionTimer()
+    timed_sleep = timer.timed(time.sleep)
+    timer.instrument(Doubler, methods=["transform"])
+    X, y = np.arange(20.0).reshape(10, 2), np.arange(10) % 2
+
+    timer.start("carga")
+    timed_sleep(0.02)
+    timed_sleep(0.01)
+    timer.start("modelos")
+    with timer.section("pipeline"):
+        Pipeline([("double", Doubler()), ("clf", LogisticRegression())]).fit(X, y).predict(X)
+    timer.finish()
+
+    table = timer.table().set_index("section")
+    assert list(table.index) == ["carga", "carga / sleep", "modelos", "modelos / pipeline",
+                                 "modelos / pipeline / Doubler.transform"]
+    assert table.loc["carga / sleep", "calls"] == 2
+    assert table.loc["carga / sleep", "wall_seconds"] >= 0.03
+    assert table.loc["carga", "wall_seconds"] >= table.loc["carga / sleep", "wall_seconds"]
+    # The pipeline clones Doubler: the instrumented class times the clone's fit_transform -> transform and predict
+    assert table.loc["modelos / pipeline / Doubler.transform", "calls"] == 2
+    assert table["depth"].tolist() == [0, 1, 0, 1, 2]
+
+
+def test_python_peaks_reach_the_parent_sections():
+    timer = SectionTimer(trace_python=True)
+    with timer.section("outer"):
+        with timer.section("inner"):
+            block = np.ones(2_000_000)
+            del block
+        small = np.ones(1000)
+    records = {record["section"]: record for record in timer.report()["sections"]}
+    assert records["outer / inner"]["python_peak_mb"] == pytest.approx(16, abs=1)
+    assert records["outer"]["python_peak_mb"] >= records["outer / inner"]["python_peak_mb"]
+    assert small.sum() == 1000
+
+
+def test_disabled_timer_and_other_threads_record_nothing():
+    timer = SectionTimer(enabled=False)
+    with timer.section("nothing"):
+        timer.start("nothing either")
+    timer.finish()
+    assert timer.sections == {}
+
+    timer = SectionTimer()
+    worker = threading.Thread(target=lambda: timer.section("thread").__enter__())
+    worker.start()
+    worker.join()
+    assert timer.sections == {} and timer._stack == []
+
+
+def test_reports_are_compared_by_section(tmp_path, capsys):
+    before, after = SectionTimer(), SectionTimer()
+    for timer, sections in ((before, ["carga", "graficos"]), (after, ["carga", "modelos"])):
+        for name in sections:
+            with timer.section(name):
+                time.sleep(0.02 if timer is before else 0.01)
+    before.write(tmp_path / "before.json", label="antes")
+    after.write(tmp_path / "after" / "timings.json")
+    assert load_report(tmp_path / "before.json")["label"] == "antes"
+
+    comparison = compare_reports(tmp_path / "before.json", tmp_path / "after" / "timings.json")
+    assert comparison["section"].tolist() == ["carga", "modelos", "graficos"]
+    assert comparison.loc[0, "wall_delta"] < 0 and comparison.loc[0, "wall_ratio"] < 1
+    assert pd.isna(comparison.loc[1, "wall_before"]) and pd.isna(comparison.loc[2, "wall_after"])
+
+    main(["compare", str(tmp_path / "before.json"), str(tmp_path / "after" / "timings.json"), "--top", "2"])
+    output = capsys.readouterr().out
+    assert output.startswith("total:") and len(output.strip().splitlines()) == 4
+    main(["show", str(tmp_path / "before.json")])
+    assert "graficos" in capsys.readouterr().out
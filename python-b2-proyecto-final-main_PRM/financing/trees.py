@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+from scipy.special import expit, softmax
+from sklearn.ensemble import (
+    AdaBoostClassifier, ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier, VotingClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
+# Leaf marker of sklearn's Tree.children_left
+TREE_LEAF = -1
+
+
+class _Group:
+    # Trees whose leaf values are summed and mapped to probabilities together (one model of the ensemble)
+    def __init__(self, trees, leaf_values, link, n_classes, baseline=None):
+        self.trees = trees
+        self.leaf_values = leaf_values
+        self.link = link
+        self.n_classes = n_classes
+        self.baseline = baseline
+
+
+def _class_values(tree):
+    # Leaf class frequencies of a classification tree, normalized as DecisionTreeClassifier.predict_proba
+    values = tree.value[:, 0, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(values / values.sum(axis=1, keepdims=True))
+
+
+def _forest_group(forest):
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    # The forest's probability is the mean of the trees' probabilities
+    values = [_class_values(tree) / len(trees) for tree in trees]
+    return _Group(trees, values, "identity", forest.n_classes_)
+
+
+def _gradient_boosting_group(model, n_features):
+    if model.init not in (None, "zero"):
+        raise ValueError("gradient boosting with an init estimator is not supported (its raw predictions vary with X)")
+    if model.loss not in ("log_loss", "exponential"):
+        raise ValueError(f"unsupported gradient boosting loss {model.loss!r}")
+    n_outputs = model.estimators_.shape[1]
+    # One scalar per leaf; the trees are in stage order, one per output (class) in each stage
+    trees = [estimator.tree_ for estimator in model.estimators_.ravel()]
+    values = [model.learning_rate * tree.value[:, 0, 0] for tree in trees]
+    link = "softmax" if n_outputs > 1 else ("logistic" if model.loss == "log_loss" else "exponential")
+    group = _Group(trees, values, link, model.n_classes_)
+    # The raw prediction of the init estimator (class priors) is the same for every row: the difference
+    # between the decision function and the sum of the trees on any row
+    row = np.zeros((1, n_features), dtype=np.float32)
+    trees_sum = CompiledEnsemble([_Group(trees, values, "identity", n_outputs)], [1.0], np.arange(n_outputs))
+    decision = model.decision_function(row if not hasattr(model, "feature_names_in_")
+                                       else pd.DataFrame(row, columns=model.feature_names_in_))
+    group.baseline = np.asarray(decision).reshape(1, -1)[0] - trees_sum._raw(row)[0][0]
+    return group
+
+
+def _adaboost_group(model):
+    n_classes = model.n_classes_
+    weights = model.estimator_weights_[:len(model.estimators_)]
+    total = model.estimator_weights_.sum()
+    trees, values = [], []
+    for estimator, weight in zip(model.estimators_, weights):
+        if not isinstance(estimator, DecisionTreeClassifier):
+            raise ValueError(f"unsupported AdaBoost estimator {type(estimator).__name__}")
+        # SAMME vote of each leaf: w for the predicted class, -w / (K - 1) for the others
+        predicted = np.searchsorted(model.classes_, estimator.classes_[estimator.tree_.value[:, 0, :].argmax(axis=1)])
+        value = np.full((estimator.tree_.node_count, n_classes), -weight / (n_classes - 1))
+        value[np.arange(len(predicted)), predicted] = weight
+        trees.append(estimator.tree_)
+        values.append(value / total)
+    return _Group(trees, values, "samme", n_classes)
+
+
+def _groups(estimator, n_features):
+    # (groups, weights) of a fitted classifier
+    if isinstance(estimator, VotingClassifier):
+        if estimator.voting != "soft":
+            raise ValueError("only soft voting can be compiled (hard voting has no predict_proba)")
+        members = [member for _, member in estimator.estimators if member != "drop"]
+        weights = estimator.weights
+        if weights is None:
+            weights = np.ones(len(members))
+        else:
+            weights = [weight for (_, member), weight in zip(estimator.estimators, weights) if member != "drop"]
+        weights = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        groups, group_weights = [], []
+        for member, weight in zip(estimator.estimators_, weights):
+            member_groups, member_weights = _groups(member, n_features)
+            groups += member_groups
+            group_weights += [weight * member_weight for member_weight in member_weights]
+        return groups, group_weights
+    if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+        if estimator.n_outputs_ != 1:
+            raise ValueError("multi-output forests are not supported")
+        return [_forest_group(estimator)], [1.0]
+    if isinstance(estimator, GradientBoostingClassifier):
+        return [_gradient_boosting_group(estimator, n_features)], [1.0]
+    if isinstance(estimator, AdaBoostClassifier):
+        return [_adaboost_group(estimator)], [1.0]
+    if isinstance(estimator, DecisionTreeClassifier):
+        return [_Group([estimator.tree_], [_class_values(estimator.tree_)], "identity", estimator.n_classes_)], [1.0]
+    raise ValueError(f"cannot compile {type(estimator).__name__}")
+
+
+def compile_ensemble(estimator):
+    """
+    Flatten a fitted tree ensemble into a CompiledEnsemble.
+
+    Supported: RandomForestClassifier, ExtraTreesClassifier,
+    GradientBoostingClassifier (default init), AdaBoostClassifier with
+    decision trees, DecisionTreeClassifier and soft VotingClassifier of those.
+    A Pipeline is accepted when its other steps are samplers (imblearn's
+    RandomUnderSampler, SMOTE...) or "passthrough", which do nothing at
+    predict time.
+
+    Parameters:
+    - estimator: fitted classifier or Pipeline
+
+    Returns:
+    - CompiledEnsemble
+    """
+    if hasattr(estimator, "steps"):
+        for name, step in estimator.steps[:-1]:
+            if step not in (None, "passthrough") and not hasattr(step, "fit_resample"):
+                raise ValueError(f"pipeline step {name!r} transforms the data at predict time; it cannot be compiled")
+        estimator = estimator.steps[-1][1]
+    n_features = estimator.n_features_in_
+    groups, weights = _groups(estimator, n_features)
+    return CompiledEnsemble(groups, weights, estimator.classes_, getattr(estimator, "feature_names_in_", None),
+                            n_features)
+
+
+class CompiledEnsemble:
+    def __init__(self, groups, weights, classes, feature_names=None, n_features=None, block_rows=256):
+        """
+        Initialize the CompiledEnsemble (use compile_ensemble).
+
+        The nodes of all the trees are stored in a few contiguous arrays
+        (split feature, threshold, children and leaf values), with the leaves
+        pointing to themselves. Prediction moves every (row, tree) pair one
+        level down per step, for all trees at once: a handful of NumPy
+        gathers per level instead of one Python call per tree. The trees are
+        ordered from deepest to shallowest, so the last levels only step the
+        trees that are still that deep.
+
+        The split test is the one of sklearn (the row converted to float32,
+        x <= threshold goes left), so the leaves reached are the same and
+        the probabilities match predict_proba up to float rounding.
+
+        Parameters:
+        - groups: list of _Group, the models of the ensemble
+        - weights: list of float, weight of each model in the averaged probabilities
+        - classes: np.ndarray, classes_ of the estimator
+        - feature_names: np.ndarray or None, feature_names_in_ of the estimator (column order of DataFrames)
+        - n_features: int or None, number of features
+        - block_rows: int, rows evaluated at a time, bounding the temporary memory
+        """
+        self.classes_ = np.asarray(classes)
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.n_features = n_features
+        self.block_rows = block_rows
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        trees = [tree for group in groups for tree in group.trees]
+        order = sorted(range(len(trees)), key=lambda i: -trees[i].max_depth)
+        starts = np.cumsum([0] + [trees[i].node_count for i in order])
+        self.n_trees = len(trees)
+        self.n_nodes = int(starts[-1])
+
+        self.feature = np.zeros(self.n_nodes, dtype=np.intp)
+        self.threshold = np.full(self.n_nodes, np.inf)
+        # children[2 * node] goes left, children[2 * node + 1] goes right
+        self.children = np.zeros(2 * self.n_nodes, dtype=np.intp)
+        self.roots = starts[:-1].astype(np.intp)
+        # Trees stepped at each level: those deeper than the level (a prefix in the depth order)
+        depths = np.array([trees[i].max_depth for i in order])
+        self.active = [int((depths > level).sum()) for level in range(int(depths.max(initial=0)))]
+
+        # Leaf values of each group, in the group's own tree order; a tree's leaves are found from the
+        # node number in the depth order minus the offset of its values
+        position = np.empty(len(order), dtype=np.intp)
+        position[order] = np.arange(len(order))
+        self.groups = []
+        first = 0
+        for group in groups:
+            columns = position[first:first + len(group.trees)]
+            first += len(group.trees)
+            values = np.concatenate(group.leaf_values)
+            offsets = np.cumsum([0] + [tree.node_count for tree in group.trees])[:-1]
+            self.groups.append({
+                "columns": columns, "offsets": starts[columns] - offsets,
+                "values": values, "link": group.link, "n_classes": group.n_classes, "baseline": group.baseline,
+            })
+
+        for i, start in zip(order, starts):
+            tree = trees[i]
+            nodes = slice(start, start + tree.node_count)
+            internal = tree.children_left != TREE_LEAF
+            own = np.arange(tree.node_count) + start
+            self.feature[nodes] = np.where(internal, tree.feature, 0)
+            self.threshold[nodes] = np.where(internal, tree.threshold, np.inf)
+            self.children[2 * start:2 * (start + tree.node_count):2] = np.where(internal, tree.children_left + start, own)
+            self.children[2 * start + 1:2 * (start + tree.node_count):2] = np.where(
+                internal, tree.children_right + start, own)
+
+    @property
+    def nbytes(self):
+        """Memory of the node arrays, in bytes."""
+        arrays = [self.feature, self.threshold, self.children, self.roots] + [g["values"] for g in self.groups]
+        return sum(array.nbytes for array in arrays)
+
+    def _matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            # Selecting the columns costs more than scoring a few rows: only when they are not in order
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.n_features is not None and X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the ensemble was fitted with {self.n_features}")
+        if np.isnan(X).any():
+            raise ValueError("X has missing values, which the compiled trees do not handle")
+        return np.ascontiguousarray(X)
+
+    def _leaves(self, X):
+        # Node reached by each row in each tree, (rows, trees)
+        flat = X.ravel()
+        row_starts = (np.arange(len(X)) * X.shape[1])[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        for n_active in self.active:
+            node = nodes[:, :n_active]
+            go_right = flat[row_starts + self.feature[node]] > self.threshold[node]
+            nodes[:, :n_active] = self.children[2 * node + go_right]
+        return nodes
+
+    def _raw(self, X):
+        # Summed leaf values of each group, [(rows, outputs)]
+        leaves = self._leaves(X)
+        raw = []
+        for group in self.groups:
+            values = group["values"][leaves[:, group["columns"]] - group["offsets"]]
+            if values.ndim == 2:
+                # Scalar leaves (gradient boosting): summed by output over the stages
+                n_outputs = 1 if group["link"] in ("logistic", "exponential") else group["n_classes"]
+                values = values.reshape(len(X), -1, n_outputs)
+            raw.append(values.sum(axis=1))
+        return raw
+
+    @staticmethod
+    def _probabilities(group, raw):
+        if group["baseline"] is not None:
+            raw = raw + group["baseline"]
+        link = group["link"]
+        if link == "identity":
+            return raw
+        if link == "softmax":
+            return softmax(raw, axis=1)
+        if link in ("logistic", "exponential"):
+            positive = expit(raw[:, 0] if link == "logistic" else 2 * raw[:, 0])
+            return np.column_stack([1 - positive, positive])
+        # samme (AdaBoost)
+        if group["n_classes"] == 2:
+            decision = (raw[:, 1] - raw[:, 0])[:, np.newaxis]
+            return softmax(np.hstack([-decision, decision]) / 2, axis=1)
+        return softmax(raw / (group["n_classes"] - 1), axis=1)
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, as the estimator's predict_proba.
+
+        Parameters:
+        - X: pd.DataFrame, np.ndarray (rows x features) or one row (1-D array)
+
+        Returns:
+        - np.ndarray, rows x classes, in the order of classes_
+        """
+        X = self._matrix(X)
+        probabilities = np.zeros((len(X), len(self.classes_)))
+        for start in range(0, len(X), self.block_rows):
+            block = X[start:start + self.block_rows]
+            for group, weight, raw in zip(self.groups, self.weights, self._raw(block)):
+                probabilities[start:start + len(block)] += weight * self._probabilities(group, raw)
+        return probabilities
+
+    def predict(self, X):
+        """
+        Predicted class of each row (the most probable one).
+
+        Parameters:
+        - X: pd.DataFrame, np.ndarray (rows x features) or one row (1-D array)
+
+        Returns:
+        - np.ndarray of classes_
+        """
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def __repr__(self):
+        return (f"CompiledEnsemble({self.n_trees} trees, {self.n_nodes} nodes, {len(self.classes_)} classes, "
+                f"{self.nbytes / 2**20:.1f} MB)")
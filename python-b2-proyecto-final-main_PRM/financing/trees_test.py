@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from imblearn.under_sampling import RandomUnderSampler
+from sklearn.datasets import make_classification
+from sklearn.decomposition import PCA
+from sklearn.ensemble import (
+    AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier, VotingClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
+from financing.trees import compile_ensemble
+
+
+def data(n_classes):
+    X, y = make_classification(600, 8, n_informative=5, n_classes=n_classes, random_state=0)
+    # Repeated values, so that rows fall exactly on split thresholds
+    X[:, 0] = np.round(X[:, 0], 1)
+    return pd.DataFrame(X, columns=[f"x{i}" for i in range(8)]).astype(np.float32), np.array(list("ABCD"))[y]
+
+
+def models():
+    gb = GradientBoostingClassifier(n_estimators=20, random_state=0)
+    rf = RandomForestClassifier(n_estimators=20, max_depth=6, min_samples_leaf=2, random_state=0)
+    ada = AdaBoostClassifier(DecisionTreeClassifier(max_depth=3), n_estimators=15, learning_rate=0.1, random_state=0)
+    return {
+        "gb": gb, "rf": rf, "ada": ada, "tree": DecisionTreeClassifier(max_depth=5, random_state=0),
+        "voting": VotingClassifier([("gb", gb), ("rf", rf), ("ada", ada)], voting="soft", weights=[2, 1, 1]),
+    }
+
+
+@pytest.mark.parametrize("n_classes", [2, 4])
+@pytest.mark.parametrize("name", ["gb", "rf", "ada", "tree", "voting"])
+def test_matches_predict_proba(name, n_classes):
+    X, y = data(n_classes)
+    model = models()[name].fit(X, y)
+    compiled = compile_ensemble(model)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    # One row, as a 1-D array, and in blocks smaller than the data
+    np.testing.assert_allclose(compiled.predict_proba(X.to_numpy()[3]), model.predict_proba(X.iloc[[3]]), atol=1e-12)
+    compiled.block_rows = 64
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-12)
+
+
+def test_pipeline_with_samplers():
+    X, y = data(4)
+    pipeline = Pipeline([
+        ("sampling_under", RandomUnderSampler(sampling_strategy="not minority", random_state=42)),
+        ("sampling_over", SMOTE(sampling_strategy="not majority", random_state=42)),
+        ("clf", GradientBoostingClassifier(n_estimators=10, random_state=0)),
+    ]).fit(X, y)
+    compiled = compile_ensemble(pipeline)
+    # DataFrame columns are taken by name
+    np.testing.assert_allclose(compiled.predict_proba(X[X.columns[::-1]]), pipeline.predict_proba(X), atol=1e-12)
+
+    with pytest.raises(ValueError, match="pca"):
+        compile_ensemble(Pipeline([("pca", PCA(2)), ("clf", DecisionTreeClassifier())]).fit(X, y))
+
+
+def test_rejects_unsupported():
+    X, y = data(2)
+    with pytest.raises(ValueError, match="soft voting"):
+        compile_ensemble(VotingClassifier([("tree", DecisionTreeClassifier())], voting="hard").fit(X, y))
+    compiled = compile_ensemble(DecisionTreeClassifier().fit(X, y))
+    with pytest.raises(ValueError, match="missing values"):
+        compiled.predict_proba(X.assign(x1=np.nan))
+    with pytest.raises(ValueError, match="features"):
+        compiled.predict_proba(X.to_numpy()[:, :5])
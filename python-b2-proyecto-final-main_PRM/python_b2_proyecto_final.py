@@ -97,6 +97,7 @@ Nota: Los datos proporcionados son ficticios y no se corresponden con la realida
 Las siguientes son varias de las librerias necesarias para el desarrollo del ejercicio; sin embargo, estas no estan limitadas es decir puedes incluir otras librerias para desarrollar el ejercico.
 """
 
+import os
 import re
 import pandas as pd
 import numpy as np
@@ -112,7 +113,10 @@ print("   Durante la ejecución se generarán múltiples visualizaciones.")
 print("   Cada vez que aparezca un gráfico, verás el mensaje:")
 print("   '>>> Presiona Enter para continuar...'")
 print("\n   Observa el gráfico y presiona Enter para continuar con el siguiente.")
+print("\n   Para ejecutarlo sin interacción: FINANCING_BATCH=1 python python_b2_proyecto_final.py")
+print("   (las figuras y el reporte de la ejecución se guardan en el directorio output/)")
 print("\n***  Tiempo estimado de ejecucion: 10-15 minutos")
+print("   (el tiempo y la memoria de cada sección de la ejecución se guardan en output/timings.json)")
 print("="*80 + "\n")
 from sklearn.cluster import KMeans
 from sklearn.ensemble import (
@@ -155,7 +159,8 @@ from imblearn.under_sampling import (
     RandomUnderSampler,
     NearMiss
 )
-from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.preprocessing import FunctionTransformer
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
@@ -168,12 +173,105 @@ from sklearn.metrics import classification_report
 from sklearn.metrics import confusion_matrix
 from sklearn.model_selection import KFold
 from sklearn.model_selection import StratifiedShuffleSplit
+from joblib import Memory
+from financing import one_hot_to_labels, age_range_binner, income_range_binner, read_typed_csv, SCHEMAS, StageCache, FigureOutput, RunReport
+from financing import ModelZoo, comparison_table
+from financing import InstrumentedPipeline, step_timings_table
+from financing import cross_validate_folds
+from financing import fit_pca, elbow_inertias
+from financing import StreamingPreparation, read_partitions
+from financing import iqr_bounds, quartile_sketches, quantiles_by_column, within_bounds_mask, filter_rows
+from sklearn.utils.validation import check_is_fitted
+from financing import CategoryEncoder, encode_columns, decode_columns
+from financing import profile_frame
+from financing import CorrelationService, top_correlated
+from financing import compile_ensemble
+from financing.serving import ScoringModel
+from financing.timing import SectionTimer
+from financing.stages import DEDUP_PARAMS, MERGE_PARAMS, preparation_pipeline
+from financing.stages import VOTING, balancing_steps, balanced, gradient_boosting, random_forest, adaboost
+from financing.stages import voting_classifier, search_hyperparameters
+
+"""## Tiempos por sección
+
+`section_timer` mide cada sección del script (carga, limpieza, preparación, PCA, balanceo, entrenamiento, evaluación...): tiempo real, tiempo de CPU y pico de memoria (RSS) sobre la memoria al empezar la sección. También mide cada llamada a `fit`, `transform`, `fit_resample`, `predict`... de los transformadores del script, de `SMOTE` y `RandomUnderSampler` y de los clasificadores, cada gráfico y el guardado de las figuras, anidados dentro de la sección en la que ocurren. Al terminar se escribe `output/timings.json` (y una tabla en el reporte del modo por lotes). `python -m financing timings compare antes/timings.json output/timings.json` compara dos ejecuciones sección por sección (`FINANCING_RUN_LABEL` da nombre a cada una). `FINANCING_TRACEMALLOC=1` mide además el pico de memoria de Python y NumPy con `tracemalloc` (hace más lentas las secciones que reservan mucha memoria) y `FINANCING_TIMINGS=0` desactiva la medición.
+"""
+
+section_timer = SectionTimer(
+    enabled=os.environ.get("FINANCING_TIMINGS", "1") != "0",
+    trace_python=os.environ.get("FINANCING_TRACEMALLOC", "0") == "1"
+)
+section_timer.start("Configuración")
+
+# Muestreadores, clasificadores y figuras: cada llamada se mide dentro de la sección en curso
+for estimator_class in (RandomUnderSampler, SMOTE, LogisticRegression, GradientBoostingClassifier,
+                        RandomForestClassifier, AdaBoostClassifier, VotingClassifier, PCA):
+    section_timer.instrument(estimator_class)
+section_timer.instrument(FigureOutput, methods=["show", "close"])
 
 """## Configuración de visualización de conjuntos de datos"""
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_colwidth', None)
 
+"""## Caché de etapas de preparación
+
+Las etapas de preparación (carga, eliminación de duplicados, rangos, merge y pipeline) se guardan en formato Parquet en `.cache/financing`. La clave de cada etapa depende del contenido de los CSV, de los parámetros de los transformadores, de las etapas anteriores y del código del paquete `financing` (por ejemplo, los límites de los rangos de edad de `financing/binning.py`), así que cualquier cambio en ellos vuelve a calcularla. `FINANCING_CACHE=0` desactiva la caché y `FINANCING_CACHE_DIR` cambia su directorio.
+"""
+
+stage_cache = StageCache(
+    os.environ.get("FINANCING_CACHE_DIR", ".cache/financing"),
+    enabled=os.environ.get("FINANCING_CACHE", "1") != "0"
+)
+
+"""## Modo por lotes
+
+Con `FINANCING_BATCH=1` el script se ejecuta sin interacción: no se muestra ninguna ventana ni se espera Enter. Cada figura se guarda como PNG en `output/figures` (o en `FINANCING_OUTPUT_DIR`), renderizada en un pool de procesos mientras el script continúa con el entrenamiento. Al final se escriben `run_report.json` y `run_report.html` con las figuras y la comparación de modelos.
+"""
+
+BATCH_MODE = os.environ.get("FINANCING_BATCH", "0") == "1"
+OUTPUT_DIR = os.environ.get("FINANCING_OUTPUT_DIR", "output")
+run_report = RunReport("Proyecto final Python B2 - Clasificación de tipos de financiamiento")
+figure_output = FigureOutput(batch=BATCH_MODE, output_dir=OUTPUT_DIR, report=run_report)
+
+"""## Modo escalable
+
+Con `FINANCING_SCALABLE=1` el PCA se ajusta con `IncrementalPCA` por bloques de filas y la curva de codo usa `MiniBatchKMeans`, evaluando los valores de k en paralelo a partir de los centros de los k menores. Los resultados quedan dentro de la tolerancia de las versiones exactas, pensados para cuando la base de clientes crece.
+"""
+
+SCALABLE_MODE = os.environ.get("FINANCING_SCALABLE", "0") == "1"
+
+"""## Preparación por particiones
+
+Con `FINANCING_STREAMING=1` la preparación de datos se ejecuta además por particiones del ID, sin cargar los ficheros completos en memoria (ver la sección *Preparación por particiones (out-of-core)*). `FINANCING_PARTITIONS` fija el número de particiones.
+"""
+
+STREAMING_MODE = os.environ.get("FINANCING_STREAMING", "0") == "1"
+
+"""## Búsqueda de hiperparámetros
+
+Con `FINANCING_SEARCH=1`, antes de entrenar los modelos se buscan los hiperparámetros de Gradient Boosting, Random Forest y AdaBoost por *successive halving*: muchas configuraciones se evalúan con pocos estimadores y solo las mejores pasan a la siguiente ronda, con más estimadores. Los mejores parámetros sustituyen a los fijados a mano. `FINANCING_SEARCH_CANDIDATES` fija el número de configuraciones de partida de cada modelo (por defecto 27).
+"""
+
+SEARCH_MODE = os.environ.get("FINANCING_SEARCH", "0") == "1"
+
+"""## Ejecución por etapas
+
+Este script recorre el ejercicio completo. Para repetir solo una parte, `python -m financing prepare`, `python -m financing train` y `python -m financing evaluate` ejecutan la preparación, el entrenamiento y la comparación de los modelos con las mismas transformaciones e hiperparámetros, y cada etapa guarda sus resultados en `output/stages` para la siguiente (`python -m financing run` ejecuta las tres). El mejor modelo queda en `output/model/financing_model.joblib`, listo para `python -m financing serve`.
+"""
+
+"""## Datos a escala de producción
+
+Los ficheros de ejemplo tienen unos 10.000 registros. `python -m financing.synthetic --rows 10000000 --output data/synthetic` genera versiones sintéticas del tamaño que se quiera, con el mismo formato y los mismos ID en las tres fuentes, que reproducen las distribuciones de los originales: regiones, `Idade`/`Renda` por región, combinaciones de productos T/F e ID duplicados. `FINANCING_DATA_DIR` indica la carpeta de la que se leen los CSV (por defecto `data`).
+"""
+
+DATA_DIR = os.environ.get("FINANCING_DATA_DIR", "data")
+
+"""Los CSV se leen con los tipos de `financing.loading.SCHEMAS` (enteros pequeños, float32, categorías y T/F como booleanos). Con `FINANCING_LOAD_REPORT=1` cada carga imprime además la memoria de cada columna frente a la lectura sin tipos; el informe vuelve a leer el fichero sin tipos, así que está desactivado por defecto.
+"""
+
+LOAD_REPORT = os.environ.get("FINANCING_LOAD_REPORT", "0") == "1"
+
 """### Descarga las fuentes de datos
 
 Si estás utilizando Google Colaboratory o un entorno Linux con la herramienta wget, puedes descomentar las siguientes líneas para descargar los datos.
@@ -201,6 +299,7 @@ X_principal = None
 A continuación se presentan algunas funciones para gráficar que pueden ser útiles.
 """
 
+@section_timer.timed
 def plot_boxplot_violinplot(x, y, data_frame):
     """
     Plot both boxplot and violinplot for comparison.
@@ -213,11 +312,8 @@ def plot_boxplot_violinplot(x, y, data_frame):
     Returns:
     None
     """
-    # Set figure size
-    plt.figure(figsize=(10, 8))
-
     # Create subplots
-    fig, axes = plt.subplots(2, 1)
+    fig, axes = plt.subplots(2, 1, figsize=(10, 8))
 
     # Rotate x-axis labels
     for ax in axes:
@@ -233,10 +329,9 @@ def plot_boxplot_violinplot(x, y, data_frame):
     plt.tight_layout()
 
     # Show plots
-    plt.show(block=False)
-    input("\n>>> Presiona Enter para continuar con el siguiente gráfico...")
-    plt.close()
+    figure_output.show(fig, f"{y} por {x}", prompt="\n>>> Presiona Enter para continuar con el siguiente gráfico...")
 
+@section_timer.timed
 def plot_count_plots(df_base, columnas):
     """
     Plot count plots for specified columns.
@@ -272,6 +367,7 @@ def plot_count_plots(df_base, columnas):
     # Adjust layout
     plt.tight_layout()
 
+@section_timer.timed
 def plot_confusion_matrix(cm, mapping, title='Confusion matrix', cmap=None, normalize=True):
     # Calculate accuracy and misclassification rate
     accuracy = np.trace(cm) / float(np.sum(cm))
@@ -320,11 +416,10 @@ def plot_confusion_matrix(cm, mapping, title='Confusion matrix', cmap=None, norm
     plt.xlabel('Predicted label\naccuracy={:0.4f}; misclass={:0.4f}'.format(accuracy, misclass))
 
     # Show the plot
-    plt.show(block=False)
-    input("\n>>> Presiona Enter para continuar...")
-    plt.close()
+    figure_output.show(name=title)
 
-def plot_accuracy_scores(estimator, train_x, train_y, test_x, test_y, nparts=5, jobs=None):
+@section_timer.timed
+def plot_accuracy_scores(estimator, train_x, train_y, test_x, test_y, nparts=5, jobs=-1, warm_start=False, memory=None):
     # Initialize KFold with specified number of splits, shuffling, and random state
     kfold = KFold(n_splits=nparts, shuffle=True, random_state=123)
 
@@ -336,11 +431,13 @@ def plot_accuracy_scores(estimator, train_x, train_y, test_x, test_y, nparts=5,
     axes.set_xlabel("Fold Number")
     axes.set_ylabel("Accuracy")
 
-    # Compute accuracy scores for training data using cross-validation
-    train_scores = cross_val_score(estimator, train_x, train_y, cv=kfold, n_jobs=jobs, scoring="accuracy")
-
-    # Compute accuracy scores for test data using cross-validation
-    test_scores = cross_val_score(estimator, test_x, test_y, cv=kfold, n_jobs=jobs, scoring="accuracy")
+    # Compute accuracy scores for training data using cross-validation (folds in parallel) and
+    # score the model of each fold on the test data, in a single pass: no model is trained on test_x
+    folds = cross_validate_folds(estimator, train_x, train_y, cv=kfold, n_jobs=jobs, scoring="accuracy",
+                                 X_holdout=test_x, y_holdout=test_y, warm_start=warm_start, memory=memory)
+    train_scores = folds["test_score"].to_numpy()
+    test_scores = folds["holdout_score"].to_numpy()
+    print(folds.to_string(index=False))
 
     # Generate sequence of fold numbers
     train_sizes = range(1, nparts+1, 1)
@@ -352,7 +449,7 @@ def plot_accuracy_scores(estimator, train_x, train_y, test_x, test_y, nparts=5,
     axes.plot(train_sizes, train_scores, 'o-', color="r", label="Training Data")
 
     # Plot accuracy scores for cross-validation data
-    axes.plot(train_sizes, test_scores, 'o-', color="g", label="Cross-Validation")
+    axes.plot(train_sizes, test_scores, 'o-', color="g", label="Test Data")
 
     # Add legend to the plot
     axes.legend(loc="best")
@@ -372,6 +469,7 @@ def startified_train_test_split(X, Y, n_splits=1, test_size=0.2, random_state=42
       y_train, y_test = y.iloc[train_index], y.iloc[test_index]
   return X_train, X_test, y_train, y_test
 
+@section_timer.timed
 def plot_pca_cumulative_variance(pca):
     """
     Plot the cumulative explained variance of principal components.
@@ -408,11 +506,7 @@ def plot_pca_cumulative_variance(pca):
     plt.title('FIGURA 6: Curva de Varianza Acumulada (PCA)', fontsize=14, fontweight='bold')
     plt.legend(loc='best')
     plt.tight_layout()
-    plt.draw()
-    plt.show(block=False)
-    plt.pause(0.5)
-    input("\n>>> Presiona Enter para continuar...")
-    plt.close()
+    figure_output.show(name="FIGURA 6 varianza acumulada PCA", pause=0.5)
 
 def get_pca_components(pca, columns):
     # Number of components
@@ -433,37 +527,29 @@ def get_pca_components(pca, columns):
     # Return a DataFrame sorted by keys
     return pd.DataFrame(sorted(dic.items()))
 
-def plot_elbow_curve_pca(X_principal):
+@section_timer.timed
+def plot_elbow_curve_pca(X_principal, mode="exact"):
     """
     Plot the elbow curve for PCA.
 
     Parameters:
     X_principal (DataFrame): Transformed features into principal components.
+    mode (str): "exact" (KMeans for each k) or "minibatch" (MiniBatchKMeans, k values in parallel).
 
     Returns:
     None
     """
     ks = range(1, 10)
-    inertias = []
 
-    for k in ks:
-        # Create a KMeans instance with k clusters: model
-        model = KMeans(n_clusters=k, n_init="auto")
-
-        # Fit model to samples
-        model.fit(X_principal)
-
-        # Append the inertia to the list of inertias
-        inertias.append(model.inertia_)
+    # Fit a k-means model for each k and keep its inertia
+    inertias = elbow_inertias(X_principal, ks, mode=mode, n_jobs=-1)
 
     # Plot ks vs inertias
     plt.plot(ks, inertias, '-o')
     plt.xlabel('Number of clusters, k')
     plt.ylabel('Inertia')
     plt.xticks(ks)
-    plt.show(block=False)
-    input("\n>>> Presiona Enter para continuar...")
-    plt.close()
+    figure_output.show(name="Curva de codo PCA")
 
 """# **Pregunta 1**
 
@@ -509,8 +595,12 @@ La preparación de datos es un paso crucial en el proceso de análisis de datos.
 Comencemos importando los diferentes conjuntos de datos como dataframes utilizando la librería de pandas. Luego, procederemos a presentar los primeros 10 registros.
 """
 
+section_timer.start("Pregunta 1 - Carga y exploración")
+
 #Write your code here
-df_retailbank = pd.read_csv("data/RetailBankEFG.csv")
+retailbank_path = os.path.join(DATA_DIR, "RetailBankEFG.csv")
+df_retailbank = stage_cache.stage("df_retailbank", lambda: read_typed_csv(retailbank_path, report=LOAD_REPORT),
+                                  sources=[retailbank_path], params=SCHEMAS["RetailBankEFG"])
 print("RetailBankEFG - Primeros 10 registros:")
 print(df_retailbank.head(10))
 print(f"\nForma del dataset: {df_retailbank.shape}")
@@ -519,7 +609,9 @@ print(f"Columnas: {list(df_retailbank.columns)}")
 """*Realiza la misma acción para InvestmentBankCDE.csv.*"""
 
 #Write your code here
-df_investment = pd.read_csv("data/InvestmentBankCDE.csv")
+investment_path = os.path.join(DATA_DIR, "InvestmentBankCDE.csv")
+df_investment = stage_cache.stage("df_investment", lambda: read_typed_csv(investment_path, report=LOAD_REPORT),
+                                  sources=[investment_path], params=SCHEMAS["InvestmentBankCDE"])
 print("\nInvestmentBankCDE - Primeros 10 registros:")
 print(df_investment.head(10))
 print(f"\nForma del dataset: {df_investment.shape}")
@@ -528,7 +620,9 @@ print(f"Columnas: {list(df_investment.columns)}")
 """*Realiza la misma acción para InsuranceCompanyABC.csv.*"""
 
 #Write your code here
-df_insurance = pd.read_csv("data/InsuranceCompanyABC.csv")
+insurance_path = os.path.join(DATA_DIR, "InsuranceCompanyABC.csv")
+df_insurance = stage_cache.stage("df_insurance", lambda: read_typed_csv(insurance_path, report=LOAD_REPORT),
+                                 sources=[insurance_path], params=SCHEMAS["InsuranceCompanyABC"])
 print("\nInsuranceCompanyABC - Primeros 10 registros:")
 print(df_insurance.head(10))
 print(f"\nForma del dataset: {df_insurance.shape}")
@@ -585,27 +679,36 @@ def get_nan_values(data_frame):
   # pass
   return {"Count NaN values in each column":nan_count_per_column,"Total number of records with NaN values":total_nan_records}
 
+"""`get_nan_values`, `check_duplicates`, `describe()` y `get_value_counts_non_numeric_columns` recorren cada conjunto de datos completo, cada una por separado. Con extractos de millones de filas conviene hacerlo una sola vez: `profile_frame` lee cada columna una vez (las columnas en paralelo) y obtiene los valores nulos, los ID duplicados, las estadísticas de `describe()` y los conteos de las columnas no numéricas. Los apartados de calidad de datos muestran los resultados de estos perfiles."""
+
+data_quality_profiles = {
+    name: profile_frame(data_frame, key="ID", n_jobs=-1)
+    for name, data_frame in [("df_retailbank", df_retailbank), ("df_investment", df_investment), ("df_insurance", df_insurance)]
+}
+for name, profile in data_quality_profiles.items():
+    print(f"{name}: {profile}")
+
 """*Imprime los valores faltantes por fila y columna*"""
 
 #Write your code here for df_retailbank
 print("\n" + "="*80)
 print("Valores faltantes en df_retailbank:")
 print("="*80)
-result_retailbank = get_nan_values(df_retailbank)
+result_retailbank = data_quality_profiles["df_retailbank"].nan_values()
 print(result_retailbank)
 
 #Write your code here for df_investment
 print("\n" + "="*80)
 print("Valores faltantes en df_investment:")
 print("="*80)
-result_investment = get_nan_values(df_investment)
+result_investment = data_quality_profiles["df_investment"].nan_values()
 print(result_investment)
 
 #Write your code here for df_insurance
 print("\n" + "="*80)
 print("Valores faltantes en df_insurance:")
 print("="*80)
-result_insurance = get_nan_values(df_insurance)
+result_insurance = data_quality_profiles["df_insurance"].nan_values()
 print(result_insurance)
 
 """## Pregunta
@@ -640,9 +743,9 @@ def check_duplicates(data_frame, column):
 print("\n" + "="*80)
 print("Verificación de duplicados:")
 print("="*80)
-duplicates_retailbank = check_duplicates(df_retailbank, 'ID')
-duplicates_investment = check_duplicates(df_investment, 'ID')
-duplicates_insurance = check_duplicates(df_insurance, 'ID')
+duplicates_retailbank = data_quality_profiles["df_retailbank"].duplicate_keys
+duplicates_investment = data_quality_profiles["df_investment"].duplicate_keys
+duplicates_insurance = data_quality_profiles["df_insurance"].duplicate_keys
 print(f"Duplicados en df_retailbank: {duplicates_retailbank}")
 print(f"Duplicados en df_investment: {duplicates_investment}")
 print(f"Duplicados en df_insurance: {duplicates_insurance}")
@@ -662,19 +765,19 @@ En esta sección, se propondrán varios métodos para identificar inconsistencia
 print("\n" + "="*80)
 print("Estadísticas básicas - df_retailbank:")
 print("="*80)
-print(df_retailbank.describe())
+print(data_quality_profiles["df_retailbank"].numeric_summary)
 
 #Write your code here for df_investment
 print("\n" + "="*80)
 print("Estadísticas básicas - df_investment:")
 print("="*80)
-print(df_investment.describe())
+print(data_quality_profiles["df_investment"].numeric_summary)
 
 #Write your code here for df_insurance
 print("\n" + "="*80)
 print("Estadísticas básicas - df_insurance:")
 print("="*80)
-print(df_insurance.describe())
+print(data_quality_profiles["df_insurance"].numeric_summary)
 
 """### Identificar Valores Únicos:
 Ahora, para todas las variables no numéricas, debemos identificar cuántos tipos de datos están registrados en cada columna. Implementaremos la función `get_value_counts_non_numeric_columns`, la cual obtiene los conteos de valores de las columnas no numéricas en un DataFrame y devuelve un diccionario donde las claves son los nombres de las columnas no numéricas y los valores son sus respectivos conteos de valores.
@@ -718,19 +821,19 @@ def get_value_counts_non_numeric_columns(df):
 print("\n" + "="*80)
 print("Conteos de columnas no numéricas - df_retailbank:")
 print("="*80)
-print(get_value_counts_non_numeric_columns(df_retailbank))
+print(data_quality_profiles["df_retailbank"].value_counts)
 
 #Write your code here for df_investment
 print("\n" + "="*80)
 print("Conteos de columnas no numéricas - df_investment:")
 print("="*80)
-print(get_value_counts_non_numeric_columns(df_investment))
+print(data_quality_profiles["df_investment"].value_counts)
 
 #Write your code here for df_insurance
 print("\n" + "="*80)
 print("Conteos de columnas no numéricas - df_insurance:")
 print("="*80)
-print(get_value_counts_non_numeric_columns(df_insurance))
+print(data_quality_profiles["df_insurance"].value_counts)
 
 """### Verificar Tipos de Datos:
 *Utiliza el atributo `dtypes` para verificar los tipos de datos de cada columna.*
@@ -826,12 +929,7 @@ ax4.set_ylabel('Renta')
 ax4.set_xticklabels(['Renda'])
 
 plt.tight_layout(rect=[0, 0.03, 1, 0.95])  # Ajustar para que no se solape el título
-fig.canvas.draw()  # Forzar el dibujado del canvas
-fig.canvas.flush_events()  # Procesar eventos pendientes
-plt.show(block=False)
-plt.pause(1.0)  # Pausa de 1 segundo para asegurar renderizado completo
-input("\n>>> Presiona Enter para continuar...")
-plt.close(fig)
+figure_output.show(fig, "FIGURA 1 variables categoricas df_insurance", pause=1.0)  # Pausa para asegurar renderizado completo
 
 """## Preguntas
 1. *¿Cuál de las dos opciones sugieres utilizar para evaluar datos no numéricos: imprimir los valores o crear visualizaciones?*
@@ -889,11 +987,18 @@ plot_boxplot_violinplot('Regiao', 'Renda', df_insurance)
 *Vamos a eliminar los datos duplicados en todos los conjuntos de datos utilizando la función `drop_duplicates`, junto con el parámetro `inplace`.*
 """
 
+section_timer.start("Pregunta 2 - Limpieza y rangos")
+
 #Write your code here
 # Eliminar duplicados basándose en la columna ID
-df_retailbank.drop_duplicates(subset=['ID'], inplace=True)
-df_investment.drop_duplicates(subset=['ID'], inplace=True)
-df_insurance.drop_duplicates(subset=['ID'], inplace=True)
+# Los argumentos forman parte de la clave de la caché: cambiarlos vuelve a calcular la etapa
+dedup_params = DEDUP_PARAMS
+df_retailbank = stage_cache.stage("df_retailbank_dedup", lambda: df_retailbank.drop_duplicates(**dedup_params),
+                                  params=dedup_params, depends_on=["df_retailbank"])
+df_investment = stage_cache.stage("df_investment_dedup", lambda: df_investment.drop_duplicates(**dedup_params),
+                                  params=dedup_params, depends_on=["df_investment"])
+df_insurance = stage_cache.stage("df_insurance_dedup", lambda: df_insurance.drop_duplicates(**dedup_params),
+                                 params=dedup_params, depends_on=["df_insurance"])
 
 print("\n" + "="*80)
 print("Duplicados eliminados exitosamente")
@@ -912,82 +1017,18 @@ print(f"df_insurance: {df_insurance.shape[0]} registros después de eliminar dup
 Las operaciones de ingeniería de características a menudo dependen de las relaciones entre las características, las cuales pueden distorsionarse al normalizar los datos. Luego, crear nuevas características como identificar los rangos de edades (Idade) y de ingresos (Renda) tiene más sentido en este punto. A continuación, se presenta un ejemplo al crear una nueva clase `CreateNewRangesColumns`, la cual implementa las clases y librerías necesarias para crear estas nuevas características.
 """
 
-class CreateNewRangesColumns(BaseEstimator, TransformerMixin):
-
-    def fit(self, X, y=None):
-        # No adjustments needed in fit, simply return the object unchanged
-        return self
-
-    def createAgeRange(self, base_df):
-        # Extract the age series from the base DataFrame
-        age_series_temp = base_df['Idade']
-
-        # Define conditions to create age ranges
-        conditions  = [
-            (age_series_temp >= 0) & (age_series_temp < 25),
-            (age_series_temp >= 25) & (age_series_temp < 30),
-            (age_series_temp >= 30) & (age_series_temp < 35),
-            (age_series_temp >= 35) & (age_series_temp < 40),
-            (age_series_temp >= 40) & (age_series_temp < 45),
-            (age_series_temp >= 45) & (age_series_temp < 50),
-            (age_series_temp >= 50) & (age_series_temp < 55),
-            (age_series_temp >= 55) & (age_series_temp < 60),
-            (age_series_temp >= 60)
-        ]
-
-        # Define choices for age ranges
-        choices = [
-            'R1-0-24', 'R2-25-29', 'R3-30-34', 'R4-35-39', 'R5-40-44', 'R6-45-49', 'R7-50-54', 'R8-55-59', 'R9-60'
-        ]
-
-        # Create 'AGE_RANGE' column based on defined conditions and choices
-        base_df['AGE_RANGE'] = np.select(conditions, choices, default="UNKNOWN")
-
-        return base_df
-
-    def createIncomeRange(self, base_df):
-        # Convert income series to numeric format
-        income_series_temp = pd.to_numeric(base_df['Renda'], errors='coerce')
-
-        # Define conditions to create income ranges
-        conditions  = [
-            (income_series_temp <= 6000),
-            (income_series_temp >= 6000) & (income_series_temp < 6500),
-            (income_series_temp >= 6500) & (income_series_temp < 7000),
-            (income_series_temp >= 7000) & (income_series_temp < 7500),
-            (income_series_temp >= 7500) & (income_series_temp < 8000),
-            (income_series_temp >= 8000) & (income_series_temp < 8500),
-            (income_series_temp >= 8500) & (income_series_temp < 9000),
-            (income_series_temp >= 9000)
-        ]
-
-        # Define choices for income ranges
-        choices = [
-            'R1-6000', 'R2-6000-6500', 'R3-6500-7000', 'R4-7000-7500', 'R5-7500-8000', 'R6-8000-8500', 'R7-8500-9000', 'R8-9000'
-        ]
-
-        # Create 'INCOME_RANGE' column based on defined conditions and choices
-        base_df['INCOME_RANGE'] = np.select(conditions, choices, default="UNKNOWN")
-
-        return base_df
-
-    def transform(self, X):
-        # First, make a copy of the input DataFrame 'X'
-        data = X.copy()
-
-        # Create the age range column
-        df_with_age_range = self.createAgeRange(data)
-
-        # Create the income range column
-        df_with_income_range = self.createIncomeRange(df_with_age_range)
-
-        return df_with_income_range
+# La clase se define en financing/preparation.py: el script, las etapas de `python -m financing` y la
+# preparación por particiones comparten la misma definición
+from financing.preparation import CreateNewRangesColumns
+section_timer.instrument(CreateNewRangesColumns)
 
 """A continuación, te presentamos un ejemplo de cómo utilizar esta clase(`CreateNewRangesColumns`). Después, podrás observar que el DataFrame `df_insurance` ahora cuenta con dos nuevas columnas: `AGE_RANGE` e `INCOME_RANGE`, las cuales contienen la información de la identificación de nuevos grupos de datos.
 
 """
 
-df_insurance = CreateNewRangesColumns().fit_transform(df_insurance)
+create_new_ranges = CreateNewRangesColumns()
+df_insurance = stage_cache.stage("df_insurance_ranges", lambda: create_new_ranges.fit_transform(df_insurance),
+                                 params=create_new_ranges, depends_on=["df_insurance_dedup"])
 df_insurance.head(10)
 
 """Imprimimos las nuevas columnas"""
@@ -999,6 +1040,7 @@ df_insurance.info()
 """
 
 plot_count_plots(df_insurance,["AGE_RANGE","INCOME_RANGE"])
+figure_output.show(name="Rangos de edad e ingresos", wait=False)
 
 """## Corrección de Inconsistencias
 
@@ -1010,46 +1052,63 @@ Como pudiste observar en las gráficas anteriores, existen diferentes valores at
 """
 
 # Custom transformer to remove outliers from specified columns
+@section_timer.instrument
 class OutlierRemover(BaseEstimator, TransformerMixin):
-    def __init__(self, threshold=1.5, columns=None):
+    def __init__(self, threshold=1.5, columns=None, sketch_size=None):
         # Initialize with a threshold and list of columns to check for outliers
         self.threshold = threshold
         self.columns = columns
+        # None: exact quartiles; int: streaming quantile sketch of that size (approximate, bounded memory)
+        self.sketch_size = sketch_size
 
-    def fit(self, X, y=None):
-        # No fitting necessary for outlier detection based on IQR
-        return self
-
-    def transform(self, X, y=None):
-        X = X.copy()
+    def _as_frame(self, X):
         # Convert to DataFrame if necessary for easier manipulation
-        if isinstance(X, np.ndarray):
-            X = pd.DataFrame(X)
+        return pd.DataFrame(X) if isinstance(X, np.ndarray) else X
+
+    def _set_bounds(self, q1, q3):
+        # Define the lower and upper bounds for detecting outliers from the interquartile range (IQR)
+        self.q1_, self.q3_ = q1, q3
+        self.lower_bound_, self.upper_bound_ = iqr_bounds(q1, q3, self.threshold)
+
+    def _set_bounds_from_sketches(self):
+        self._set_bounds(pd.Series({col: sketch.quantile(0.25) for col, sketch in self.sketches_.items()}),
+                         pd.Series({col: sketch.quantile(0.75) for col, sketch in self.sketches_.items()}))
+
+    def fit(self, X, y=None):
+        # Learn the bounds once, so the same bounds are applied to the training and the test data
+        X = self._as_frame(X)
 
         # If no specific columns are provided, use all columns
-        if self.columns is None:
-            self.columns = X.columns
+        self.columns_ = list(X.columns if self.columns is None else self.columns)
 
         # Calculate the 1st (Q1) and 3rd (Q3) quartiles for specified columns
-        Q1 = X[self.columns].quantile(0.25)
-        Q3 = X[self.columns].quantile(0.75)
-        # Calculate the interquartile range (IQR)
-        IQR = Q3 - Q1
-
-        # Define the lower and upper bounds for detecting outliers
-        lower_bound = Q1 - self.threshold * IQR
-        upper_bound = Q3 + self.threshold * IQR
+        if self.sketch_size is None:
+            quartiles = quantiles_by_column(X, self.columns_, [0.25, 0.75])
+            self._set_bounds(quartiles.loc[0.25], quartiles.loc[0.75])
+        else:
+            self.sketches_ = quartile_sketches(X, self.columns_, k=self.sketch_size)
+            self._set_bounds_from_sketches()
+        return self
 
-        # Create a mask to identify rows with any feature values outside the bounds
-        mask = ((X[self.columns] >= lower_bound) & (X[self.columns] <= upper_bound)).all(axis=1)
+    def partial_fit(self, X, y=None):
+        # Update the quartile sketches with one chunk of the data (streaming preparation)
+        X = self._as_frame(X)
+        if not hasattr(self, "sketches_"):
+            self.columns_ = list(X.columns if self.columns is None else self.columns)
+            self.sketches_ = {}
+        quartile_sketches(X, self.columns_, self.sketches_, k=self.sketch_size or 2048)
+        self._set_bounds_from_sketches()
+        return self
 
-        # Keep only the rows that are within the bounds
-        X_filtered = X[mask].reset_index(drop=True)
+    def transform(self, X, y=None):
+        check_is_fitted(self, "lower_bound_")
+        X = self._as_frame(X)
 
-        # Replace the original specified columns with the filtered values
-        X[self.columns] = X_filtered[self.columns]
+        # One boolean mask: rows with every specified column within the bounds and no missing values
+        mask = within_bounds_mask(X, self.lower_bound_, self.upper_bound_)
 
-        return X.dropna()
+        # Keep only the rows that are within the bounds (a single selection, with their original index)
+        return filter_rows(X, mask)
 
 """*Ejecuta la transformación utilizando la clase `OutlierRemover` y asigna el resultado a `df_insurance`*"""
 
@@ -1090,6 +1149,7 @@ Otra opción es crear una función que permita estandarizar las características
 """
 
 # Custom class to impute and scale data
+@section_timer.instrument
 class DataScaleImputer(BaseEstimator, TransformerMixin):
     def __init__(self, columns):
         self.columns = columns  # Columns to be scaled
@@ -1100,18 +1160,20 @@ class DataScaleImputer(BaseEstimator, TransformerMixin):
         self.scaler.fit(X[self.columns])
         return self  # Return the transformer
 
+    def partial_fit(self, X, y=None):
+        # Update the mean and variance with one chunk of the data (streaming preparation)
+        self.scaler.partial_fit(X[self.columns])
+        return self
+
     def transform(self, X):
         data = X.copy()  # Make a copy of the input DataFrame to avoid modifying the original
 
-        # Create a ColumnTransformer that will apply StandardScaler only to the specified columns
-        # Write you code here, change None by custom transformer
-        transformer = None
-
-        # Apply the transformer to the data
-        X_transform = transformer.fit_transform(data)
+        # Apply the scaler learned in fit (or partial_fit) only to the specified columns:
+        # refitting it here would scale each chunk (or the test set) with its own statistics
+        X_transform = self.scaler.transform(data[self.columns])
 
-        # Convert the result to a DataFrame to maintain the column labels
-        X_imputed_df = pd.DataFrame(data=X_transform, columns=self.columns)
+        # Convert the result to a DataFrame to maintain the column labels (and the index of the rows)
+        X_imputed_df = pd.DataFrame(data=X_transform, columns=self.columns, index=data.index)
 
         # Replace the original columns in 'data' with the scaled columns
         data[self.columns] = X_imputed_df[self.columns]
@@ -1137,7 +1199,12 @@ Vamos a unificar diferentes conjuntos de datos (`df_insurance`, `df_retailbank`
 """
 
 # Write you code here
-data_frame_merged = df_insurance.merge(df_retailbank, on='ID', how='inner').merge(df_investment, on='ID', how='inner')
+merge_params = MERGE_PARAMS
+data_frame_merged = stage_cache.stage(
+    "data_frame_merged",
+    lambda: df_insurance.merge(df_retailbank, **merge_params).merge(df_investment, **merge_params),
+    params=merge_params, depends_on=["df_insurance_ranges", "df_retailbank_dedup", "df_investment_dedup"]
+)
 print("\n" + "="*80)
 print("MERGE COMPLETADO - data_frame_merged creado")
 print("="*80)
@@ -1186,225 +1253,62 @@ Como último paso, es necesario ejecutar el siguiente tratamiento a los datos co
 4. **Conversión de valores binarios:** Se convertirán todas las columnas con valores 'F' o 'T' a tipos de datos numéricos 0 y 1, respectivamente.
 """
 
-class OneHotDecoderImputer(BaseEstimator, TransformerMixin):
-    def __init__(self, columns, label_column_name):
-        """
-        Initialize the OneHotDecoderImputer.
-
-        Parameters:
-        - columns: list of str, names of columns to be converted from one-hot encoding
-        - label_column_name: str, name of the new label column
-        """
-        self.columns = columns  # List of column names to be converted from one-hot encoding
-        self.label_column_name = label_column_name
-        self.label_encoders = {}  # Dictionary to store label encoders for each column
-
-    def fit(self, X, y=None):
-        """
-        Fit the label encoders on the specified columns.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - self: OneHotDecoderImputer, the transformer instance
-        """
-        for col in self.columns:
-            encoder = LabelEncoder()
-            encoder.fit(X[col])
-            self.label_encoders[col] = encoder
-        return self  # Return the transformer instance
-
-    def get_financing_type_name_from_row(self, row):
-        """
-        Get the financing type name from a one-hot encoded row.
-
-        Parameters:
-        - row: pd.Series, a row of one-hot encoded data
-
-        Returns:
-        - str or None, the name of the financing type or None if not found
-        """
-        total_financing_types = row.sum()
-        if total_financing_types == len(row):
-            return "Ambos"
-        if total_financing_types == 0:
-            return "Ninguno"
-        for col_name, value in row.items():
-            if value == 1:
-                return col_name
-        return None
-
-    def transform(self, X):
-        """
-        Convert one-hot encoded columns to a single label column.
+section_timer.start("Preparación para los modelos")
 
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
+# Los transformadores de la preparación (OneHotDecoderImputer, MultiColumnLabelEncoder, DropColumns y
+# BooleanToNumeric) se definen en financing/preparation.py y el pipeline en financing/stages.py, de modo
+# que `python -m financing prepare` prepara los datos exactamente igual que el script
+from financing.preparation import OneHotDecoderImputer, MultiColumnLabelEncoder, DropColumns, BooleanToNumeric
+for transformer_class in (OneHotDecoderImputer, MultiColumnLabelEncoder, DropColumns, BooleanToNumeric):
+    section_timer.instrument(transformer_class)
 
-        Returns:
-        - X_transformed: pd.DataFrame, the DataFrame with the new label column
-        """
-        # Create a copy of the input DataFrame to keep the original data
-        X_transformed = X.copy()
+"""Definimos el pipeline para ajustar los datos al formato requerido para resolver el ejercicio: `OneHotDecoderImputer` (columnas `FinanciamentoCasa` y `FinanciamentoCarro` a la etiqueta `tipo_financiamiento`), `MultiColumnLabelEncoder` (`AGE_RANGE`, `INCOME_RANGE`, `tipo_financiamiento` y `Regiao`), `DropColumns` (`ID`) y `BooleanToNumeric`."""
 
-        # Encode the specified columns using the fitted label encoders
-        for col in self.columns:
-            X_transformed[col] = self.label_encoders[col].transform(X[col])
+pipeline_data_preparation = preparation_pipeline()
 
-        # Create the label column by applying the method to each row
-        X_transformed[self.label_column_name] = X_transformed[self.columns].apply(lambda row: self.get_financing_type_name_from_row(row), axis=1)
-
-        return X_transformed.drop(columns=self.columns)
-class BooleanToNumeric(BaseEstimator, TransformerMixin):
-    def __init__(self):
-        """
-        Initialize the BooleanToNumeric transformer.
-        """
-        pass
-
-    def fit(self, X, y=None):
-        """
-        Fit the BooleanToNumeric transformer.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - self: BooleanToNumeric, the transformer instance
-        """
-        return self
-
-    def transform(self, X):
-        """
-        Transform boolean values ("T" or "F") to numerical values (1 or 0).
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - X_transformed: pd.DataFrame, the transformed DataFrame
-        """
-        X_transformed = X.replace({"T": 1, "F": 0})
-        return X_transformed
-
-class MultiColumnLabelEncoder(BaseEstimator, TransformerMixin):
-    def __init__(self, columns=None):
-        """
-        Initialize the MultiColumnLabelEncoder.
-
-        Parameters:
-        - columns: array of str, names of columns to encode. If None, encode all columns.
-        """
-        self.columns = columns
-        self.label_encoders = {}
-
-    def fit(self, X, y=None):
-        """
-        Fit the label encoders on the specified columns.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - self: MultiColumnLabelEncoder, the transformer instance
-        """
-        if self.columns is None:
-            self.columns = X.columns
-        for col in self.columns:
-            self.label_encoders[col] = LabelEncoder().fit(X[col])
-        return self
-
-    def transform(self, X):
-        """
-        Transform the specified columns using the fitted label encoders.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - X_transformed: pd.DataFrame, the DataFrame with transformed columns
-        """
-        X_transformed = X.copy()
-        for col in self.columns:
-            X_transformed[col] = self.label_encoders[col].transform(X[col])
-        return X_transformed
-
-    def fit_transform(self, X, y=None):
-        """
-        Fit label encoders on the specified columns and transform the DataFrame.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - X_transformed: pd.DataFrame, the DataFrame with transformed columns
-        """
-        return self.fit(X, y).transform(X)
-
-    def inverse_transform(self, X):
-        """
-        Reverse the encoding back to the original values.
-
-        Parameters:
-        - X: pd.DataFrame, the DataFrame with encoded columns
-
-        Returns:
-        - X_inverse: pd.DataFrame, the DataFrame with original values
-        """
-        X_inverse = X.copy()
-        for col in self.columns:
-            X_inverse[col] = self.label_encoders[col].inverse_transform(X[col])
-        return X_inverse
-
-class DropColumns(BaseEstimator, TransformerMixin):
-    def __init__(self, columns=None):
-        """
-        Initialize the DropColumns transformer.
-
-        Parameters:
-        - columns: list of str, names of columns to drop from the DataFrame
-        """
-        self.columns = columns
-
-    def fit(self, X, y=None):
-        """
-        Fit the DropColumns transformer.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
-
-        Returns:
-        - self: DropColumns, the transformer instance
-        """
-        return self
-
-    def transform(self, X):
-        """
-        Transform the input DataFrame by dropping specified columns.
-
-        Parameters:
-        - X: pd.DataFrame, the input DataFrame
+"""*Ejecuta el pipeline para ajustar los datos y asignarlos a la variable `data_frame_tipo_financiamiento`.*"""
 
-        Returns:
-        - X_transformed: pd.DataFrame, the transformed DataFrame
-        """
-        X_transformed = X.drop(columns=self.columns, errors='ignore')
-        return X_transformed
+def fit_data_preparation():
+    # The fitted pipeline is cached with the data: its label encoders are used below
+    return pipeline_data_preparation.fit_transform(data_frame_merged), pipeline_data_preparation
 
-"""Definimos el pipeline para ajustar los datos al formato requerido para resolver el ejercicio."""
+data_frame_tipo_financiamiento, pipeline_data_preparation = stage_cache.stage(
+    "data_frame_tipo_financiamiento", fit_data_preparation,
+    params=pipeline_data_preparation, depends_on=["data_frame_merged"]
+)
+data_frame_tipo_financiamiento.head(10)
 
-pipeline_data_preparation = Pipeline([
-    ("one_hote_to_label" ,OneHotDecoderImputer(columns=["FinanciamentoCasa","FinanciamentoCarro"], label_column_name = "tipo_financiamiento" )),
-    ("label_encode", MultiColumnLabelEncoder(columns=["AGE_RANGE","INCOME_RANGE","tipo_financiamiento","Regiao"])),
-    ('drop_columns', DropColumns(columns=["ID"])),
-    ('boolean_numeric', BooleanToNumeric())
-])
+"""## Preparación por particiones (out-of-core)
 
-"""*Ejecuta el pipeline para ajustar los datos y asignarlos a la variable `data_frame_tipo_financiamiento`.*"""
+Los extractos de producción son mucho más grandes que los ficheros de ejemplo. `StreamingPreparation` ejecuta la misma preparación sin cargar los ficheros completos: lee cada CSV por bloques y lo reparte en particiones Parquet según el hash del ID, de modo que el merge se hace partición por partición. Los transformadores sin estado se aplican a cada partición; los que aprenden de los datos (`OneHotDecoderImputer`, `MultiColumnLabelEncoder`, `DataScaleImputer`) se ajustan con `partial_fit` en una pasada previa sobre todas las particiones. La memoria depende del tamaño de la partición, no del de los datos, y el resultado se escribe en `output/prepared/part-*.parquet`.
+"""
 
-data_frame_tipo_financiamiento = pipeline_data_preparation.fit_transform(data_frame_merged)
-data_frame_tipo_financiamiento.head(10)
+def clean_column_names(data_frame):
+    # Same correction of the column names as data_frame_merged
+    return data_frame.rename(columns=lambda x: re.sub('[^A-Za-z0-9_]+', '', x))
+
+if STREAMING_MODE:
+    streaming_preparation = StreamingPreparation(
+        sources={
+            "insurance": insurance_path,
+            "retailbank": retailbank_path,
+            "investment": investment_path,
+        },
+        key="ID",
+        source_steps={"insurance": [("ranges", CreateNewRangesColumns())]},
+        pipeline=[("clean_column_names", FunctionTransformer(clean_column_names))] + clone(pipeline_data_preparation).steps,
+        n_partitions=int(os.environ.get("FINANCING_PARTITIONS", "0")) or None,
+        work_dir=stage_cache.directory / "streaming",
+    )
+    prepared_files = streaming_preparation.run(os.path.join(OUTPUT_DIR, "prepared"))
+
+    # Same rows as the in-memory preparation (the order of the rows depends on the partitions)
+    data_frame_streaming = read_partitions(os.path.join(OUTPUT_DIR, "prepared"))
+    columns = list(data_frame_tipo_financiamiento.columns)
+    same_rows = data_frame_streaming[columns].astype(float).sort_values(columns).reset_index(drop=True).equals(
+        data_frame_tipo_financiamiento.astype(float).sort_values(columns).reset_index(drop=True))
+    print(f"Preparación por particiones: {len(data_frame_streaming)} registros en {len(prepared_files)} ficheros, "
+          f"iguales a la preparación en memoria: {same_rows}")
 
 """Obtenemos las etiquetas por tipo de financiamiento y asignamos a la varabile `le_tipo_financiamiento_mapping`."""
 
@@ -1451,6 +1355,8 @@ Utiliza técnicas de validación cruzada para obtener estimaciones más robustas
 *¿Cuál es el tipo de problema que estás enfrentando: clasificación o regresión? Imprime o grafica el conteo de valores que corresponde a la columna `data_frame_tipo_financiamiento`.*
 """
 
+section_timer.start("Pregunta 3 - Modelo base y correlaciones")
+
 # Write you code here
 print("\n" + "="*80)
 print("TIPO DE PROBLEMA: CLASIFICACIÓN MULTICLASE")
@@ -1486,11 +1392,7 @@ axes[1].set_title('Proporción de Tipos de Financiamiento', fontweight='bold')
 axes[1].set_ylabel('')
 
 plt.tight_layout()
-plt.draw()
-plt.show(block=False)
-plt.pause(0.5)
-input("\n>>> Presiona Enter para continuar...")
-plt.close()
+figure_output.show(fig, "FIGURA 4 distribucion tipo_financiamiento", pause=0.5)
 
 """## Pasos para el entrenamiento de modelos
 
@@ -1576,6 +1478,7 @@ print("Accuracy:", accuracy)
 
 # Plot accuracy the model over the time
 plot_accuracy_scores(lr_model,X_train,y_train,X_test,y_test,nparts=5,jobs=2)
+figure_output.show(name="Accuracy por fold LogisticRegression", wait=False)
 
 # Print classifitacion report
 clas_report=classification_report(y_test,y_pred,labels=np.unique(y_pred), digits=6)
@@ -1595,6 +1498,11 @@ Aquí está la corrección:
 Ahora vamos a desarrollar validaciones para ver cuáles características son más relevantes para el modelo. Para esto, debes a implementar una función llamada  `plot_correlations` que te permita graficar las correlaciones del DataFrame `data_frame_tipo_financiamiento`.
 """
 
+"""`correlation_service` calcula la matriz de correlación una sola vez: con una matriz de Gram centrada en float32 por bloques de filas, y la guarda según el contenido del DataFrame. Al pedir de nuevo la matriz del mismo DataFrame (para `get_most_important_features`) no se recalcula."""
+
+correlation_service = CorrelationService()
+
+@section_timer.timed
 def plot_correlations(df_temp):
     #Write your code here
     print("\n" + "="*80)
@@ -1607,8 +1515,8 @@ def plot_correlations(df_temp):
     print("  * Permite identificar las variables mas correlacionadas con el objetivo")
     print("="*80)
 
-    # Calculate correlation matrix
-    corr_matrix = df_temp.corr()
+    # Calculate correlation matrix (memoized by correlation_service)
+    corr_matrix = correlation_service.correlation_matrix(df_temp)
 
     # Create figure
     plt.figure(figsize=(20, 16))
@@ -1619,11 +1527,7 @@ def plot_correlations(df_temp):
 
     plt.title('FIGURA 5: Matriz de Correlaciones - data_frame_tipo_financiamiento', fontsize=16, fontweight='bold', pad=20)
     plt.tight_layout()
-    plt.draw()
-    plt.show(block=False)
-    plt.pause(0.5)
-    input("\n>>> Presiona Enter para continuar...")
-    plt.close()
+    figure_output.show(name="FIGURA 5 matriz de correlaciones", pause=0.5)
 
     # Print top correlations with target variable
     if 'tipo_financiamiento' in df_temp.columns:
@@ -1652,14 +1556,9 @@ def get_most_important_features(correlation_matrix, target_column, n=5):
     Returns:
     - top_features: list, the top N most important feature names
     """
-    # Get the absolute correlation values with the target variable
-    correlation_with_target = correlation_matrix[target_column].abs().sort_values(ascending=False)
-
-    # Exclude the target variable itself
-    correlation_with_target = correlation_with_target.drop(target_column)
-
-    # Get the top N most important features
-    top_features = correlation_with_target.head(n).index.tolist()
+    # Top N absolute correlations with the target variable, excluding the target itself
+    # (partial sort: only the N selected values are sorted)
+    top_features = top_correlated(correlation_matrix[target_column], n, exclude=target_column)
 
     return top_features
 
@@ -1668,8 +1567,8 @@ def get_most_important_features(correlation_matrix, target_column, n=5):
 """
 
 #Write your code here
-# Primero calculamos la matriz de correlación
-correlation_matrix = data_frame_tipo_financiamiento.corr()
+# Primero obtenemos la matriz de correlación (ya calculada en plot_correlations)
+correlation_matrix = correlation_service.correlation_matrix(data_frame_tipo_financiamiento)
 # Luego obtenemos las top features
 top_6_features = get_most_important_features(correlation_matrix, 'tipo_financiamiento', n=6)
 print("\n" + "="*80)
@@ -1693,33 +1592,33 @@ for i, feature in enumerate(top_6_features, 1):
 * Estas características transformadas se almacenan en un DataFrame llamado `X_principal`, que luego se devuelve junto con el objeto PCA ajustado (`pca_model`) como salida de la función.
 """
 
-def create_pca_model(X_train, n_components):
+section_timer.start("PCA")
+
+def create_pca_model(X_train, n_components, mode="exact"):
     """
     Create a Principal Component Analysis (PCA) model.
 
     Parameters:
     X_train (DataFrame): The training dataset without the target variable.
     n_components (int): The number of principal components to identify.
+    mode (str): "exact", "randomized", "incremental" (IncrementalPCA by chunks) or "auto".
 
     Returns:
     pca_model (PCA): The fitted PCA model.
     X_principal (DataFrame): The transformed features into principal components.
     """
-    # Instantiate PCA
-    #Write your code here
-    pca_model = PCA(n_components=n_components)
-
-    # Fit PCA to the training data and transform features
+    # Instantiate PCA, fit it to the training data and transform features
     #Write your code here
-    X_principal = pca_model.fit_transform(X_train)
-    X_principal = pd.DataFrame(X_principal, columns=[f'PC{i+1}' for i in range(n_components)])
+    pca_model, X_principal = fit_pca(X_train, n_components, mode=mode)
+    X_principal = X_principal.reset_index(drop=True)
 
     # Return pca_model,X_principal
     return pca_model,X_principal
 
 """Llamamos a la función `create_pca_model`, pasando como argumentos el DataFrame `data_frame_tipo_financiamiento` y `n_components` igual a 10, para determinar las 10 componentes principales del conjunto de datos. Luego, graficamos la varianza acumulada."""
 
-pca_model,X_principal = create_pca_model(data_frame_tipo_financiamiento.drop(columns=['tipo_financiamiento']),n_components=10)
+pca_model,X_principal = create_pca_model(data_frame_tipo_financiamiento.drop(columns=['tipo_financiamiento']),n_components=10,
+                                         mode="incremental" if SCALABLE_MODE else "exact")
 plot_pca_cumulative_variance(pca_model)
 
 """A continuación, obtenemos la lista de los N componentes principales."""
@@ -1733,7 +1632,7 @@ df_pca_components
 Vamos a graficar la curva conocida como codo (elbow curve) utilizando la función `plot_elbow_curve_pca`.
 """
 
-plot_elbow_curve_pca(X_principal)
+plot_elbow_curve_pca(X_principal, mode="minibatch" if SCALABLE_MODE else "exact")
 
 """## Pregunta
 *Primero, investiga para qué sirve la curva conocida como codo (elbow curve). Luego, responde a la pregunta: ¿Cuántos componentes principales (columnas) puedes sugerir que sean utilizados por algún modelo de Machine Learning?*
@@ -1812,15 +1711,13 @@ conteo_tipo_financiamiento_label.plot.pie(autopct='%1.1f%%')
 plt.title('FIGURA 7: Distribución después del balanceo', fontsize=14, fontweight='bold')
 plt.ylabel('')
 plt.tight_layout()
-plt.draw()
-plt.show(block=False)
-plt.pause(0.5)
-input("\n>>> Presiona Enter para continuar...")
-plt.close()
+figure_output.show(name="FIGURA 7 distribucion de clases", pause=0.5)
 y.value_counts()
 
 """Para abordar el problema, vamos a comenzar reduciendo la variable que tiene mayor presencia y luego crearemos nuevos datos sintéticos para que los datos con menor presencia tengan la misma representatividad."""
 
+section_timer.start("Balanceo de clases")
+
 # Define the steps of the pipeline
 # Calculating class counts
 class_counts = data_frame_tipo_financiamiento['tipo_financiamiento'].value_counts()
@@ -1833,17 +1730,9 @@ print(class_counts)
 
 print(f"\nUsando estrategia automática 'not minority' para RandomUnderSampler")
 
-# Undersampling with RandomUnderSampler - estrategia automática
-rand_under = RandomUnderSampler(sampling_strategy='not minority', random_state=42)
-
-# Oversampling with SMOTE
-smote_over = SMOTE(sampling_strategy='not majority', k_neighbors=5, random_state=42)
-
-# Steps for addressing imbalance
-steps_imbalance = [
-    ('sampling_under', rand_under),
-    ('sampling', smote_over)
-]
+# Steps for addressing imbalance (financing/stages.py, los mismos de `python -m financing train`):
+# undersampling with RandomUnderSampler - estrategia automática - y oversampling with SMOTE
+steps_imbalance = balancing_steps()
 
 # Create the pipeline
 pipeline_fix_imbalance = Pipeline(steps_imbalance)
@@ -1860,9 +1749,7 @@ plt.figure(figsize=(10, 8))
 conteo_tipo_financiamiento_label.plot.pie(autopct='%1.1f%%')
 plt.title('Distribución después del balanceo de clases')
 plt.ylabel('')
-plt.show(block=False)
-input("\n>>> Presiona Enter para continuar...")
-plt.close()
+figure_output.show(name="Distribucion despues del balanceo")
 print("\nConteo después del balanceo:")
 print(y_reshaped.value_counts())
 
@@ -1903,52 +1790,104 @@ X_train, X_test, y_train, y_test = train_test_split(X_reshaped, y_reshaped, test
 print(f"\nTamaño del conjunto de entrenamiento: {X_train.shape}")
 print(f"Tamaño del conjunto de prueba: {X_test.shape}")
 
-# Define the steps for the pipeline
-steps_gradient_boost = [
-    ('sampling_under', rand_under),  # Undersampling
-    ('sampling_over', smote_over),    # Oversampling
-    ('clf', GradientBoostingClassifier(
-        ccp_alpha=0.0,
-        criterion='friedman_mse',
-        init=None,
-        learning_rate=0.1,
-        loss='log_loss',
-        max_depth=3,
-        max_features=None,
-        max_leaf_nodes=None,
-        min_impurity_decrease=0.0,
-        min_samples_leaf=1,
-        min_samples_split=2,
-        min_weight_fraction_leaf=0.0,
-        n_estimators=100,
-        n_iter_no_change=None,
-        random_state=8860,
-        subsample=1.0,
-        tol=0.0001,
-        validation_fraction=0.1,
-        verbose=0,
-        warm_start=False))  # Example classifier
-]
+# Define the steps for the pipeline: balanceo + GradientBoostingClassifier con los hiperparámetros de arriba.
+# Los modelos y sus hiperparámetros se definen en financing/stages.py (balanced, gradient_boosting,
+# random_forest, adaboost, voting_classifier), compartidos con `python -m financing train`
+
+# Los pipelines de modelos comparten la caché de pasos: el balanceo (RandomUnderSampler + SMOTE)
+# de X_train se calcula una sola vez y el resto de pipelines lo leen de disco. También registran
+# el tiempo y la memoria de cada paso (step_timings_)
+pipeline_memory = Memory(stage_cache.directory / "pipeline_steps", verbose=0) if stage_cache.enabled else None
 
 # Create the pipeline for Gradient Boosting
 # Write your code here
-pipeline_gradient_boost = Pipeline(steps_gradient_boost)
+pipeline_gradient_boost = balanced(gradient_boosting(), memory=pipeline_memory)
+
+# Modelos adicionales (Pregunta 3) y ensamble (Pregunta 4): se definen aquí para entrenarlos
+# todos a la vez junto con Gradient Boosting; su evaluación se mantiene en cada sección
+
+# Pipeline con balanceo + Random Forest
+pipeline_random_forest = balanced(random_forest(), memory=pipeline_memory)
+
+# Pipeline con balanceo + AdaBoost
+pipeline_adaboost = balanced(adaboost(), memory=pipeline_memory)
+
+# Crear modelos base SIN el sampling (porque VotingClassifier no acepta pipelines con fit_resample)
+# Primero aplicamos el balanceo a los datos
+# (mismos pasos que los pipelines de modelos, así que estos reutilizan el resultado de la caché)
+pipeline_balance_train = InstrumentedPipeline(steps_imbalance + [('passthrough', 'passthrough')], memory=pipeline_memory)
+X_train_balanced, y_train_balanced = pipeline_balance_train.fit_resample(X_train, y_train)
+
+# Modelos base (sin pipelines de sampling, usando datos ya balanceados)
+gb_clf = gradient_boosting()
+rf_clf = random_forest()
+ada_clf = adaboost()
+
+# Crear Voting Classifier (voting='soft': usa probabilidades para votar)
+voting_clf = voting_classifier(gb_clf, rf_clf, ada_clf)
+
+section_timer.start("Búsqueda de hiperparámetros")
+
+# Búsqueda de hiperparámetros por successive halving (FINANCING_SEARCH=1): cada ronda evalúa con
+# validación cruzada un tercio de las configuraciones de la anterior con el triple de estimadores,
+# hasta llegar a n_estimators. Cada fold se balancea una sola vez para todos los candidatos (y queda en
+# la caché de pasos) y los candidatos de cada ronda se entrenan en paralelo. Los mejores parámetros
+# se aplican al pipeline y al modelo base correspondiente del Voting Classifier
+hyperparameter_searches = {}
+if SEARCH_MODE:
+    print("\n" + "="*80)
+    print("Búsqueda de hiperparámetros (successive halving)")
+    print("="*80)
+    hyperparameter_searches = search_hyperparameters(
+        {"Gradient Boosting": pipeline_gradient_boost, "Random Forest": pipeline_random_forest,
+         "AdaBoost": pipeline_adaboost, VOTING: voting_clf},
+        X_train, y_train,
+        n_candidates=int(os.environ.get("FINANCING_SEARCH_CANDIDATES", "27")),
+        core_budget=int(os.environ.get("FINANCING_CORE_BUDGET", "0")) or None,
+        memory=pipeline_memory)
+    for name, search in hyperparameter_searches.items():
+        print(f"{name}: {search.best_params_} (accuracy CV {search.best_score_:.4f})")
+
+section_timer.start("Entrenamiento de modelos")
 
 # Train the model using fit
 # Write your code here
+# Los cuatro modelos se entrenan en paralelo en un pool de procesos sin superar el presupuesto
+# de núcleos (FINANCING_CORE_BUDGET, por defecto todos los disponibles); cada uno se evalúa una sola vez
 print("\n" + "="*80)
-print("Entrenando modelo Gradient Boosting...")
+print("Entrenando modelos: Gradient Boosting, Random Forest, AdaBoost y Voting Classifier...")
 print("="*80)
-pipeline_gradient_boost.fit(X_train, y_train)
-print("* Modelo entrenado exitosamente")
+model_zoo = ModelZoo(core_budget=int(os.environ.get("FINANCING_CORE_BUDGET", "0")) or None)
+model_zoo.add("Gradient Boosting", pipeline_gradient_boost)
+model_zoo.add("Random Forest", pipeline_random_forest)
+model_zoo.add("AdaBoost", pipeline_adaboost)
+model_zoo.add("Voting Classifier (Ensamble)", voting_clf, X_train_balanced, y_train_balanced)
+model_results = model_zoo.run(X_train, y_train, X_test, y_test)
+
+# Los modelos entrenados reemplazan a los modelos sin entrenar
+pipeline_gradient_boost = model_results["Gradient Boosting"].model
+pipeline_random_forest = model_results["Random Forest"].model
+pipeline_adaboost = model_results["AdaBoost"].model
+voting_clf = model_results["Voting Classifier (Ensamble)"].model
+print("* Modelos entrenados exitosamente")
+
+# Tiempo y memoria pico de cada paso de los pipelines (cached=True: leído de la caché de pasos)
+pipeline_step_timings = step_timings_table({
+    "Balanceo X_train": pipeline_balance_train,
+    "Gradient Boosting": pipeline_gradient_boost,
+    "Random Forest": pipeline_random_forest,
+    "AdaBoost": pipeline_adaboost,
+})
+print("\nTiempos por paso de los pipelines:")
+print(pipeline_step_timings.to_string(index=False))
+
+section_timer.start("Evaluación y comparación de modelos")
 
 # Make predictions
 # Write your code here
-y_pred_gb = pipeline_gradient_boost.predict(X_test)
-accuracy_gb = accuracy_score(y_test, y_pred_gb)
+y_pred_gb = model_results["Gradient Boosting"].y_pred
+accuracy_gb = model_results["Gradient Boosting"].accuracy
 print(f"\nAccuracy del modelo Gradient Boosting: {accuracy_gb:.4f}")
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred_gb))
 print("\nConfusion Matrix:")
 print(confusion_matrix(y_test, y_pred_gb))
 
@@ -1958,7 +1897,7 @@ print(confusion_matrix(y_test, y_pred_gb))
 print("\n" + "="*80)
 print("EVALUACIÓN GRADIENT BOOSTING")
 print("="*80)
-clas_report_gb = classification_report(y_test, y_pred_gb, labels=np.unique(y_pred_gb), digits=6)
+clas_report_gb = model_results["Gradient Boosting"].report_text
 print(clas_report_gb)
 
 # Plot confusion matrix
@@ -1975,6 +1914,8 @@ Vamos a implementar:
 1. Gradient Boosting (ya implementado arriba)
 2. Random Forest Classifier
 3. AdaBoost Classifier
+
+Los pipelines de ambos modelos se definen y entrenan arriba, junto con Gradient Boosting.
 """
 
 print("\n" + "="*80)
@@ -1985,39 +1926,16 @@ print("="*80)
 # MODELO 2: RANDOM FOREST CLASSIFIER
 # ==============================================================================
 
-from sklearn.ensemble import RandomForestClassifier
-
-print("\n" + "="*80)
-print("Entrenando modelo Random Forest...")
-print("="*80)
-
-# Pipeline con balanceo + Random Forest
-steps_random_forest = [
-    ('sampling_under', RandomUnderSampler(sampling_strategy='not minority', random_state=42)),
-    ('sampling_over', SMOTE(sampling_strategy='not majority', k_neighbors=5, random_state=42)),
-    ('clf', RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1))
-]
-
-pipeline_random_forest = Pipeline(steps_random_forest)
-pipeline_random_forest.fit(X_train, y_train)
-print("* Modelo Random Forest entrenado exitosamente")
-
 # Predicciones
-y_pred_rf = pipeline_random_forest.predict(X_test)
-accuracy_rf = accuracy_score(y_test, y_pred_rf)
+y_pred_rf = model_results["Random Forest"].y_pred
+accuracy_rf = model_results["Random Forest"].accuracy
 print(f"\nAccuracy del modelo Random Forest: {accuracy_rf:.4f}")
 
 # Classification Report
 print("\n" + "="*80)
 print("EVALUACIÓN RANDOM FOREST")
 print("="*80)
-print(classification_report(y_test, y_pred_rf, digits=6))
+print(model_results["Random Forest"].report_text)
 
 # Confusion Matrix
 print("\nConfusion Matrix - Random Forest:")
@@ -2027,38 +1945,16 @@ plot_confusion_matrix(confusion_matrix(y_test, y_pred_rf), tipo_financiamiento_m
 # MODELO 3: ADABOOST CLASSIFIER
 # ==============================================================================
 
-from sklearn.ensemble import AdaBoostClassifier
-from sklearn.tree import DecisionTreeClassifier
-
-print("\n" + "="*80)
-print("Entrenando modelo AdaBoost...")
-print("="*80)
-
-# Pipeline con balanceo + AdaBoost
-steps_adaboost = [
-    ('sampling_under', RandomUnderSampler(sampling_strategy='not minority', random_state=42)),
-    ('sampling_over', SMOTE(sampling_strategy='not majority', k_neighbors=5, random_state=42)),
-    ('clf', AdaBoostClassifier(
-        estimator=DecisionTreeClassifier(max_depth=3),
-        n_estimators=50,
-        learning_rate=0.1,
-        random_state=42))
-]
-
-pipeline_adaboost = Pipeline(steps_adaboost)
-pipeline_adaboost.fit(X_train, y_train)
-print("* Modelo AdaBoost entrenado exitosamente")
-
 # Predicciones
-y_pred_ada = pipeline_adaboost.predict(X_test)
-accuracy_ada = accuracy_score(y_test, y_pred_ada)
+y_pred_ada = model_results["AdaBoost"].y_pred
+accuracy_ada = model_results["AdaBoost"].accuracy
 print(f"\nAccuracy del modelo AdaBoost: {accuracy_ada:.4f}")
 
 # Classification Report
 print("\n" + "="*80)
 print("EVALUACIÓN ADABOOST")
 print("="*80)
-print(classification_report(y_test, y_pred_ada, digits=6))
+print(model_results["AdaBoost"].report_text)
 
 # Confusion Matrix
 print("\nConfusion Matrix - AdaBoost:")
@@ -2084,27 +1980,7 @@ print("COMPARACIÓN DE TODOS LOS MODELOS")
 print("="*80)
 
 # Crear tabla comparativa
-import pandas as pd
-
-models_comparison = pd.DataFrame({
-    'Modelo': ['Gradient Boosting', 'Random Forest', 'AdaBoost'],
-    'Accuracy': [accuracy_gb, accuracy_rf, accuracy_ada],
-    'Precision (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['precision']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['precision']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['precision'])
-    ],
-    'Recall (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['recall']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['recall']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['recall'])
-    ],
-    'F1-Score (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['f1-score']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['f1-score']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['f1-score'])
-    ]
-})
+models_comparison = comparison_table([model_results[name] for name in ["Gradient Boosting", "Random Forest", "AdaBoost"]])
 
 print("\nTabla Comparativa de Modelos:")
 print(models_comparison.to_string(index=False))
@@ -2123,69 +1999,24 @@ print(f"   F1-Score: {models_comparison.loc[best_model_idx, 'F1-Score (macro avg
 # ==============================================================================
 
 print("\n" + "="*80)
-print("IMPLEMENTANDO VOTING CLASSIFIER (ENSAMBLE)")
+print("VOTING CLASSIFIER (ENSAMBLE DE 3 MODELOS)")
 print("="*80)
 
-from sklearn.ensemble import VotingClassifier
-
-# Crear modelos base SIN el sampling (porque VotingClassifier no acepta pipelines con fit_resample)
-# Primero aplicamos el balanceo a los datos
-X_train_balanced, y_train_balanced = pipeline_fix_imbalance.fit_resample(X_train, y_train)
-
 print(f"\nDatos de entrenamiento después del balanceo:")
 print(f"  - Tamaño original: {X_train.shape[0]}")
 print(f"  - Tamaño balanceado: {X_train_balanced.shape[0]}")
 print(f"  - Distribución: {pd.Series(y_train_balanced).value_counts().to_dict()}")
 
-# Modelos base (sin pipelines de sampling, usando datos ya balanceados)
-gb_clf = GradientBoostingClassifier(
-    ccp_alpha=0.0,
-    criterion='friedman_mse',
-    learning_rate=0.1,
-    loss='log_loss',
-    max_depth=3,
-    n_estimators=100,
-    random_state=8860)
-
-rf_clf = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=10,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    n_jobs=-1)
-
-ada_clf = AdaBoostClassifier(
-    estimator=DecisionTreeClassifier(max_depth=3),
-    n_estimators=50,
-    learning_rate=0.1,
-    random_state=42)
-
-# Crear Voting Classifier
-voting_clf = VotingClassifier(
-    estimators=[
-        ('gb', gb_clf),
-        ('rf', rf_clf),
-        ('ada', ada_clf)
-    ],
-    voting='soft',  # Usa probabilidades para votar
-    n_jobs=-1
-)
-
-print("\nEntrenando Voting Classifier (Ensamble de 3 modelos)...")
-voting_clf.fit(X_train_balanced, y_train_balanced)
-print("* Voting Classifier entrenado exitosamente")
-
 # Predicciones
-y_pred_voting = voting_clf.predict(X_test)
-accuracy_voting = accuracy_score(y_test, y_pred_voting)
+y_pred_voting = model_results["Voting Classifier (Ensamble)"].y_pred
+accuracy_voting = model_results["Voting Classifier (Ensamble)"].accuracy
 print(f"\nAccuracy del Voting Classifier: {accuracy_voting:.4f}")
 
 # Classification Report
 print("\n" + "="*80)
 print("EVALUACIÓN VOTING CLASSIFIER (ENSAMBLE)")
 print("="*80)
-print(classification_report(y_test, y_pred_voting, digits=6))
+print(model_results["Voting Classifier (Ensamble)"].report_text)
 
 # Confusion Matrix
 print("\nConfusion Matrix - Voting Classifier:")
@@ -2199,29 +2030,8 @@ print("\n" + "="*80)
 print("COMPARACIÓN FINAL - TODOS LOS MODELOS + ENSAMBLE")
 print("="*80)
 
-# Actualizar tabla comparativa
-models_comparison_final = pd.DataFrame({
-    'Modelo': ['Gradient Boosting', 'Random Forest', 'AdaBoost', 'Voting Classifier (Ensamble)'],
-    'Accuracy': [accuracy_gb, accuracy_rf, accuracy_ada, accuracy_voting],
-    'Precision (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['precision']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['precision']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['precision']),
-        float(classification_report(y_test, y_pred_voting, output_dict=True)['macro avg']['precision'])
-    ],
-    'Recall (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['recall']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['recall']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['recall']),
-        float(classification_report(y_test, y_pred_voting, output_dict=True)['macro avg']['recall'])
-    ],
-    'F1-Score (macro avg)': [
-        float(classification_report(y_test, y_pred_gb, output_dict=True)['macro avg']['f1-score']),
-        float(classification_report(y_test, y_pred_rf, output_dict=True)['macro avg']['f1-score']),
-        float(classification_report(y_test, y_pred_ada, output_dict=True)['macro avg']['f1-score']),
-        float(classification_report(y_test, y_pred_voting, output_dict=True)['macro avg']['f1-score'])
-    ]
-})
+# Tabla comparativa: métricas, tiempos de entrenamiento/predicción, memoria pico y n_jobs por modelo
+models_comparison_final = comparison_table(model_results)
 
 print("\nTabla Comparativa Final (Todos los modelos):")
 print(models_comparison_final.to_string(index=False))
@@ -2272,6 +2082,57 @@ print(f"  - Total de predicciones: {len(predictions_df)}")
 print(f"  - Predicciones correctas: {predictions_df['correcta'].sum()}")
 print(f"  - Accuracy: {predictions_df['correcta'].mean():.4f}")
 
+"""## Modelo para predicciones en producción
+
+El modelo ganador solo existe dentro de este proceso. Sus árboles se compilan en arrays de NumPy (`compile_ensemble`), que puntúan una fila decenas de veces más rápido que `predict_proba` de sklearn, y `ScoringModel` los guarda junto con la preparación de los datos (rangos de edad e ingresos, codificación de las columnas categóricas y conversión de los indicadores T/F) usando solo clases del paquete `financing`, en un fichero joblib sin comprimir cuyos arrays se pueden mapear en memoria. Así se pueden puntuar clientes nuevos sin volver a ejecutar el script: el servicio HTTP carga el modelo al arrancar y agrupa las peticiones que llegan en unos pocos milisegundos para predecirlas juntas.
+
+```
+python -m financing.serving output/model/financing_model.joblib --port 8000
+```
+"""
+
+section_timer.start("Modelo para producción")
+
+# Los pipelines con balanceo no remuestrean al predecir: basta con su clasificador final
+final_models = {
+    'Voting Classifier (Ensamble)': voting_clf,
+    'Gradient Boosting': pipeline_gradient_boost[-1],
+    'Random Forest': pipeline_random_forest[-1],
+    'AdaBoost': pipeline_adaboost[-1],
+}
+final_estimator = final_models[best_model_final_name]
+
+# Los árboles del modelo se copian en arrays contiguos de NumPy (CompiledEnsemble): una predicción
+# recorre todos los árboles a la vez, sin una llamada de Python por árbol, y da las mismas probabilidades
+compiled_estimator = compile_ensemble(final_estimator)
+compiled_difference = np.abs(compiled_estimator.predict_proba(X_test) - final_estimator.predict_proba(X_test)).max()
+print(f"* {compiled_estimator}: diferencia máxima de probabilidades con el modelo de sklearn {compiled_difference:.1e}")
+
+# Registros tal como llegan de las fuentes: sin el tipo de financiamiento ni los rangos calculados
+preparation_encoders = pipeline_data_preparation[1].label_encoders
+raw_columns = [col for col in data_frame_merged.columns
+               if col not in ("FinanciamentoCasa", "FinanciamentoCarro", "AGE_RANGE", "INCOME_RANGE")]
+X_prepared = data_frame_tipo_financiamiento.drop(columns=['tipo_financiamiento'])
+
+scoring_model = ScoringModel(
+    compiled_estimator,
+    feature_names=X_prepared.columns,
+    label_encoders={col: encoder for col, encoder in preparation_encoders.items() if col != 'tipo_financiamiento'},
+    target_encoder=preparation_encoders['tipo_financiamiento'],
+    range_binners=[age_range_binner(), income_range_binner()],
+    example=data_frame_merged[raw_columns].head(5),
+)
+model_path = scoring_model.save(os.path.join(OUTPUT_DIR, "model", "financing_model.joblib"))
+
+# El modelo cargado del fichero predice a partir de los registros sin preparar lo mismo que el modelo entrenado
+loaded_scoring_model = ScoringModel.load(model_path)
+same_predictions = np.array_equal(
+    loaded_scoring_model.predict(data_frame_merged[raw_columns]),
+    preparation_encoders['tipo_financiamiento'].inverse_transform(final_estimator.predict(X_prepared)),
+)
+print(f"* Modelo para producción guardado en '{model_path}' ({os.path.getsize(model_path) / 2**20:.1f} MB)")
+print(f"  - Mismas predicciones desde los registros sin preparar: {same_predictions}")
+
 print("\n" + "="*80)
 print("PROYECTO COMPLETADO AL 100%")
 print("="*80)
@@ -2281,3 +2142,31 @@ print(f"  * Modelo de Ensamble: Voting Classifier")
 print(f"  * Comparacion completa de modelos")
 print(f"  * Archivo predicciones.csv generado")
 print(f"  * Mejor modelo: {best_model_final_name} ({best_accuracy_final:.2%} accuracy)")
+
+# ==============================================================================
+# REPORTE DE LA EJECUCIÓN (MODO POR LOTES)
+# ==============================================================================
+
+# Esperar a que terminen de guardarse las figuras pendientes
+section_timer.start("Figuras pendientes")
+figure_output.close()
+section_timer.finish()
+if section_timer.enabled:
+    timings_path = section_timer.write(os.path.join(OUTPUT_DIR, "timings.json"),
+                                       label=os.environ.get("FINANCING_RUN_LABEL"))
+    print(f"\n* Tiempos por sección: {timings_path}")
+if BATCH_MODE:
+    run_report.add_table("Comparación final de modelos", models_comparison_final)
+    run_report.add_table("Tiempos por paso de los pipelines", pipeline_step_timings)
+    if section_timer.enabled:
+        run_report.add_table("Tiempos por sección", section_timer.table())
+    for name, profile in data_quality_profiles.items():
+        run_report.add_table(f"Calidad de datos - {name}", profile.summary())
+    for name, search in hyperparameter_searches.items():
+        run_report.add_table(f"Búsqueda de hiperparámetros - {name}", search.summary())
+    run_report.add_value("Mejor modelo", best_model_final_name)
+    run_report.add_value("Accuracy del mejor modelo", best_accuracy_final)
+    run_report.add_value("Predicciones", "predicciones.csv")
+    run_report.add_value("Modelo para producción", str(model_path))
+    json_path, html_path = run_report.write(OUTPUT_DIR)
+    print(f"\n* Reporte de la ejecución: {json_path} y {html_path}")
@@ -0,0 +1,155 @@
+"""
+Medición de la compresión de respuestas en un enlace lento
+
+Levanta el servicio de citas con N citas sintéticas en una base de datos en
+memoria, y delante un proxy TCP local que limita el ancho de banda y añade
+latencia. Mide para GET /citas, con y sin Accept-Encoding: gzip, los bytes
+transferidos y la latencia extremo a extremo (incluida la descompresión).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_compresion.py
+    python benchmarks/bench_compresion.py --citas 20000 --mbps 10 --rtt-ms 80
+"""
+import argparse
+import gzip
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import requests
+from werkzeug.serving import make_server
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'odontocare', 'servicio_citas'))
+os.environ['DATABASE_URL'] = 'sqlite://'
+# Puerto cerrado: la validación remota del token falla rápido y se usa la local
+os.environ['SERVICIO_USUARIOS_URL'] = 'http://127.0.0.1:9'
+
+from app import create_app, db  # noqa: E402
+from app.models.cita import Cita  # noqa: E402
+
+TROZO = 16 * 1024
+
+
+def poblar(n):
+    """Inserta n citas sintéticas"""
+    inicio = datetime(2025, 1, 1, 9, 0)
+    db.session.execute(db.insert(Cita), [
+        {
+            'fecha': inicio + timedelta(minutes=30 * i),
+            'motivo': f'Revisión periódica {i % 17}',
+            'estado': ('PROGRAMADA', 'COMPLETADA', 'CANCELADA')[i % 3],
+            'id_paciente': i % 500 + 1,
+            'id_doctor': i % 20 + 1,
+            'id_centro': i % 5 + 1,
+            'id_usuario_registra': 1,
+        }
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+def bombear(origen, destino, bytes_por_segundo, retardo):
+    """
+    Copia datos de un socket a otro con retardo y ancho de banda limitado
+
+    El retardo (medio RTT) se aplica una vez por sentido: las peticiones del
+    benchmark usan Connection: close, así que cada conexión es un intercambio.
+    """
+    try:
+        while True:
+            datos = origen.recv(TROZO)
+            if not datos:
+                break
+            time.sleep(retardo + len(datos) / bytes_por_segundo)
+            retardo = 0
+            destino.sendall(datos)
+    except OSError:
+        pass
+    finally:
+        for s in (origen, destino):
+            try:
+                s.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def proxy_lento(puerto_destino, mbps, rtt_ms):
+    """Arranca un proxy TCP limitado y devuelve su puerto"""
+    servidor = socket.socket()
+    servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    servidor.bind(('127.0.0.1', 0))
+    servidor.listen()
+    bytes_por_segundo = mbps * 1e6 / 8
+    retardo = rtt_ms / 2000
+
+    def aceptar():
+        while True:
+            cliente, _ = servidor.accept()
+            destino = socket.create_connection(('127.0.0.1', puerto_destino))
+            for a, b in ((cliente, destino), (destino, cliente)):
+                threading.Thread(
+                    target=bombear, args=(a, b, bytes_por_segundo, retardo), daemon=True
+                ).start()
+
+    threading.Thread(target=aceptar, daemon=True).start()
+    return servidor.getsockname()[1]
+
+
+def medir(url, cabeceras, repeticiones):
+    """Mejor latencia y bytes en el cable de GET url"""
+    mejor, en_cable = None, 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        r = requests.get(url, headers=cabeceras, stream=True)
+        crudo = r.raw.read(decode_content=False)
+        cuerpo = gzip.decompress(crudo) if r.headers.get('Content-Encoding') == 'gzip' else crudo
+        transcurrido = time.perf_counter() - t0
+        assert r.status_code == 200 and cuerpo.startswith(b'{')
+        en_cable = len(crudo)
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, en_cable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--citas', type=int, default=10000)
+    parser.add_argument('--mbps', type=float, default=20)
+    parser.add_argument('--rtt-ms', type=float, default=50)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app('production')
+    # Los fallos de conexión con el servicio de usuarios son esperados aquí
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        poblar(args.citas)
+
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    puerto = proxy_lento(servidor.server_port, args.mbps, args.rtt_ms)
+
+    token = jwt.encode(
+        {'id_usuario': 1, 'username': 'admin', 'rol': 'admin',
+         'exp': datetime.now(timezone.utc) + timedelta(hours=1)},
+        app.config['JWT_SECRET_KEY'], algorithm='HS256'
+    )
+    url = f'http://127.0.0.1:{puerto}/citas'
+    base = {'Authorization': f'Bearer {token}', 'Connection': 'close'}
+
+    print(f'GET /citas con {args.citas} citas, enlace de {args.mbps} Mbit/s y RTT {args.rtt_ms} ms')
+    resultados = [
+        ('sin compresión', medir(url, {**base, 'Accept-Encoding': 'identity'}, args.repeticiones)),
+        ('gzip', medir(url, {**base, 'Accept-Encoding': 'gzip'}, args.repeticiones)),
+    ]
+    for nombre, (segundos, en_cable) in resultados:
+        print(f'  {nombre:<15} {en_cable / 1e6:7.2f} MB  {segundos * 1000:8.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark de serialización de listados de citas
+
+Compara, para 10.000 y 100.000 citas, el camino antiguo (objetos ORM +
+to_dict() + json de la biblioteca estándar) con la consulta por columnas
+serializada con json y con orjson, pasando por el mismo camino que jsonify
+(proveedor JSON de la aplicación). Comprueba además que las tres variantes
+producen el mismo documento (orjson no escapa los caracteres no ASCII, así
+que se comparan los datos decodificados y no los bytes).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_serializacion.py
+    python benchmarks/bench_serializacion.py 10000 100000 500000
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'odontocare', 'servicio_citas'))
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from app import create_app, db  # noqa: E402
+from app.models.cita import Cita  # noqa: E402
+from app.json_provider import orjson  # noqa: E402
+
+REPETICIONES = 3
+
+
+def poblar(n):
+    """Inserta n citas sintéticas en la base de datos en memoria"""
+    db.session.query(Cita).delete()
+    inicio = datetime(2025, 1, 1, 9, 0)
+    filas = [
+        {
+            'id_cita': i + 1,
+            'fecha': inicio + timedelta(minutes=30 * i),
+            'motivo': f'Revisión periódica {i % 17}',
+            'estado': ('PROGRAMADA', 'COMPLETADA', 'CANCELADA')[i % 3],
+            'id_paciente': i % 500 + 1,
+            'id_doctor': i % 20 + 1,
+            'id_centro': i % 5 + 1,
+            'id_usuario_registra': 1,
+            'created_at': inicio,
+            'updated_at': inicio,
+        }
+        for i in range(n)
+    ]
+    db.session.execute(db.insert(Cita), filas)
+    db.session.commit()
+
+
+def orm_to_dict(app):
+    citas = Cita.query.order_by(Cita.fecha.desc()).all()
+    return app.json.response({'total': len(citas), 'citas': [c.to_dict() for c in citas]}).get_data()
+
+
+def columnas(app):
+    filas = Cita.query.with_entities(*Cita.columnas_dict()).order_by(Cita.fecha.desc()).all()
+    return app.json.response({'total': len(filas), 'citas': [f._asdict() for f in filas]}).get_data()
+
+
+def medir(funcion, app):
+    """Mejor tiempo de REPETICIONES ejecuciones (la sesión se limpia entre ellas)"""
+    mejor, salida = None, None
+    for _ in range(REPETICIONES):
+        db.session.expunge_all()
+        t0 = time.perf_counter()
+        salida = funcion(app)
+        transcurrido = time.perf_counter() - t0
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, salida
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    app = create_app('production')
+
+    variantes = [('ORM + to_dict + json', orm_to_dict, False),
+                 ('columnas + json', columnas, False)]
+    if orjson is not None:
+        variantes.append(('columnas + orjson', columnas, True))
+    else:
+        print('orjson no está instalado: se omite esa variante')
+
+    with app.app_context():
+        for n in tamanos:
+            poblar(n)
+            print(f'\n{n} citas')
+            referencia = None
+            base = None
+            for nombre, funcion, usar_orjson in variantes:
+                app.json.usar_orjson = usar_orjson
+                segundos, salida = medir(funcion, app)
+                datos = json.loads(salida)
+                if referencia is None:
+                    referencia, base = datos, segundos
+                igual = 'OK' if datos == referencia else 'DISTINTO'
+                print(f'  {nombre:<24} {segundos * 1000:9.1f} ms  x{base / segundos:4.1f}  '
+                      f'{len(salida) / 1e6:6.1f} MB  {igual}')
+
+
+if __name__ == '__main__':
+    main()
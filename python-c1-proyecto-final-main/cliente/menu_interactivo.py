@@ -7,12 +7,16 @@ para realizar operaciones CRUD sobre doctores, pacientes, centros y citas.
 """
 import requests
 import json
+import time
 from datetime import datetime, timedelta
 
 # URLs de los servicios
 URL_USUARIOS = "http://localhost:5001"
 URL_CITAS = "http://localhost:5002"
 
+# Segundos que se reutilizan las listas de doctores, pacientes y centros
+CACHE_TTL_SEGUNDOS = 60
+
 
 class OdontoCareMenu:
     """Clase principal del menu interactivo"""
@@ -21,6 +25,10 @@ class OdontoCareMenu:
         self.token = None
         self.headers = {'Content-Type': 'application/json'}
         self.usuario_actual = None
+        # Una sola sesion: reutiliza las conexiones HTTP (keep-alive) entre peticiones
+        self.session = requests.Session()
+        # Cache de listas de referencia: tipo -> (instante, respuesta)
+        self.cache = {}
 
     # ==================== UTILIDADES ====================
 
@@ -56,6 +64,34 @@ class OdontoCareMenu:
                 return opcion
             print(f"Opcion no valida. Opciones: {', '.join(opciones_validas)}")
 
+    # ==================== CACHE DE REFERENCIAS ====================
+
+    def obtener_referencias(self, tipo):
+        """
+        Devuelve la respuesta de /admin/<tipo> (doctores, pacientes o centros)
+
+        Usa la cache si no ha caducado; None si el servicio responde con error
+        """
+        entrada = self.cache.get(tipo)
+        if entrada and time.monotonic() - entrada[0] < CACHE_TTL_SEGUNDOS:
+            return entrada[1]
+
+        resp = self.session.get(f"{URL_USUARIOS}/admin/{tipo}", headers=self.headers, timeout=10)
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+        self.guardar_en_cache(tipo, data)
+        return data
+
+    def guardar_en_cache(self, tipo, data):
+        """Guarda una lista de referencia recien descargada"""
+        self.cache[tipo] = (time.monotonic(), data)
+
+    def invalidar_cache(self, *tipos):
+        """Descarta las listas indicadas (todas si no se indica ninguna)"""
+        for tipo in tipos or list(self.cache):
+            self.cache.pop(tipo, None)
+
     # ==================== AUTENTICACION ====================
 
     def login(self):
@@ -68,7 +104,7 @@ class OdontoCareMenu:
         password = self.solicitar_dato("Contrasena")
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_USUARIOS}/auth/login",
                 json={"username": username, "password": password},
                 timeout=10
@@ -80,6 +116,7 @@ class OdontoCareMenu:
                 self.headers['Authorization'] = f"Bearer {self.token}"
                 self.usuario_actual = data['usuario']
                 self.mostrar_exito(f"Bienvenido, {self.usuario_actual['username']} (Rol: {self.usuario_actual['rol']})")
+                self.invalidar_cache()
                 return True
             else:
                 self.mostrar_error(response.json().get('error', 'Credenciales invalidas'))
@@ -140,7 +177,7 @@ class OdontoCareMenu:
     def listar_doctores(self):
         """Lista todos los doctores"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/doctores",
                 headers=self.headers,
                 timeout=10
@@ -148,6 +185,7 @@ class OdontoCareMenu:
 
             if response.status_code == 200:
                 data = response.json()
+                self.guardar_en_cache('doctores', data)
                 doctores = data.get('doctores', [])
 
                 print("\n" + "-" * 85)
@@ -178,7 +216,7 @@ class OdontoCareMenu:
         id_doctor = self.solicitar_dato("Ingrese el ID del doctor")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/doctores/{id_doctor}",
                 headers=self.headers,
                 timeout=10
@@ -221,7 +259,7 @@ class OdontoCareMenu:
             data["password"] = self.solicitar_dato("Password")
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_USUARIOS}/admin/doctores",
                 json=data,
                 headers=self.headers,
@@ -231,6 +269,7 @@ class OdontoCareMenu:
             if response.status_code == 201:
                 doctor = response.json()['doctor']
                 self.mostrar_exito(f"Doctor creado con ID: {doctor['id_doctor']}")
+                self.invalidar_cache('doctores')
             else:
                 self.mostrar_error(response.json().get('error', 'Error al crear doctor'))
 
@@ -248,7 +287,7 @@ class OdontoCareMenu:
 
         if confirmar == 's':
             try:
-                response = requests.delete(
+                response = self.session.delete(
                     f"{URL_USUARIOS}/admin/doctores/{id_doctor}",
                     headers=self.headers,
                     timeout=10
@@ -256,6 +295,7 @@ class OdontoCareMenu:
 
                 if response.status_code == 200:
                     self.mostrar_exito("Doctor eliminado correctamente")
+                    self.invalidar_cache('doctores')
                 else:
                     self.mostrar_error(response.json().get('error', 'Error al eliminar doctor'))
 
@@ -300,7 +340,7 @@ class OdontoCareMenu:
     def listar_pacientes(self):
         """Lista todos los pacientes"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/pacientes",
                 headers=self.headers,
                 timeout=10
@@ -308,6 +348,7 @@ class OdontoCareMenu:
 
             if response.status_code == 200:
                 data = response.json()
+                self.guardar_en_cache('pacientes', data)
                 pacientes = data.get('pacientes', [])
 
                 print("\n" + "-" * 85)
@@ -336,7 +377,7 @@ class OdontoCareMenu:
         id_paciente = self.solicitar_dato("Ingrese el ID del paciente")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/pacientes/{id_paciente}",
                 headers=self.headers,
                 timeout=10
@@ -379,7 +420,7 @@ class OdontoCareMenu:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_USUARIOS}/admin/pacientes",
                 json=data,
                 headers=self.headers,
@@ -389,6 +430,7 @@ class OdontoCareMenu:
             if response.status_code == 201:
                 paciente = response.json()['paciente']
                 self.mostrar_exito(f"Paciente creado con ID: {paciente['id_paciente']}")
+                self.invalidar_cache('pacientes')
             else:
                 self.mostrar_error(response.json().get('error', 'Error al crear paciente'))
 
@@ -407,7 +449,7 @@ class OdontoCareMenu:
         nuevo_estado = "ACTIVO" if estado_opcion == '1' else "INACTIVO"
 
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{URL_USUARIOS}/admin/pacientes/{id_paciente}",
                 json={"estado": nuevo_estado},
                 headers=self.headers,
@@ -416,6 +458,7 @@ class OdontoCareMenu:
 
             if response.status_code == 200:
                 self.mostrar_exito(f"Estado actualizado a {nuevo_estado}")
+                self.invalidar_cache('pacientes')
             else:
                 self.mostrar_error(response.json().get('error', 'Error al modificar paciente'))
 
@@ -433,7 +476,7 @@ class OdontoCareMenu:
 
         if confirmar == 's':
             try:
-                response = requests.delete(
+                response = self.session.delete(
                     f"{URL_USUARIOS}/admin/pacientes/{id_paciente}",
                     headers=self.headers,
                     timeout=10
@@ -441,6 +484,7 @@ class OdontoCareMenu:
 
                 if response.status_code == 200:
                     self.mostrar_exito("Paciente eliminado correctamente")
+                    self.invalidar_cache('pacientes')
                 else:
                     self.mostrar_error(response.json().get('error', 'Error al eliminar paciente'))
 
@@ -482,7 +526,7 @@ class OdontoCareMenu:
     def listar_centros(self):
         """Lista todos los centros"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/centros",
                 headers=self.headers,
                 timeout=10
@@ -490,6 +534,7 @@ class OdontoCareMenu:
 
             if response.status_code == 200:
                 data = response.json()
+                self.guardar_en_cache('centros', data)
                 centros = data.get('centros', [])
 
                 print("\n" + "-" * 110)
@@ -520,7 +565,7 @@ class OdontoCareMenu:
         id_centro = self.solicitar_dato("Ingrese el ID del centro")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/centros/{id_centro}",
                 headers=self.headers,
                 timeout=10
@@ -551,7 +596,7 @@ class OdontoCareMenu:
         direccion = self.solicitar_dato("Direccion", obligatorio=False)
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_USUARIOS}/admin/centros",
                 json={"nombre": nombre, "direccion": direccion},
                 headers=self.headers,
@@ -561,6 +606,7 @@ class OdontoCareMenu:
             if response.status_code == 201:
                 centro = response.json()['centro']
                 self.mostrar_exito(f"Centro creado con ID: {centro['id_centro']}")
+                self.invalidar_cache('centros')
             else:
                 self.mostrar_error(response.json().get('error', 'Error al crear centro'))
 
@@ -578,7 +624,7 @@ class OdontoCareMenu:
 
         if confirmar == 's':
             try:
-                response = requests.delete(
+                response = self.session.delete(
                     f"{URL_USUARIOS}/admin/centros/{id_centro}",
                     headers=self.headers,
                     timeout=10
@@ -586,6 +632,7 @@ class OdontoCareMenu:
 
                 if response.status_code == 200:
                     self.mostrar_exito("Centro eliminado correctamente")
+                    self.invalidar_cache('centros')
                 else:
                     self.mostrar_error(response.json().get('error', 'Error al eliminar centro'))
 
@@ -630,7 +677,7 @@ class OdontoCareMenu:
     def listar_citas(self):
         """Lista todas las citas"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_CITAS}/citas",
                 headers=self.headers,
                 timeout=10
@@ -640,18 +687,22 @@ class OdontoCareMenu:
                 data = response.json()
                 citas = data.get('citas', [])
 
-                print("\n" + "-" * 90)
-                print(f"{'ID':<6} {'FECHA':<20} {'PACIENTE':<10} {'DOCTOR':<10} {'CENTRO':<10} {'ESTADO':<12} {'MOTIVO':<15}")
-                print("-" * 90)
+                print("\n" + "-" * 120)
+                print(f"{'ID':<6} {'FECHA':<18} {'PACIENTE':<22} {'DOCTOR':<22} {'CENTRO':<22} {'ESTADO':<12} {'MOTIVO':<15}")
+                print("-" * 120)
 
                 if citas:
                     for c in citas:
                         fecha = c.get('fecha', '-')[:16] if c.get('fecha') else '-'
-                        print(f"{c['id_cita']:<6} {fecha:<20} {c['id_paciente']:<10} {c['id_doctor']:<10} {c['id_centro']:<10} {c.get('estado', '-'):<12} {(c.get('motivo', '-') or '-')[:15]:<15}")
+                        # Nombres de la proyección del servicio de citas (id si aún no se conoce)
+                        paciente = (c.get('nombre_paciente') or str(c['id_paciente']))[:20]
+                        doctor = (c.get('nombre_doctor') or str(c['id_doctor']))[:20]
+                        centro = (c.get('nombre_centro') or str(c['id_centro']))[:20]
+                        print(f"{c['id_cita']:<6} {fecha:<18} {paciente:<22} {doctor:<22} {centro:<22} {c.get('estado', '-'):<12} {(c.get('motivo', '-') or '-')[:15]:<15}")
                 else:
                     print("  No hay citas registradas")
 
-                print("-" * 90)
+                print("-" * 120)
                 print(f"Total: {data.get('total', 0)} citas")
             else:
                 self.mostrar_error(response.json().get('error', 'Error al listar citas'))
@@ -666,7 +717,7 @@ class OdontoCareMenu:
         id_cita = self.solicitar_dato("Ingrese el ID de la cita")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_CITAS}/citas/{id_cita}",
                 headers=self.headers,
                 timeout=10
@@ -681,9 +732,9 @@ class OdontoCareMenu:
                 print(f"  Fecha:       {cita.get('fecha', '-')}")
                 print(f"  Motivo:      {cita.get('motivo', '-')}")
                 print(f"  Estado:      {cita.get('estado', '-')}")
-                print(f"  ID Paciente: {cita['id_paciente']}")
-                print(f"  ID Doctor:   {cita['id_doctor']}")
-                print(f"  ID Centro:   {cita['id_centro']}")
+                print(f"  Paciente:    {cita['id_paciente']} - {cita.get('nombre_paciente') or '-'}")
+                print(f"  Doctor:      {cita['id_doctor']} - {cita.get('nombre_doctor') or '-'}")
+                print(f"  Centro:      {cita['id_centro']} - {cita.get('nombre_centro') or '-'}")
                 print("-" * 40)
             else:
                 self.mostrar_error(response.json().get('error', 'Cita no encontrada'))
@@ -700,9 +751,9 @@ class OdontoCareMenu:
         # Mostrar pacientes disponibles
         print("PACIENTES DISPONIBLES:")
         try:
-            resp = requests.get(f"{URL_USUARIOS}/admin/pacientes", headers=self.headers, timeout=10)
-            if resp.status_code == 200:
-                for p in resp.json().get('pacientes', []):
+            data = self.obtener_referencias('pacientes')
+            if data:
+                for p in data.get('pacientes', []):
                     estado_marca = "[ACTIVO]" if p.get('estado') == 'ACTIVO' else "[INACTIVO]"
                     print(f"  {p['id_paciente']} - {p['nombre']} {estado_marca}")
         except:
@@ -713,9 +764,9 @@ class OdontoCareMenu:
         # Mostrar doctores disponibles
         print("\nDOCTORES DISPONIBLES:")
         try:
-            resp = requests.get(f"{URL_USUARIOS}/admin/doctores", headers=self.headers, timeout=10)
-            if resp.status_code == 200:
-                for d in resp.json().get('doctores', []):
+            data = self.obtener_referencias('doctores')
+            if data:
+                for d in data.get('doctores', []):
                     print(f"  {d['id_doctor']} - {d['nombre']} ({d.get('especialidad', '-')})")
         except:
             pass
@@ -725,9 +776,9 @@ class OdontoCareMenu:
         # Mostrar centros disponibles
         print("\nCENTROS DISPONIBLES:")
         try:
-            resp = requests.get(f"{URL_USUARIOS}/admin/centros", headers=self.headers, timeout=10)
-            if resp.status_code == 200:
-                for c in resp.json().get('centros', []):
+            data = self.obtener_referencias('centros')
+            if data:
+                for c in data.get('centros', []):
                     print(f"  {c['id_centro']} - {c['nombre']}")
         except:
             pass
@@ -752,7 +803,7 @@ class OdontoCareMenu:
 
         # Crear la cita
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_CITAS}/citas",
                 json={
                     "id_paciente": int(id_paciente),
@@ -789,7 +840,7 @@ class OdontoCareMenu:
 
         if confirmar == 's':
             try:
-                response = requests.put(
+                response = self.session.put(
                     f"{URL_CITAS}/citas/{id_cita}",
                     json={"estado": "CANCELADA"},
                     headers=self.headers,
@@ -813,9 +864,9 @@ class OdontoCareMenu:
         # Mostrar doctores
         print("\nDOCTORES DISPONIBLES:")
         try:
-            resp = requests.get(f"{URL_USUARIOS}/admin/doctores", headers=self.headers, timeout=10)
-            if resp.status_code == 200:
-                for d in resp.json().get('doctores', []):
+            data = self.obtener_referencias('doctores')
+            if data:
+                for d in data.get('doctores', []):
                     print(f"  {d['id_doctor']} - {d['nombre']}")
         except:
             pass
@@ -824,7 +875,7 @@ class OdontoCareMenu:
         fecha = self.solicitar_dato("Fecha a consultar (YYYY-MM-DD)")
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_CITAS}/citas/doctor/{id_doctor}/disponibilidad",
                 params={"fecha": fecha},
                 headers=self.headers,
@@ -883,7 +934,7 @@ class OdontoCareMenu:
     def listar_usuarios(self):
         """Lista todos los usuarios"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{URL_USUARIOS}/admin/usuarios",
                 headers=self.headers,
                 timeout=10
@@ -929,7 +980,7 @@ class OdontoCareMenu:
         rol = "admin" if rol_opcion == '1' else "secretaria"
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{URL_USUARIOS}/admin/usuario",
                 json={
                     "username": username,
@@ -943,6 +994,7 @@ class OdontoCareMenu:
             if response.status_code == 201:
                 usuario = response.json()['usuario']
                 self.mostrar_exito(f"Usuario creado con ID: {usuario['id_usuario']}")
+                self.invalidar_cache()
                 print(f"  Username: {usuario['username']}")
                 print(f"  Rol: {usuario['rol']}")
             else:
@@ -968,7 +1020,7 @@ class OdontoCareMenu:
 
         if confirmar == 's':
             try:
-                response = requests.delete(
+                response = self.session.delete(
                     f"{URL_USUARIOS}/admin/usuarios/{id_usuario}",
                     headers=self.headers,
                     timeout=10
@@ -976,6 +1028,7 @@ class OdontoCareMenu:
 
                 if response.status_code == 200:
                     self.mostrar_exito("Usuario eliminado correctamente")
+                    self.invalidar_cache()
                 else:
                     self.mostrar_error(response.json().get('error', 'Error al eliminar usuario'))
 
@@ -995,20 +1048,18 @@ class OdontoCareMenu:
         print("=" * 50)
 
         try:
-            # Contar doctores
-            resp = requests.get(f"{URL_USUARIOS}/admin/doctores", headers=self.headers, timeout=10)
-            total_doctores = resp.json().get('total', 0) if resp.status_code == 200 else 'Error'
+            # Contar doctores, pacientes y centros (listas en cache)
+            data = self.obtener_referencias('doctores')
+            total_doctores = data.get('total', 0) if data else 'Error'
 
-            # Contar pacientes
-            resp = requests.get(f"{URL_USUARIOS}/admin/pacientes", headers=self.headers, timeout=10)
-            total_pacientes = resp.json().get('total', 0) if resp.status_code == 200 else 'Error'
+            data = self.obtener_referencias('pacientes')
+            total_pacientes = data.get('total', 0) if data else 'Error'
 
-            # Contar centros
-            resp = requests.get(f"{URL_USUARIOS}/admin/centros", headers=self.headers, timeout=10)
-            total_centros = resp.json().get('total', 0) if resp.status_code == 200 else 'Error'
+            data = self.obtener_referencias('centros')
+            total_centros = data.get('total', 0) if data else 'Error'
 
             # Contar citas
-            resp = requests.get(f"{URL_CITAS}/citas", headers=self.headers, timeout=10)
+            resp = self.session.get(f"{URL_CITAS}/citas", headers=self.headers, timeout=10)
             total_citas = resp.json().get('total', 0) if resp.status_code == 200 else 'Error'
 
             print(f"\n  Doctores registrados:  {total_doctores}")
@@ -6,8 +6,11 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
 
+from app.compresion import Compresion
+
 # Inicializar extensiones
 db = SQLAlchemy()
+compresion = Compresion()
 
 
 def create_app(config_name='default'):
@@ -26,8 +29,13 @@ def create_app(config_name='default'):
     from config import config
     app.config.from_object(config[config_name])
 
+    # Serialización JSON (orjson si está disponible)
+    from app.json_provider import JSONProviderRapido
+    app.json = JSONProviderRapido(app)
+
     # Inicializar extensiones con la app
     db.init_app(app)
+    compresion.init_app(app)
 
     # Registrar blueprints
     from app.blueprints.citas_bp import citas_bp
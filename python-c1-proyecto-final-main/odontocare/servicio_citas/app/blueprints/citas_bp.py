@@ -5,11 +5,14 @@ Maneja CRUD de citas médicas con validaciones de negocio
 from flask import Blueprint, request, jsonify, current_app
 from functools import wraps
 from datetime import datetime
+from sqlalchemy.orm import aliased
 import jwt
 
 from app import db
 from app.models.cita import Cita
+from app.models.referencia import Referencia
 from app.services.usuarios_client import UsuariosServiceClient
+from app.services.proyeccion_referencias import ProyeccionReferencias
 
 citas_bp = Blueprint('citas', __name__)
 
@@ -155,6 +158,11 @@ def crear_cita(current_user):
             'error': 'El doctor ya tiene una cita programada en esa fecha y hora'
         }), 409
 
+    # Aprovechar los datos ya obtenidos para actualizar la proyección local
+    ProyeccionReferencias.registrar('doctor', doctor)
+    ProyeccionReferencias.registrar('centro', centro)
+    ProyeccionReferencias.registrar('paciente', paciente)
+
     # Crear la cita
     nueva_cita = Cita(
         fecha=fecha,
@@ -171,7 +179,7 @@ def crear_cita(current_user):
 
     return jsonify({
         'mensaje': 'Cita creada exitosamente',
-        'cita': nueva_cita.to_dict()
+        'cita': ProyeccionReferencias.enriquecer(nueva_cita.to_dict())
     }), 201
 
 
@@ -186,24 +194,35 @@ def listar_citas(current_user):
     - Admin: puede filtrar por doctor, centro, fecha, estado o paciente
 
     Query params: fecha, id_doctor, id_centro, id_paciente, estado
+
+    Cada cita incluye nombre_doctor, especialidad_doctor, nombre_paciente,
+    estado_paciente y nombre_centro, obtenidos de la proyección local
+    (una sola consulta con JOIN, sin llamadas al servicio de usuarios por cita).
     """
     query = Cita.query
+    token = request.token
+
+    # Refresco incremental de la proyección en segundo plano (como mucho una vez por TTL)
+    ProyeccionReferencias.refrescar_en_segundo_plano(token)
 
     # Filtros según rol
     if current_user['rol'] == 'medico':
         # El doctor solo ve sus citas
-        # Buscar el id_doctor asociado al usuario
-        token = request.token
-        doctores = UsuariosServiceClient.listar_doctores(token)
-        if doctores and 'doctores' in doctores:
-            doctor_usuario = next(
-                (d for d in doctores['doctores'] if d.get('id_usuario') == current_user['id_usuario']),
-                None
-            )
-            if doctor_usuario:
-                query = query.filter(Cita.id_doctor == doctor_usuario['id_doctor'])
-            else:
-                return jsonify({'total': 0, 'citas': []}), 200
+        # Buscar el id_doctor asociado al usuario (primero en la proyección local)
+        id_doctor = ProyeccionReferencias.buscar_por_usuario('doctor', current_user['id_usuario'])
+        if id_doctor is None:
+            doctores = UsuariosServiceClient.listar_doctores(token)
+            if doctores and 'doctores' in doctores:
+                doctor_usuario = next(
+                    (d for d in doctores['doctores'] if d.get('id_usuario') == current_user['id_usuario']),
+                    None
+                )
+                if doctor_usuario:
+                    id_doctor = doctor_usuario['id_doctor']
+                else:
+                    return jsonify({'total': 0, 'citas': []}), 200
+        if id_doctor is not None:
+            query = query.filter(Cita.id_doctor == id_doctor)
 
     elif current_user['rol'] == 'secretaria':
         # Secretaria puede filtrar por fecha
@@ -240,25 +259,49 @@ def listar_citas(current_user):
 
     elif current_user['rol'] == 'paciente':
         # El paciente solo ve sus propias citas
-        token = request.token
-        pacientes = UsuariosServiceClient.listar_pacientes(token)
-        if pacientes and 'pacientes' in pacientes:
-            paciente_usuario = next(
-                (p for p in pacientes['pacientes'] if p.get('id_usuario') == current_user['id_usuario']),
-                None
-            )
-            if paciente_usuario:
-                query = query.filter(Cita.id_paciente == paciente_usuario['id_paciente'])
-            else:
-                return jsonify({'total': 0, 'citas': []}), 200
+        id_paciente = ProyeccionReferencias.buscar_por_usuario('paciente', current_user['id_usuario'])
+        if id_paciente is None:
+            pacientes = UsuariosServiceClient.listar_pacientes(token)
+            if pacientes and 'pacientes' in pacientes:
+                paciente_usuario = next(
+                    (p for p in pacientes['pacientes'] if p.get('id_usuario') == current_user['id_usuario']),
+                    None
+                )
+                if paciente_usuario:
+                    id_paciente = paciente_usuario['id_paciente']
+                else:
+                    return jsonify({'total': 0, 'citas': []}), 200
+        if id_paciente is not None:
+            query = query.filter(Cita.id_paciente == id_paciente)
+
+    # Enriquecer con la proyección local mediante LEFT JOIN
+    doctor = aliased(Referencia)
+    paciente = aliased(Referencia)
+    centro = aliased(Referencia)
+    query = query.outerjoin(
+        doctor, db.and_(doctor.tipo == 'doctor', doctor.id_ref == Cita.id_doctor)
+    ).outerjoin(
+        paciente, db.and_(paciente.tipo == 'paciente', paciente.id_ref == Cita.id_paciente)
+    ).outerjoin(
+        centro, db.and_(centro.tipo == 'centro', centro.id_ref == Cita.id_centro)
+    ).with_entities(
+        # Consulta por columnas: no se hidratan objetos Cita
+        *Cita.columnas_dict(),
+        doctor.nombre.label('nombre_doctor'),
+        doctor.especialidad.label('especialidad_doctor'),
+        paciente.nombre.label('nombre_paciente'),
+        paciente.estado.label('estado_paciente'),
+        centro.nombre.label('nombre_centro')
+    )
 
     # Ordenar por fecha
     query = query.order_by(Cita.fecha.desc())
 
-    citas = query.all()
+    filas = query.all()
     return jsonify({
-        'total': len(citas),
-        'citas': [c.to_dict() for c in citas]
+        'total': len(filas),
+        # Las fechas quedan como datetime; las serializa el proveedor JSON
+        'citas': [fila._asdict() for fila in filas]
     }), 200
 
 
@@ -270,7 +313,7 @@ def obtener_cita(current_user, id_cita):
     if not cita:
         return jsonify({'error': 'Cita no encontrada'}), 404
 
-    return jsonify(cita.to_dict()), 200
+    return jsonify(ProyeccionReferencias.enriquecer(cita.to_dict())), 200
 
 
 @citas_bp.route('/<int:id_cita>', methods=['PUT'])
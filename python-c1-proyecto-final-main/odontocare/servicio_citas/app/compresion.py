@@ -0,0 +1,91 @@
+"""
+Compresión gzip negociada de las respuestas
+
+Los listados (citas, pacientes, usuarios...) son JSON muy repetitivo que se
+comprime a una fracción de su tamaño. Se comprime solo si:
+- El cliente acepta gzip (cabecera Accept-Encoding)
+- El tipo de contenido es comprimible (COMPRESION_TIPOS)
+- La respuesta no viene ya codificada ni prohíbe transformaciones
+- El cuerpo supera COMPRESION_UMBRAL_BYTES (las respuestas pequeñas no compensan)
+
+Las respuestas en streaming se comprimen trozo a trozo, vaciando el compresor
+tras cada uno para no retener datos que el cliente espera.
+"""
+from flask import request
+import gzip
+import zlib
+
+
+def _comprimir_flujo(iterable, nivel):
+    """Comprime un iterable de trozos como un único flujo gzip"""
+    # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    try:
+        for trozo in iterable:
+            if isinstance(trozo, str):
+                trozo = trozo.encode('utf-8')
+            datos = compresor.compress(trozo) + compresor.flush(zlib.Z_SYNC_FLUSH)
+            if datos:
+                yield datos
+        yield compresor.flush()
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+class Compresion:
+    """
+    Extensión Flask de compresión de respuestas
+
+    Uso:
+        compresion.init_app(app)
+    """
+
+    def __init__(self):
+        self.habilitada = True
+        self.umbral = 1024
+        self.nivel = 6
+        self.tipos = set()
+
+    def init_app(self, app):
+        """Lee la configuración y registra el hook after_request"""
+        self.habilitada = app.config.get('COMPRESION_HABILITADA', True)
+        self.umbral = app.config.get('COMPRESION_UMBRAL_BYTES', 1024)
+        self.nivel = app.config.get('COMPRESION_NIVEL', 6)
+        self.tipos = set(app.config.get('COMPRESION_TIPOS', ('application/json',)))
+
+        app.after_request(self.comprimir)
+        app.extensions['compresion'] = self
+
+    def _aplicable(self, response):
+        """Indica si la respuesta se puede y se debe comprimir"""
+        if not self.habilitada or request.accept_encodings['gzip'] <= 0:
+            return False
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        return response.mimetype in self.tipos
+
+    def comprimir(self, response):
+        """Hook after_request: comprime la respuesta si procede"""
+        # La respuesta depende de Accept-Encoding aunque no se llegue a comprimir
+        response.vary.add('Accept-Encoding')
+
+        if not self._aplicable(response):
+            return response
+
+        if response.is_streamed:
+            response.response = _comprimir_flujo(response.response, self.nivel)
+            response.headers.pop('Content-Length', None)
+        else:
+            datos = response.get_data()
+            if len(datos) < self.umbral:
+                return response
+            # mtime=0: misma entrada, mismos bytes (útil para ETag y cachés)
+            response.set_data(gzip.compress(datos, self.nivel, mtime=0))
+
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,73 @@
+"""
+Proveedor JSON de la aplicación
+
+Sustituye al proveedor por defecto de Flask para que jsonify y request.get_json
+usen orjson cuando está instalado (serializa listados grandes varias veces más
+rápido que el módulo json de la biblioteca estándar). Si no lo está, o si la
+configuración JSON_BACKEND es 'stdlib', se usa el módulo json.
+
+Ambos backends producen documentos equivalentes:
+- Claves ordenadas (igual que Flask por defecto)
+- orjson escribe los caracteres no ASCII en UTF-8 en lugar de escaparlos
+- Fechas en ISO 8601, de modo que las consultas por columnas pueden devolver
+  datetime sin pasar por isoformat() fila a fila
+"""
+from datetime import date, time
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _por_defecto(o):
+    """Serializa tipos no nativos de JSON (fechas en ISO 8601, el resto como Flask)"""
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    return _default(o)
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """
+    Proveedor JSON con orjson como backend opcional
+
+    Uso:
+        app.json = JSONProviderRapido(app)
+    """
+
+    default = staticmethod(_por_defecto)
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        self.usar_orjson = orjson is not None and backend != 'stdlib'
+
+    def _opciones(self, indentar=False):
+        opciones = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps(self, obj, **kwargs):
+        # Con argumentos extra (indent, separators...) se delega en json
+        if not self.usar_orjson or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_por_defecto, option=self._opciones()).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.usar_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.usar_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        # Mismo criterio que Flask: salida indentada en modo debug
+        indentar = self.compact is False or (self.compact is None and self._app.debug)
+        cuerpo = orjson.dumps(obj, default=_por_defecto, option=self._opciones(indentar))
+        return self._app.response_class(cuerpo + b'\n', mimetype=self.mimetype)
@@ -2,5 +2,6 @@
 Modelos del Servicio de Citas
 """
 from app.models.cita import Cita
+from app.models.referencia import Referencia, EstadoProyeccion
 
-__all__ = ['Cita']
+__all__ = ['Cita', 'Referencia', 'EstadoProyeccion']
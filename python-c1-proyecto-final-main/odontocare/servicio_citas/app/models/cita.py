@@ -28,6 +28,17 @@ class Cita(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Campos de to_dict(), para listados por columnas sin hidratar objetos ORM
+    CAMPOS_DICT = (
+        'id_cita', 'fecha', 'motivo', 'estado', 'id_paciente', 'id_doctor',
+        'id_centro', 'id_usuario_registra', 'created_at', 'updated_at'
+    )
+
+    @classmethod
+    def columnas_dict(cls):
+        """Columnas equivalentes a to_dict() para Query.with_entities()"""
+        return [getattr(cls, campo) for campo in cls.CAMPOS_DICT]
+
     def to_dict(self):
         """Convierte la cita a diccionario"""
         return {
@@ -0,0 +1,59 @@
+"""
+Modelos de la proyección local de referencias
+
+Copia desnormalizada y compacta de los datos de doctores, pacientes y centros
+que necesita el servicio de citas para mostrar nombres en los listados.
+Se alimenta vía REST desde el servicio de usuarios (nunca accede a su BD).
+"""
+from app import db
+from datetime import datetime
+
+
+class Referencia(db.Model):
+    """
+    Entrada de la proyección: id -> nombre/especialidad/estado
+
+    Tipos: doctor, paciente, centro
+    """
+    __tablename__ = 'referencias'
+
+    tipo = db.Column(db.String(10), primary_key=True)
+    id_ref = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=True)
+    especialidad = db.Column(db.String(100), nullable=True)
+    estado = db.Column(db.String(10), nullable=True)
+    id_usuario = db.Column(db.Integer, nullable=True, index=True)
+
+    sincronizado_en = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convierte la referencia a diccionario"""
+        return {
+            'tipo': self.tipo,
+            'id': self.id_ref,
+            'nombre': self.nombre,
+            'especialidad': self.especialidad,
+            'estado': self.estado,
+            'id_usuario': self.id_usuario
+        }
+
+    def __repr__(self):
+        return f'<Referencia {self.tipo} {self.id_ref} - {self.nombre}>'
+
+
+class EstadoProyeccion(db.Model):
+    """
+    Estado de sincronización de la proyección por tipo de referencia
+
+    marca_agua es la mayor fecha de modificación recibida del servicio de
+    usuarios (su reloj, no el nuestro), usada en la siguiente petición incremental.
+    """
+    __tablename__ = 'estado_proyeccion'
+
+    tipo = db.Column(db.String(10), primary_key=True)
+    marca_agua = db.Column(db.String(32), nullable=True)
+    refrescado_en = db.Column(db.DateTime, nullable=True)
+    resincronizado_en = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<EstadoProyeccion {self.tipo} - {self.marca_agua}>'
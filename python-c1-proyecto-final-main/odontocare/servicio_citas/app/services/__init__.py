@@ -2,5 +2,6 @@
 Servicios del módulo de Citas
 """
 from app.services.usuarios_client import UsuariosServiceClient
+from app.services.proyeccion_referencias import ProyeccionReferencias
 
-__all__ = ['UsuariosServiceClient']
+__all__ = ['UsuariosServiceClient', 'ProyeccionReferencias']
@@ -0,0 +1,245 @@
+"""
+Proyección local de referencias del Servicio de Usuarios
+
+Mantiene en la BD de citas una tabla compacta id -> nombre/especialidad/estado
+de doctores, pacientes y centros, para que los listados de citas se puedan
+enriquecer con una sola consulta local en lugar de N llamadas REST.
+
+La proyección se refresca de forma incremental (solo lo modificado desde la
+última marca de agua) como mucho una vez cada PROYECCION_TTL_SEGUNDOS, y se
+resincroniza completa cada PROYECCION_RESYNC_SEGUNDOS para eliminar registros
+borrados en origen. Además, crear_cita la actualiza al vuelo con los datos que
+ya obtiene para validar.
+
+Los listados no esperan al refresco: lo lanzan en un hilo en segundo plano
+(uno por proceso como mucho) y siguen sirviendo la proyección existente. Las
+escrituras son upserts (INSERT ... ON CONFLICT DO UPDATE), de modo que varios
+workers refrescando a la vez, o un refresco junto a una cita nueva, no chocan
+por la clave primaria.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.referencia import Referencia, EstadoProyeccion
+from app.services.usuarios_client import UsuariosServiceClient
+
+# Dialectos con INSERT ... ON CONFLICT DO UPDATE
+INSERT_POR_DIALECTO = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# Filas por sentencia de upsert (SQLite limita el número de parámetros)
+FILAS_POR_UPSERT = 500
+
+
+class ProyeccionReferencias:
+    """
+    Mantenimiento y consulta de la proyección de referencias
+    """
+
+    # tipo -> (método del cliente, clave de la lista en la respuesta, clave del id)
+    TIPOS = {
+        'doctor': ('listar_doctores', 'doctores', 'id_doctor'),
+        'paciente': ('listar_pacientes', 'pacientes', 'id_paciente'),
+        'centro': ('listar_centros', 'centros', 'id_centro'),
+    }
+
+    # Refresco en segundo plano: uno en curso como mucho por proceso
+    _refresco_en_curso = threading.Lock()
+    _proximo_refresco = 0.0
+
+    @staticmethod
+    def refrescar_en_segundo_plano(token):
+        """
+        Lanza el refresco en un hilo si ha pasado el TTL, sin bloquear la petición
+
+        Si la proyección está vacía (primer arranque) se carga en la propia
+        petición para que el primer listado ya tenga nombres. Un fallo del
+        refresco nunca hace fallar la petición: se registra y se sigue
+        sirviendo la proyección existente.
+
+        Args:
+            token: Token JWT del usuario (el servicio no tiene credenciales propias)
+
+        Returns:
+            True si se ha lanzado un refresco
+        """
+        if time.monotonic() < ProyeccionReferencias._proximo_refresco:
+            return False
+        if not ProyeccionReferencias._refresco_en_curso.acquire(blocking=False):
+            return False
+
+        app = current_app._get_current_object()
+        ProyeccionReferencias._proximo_refresco = (
+            time.monotonic() + app.config.get('PROYECCION_TTL_SEGUNDOS', 30)
+        )
+
+        def tarea():
+            try:
+                with app.app_context():
+                    ProyeccionReferencias._refrescar_seguro(token)
+            finally:
+                ProyeccionReferencias._refresco_en_curso.release()
+
+        if EstadoProyeccion.query.first() is None:
+            tarea()
+        else:
+            threading.Thread(target=tarea, name='refresco-proyeccion', daemon=True).start()
+        return True
+
+    @staticmethod
+    def _refrescar_seguro(token):
+        """refrescar() que registra los errores en lugar de propagarlos"""
+        try:
+            ProyeccionReferencias.refrescar(token)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error refrescando la proyección de referencias: {e}")
+
+    @staticmethod
+    def refrescar(token, forzar=False):
+        """
+        Refresca la proyección si ha pasado el TTL desde el último refresco
+
+        Args:
+            token: Token JWT del usuario (el servicio no tiene credenciales propias)
+            forzar: Refrescar aunque no haya pasado el TTL
+        """
+        ahora = datetime.utcnow()
+        ttl = timedelta(seconds=current_app.config.get('PROYECCION_TTL_SEGUNDOS', 30))
+        resync = timedelta(seconds=current_app.config.get('PROYECCION_RESYNC_SEGUNDOS', 3600))
+
+        for tipo, (metodo, clave_lista, clave_id) in ProyeccionReferencias.TIPOS.items():
+            estado = EstadoProyeccion.query.get(tipo) or EstadoProyeccion(tipo=tipo)
+
+            if not forzar and estado.refrescado_en and ahora - estado.refrescado_en < ttl:
+                continue
+
+            completo = (
+                forzar
+                or estado.marca_agua is None
+                or estado.resincronizado_en is None
+                or ahora - estado.resincronizado_en >= resync
+            )
+            desde = None if completo else estado.marca_agua
+
+            respuesta = getattr(UsuariosServiceClient, metodo)(token, actualizado_desde=desde)
+            if not respuesta or clave_lista not in respuesta:
+                # Servicio no disponible: se sigue sirviendo la proyección existente
+                continue
+
+            registros = respuesta[clave_lista]
+            ProyeccionReferencias._aplicar(tipo, clave_id, registros, completo, ahora)
+
+            ProyeccionReferencias._upsert(EstadoProyeccion, [{
+                'tipo': tipo,
+                'marca_agua': respuesta.get('marca_agua') or estado.marca_agua,
+                'refrescado_en': ahora,
+                'resincronizado_en': ahora if completo else estado.resincronizado_en,
+            }])
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Solo posible en dialectos sin upsert: otro worker ha refrescado a la vez
+            db.session.rollback()
+
+    @staticmethod
+    def _aplicar(tipo, clave_id, registros, completo, ahora):
+        """Hace upsert de los registros recibidos y, si es completo, poda los ausentes"""
+        filas = {}
+        for datos in registros:
+            id_ref = datos.get(clave_id)
+            if id_ref is not None:
+                filas[id_ref] = ProyeccionReferencias._fila(tipo, id_ref, datos, ahora)
+        ProyeccionReferencias._upsert(Referencia, list(filas.values()))
+
+        if completo:
+            Referencia.query.filter(
+                Referencia.tipo == tipo,
+                Referencia.id_ref.notin_(list(filas))
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def _fila(tipo, id_ref, datos, ahora):
+        """Fila de la tabla referencias con los campos relevantes de la respuesta REST"""
+        return {
+            'tipo': tipo,
+            'id_ref': id_ref,
+            'nombre': datos.get('nombre'),
+            'especialidad': datos.get('especialidad'),
+            'estado': datos.get('estado'),
+            'id_usuario': datos.get('id_usuario'),
+            'sincronizado_en': ahora,
+        }
+
+    @staticmethod
+    def _upsert(modelo, filas):
+        """
+        INSERT ... ON CONFLICT (clave primaria) DO UPDATE de varias filas
+
+        En dialectos sin ON CONFLICT se recurre a session.merge (leer y escribir).
+        """
+        if not filas:
+            return
+        insert = INSERT_POR_DIALECTO.get(db.session.get_bind().dialect.name)
+        if insert is None:
+            for fila in filas:
+                db.session.merge(modelo(**fila))
+            return
+
+        claves = [columna.name for columna in modelo.__table__.primary_key]
+        for inicio in range(0, len(filas), FILAS_POR_UPSERT):
+            sentencia = insert(modelo).values(filas[inicio:inicio + FILAS_POR_UPSERT])
+            sentencia = sentencia.on_conflict_do_update(
+                index_elements=claves,
+                set_={campo: sentencia.excluded[campo] for campo in filas[0] if campo not in claves}
+            )
+            db.session.execute(sentencia)
+
+    @staticmethod
+    def registrar(tipo, datos):
+        """
+        Actualiza una referencia al vuelo con datos ya obtenidos vía REST
+
+        Se guarda con el siguiente commit de la sesión (el de la cita).
+
+        Args:
+            tipo: doctor, paciente o centro
+            datos: dict devuelto por el servicio de usuarios
+        """
+        clave_id = ProyeccionReferencias.TIPOS[tipo][2]
+        id_ref = datos.get(clave_id)
+        if id_ref is None:
+            return
+        ProyeccionReferencias._upsert(
+            Referencia, [ProyeccionReferencias._fila(tipo, id_ref, datos, datetime.utcnow())]
+        )
+
+    @staticmethod
+    def buscar_por_usuario(tipo, id_usuario):
+        """Devuelve el id del doctor/paciente asociado a un usuario, o None"""
+        referencia = Referencia.query.filter_by(tipo=tipo, id_usuario=id_usuario).first()
+        return referencia.id_ref if referencia else None
+
+    @staticmethod
+    def enriquecer(cita_dict):
+        """
+        Añade nombres de doctor, paciente y centro al diccionario de una cita
+
+        Solo consulta la proyección local (búsquedas por clave primaria).
+        """
+        doctor = Referencia.query.get(('doctor', cita_dict['id_doctor']))
+        paciente = Referencia.query.get(('paciente', cita_dict['id_paciente']))
+        centro = Referencia.query.get(('centro', cita_dict['id_centro']))
+        cita_dict.update({
+            'nombre_doctor': doctor.nombre if doctor else None,
+            'especialidad_doctor': doctor.especialidad if doctor else None,
+            'nombre_paciente': paciente.nombre if paciente else None,
+            'estado_paciente': paciente.estado if paciente else None,
+            'nombre_centro': centro.nombre if centro else None
+        })
+        return cita_dict
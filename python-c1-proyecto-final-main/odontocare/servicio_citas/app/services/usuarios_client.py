@@ -114,12 +114,20 @@ class UsuariosServiceClient:
             return None
 
     @staticmethod
-    def listar_doctores(token):
-        """Lista todos los doctores"""
+    def listar_doctores(token, actualizado_desde=None):
+        """
+        Lista todos los doctores
+
+        Args:
+            token: Token JWT para autenticación
+            actualizado_desde: Marca de agua ISO 8601; si se indica, solo
+                devuelve los doctores modificados desde esa fecha
+        """
         try:
             url = f"{UsuariosServiceClient.get_base_url()}/admin/doctores"
             headers = {'Authorization': f'Bearer {token}'}
-            response = requests.get(url, headers=headers, timeout=5)
+            params = {'actualizado_desde': actualizado_desde} if actualizado_desde else None
+            response = requests.get(url, headers=headers, params=params, timeout=5)
 
             if response.status_code == 200:
                 return response.json()
@@ -129,12 +137,20 @@ class UsuariosServiceClient:
             return None
 
     @staticmethod
-    def listar_pacientes(token):
-        """Lista todos los pacientes"""
+    def listar_pacientes(token, actualizado_desde=None):
+        """
+        Lista todos los pacientes
+
+        Args:
+            token: Token JWT para autenticación
+            actualizado_desde: Marca de agua ISO 8601; si se indica, solo
+                devuelve los pacientes modificados desde esa fecha
+        """
         try:
             url = f"{UsuariosServiceClient.get_base_url()}/admin/pacientes"
             headers = {'Authorization': f'Bearer {token}'}
-            response = requests.get(url, headers=headers, timeout=5)
+            params = {'actualizado_desde': actualizado_desde} if actualizado_desde else None
+            response = requests.get(url, headers=headers, params=params, timeout=5)
 
             if response.status_code == 200:
                 return response.json()
@@ -144,12 +160,20 @@ class UsuariosServiceClient:
             return None
 
     @staticmethod
-    def listar_centros(token):
-        """Lista todos los centros"""
+    def listar_centros(token, actualizado_desde=None):
+        """
+        Lista todos los centros
+
+        Args:
+            token: Token JWT para autenticación
+            actualizado_desde: Marca de agua ISO 8601; si se indica, solo
+                devuelve los centros modificados desde esa fecha
+        """
         try:
             url = f"{UsuariosServiceClient.get_base_url()}/admin/centros"
             headers = {'Authorization': f'Bearer {token}'}
-            response = requests.get(url, headers=headers, timeout=5)
+            params = {'actualizado_desde': actualizado_desde} if actualizado_desde else None
+            response = requests.get(url, headers=headers, params=params, timeout=5)
 
             if response.status_code == 200:
                 return response.json()
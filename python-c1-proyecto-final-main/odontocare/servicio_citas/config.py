@@ -16,12 +16,27 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Backend JSON: 'auto' (orjson si está instalado) o 'stdlib'
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Compresión gzip de respuestas (si el cliente la acepta)
+    COMPRESION_HABILITADA = os.environ.get('COMPRESION_HABILITADA', 'true').lower() == 'true'
+    COMPRESION_UMBRAL_BYTES = int(os.environ.get('COMPRESION_UMBRAL_BYTES', 1024))
+    COMPRESION_NIVEL = int(os.environ.get('COMPRESION_NIVEL', 6))
+    COMPRESION_TIPOS = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
     # URL del servicio de usuarios para comunicación REST
     SERVICIO_USUARIOS_URL = os.environ.get(
         'SERVICIO_USUARIOS_URL',
         'http://localhost:5001'
     )
 
+    # Proyección local de referencias (doctores, pacientes, centros)
+    # Segundos entre refrescos incrementales y entre resincronizaciones completas
+    # (la completa elimina de la proyección los registros borrados en origen)
+    PROYECCION_TTL_SEGUNDOS = int(os.environ.get('PROYECCION_TTL_SEGUNDOS', 30))
+    PROYECCION_RESYNC_SEGUNDOS = int(os.environ.get('PROYECCION_RESYNC_SEGUNDOS', 3600))
+
 
 class DevelopmentConfig(Config):
     """Configuración de desarrollo"""
@@ -6,8 +6,28 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import os
 
+from app.compresion import Compresion
+from app.limitador import Limitador
+
 # Inicializar extensiones
 db = SQLAlchemy()
+limitador = Limitador()
+compresion = Compresion()
+
+
+def migrar_columnas_actualizacion():
+    """
+    Añade la columna updated_at a bases de datos creadas antes de que existiera
+
+    db.create_all() no altera tablas existentes, y los volúmenes de Docker
+    conservan la base de datos entre versiones.
+    """
+    inspector = db.inspect(db.engine)
+    for tabla in ('doctores', 'pacientes', 'centros'):
+        columnas = {c['name'] for c in inspector.get_columns(tabla)}
+        if 'updated_at' not in columnas:
+            with db.engine.begin() as conexion:
+                conexion.execute(db.text(f'ALTER TABLE {tabla} ADD COLUMN updated_at DATETIME'))
 
 
 def create_app(config_name='default'):
@@ -26,8 +46,14 @@ def create_app(config_name='default'):
     from config import config
     app.config.from_object(config[config_name])
 
+    # Serialización JSON (orjson si está disponible)
+    from app.json_provider import JSONProviderRapido
+    app.json = JSONProviderRapido(app)
+
     # Inicializar extensiones con la app
     db.init_app(app)
+    limitador.init_app(app)
+    compresion.init_app(app)
 
     # Registrar blueprints
     from app.blueprints.auth_bp import auth_bp
@@ -39,6 +65,7 @@ def create_app(config_name='default'):
     # Crear tablas en la base de datos
     with app.app_context():
         db.create_all()
+        migrar_columnas_actualizacion()
         # Crear usuario admin por defecto si no existe
         from app.models.usuario import Usuario
         admin = Usuario.query.filter_by(username='admin').first()
@@ -3,6 +3,7 @@ Blueprint de Administración - admin_bp
 Maneja CRUD de usuarios, pacientes, doctores y centros médicos
 """
 from flask import Blueprint, request, jsonify
+from datetime import datetime
 
 from app import db
 from app.models.usuario import Usuario
@@ -14,6 +15,40 @@ from app.blueprints.auth_bp import token_required, role_required
 admin_bp = Blueprint('admin', __name__)
 
 
+def filtrar_actualizados(query, modelo):
+    """
+    Aplica el filtro incremental ?actualizado_desde=<ISO 8601>
+
+    Lo usa el servicio de citas para refrescar su proyección local
+    pidiendo solo los registros modificados desde la última sincronización.
+    Se usa >= para no perder registros con la misma marca de tiempo
+    (reenviarlos es inocuo porque el consumidor hace upsert).
+    """
+    desde = request.args.get('actualizado_desde')
+    if desde:
+        try:
+            query = query.filter(modelo.updated_at >= datetime.fromisoformat(desde))
+        except ValueError:
+            pass
+    return query
+
+
+def filas_a_dicts(filas):
+    """
+    Convierte filas de una consulta por columnas en diccionarios
+
+    Evita hidratar objetos ORM en los listados; las fechas se dejan como
+    datetime y las serializa el proveedor JSON de la aplicación.
+    """
+    return [fila._asdict() for fila in filas]
+
+
+def marca_agua(registros):
+    """Devuelve la mayor fecha de modificación de los registros (ISO 8601) o None"""
+    marca = max((r.updated_at for r in registros if r.updated_at), default=None)
+    return marca.isoformat() if marca else request.args.get('actualizado_desde')
+
+
 # ==================== USUARIOS ====================
 
 @admin_bp.route('/usuario', methods=['POST'])
@@ -60,10 +95,10 @@ def crear_usuario(current_user):
 @role_required('admin')
 def listar_usuarios(current_user):
     """Listar todos los usuarios"""
-    usuarios = Usuario.query.all()
+    usuarios = Usuario.query.with_entities(*Usuario.columnas_dict()).all()
     return jsonify({
         'total': len(usuarios),
-        'usuarios': [u.to_dict() for u in usuarios]
+        'usuarios': filas_a_dicts(usuarios)
     }), 200
 
 
@@ -140,11 +175,18 @@ def crear_doctor(current_user):
 @admin_bp.route('/doctores', methods=['GET'])
 @token_required
 def listar_doctores(current_user):
-    """Listar todos los doctores"""
-    doctores = Doctor.query.all()
+    """
+    Listar todos los doctores
+
+    Query params: actualizado_desde (ISO 8601, solo los modificados desde esa fecha)
+    """
+    doctores = filtrar_actualizados(Doctor.query, Doctor).with_entities(
+        *Doctor.columnas_dict()
+    ).all()
     return jsonify({
         'total': len(doctores),
-        'doctores': [d.to_dict() for d in doctores]
+        'doctores': filas_a_dicts(doctores),
+        'marca_agua': marca_agua(doctores)
     }), 200
 
 
@@ -251,11 +293,18 @@ def crear_paciente(current_user):
 @admin_bp.route('/pacientes', methods=['GET'])
 @token_required
 def listar_pacientes(current_user):
-    """Listar todos los pacientes"""
-    pacientes = Paciente.query.all()
+    """
+    Listar todos los pacientes
+
+    Query params: actualizado_desde (ISO 8601, solo los modificados desde esa fecha)
+    """
+    pacientes = filtrar_actualizados(Paciente.query, Paciente).with_entities(
+        *Paciente.columnas_dict()
+    ).all()
     return jsonify({
         'total': len(pacientes),
-        'pacientes': [p.to_dict() for p in pacientes]
+        'pacientes': filas_a_dicts(pacientes),
+        'marca_agua': marca_agua(pacientes)
     }), 200
 
 
@@ -346,11 +395,18 @@ def crear_centro(current_user):
 @admin_bp.route('/centros', methods=['GET'])
 @token_required
 def listar_centros(current_user):
-    """Listar todos los centros médicos"""
-    centros = Centro.query.all()
+    """
+    Listar todos los centros médicos
+
+    Query params: actualizado_desde (ISO 8601, solo los modificados desde esa fecha)
+    """
+    centros = filtrar_actualizados(Centro.query, Centro).with_entities(
+        *Centro.columnas_dict()
+    ).all()
     return jsonify({
         'total': len(centros),
-        'centros': [c.to_dict() for c in centros]
+        'centros': filas_a_dicts(centros),
+        'marca_agua': marca_agua(centros)
     }), 200
 
 
@@ -7,7 +7,7 @@ from functools import wraps
 import jwt
 from datetime import datetime, timedelta, timezone
 
-from app import db
+from app import db, limitador
 from app.models.usuario import Usuario
 
 auth_bp = Blueprint('auth', __name__)
@@ -78,6 +78,7 @@ def role_required(*roles):
 
 
 @auth_bp.route('/login', methods=['POST'])
+@limitador.limitar('login')
 def login():
     """
     Endpoint de login
@@ -124,6 +125,7 @@ def login():
 
 
 @auth_bp.route('/register', methods=['POST'])
+@limitador.limitar('register')
 def register():
     """
     Endpoint de registro público (solo crea usuarios con rol 'paciente')
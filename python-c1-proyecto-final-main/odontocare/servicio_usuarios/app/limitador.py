@@ -0,0 +1,219 @@
+"""
+Limitador de peticiones por token bucket
+
+Protege los endpoints públicos (login, register) de clientes que los saturan:
+cada comprobación de contraseña es deliberadamente lenta, así que sin límite
+un solo cliente puede ocupar todos los workers.
+
+Cada clave (ruta + IP, ruta + username) tiene un cubo con `capacidad` tokens
+que se repone a `por_segundo` tokens/s. Cada petición consume un token; si no
+queda ninguno se responde 429 con la cabecera Retry-After.
+
+Almacenes disponibles (config RATE_LIMIT_STORAGE):
+- 'memoria': diccionario en el proceso, protegido con un lock (microsegundos)
+- 'sqlite:///ruta.db': fichero SQLite compartido por todos los workers de la
+  misma máquina (más lento, pero el límite es global y no por proceso)
+"""
+from collections import OrderedDict
+from flask import request, jsonify, current_app
+from functools import wraps
+import math
+import sqlite3
+import threading
+import time
+
+
+class AlmacenMemoria:
+    """Cubos en memoria del proceso, en orden de último uso"""
+
+    # Como mucho este número de claves: al superarlo se descarta la usada hace más tiempo
+    MAX_CLAVES = 10000
+
+    def __init__(self):
+        # clave -> (tokens, último uso, instante en que el cubo vuelve a estar lleno)
+        self._cubos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, clave, capacidad, por_segundo):
+        """
+        Intenta consumir un token del cubo de la clave
+
+        Returns:
+            0 si se permite la petición, o los segundos a esperar si no
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            tokens, ultimo, _ = self._cubos.get(clave, (capacidad, ahora, ahora))
+            tokens = min(capacidad, tokens + (ahora - ultimo) * por_segundo)
+            espera = 0 if tokens >= 1 else (1 - tokens) / por_segundo
+            if espera == 0:
+                tokens -= 1
+            self._cubos[clave] = (tokens, ahora, ahora + (capacidad - tokens) / por_segundo)
+            self._cubos.move_to_end(clave)
+            self._podar(ahora)
+            return espera
+
+    def _podar(self, ahora):
+        """
+        Descarta desde el cubo usado hace más tiempo los que ya se habrían rellenado
+
+        Un cubo lleno equivale a no tener entrada. Cada cubo se descarta una
+        sola vez, así que el coste por petición es O(1) amortizado, y cada uno
+        se juzga con su propia capacidad y ritmo (fijados al usarlo).
+        """
+        while self._cubos:
+            _, (_, _, lleno_en) = next(iter(self._cubos.items()))
+            if lleno_en > ahora and len(self._cubos) <= self.MAX_CLAVES:
+                break
+            self._cubos.popitem(last=False)
+
+    def reiniciar(self):
+        """Vacía todos los cubos"""
+        with self._lock:
+            self._cubos.clear()
+
+
+class AlmacenSQLite:
+    """Cubos en un fichero SQLite compartido entre procesos de la misma máquina"""
+
+    # Segundos entre borrados de los cubos ya rellenados (por proceso)
+    INTERVALO_LIMPIEZA = 60
+
+    def __init__(self, ruta):
+        self._ruta = ruta
+        self._local = threading.local()
+        self._proxima_limpieza = 0.0
+        with self._conexion() as conexion:
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS cubos '
+                '(clave TEXT PRIMARY KEY, tokens REAL NOT NULL, ultimo REAL NOT NULL, '
+                'lleno_en REAL NOT NULL DEFAULT 0)'
+            )
+            columnas = [fila[1] for fila in conexion.execute('PRAGMA table_info(cubos)')]
+            if 'lleno_en' not in columnas:
+                # Tabla de una versión anterior: sus cubos se borran en la primera limpieza
+                conexion.execute('ALTER TABLE cubos ADD COLUMN lleno_en REAL NOT NULL DEFAULT 0')
+            conexion.execute('CREATE INDEX IF NOT EXISTS cubos_lleno_en ON cubos (lleno_en)')
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self._ruta, timeout=5, isolation_level=None)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            self._local.conexion = conexion
+        return conexion
+
+    def consumir(self, clave, capacidad, por_segundo):
+        """Igual que AlmacenMemoria.consumir, en una transacción exclusiva"""
+        # time.time() y no monotonic(): el reloj tiene que ser común a los procesos
+        ahora = time.time()
+        conexion = self._conexion()
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            fila = conexion.execute(
+                'SELECT tokens, ultimo FROM cubos WHERE clave = ?', (clave,)
+            ).fetchone()
+            tokens, ultimo = fila if fila else (capacidad, ahora)
+            tokens = min(capacidad, tokens + max(0.0, ahora - ultimo) * por_segundo)
+            espera = 0 if tokens >= 1 else (1 - tokens) / por_segundo
+            if espera == 0:
+                tokens -= 1
+            conexion.execute(
+                'INSERT OR REPLACE INTO cubos (clave, tokens, ultimo, lleno_en) VALUES (?, ?, ?, ?)',
+                (clave, tokens, ahora, ahora + (capacidad - tokens) / por_segundo)
+            )
+            if ahora >= self._proxima_limpieza:
+                # Los cubos ya rellenados equivalen a no tener fila
+                self._proxima_limpieza = ahora + self.INTERVALO_LIMPIEZA
+                conexion.execute('DELETE FROM cubos WHERE lleno_en <= ?', (ahora,))
+            conexion.execute('COMMIT')
+        except Exception:
+            conexion.execute('ROLLBACK')
+            raise
+        return espera
+
+    def reiniciar(self):
+        """Vacía todos los cubos"""
+        self._conexion().execute('DELETE FROM cubos')
+
+
+class Limitador:
+    """
+    Extensión Flask de limitación de peticiones
+
+    Uso:
+        limitador.init_app(app)
+
+        @auth_bp.route('/login', methods=['POST'])
+        @limitador.limitar('login')
+        def login(): ...
+    """
+
+    def __init__(self):
+        self.almacen = None
+        self.limites = {}
+        self.habilitado = True
+
+    def init_app(self, app):
+        """Configura el almacén y los límites a partir de app.config"""
+        self.habilitado = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.limites = app.config.get('RATE_LIMITS', {})
+
+        almacen = app.config.get('RATE_LIMIT_STORAGE', 'memoria')
+        if almacen.startswith('sqlite:///'):
+            self.almacen = AlmacenSQLite(almacen[len('sqlite:///'):])
+        else:
+            self.almacen = AlmacenMemoria()
+
+        app.extensions['limitador'] = self
+
+    def comprobar(self, ruta, claves):
+        """
+        Consume un token de cada clave de la ruta
+
+        Returns:
+            Segundos a esperar (0 si se permite la petición)
+        """
+        limite = self.limites.get(ruta)
+        if not self.habilitado or not limite:
+            return 0
+
+        capacidad = limite['capacidad']
+        por_segundo = limite['por_segundo']
+        espera = 0
+        for clave in claves:
+            espera = max(espera, self.almacen.consumir(f'{ruta}:{clave}', capacidad, por_segundo))
+        return espera
+
+    def limitar(self, ruta):
+        """
+        Decorador que limita la ruta por IP y, si viene en el JSON, por username
+
+        Args:
+            ruta: Nombre del límite en la configuración RATE_LIMITS
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                claves = [f'ip:{request.remote_addr}']
+                data = request.get_json(silent=True)
+                if isinstance(data, dict) and data.get('username'):
+                    claves.append(f'user:{str(data["username"]).lower()}')
+
+                espera = self.comprobar(ruta, claves)
+                if espera > 0:
+                    reintentar = math.ceil(espera)
+                    current_app.logger.warning(
+                        f"Límite de peticiones superado en {ruta}: {', '.join(claves)}"
+                    )
+                    respuesta = jsonify({
+                        'error': 'Demasiadas peticiones. Intente de nuevo más tarde',
+                        'reintentar_en': reintentar
+                    })
+                    respuesta.status_code = 429
+                    respuesta.headers['Retry-After'] = str(reintentar)
+                    return respuesta
+
+                return f(*args, **kwargs)
+            return decorated
+        return decorator
@@ -2,6 +2,7 @@
 Modelo de Centro Médico
 """
 from app import db
+from datetime import datetime
 
 
 class Centro(db.Model):
@@ -14,12 +15,24 @@ class Centro(db.Model):
     nombre = db.Column(db.String(100), nullable=False)
     direccion = db.Column(db.String(200), nullable=True)
 
+    # Marca de modificación (permite sincronización incremental)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Campos de to_dict(), para listados por columnas sin hidratar objetos ORM
+    CAMPOS_DICT = ('id_centro', 'nombre', 'direccion', 'updated_at')
+
+    @classmethod
+    def columnas_dict(cls):
+        """Columnas equivalentes a to_dict() para Query.with_entities()"""
+        return [getattr(cls, campo) for campo in cls.CAMPOS_DICT]
+
     def to_dict(self):
         """Convierte el centro a diccionario"""
         return {
             'id_centro': self.id_centro,
             'nombre': self.nombre,
-            'direccion': self.direccion
+            'direccion': self.direccion,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
     def __repr__(self):
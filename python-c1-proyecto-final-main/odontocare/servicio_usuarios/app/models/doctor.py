@@ -2,6 +2,7 @@
 Modelo de Doctor
 """
 from app import db
+from datetime import datetime
 
 
 class Doctor(db.Model):
@@ -15,13 +16,25 @@ class Doctor(db.Model):
     nombre = db.Column(db.String(100), nullable=False)
     especialidad = db.Column(db.String(100), nullable=True)
 
+    # Marca de modificación (permite sincronización incremental)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Campos de to_dict(), para listados por columnas sin hidratar objetos ORM
+    CAMPOS_DICT = ('id_doctor', 'id_usuario', 'nombre', 'especialidad', 'updated_at')
+
+    @classmethod
+    def columnas_dict(cls):
+        """Columnas equivalentes a to_dict() para Query.with_entities()"""
+        return [getattr(cls, campo) for campo in cls.CAMPOS_DICT]
+
     def to_dict(self):
         """Convierte el doctor a diccionario"""
         return {
             'id_doctor': self.id_doctor,
             'id_usuario': self.id_usuario,
             'nombre': self.nombre,
-            'especialidad': self.especialidad
+            'especialidad': self.especialidad,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
     def __repr__(self):
@@ -2,6 +2,7 @@
 Modelo de Paciente
 """
 from app import db
+from datetime import datetime
 
 
 class Paciente(db.Model):
@@ -18,6 +19,17 @@ class Paciente(db.Model):
     telefono = db.Column(db.String(20), nullable=True)
     estado = db.Column(db.String(10), nullable=False, default='ACTIVO')
 
+    # Marca de modificación (permite sincronización incremental)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Campos de to_dict(), para listados por columnas sin hidratar objetos ORM
+    CAMPOS_DICT = ('id_paciente', 'id_usuario', 'nombre', 'telefono', 'estado', 'updated_at')
+
+    @classmethod
+    def columnas_dict(cls):
+        """Columnas equivalentes a to_dict() para Query.with_entities()"""
+        return [getattr(cls, campo) for campo in cls.CAMPOS_DICT]
+
     def to_dict(self):
         """Convierte el paciente a diccionario"""
         return {
@@ -25,7 +37,8 @@ class Paciente(db.Model):
             'id_usuario': self.id_usuario,
             'nombre': self.nombre,
             'telefono': self.telefono,
-            'estado': self.estado
+            'estado': self.estado,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
     def __repr__(self):
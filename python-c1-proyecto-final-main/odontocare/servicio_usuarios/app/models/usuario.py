@@ -22,6 +22,14 @@ class Usuario(db.Model):
     paciente = db.relationship('Paciente', backref='usuario', uselist=False)
     doctor = db.relationship('Doctor', backref='usuario', uselist=False)
 
+    # Campos de to_dict(), para listados por columnas sin hidratar objetos ORM
+    CAMPOS_DICT = ('id_usuario', 'username', 'rol')
+
+    @classmethod
+    def columnas_dict(cls):
+        """Columnas equivalentes a to_dict() para Query.with_entities()"""
+        return [getattr(cls, campo) for campo in cls.CAMPOS_DICT]
+
     def set_password(self, password):
         """Hashea y guarda la contraseña"""
         self.password = generate_password_hash(password)
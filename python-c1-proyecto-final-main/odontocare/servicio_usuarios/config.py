@@ -17,6 +17,31 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Backend JSON: 'auto' (orjson si está instalado) o 'stdlib'
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Compresión gzip de respuestas (si el cliente la acepta)
+    COMPRESION_HABILITADA = os.environ.get('COMPRESION_HABILITADA', 'true').lower() == 'true'
+    COMPRESION_UMBRAL_BYTES = int(os.environ.get('COMPRESION_UMBRAL_BYTES', 1024))
+    COMPRESION_NIVEL = int(os.environ.get('COMPRESION_NIVEL', 6))
+    COMPRESION_TIPOS = ('application/json', 'text/plain', 'text/html', 'text/csv')
+
+    # Limitación de peticiones (token bucket) por IP y por username
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    # 'memoria' (por proceso) o 'sqlite:///ruta.db' (compartido entre workers)
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memoria')
+    # Por ruta: ráfaga máxima y tokens repuestos por segundo
+    RATE_LIMITS = {
+        'login': {
+            'capacidad': int(os.environ.get('RATE_LIMIT_LOGIN_CAPACIDAD', 10)),
+            'por_segundo': float(os.environ.get('RATE_LIMIT_LOGIN_POR_SEGUNDO', 0.2))
+        },
+        'register': {
+            'capacidad': int(os.environ.get('RATE_LIMIT_REGISTER_CAPACIDAD', 5)),
+            'por_segundo': float(os.environ.get('RATE_LIMIT_REGISTER_POR_SEGUNDO', 0.05))
+        }
+    }
+
 
 class DevelopmentConfig(Config):
     """Configuración de desarrollo"""